@@ -1,5 +1,7 @@
 import os
+import random
 import time
+from email.utils import parsedate_to_datetime
 import subprocess
 from datetime import datetime
 from typing import List, Optional
@@ -28,6 +30,21 @@ from ..config import config
 from .background_runner import BackgroundRunner
 
 
+def _parse_retry_after(value):
+    """Return the Retry-After header as seconds, or None if absent/unparseable."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
 class ResumeImprover:
 
     def __init__(self, url, resume_location=None, llm_kwargs: dict = None):
@@ -108,6 +125,7 @@ class ResumeImprover:
         use_proxy = False
 
         for attempt in range(max_retries):
+            response = None
             try:
                 proxies = None
                 if use_proxy:
@@ -122,11 +140,16 @@ class ResumeImprover:
                 return True
 
             except requests.RequestException as e:
-                if response.status_code == 429:
+                if response is not None and response.status_code in (429, 503):
+                    # Honour Retry-After when the site sends it, otherwise full-jitter backoff
+                    # so parallel downloads don't retry in lockstep.
+                    delay = _parse_retry_after(response.headers.get("Retry-After"))
+                    if delay is None:
+                        delay = random.uniform(0, backoff_factor * 2**attempt)
                     config.logger.warning(
-                        f"Rate limit exceeded. Retrying in {backoff_factor * 2 ** attempt} seconds..."
+                        f"Rate limit exceeded. Retrying in {delay:.1f} seconds..."
                     )
-                    time.sleep(backoff_factor * 2**attempt)
+                    time.sleep(delay)
                     use_proxy = True
                 else:
                     config.logger.error(f"Failed to download URL {self.url}: {e}")
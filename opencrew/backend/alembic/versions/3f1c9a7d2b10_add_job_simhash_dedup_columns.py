@@ -0,0 +1,48 @@
+"""Add simhash and canonical_job_id columns to jobs for near-duplicate detection
+
+Revision ID: 3f1c9a7d2b10
+Revises: 968f67fbf361
+Create Date: 2025-05-02 10:14:27.318842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b10'
+down_revision: Union[str, None] = '968f67fbf361'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('simhash', sa.BigInteger(), nullable=True))
+    op.add_column('jobs', sa.Column('simhash_band_0', sa.Integer(), nullable=True))
+    op.add_column('jobs', sa.Column('simhash_band_1', sa.Integer(), nullable=True))
+    op.add_column('jobs', sa.Column('simhash_band_2', sa.Integer(), nullable=True))
+    op.add_column('jobs', sa.Column('simhash_band_3', sa.Integer(), nullable=True))
+    op.add_column('jobs', sa.Column('canonical_job_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_jobs_canonical_job_id', 'jobs', 'jobs', ['canonical_job_id'], ['id'], ondelete='SET NULL')
+    op.create_index(op.f('ix_jobs_simhash_band_0'), 'jobs', ['simhash_band_0'], unique=False)
+    op.create_index(op.f('ix_jobs_simhash_band_1'), 'jobs', ['simhash_band_1'], unique=False)
+    op.create_index(op.f('ix_jobs_simhash_band_2'), 'jobs', ['simhash_band_2'], unique=False)
+    op.create_index(op.f('ix_jobs_simhash_band_3'), 'jobs', ['simhash_band_3'], unique=False)
+    op.create_index(op.f('ix_jobs_canonical_job_id'), 'jobs', ['canonical_job_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_jobs_canonical_job_id'), table_name='jobs')
+    op.drop_index(op.f('ix_jobs_simhash_band_3'), table_name='jobs')
+    op.drop_index(op.f('ix_jobs_simhash_band_2'), table_name='jobs')
+    op.drop_index(op.f('ix_jobs_simhash_band_1'), table_name='jobs')
+    op.drop_index(op.f('ix_jobs_simhash_band_0'), table_name='jobs')
+    op.drop_constraint('fk_jobs_canonical_job_id', 'jobs', type_='foreignkey')
+    op.drop_column('jobs', 'canonical_job_id')
+    op.drop_column('jobs', 'simhash_band_3')
+    op.drop_column('jobs', 'simhash_band_2')
+    op.drop_column('jobs', 'simhash_band_1')
+    op.drop_column('jobs', 'simhash_band_0')
+    op.drop_column('jobs', 'simhash')
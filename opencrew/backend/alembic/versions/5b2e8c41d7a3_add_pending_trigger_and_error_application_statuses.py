@@ -0,0 +1,31 @@
+"""Add pending_trigger, trigger_failed and error application statuses
+
+Revision ID: 5b2e8c41d7a3
+Revises: 3f1c9a7d2b10
+Create Date: 2025-05-04 09:41:52.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e8c41d7a3'
+down_revision: Union[str, None] = '3f1c9a7d2b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ALTER TYPE ... ADD VALUE can't run inside a transaction block on older Postgres
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE applicationstatus ADD VALUE IF NOT EXISTS 'PENDING_TRIGGER'")
+        op.execute("ALTER TYPE applicationstatus ADD VALUE IF NOT EXISTS 'TRIGGER_FAILED'")
+        op.execute("ALTER TYPE applicationstatus ADD VALUE IF NOT EXISTS 'ERROR'")
+
+
+def downgrade() -> None:
+    # Postgres can't drop enum values; the extra labels are harmless once unused.
+    pass
@@ -0,0 +1,44 @@
+"""Create user_quota_usage table for materialized monthly auto-apply quota
+
+Revision ID: a7d3e9f05c12
+Revises: 5b2e8c41d7a3
+Create Date: 2025-05-05 14:22:08.917341
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9f05c12'
+down_revision: Union[str, None] = '5b2e8c41d7a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_quota_usage',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=7), nullable=False),
+    sa.Column('reserved', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('used', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'period')
+    )
+    # Seed the current month from existing applications so quotas carry over on deploy
+    op.execute("""
+        INSERT INTO user_quota_usage (user_id, period, reserved, used)
+        SELECT user_id,
+               to_char(now() AT TIME ZONE 'UTC', 'YYYY-MM'),
+               count(*) FILTER (WHERE status IN ('PENDING_TRIGGER', 'APPLYING')),
+               count(*) FILTER (WHERE status = 'APPLIED' AND applied_at >= date_trunc('month', now() AT TIME ZONE 'UTC'))
+        FROM applications
+        GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('user_quota_usage')
@@ -0,0 +1,48 @@
+"""Create agent_run_usage table for per-application LLM agent usage
+
+Revision ID: c4f2a8e61b93
+Revises: a7d3e9f05c12
+Create Date: 2025-05-12 10:41:37.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f2a8e61b93'
+down_revision: Union[str, None] = 'a7d3e9f05c12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('agent_run_usage',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('application_id', sa.Integer(), nullable=False),
+    sa.Column('domain', sa.String(), nullable=False),
+    sa.Column('steps', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('llm_calls', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('prompt_tokens', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('completion_tokens', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('duration_seconds', sa.Float(), server_default='0', nullable=False),
+    sa.Column('success', sa.Boolean(), server_default='false', nullable=False),
+    sa.Column('stop_reason', sa.String(length=16), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['application_id'], ['applications.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_agent_run_usage_id'), 'agent_run_usage', ['id'], unique=False)
+    op.create_index(op.f('ix_agent_run_usage_application_id'), 'agent_run_usage', ['application_id'], unique=False)
+    op.create_index(op.f('ix_agent_run_usage_domain'), 'agent_run_usage', ['domain'], unique=False)
+    op.create_index(op.f('ix_agent_run_usage_created_at'), 'agent_run_usage', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_agent_run_usage_created_at'), table_name='agent_run_usage')
+    op.drop_index(op.f('ix_agent_run_usage_domain'), table_name='agent_run_usage')
+    op.drop_index(op.f('ix_agent_run_usage_application_id'), table_name='agent_run_usage')
+    op.drop_index(op.f('ix_agent_run_usage_id'), table_name='agent_run_usage')
+    op.drop_table('agent_run_usage')
@@ -0,0 +1,26 @@
+"""Add analysis JSON column to jobs for the shared job-description analysis
+
+Revision ID: d81b5f3c7a20
+Revises: c4f2a8e61b93
+Create Date: 2025-05-14 09:22:51.640193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81b5f3c7a20'
+down_revision: Union[str, None] = 'c4f2a8e61b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('analysis', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'analysis')
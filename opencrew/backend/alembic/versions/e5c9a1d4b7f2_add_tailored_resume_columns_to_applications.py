@@ -0,0 +1,26 @@
+"""Add tailored_data column to applications for pre-tailored resumes
+
+Revision ID: e5c9a1d4b7f2
+Revises: d81b5f3c7a20
+Create Date: 2025-05-15 16:08:12.905317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c9a1d4b7f2'
+down_revision: Union[str, None] = 'd81b5f3c7a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('applications', sa.Column('tailored_data', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('applications', 'tailored_data')
@@ -9,11 +9,12 @@ import tempfile
 
 from app import crud # Import crud only
 from app.schemas.application import Application, ApplicationCreate, ApplicationUpdate # Import application schemas directly
-from app.models.user import User # Import User model specifically
+from app.models.user import User, SubscriptionTier # Import User model specifically
 from app.db.session import get_db # Absolute import
 from app.api.users import get_current_active_user # Correct import name
-from app.workers.tasks import trigger_auto_apply # Absolute import
+from app.workers.tasks import schedule_auto_apply # Absolute import
 from app.models.application import ApplicationStatus # Absolute import
+from app.services import quota
 
 
 logger = logging.getLogger(__name__)
@@ -114,31 +115,38 @@ def update_application(
 
     # --- Check if triggering auto-apply --- 
     should_trigger_apply = False
+    reserved_quota = False
     if application_in.status == ApplicationStatus.APPLYING and db_application.status != ApplicationStatus.APPLYING:
-        # Check quota before allowing the status change and triggering the task
-        can_apply = crud.application.check_auto_apply_quota(db=db, user=current_user)
-        if not can_apply:
+        if db_application.status == ApplicationStatus.PENDING_TRIGGER:
+            should_trigger_apply = True # Matching already reserved this application's slot
+        # Reserve quota before allowing the status change and triggering the task
+        elif quota.reserve(db, current_user, count=1) == 0:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS, 
-                detail=f"Auto-apply quota reached for the month ({crud.application.FREE_TIER_AUTO_APPLY_LIMIT} limit for free tier)."
+                detail=f"Auto-apply quota reached for the month ({quota.QUOTA_LIMITS[SubscriptionTier.FREE]} limit for free tier)."
             )
         else:
-            should_trigger_apply = True
+            should_trigger_apply = reserved_quota = True
 
-    # Optional: Validate resume ownership if resume_id is being updated
-    if application_in.resume_id and application_in.resume_id != db_application.resume_id:
-        resume = crud.resume.get_resume(db=db, resume_id=application_in.resume_id)
-        if not resume or resume.owner_id != current_user.id:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Resume not found or does not belong to user")
-
-    # Update the application record in the database
-    updated_application = crud.application.update_application(
-        db=db, db_application=db_application, application_in=application_in
-    )
+    try:
+        # Optional: Validate resume ownership if resume_id is being updated
+        if application_in.resume_id and application_in.resume_id != db_application.resume_id:
+            resume = crud.resume.get_resume(db=db, resume_id=application_in.resume_id)
+            if not resume or resume.owner_id != current_user.id:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Resume not found or does not belong to user")
+
+        # Update the application record in the database
+        updated_application = crud.application.update_application(
+            db=db, db_application=db_application, application_in=application_in
+        )
 
-    # --- Trigger Celery task AFTER successfully updating status --- 
-    if should_trigger_apply:
-        trigger_auto_apply.delay(application_id=updated_application.id)
+        # --- Trigger Celery task AFTER successfully updating status --- 
+        if should_trigger_apply:
+            schedule_auto_apply(current_user, [updated_application.id]) # Fair-queued with per-domain pacing
+    except Exception:
+        if reserved_quota:
+            quota.release(db, current_user.id) # The reserved slot was never used
+        raise
 
     return updated_application
 
@@ -4,8 +4,13 @@ from pathlib import Path
 import logging
 from typing import Literal # Added for query parameter validation
 
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
 # Assuming your project structure allows this import path
-from app.services import resume_optimizer
+from app.services import resume_optimizer, job_analysis
+from app import crud
+from app.db.session import get_db
 from app.schemas.optimize import ( # Added Patch schemas
     IngestResponse, ParseRequest, ParsedResume,
     KeywordAnalysisRequest, KeywordAnalysisResponse,
@@ -150,6 +155,7 @@ async def parse_resume_structure(
 )
 async def analyze_keywords(
     request: KeywordAnalysisRequest,
+    db: Session = Depends(get_db),
     # Uncomment if authentication is needed
     # current_user: User = Depends(get_current_active_user)
 ):
@@ -162,13 +168,25 @@ async def analyze_keywords(
     logger.info("Received request for keyword analysis.")
     # Add user info: logger.info(f"User {current_user.email} analyzing keywords.")
 
-    if not request.job_description:
+    jd_terms = None
+    if request.job_id is not None:
+        job = crud.job.get_job(db, job_id=request.job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found.")
+        # Shared per-job analysis: the JD's TF-IDF terms are computed once, not per request.
+        # Only the key terms are needed here, so don't wait on (or retry) the LLM summary.
+        analysis = await run_in_threadpool(job_analysis.get_or_compute, db, job, with_summary=False)
+        if analysis is not None:
+            jd_terms = job_analysis.key_terms(analysis)
+    elif not request.job_description:
         raise HTTPException(status_code=400, detail="Job description cannot be empty.")
+    if jd_terms is None and not request.job_description:
+        raise HTTPException(status_code=400, detail="Job has no description to analyze.")
     if not request.parsed_resume or not request.parsed_resume.sections:
          raise HTTPException(status_code=400, detail="Parsed resume data cannot be empty.")
 
     try:
-        analysis_result: KeywordAnalysisResponse = resume_optimizer.analyze_keyword_gaps(request)
+        analysis_result: KeywordAnalysisResponse = resume_optimizer.analyze_keyword_gaps(request, jd_terms=jd_terms)
         return analysis_result
     except Exception as e:
         logger.exception(f"Unexpected error during keyword analysis: {e}")
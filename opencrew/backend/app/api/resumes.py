@@ -1,19 +1,22 @@
 import uuid # For generating unique S3 keys
-import boto3
 from botocore.exceptions import NoCredentialsError, PartialCredentialsError, ClientError
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List
 
 from app.core.config import settings # Absolute import
 
 from app import crud, schemas # Import crud and schemas
 from app.models.user import User # Import User model specifically
-from app.schemas.resume import ResumeParseRequest, ResumeParseResponse, BasicInfo, StructuredResume # Absolute import
+from app.schemas.resume import ResumeParseRequest, ResumeParseResponse, ResumeParseJobSubmitted, ResumeParseJobStatus, BasicInfo, StructuredResume # Absolute import
 from app.db.session import get_db # Absolute import
 from app.api.users import get_current_active_user # Correct import name
 from app.services import profile_import # Absolute import
-from app.services import resume_tailoring # Absolute import
+from app.services import s3 # Absolute import
+from app.services import parse_jobs # Absolute import
+from app.workers.tasks import parse_and_tailor_resume_task # Absolute import
 import logging # Import logging
 
 logger = logging.getLogger(__name__) # Add logger
@@ -39,13 +42,8 @@ async def upload_resume(
 
     # --- S3 Upload ---
     s3_key = None
-    if settings.S3_BUCKET_NAME and settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION_NAME
-        )
+    if s3.is_configured():
+        s3_client = s3.get_s3_client()
         # Generate a unique key for the S3 object
         file_extension = ".pdf" # Enforce pdf
         unique_id = uuid.uuid4()
@@ -181,12 +179,82 @@ def delete_existing_resume(
     return deleted_resume
 
 
-# --- Endpoint for Structured PDF Parsing and Tailoring --- 
+# --- Endpoints for Structured PDF Parsing and Tailoring ---
+# Parsing and tailoring make several LLM calls, so they run in the Celery task
+# tasks.parse_and_tailor_resume. Clients submit a job, then poll its status or follow its
+# server-sent events; finished sections are included as soon as they are ready.
+
+def _submit_parse_job(parse_request: ResumeParseRequest, user_id: int, tracked: bool = True) -> str:
+    """Publishes a parse-and-tailor job and returns its ID.
+
+    Tracked jobs (served by the status/events endpoints) need their owner recorded first, so
+    the first poll finds it; if that fails, nothing is published and a 503 is raised.
+    """
+    job_id = str(uuid.uuid4())
+    if not parse_jobs.register(job_id, user_id) and tracked:
+        # Without the job store the job would run but its status couldn't be served
+        logger.error(f"Not queueing parse job for user {user_id}: its owner could not be recorded (Redis unavailable).")
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Job tracking is temporarily unavailable.")
+    parse_and_tailor_resume_task.apply_async(
+        kwargs={"user_id": user_id, "parse_request": parse_request.model_dump()}, task_id=job_id
+    )
+    logger.info(f"Submitted parse job {job_id} for user {user_id}. Resume ID: {parse_request.resume_id}, Job ID: {parse_request.job_id}, {len(parse_request.text_items)} text items.")
+    return job_id
+
+
+def _require_job_owner(job_id: str, current_user: User) -> None:
+    if not parse_jobs.is_owner(job_id, current_user.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Parse job not found.")
+
+
+@router.post("/parse-and-tailor/jobs", response_model=ResumeParseJobSubmitted, status_code=status.HTTP_202_ACCEPTED)
+def submit_parse_and_tailor_job(
+    *,
+    request: Request,
+    parse_request: ResumeParseRequest,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Queues parsing/tailoring of parsed PDF text items and returns a job ID.
+    Poll `status_url` or follow `events_url` (server-sent events) for progress and the result.
+    """
+    job_id = _submit_parse_job(parse_request, current_user.id)
+    return ResumeParseJobSubmitted(
+        job_id=job_id,
+        status_url=str(request.url_for("get_parse_and_tailor_job", job_id=job_id)),
+        events_url=str(request.url_for("stream_parse_and_tailor_job", job_id=job_id)),
+    )
+
+
+@router.get("/parse-and-tailor/jobs/{job_id}", response_model=ResumeParseJobStatus)
+def get_parse_and_tailor_job(
+    *,
+    job_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Current state of a parse-and-tailor job, with the sections finished so far."""
+    _require_job_owner(job_id, current_user)
+    return parse_jobs.get_status(job_id)
+
+
+@router.get("/parse-and-tailor/jobs/{job_id}/events")
+def stream_parse_and_tailor_job(
+    *,
+    job_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Server-sent events for a parse-and-tailor job (`stage`, `section`, then `done` or `error`)."""
+    _require_job_owner(job_id, current_user)
+    return StreamingResponse(
+        parse_jobs.stream_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}, # Don't let proxies buffer the stream
+    )
+
 
 @router.post("/parse-and-tailor", response_model=ResumeParseResponse) # Keep using directly imported schema
 async def parse_and_tailor_resume(
-    *, 
-    db: Session = Depends(get_db),
+    *,
     parse_request: ResumeParseRequest, # Use directly imported schema
     current_user: User = Depends(get_current_active_user) # Use correct dependency
 ):
@@ -194,42 +262,24 @@ async def parse_and_tailor_resume(
     Receives parsed PDF text items from the frontend,
     triggers backend processing/tailoring,
     and returns a structured ATS-friendly resume.
+
+    Kept for existing clients: runs the same job as /parse-and-tailor/jobs and awaits it
+    without blocking the event loop. New clients should use the job endpoints.
     """
-    logger.info(f"Received request to parse/tailor resume for user {current_user.id}. Job ID: {parse_request.job_id}")
-    logger.info(f"Received {len(parse_request.text_items)} text items.")
-    
+    # Redis SET + broker publish are blocking I/O; keep them off the event loop
+    job_id = await run_in_threadpool(_submit_parse_job, parse_request, current_user.id, tracked=False) # Awaited here, not polled
     try:
-        # Call the new service function (currently uses placeholder logic)
-        structured_resume = resume_tailoring.process_and_tailor_resume(
-            text_items=parse_request.text_items,
-            job_description=parse_request.job_description
-            # TODO: Potentially fetch job description from DB using job_id if not provided directly
-        )
-        
-        # --- Save/Update Structured Data ---
-        resume_id_to_update = parse_request.resume_id # Access directly from the updated schema
-
-        if resume_id_to_update is not None: # Check if ID was provided
-            db_resume = crud.resume.get_resume(db, resume_id=resume_id_to_update, owner_id=current_user.id)
-            if db_resume:
-                logger.info(f"Updating structured data for resume ID: {resume_id_to_update}")
-                update_schema = schemas.resume.ResumeUpdate(structured_data=structured_resume) # Correct path
-                crud.resume.update_resume(db=db, db_resume=db_resume, resume_in=update_schema)
-            else:
-                logger.warning(f"Resume ID {resume_id_to_update} not found for user {current_user.id}. Structured data not saved.")
-                # Optionally, could create a new resume record here if desired
-        else:
-             logger.warning("No resume_id provided in the request. Structured data not saved.")
-             # Handle cases where no ID is given - perhaps create a new default resume?
-
-        return ResumeParseResponse( # Use directly imported schema
-            structured_resume=structured_resume,
-            message="Resume processed and tailored successfully (using placeholder logic)."
+        job_status = await parse_jobs.wait_for_result(job_id, timeout=settings.PARSE_JOB_SYNC_TIMEOUT)
+    except TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Resume processing is taking longer than expected. Job ID: {job_id}"
         )
-        
-    except Exception as e:
-        logger.exception(f"Error during parse_and_tailor_resume for user {current_user.id}: {e}")
+
+    if job_status["state"] != "SUCCESS":
+        logger.error(f"Parse job {job_id} for user {current_user.id} failed: {job_status['error']}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to process and tailor resume: {e}"
+            detail=f"Failed to process and tailor resume: {job_status['error']}"
         )
+    return ResumeParseResponse(**job_status["result"])
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 import os
+import tempfile
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "JobBright"
@@ -28,6 +29,46 @@ class Settings(BaseSettings):
     # Celery / Redis
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
     CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
+    # Shared state (rate limits, counters) that must hold across Celery workers
+    REDIS_URL: str = os.getenv("REDIS_URL", os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0"))
+
+    # Outbound scraping politeness (see services/rate_limiter.py)
+    SCRAPE_RATE_PER_SECOND: float = float(os.getenv("SCRAPE_RATE_PER_SECOND", 1.0)) # Default per-host request rate
+    SCRAPE_BURST: int = int(os.getenv("SCRAPE_BURST", 3)) # Requests allowed back-to-back before pacing kicks in
+    SCRAPE_MAX_RETRIES: int = int(os.getenv("SCRAPE_MAX_RETRIES", 3))
+    # Per-host overrides, e.g. '{"boards-api.greenhouse.io": 4.0, "www.indeed.com": 0.2}'
+    SCRAPE_HOST_RATE_LIMITS_JSON: str = os.getenv("SCRAPE_HOST_RATE_LIMITS_JSON", '{}')
+    SCRAPER_SHARD_SIZE: int = int(os.getenv("SCRAPER_SHARD_SIZE", 5)) # sites.yml entries per Celery subtask
+    SCRAPER_SHARD_TIME_LIMIT: int = int(os.getenv("SCRAPER_SHARD_TIME_LIMIT", 900)) # Seconds before a shard is killed
+    SCRAPER_HTML_BATCH_SIZE: int = int(os.getenv("SCRAPER_HTML_BATCH_SIZE", 50)) # Streamed jobs converted/ingested per batch
+    SCRAPER_HTML_WORKERS: int = int(os.getenv("SCRAPER_HTML_WORKERS", 4)) # Threads for description HTML-to-text
+
+    # Auto-apply browser pool (per worker process, see services/browser_pool.py)
+    BROWSER_POOL_SIZE: int = int(os.getenv("BROWSER_POOL_SIZE", 2)) # Concurrent agent contexts per worker
+    BROWSER_POOL_MAX_USES: int = int(os.getenv("BROWSER_POOL_MAX_USES", 50)) # Leases before Chromium is relaunched
+    BROWSER_HEADLESS: bool = os.getenv("BROWSER_HEADLESS", "true").lower() == "true"
+    AUTO_APPLY_DOMAIN_CONCURRENCY: int = int(os.getenv("AUTO_APPLY_DOMAIN_CONCURRENCY", 1)) # Concurrent agents per job-site domain (per board on hosted ATSs)
+    AUTO_APPLY_ATS_CONCURRENCY: int = int(os.getenv("AUTO_APPLY_ATS_CONCURRENCY", 8)) # Concurrent agents per hosted ATS (all boards on e.g. boards.greenhouse.io)
+    AUTO_APPLY_BATCH_SIZE: int = int(os.getenv("AUTO_APPLY_BATCH_SIZE", 8)) # Applications per trigger_auto_apply_batch task
+    ATS_ADAPTERS_ENABLED: bool = os.getenv("ATS_ADAPTERS_ENABLED", "true").lower() == "true" # Deterministic Greenhouse/Lever fast path
+    ATS_ADAPTER_TIMEOUT_SECONDS: int = int(os.getenv("ATS_ADAPTER_TIMEOUT_SECONDS", 20)) # Per navigation/confirmation wait
+    AGENT_MAX_STEPS: int = int(os.getenv("AGENT_MAX_STEPS", 40)) # browser-use steps per application
+    AGENT_MAX_SECONDS: float = float(os.getenv("AGENT_MAX_SECONDS", 600)) # Wall-clock budget per agent run
+    AGENT_MAX_TOKENS: int = int(os.getenv("AGENT_MAX_TOKENS", 400000)) # Prompt + completion tokens per agent run
+
+    # Auto-apply scheduler (see services/apply_scheduler.py)
+    AUTO_APPLY_DOMAIN_RATE_PER_MINUTE: float = float(os.getenv("AUTO_APPLY_DOMAIN_RATE_PER_MINUTE", 2.0)) # Agent starts per domain, cluster-wide
+    AUTO_APPLY_ATS_RATE_PER_MINUTE: float = float(os.getenv("AUTO_APPLY_ATS_RATE_PER_MINUTE", 30.0)) # Agent starts per hosted ATS, cluster-wide
+    AUTO_APPLY_SLOT_TTL: int = int(os.getenv("AUTO_APPLY_SLOT_TTL", 1200)) # Seconds before a dead worker's domain slot is reclaimed
+    AUTO_APPLY_DEFER_SECONDS: int = int(os.getenv("AUTO_APPLY_DEFER_SECONDS", 30)) # Countdown when a domain is at capacity
+    AUTO_APPLY_DISPATCH_BATCH: int = int(os.getenv("AUTO_APPLY_DISPATCH_BATCH", 40)) # Applications released from the fair queue per tick
+    AUTO_APPLY_DISPATCH_INTERVAL: float = float(os.getenv("AUTO_APPLY_DISPATCH_INTERVAL", 15.0)) # Seconds between dispatcher ticks
+
+    # Pre-tailoring ahead of auto-apply (see services/pre_tailoring.py)
+    PRETAILOR_ENABLED: bool = os.getenv("PRETAILOR_ENABLED", "true").lower() == "true"
+    PRETAILOR_BATCH_SIZE: int = int(os.getenv("PRETAILOR_BATCH_SIZE", 10)) # Applications per pretailor_applications task
+    PRETAILOR_CONCURRENCY: int = int(os.getenv("PRETAILOR_CONCURRENCY", 4)) # Applications tailored at once per task
+    PRETAILOR_RATE_PER_MINUTE: float = float(os.getenv("PRETAILOR_RATE_PER_MINUTE", 30.0)) # Application tailorings started per minute, cluster-wide
 
     # Qdrant
     QDRANT_HOST: str = os.getenv("QDRANT_HOST", "localhost")
@@ -40,6 +81,26 @@ class Settings(BaseSettings):
     AZURE_OPENAI_API_KEY: str | None = os.getenv("AZURE_OPENAI_API_KEY")
     AZURE_OPENAI_DEPLOYMENT_NAME: str | None = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME") # Your deployment name (e.g., gpt-4-turbo)
     AZURE_OPENAI_API_VERSION: str | None = os.getenv("AZURE_OPENAI_API_VERSION") # e.g., "2023-05-15"
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", 16)) # In-flight LLM requests per process (threads) / event loop
+    LLM_MODEL_CONCURRENCY: int = int(os.getenv("LLM_MODEL_CONCURRENCY", 8)) # In-flight requests per model/deployment
+    LLM_RATE_PER_MINUTE: float = float(os.getenv("LLM_RATE_PER_MINUTE", 300)) # Requests per model per minute, shared across workers
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", 3)) # Retries for throttling, 5xx and connection errors
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))
+    LLM_BASE_URL: str | None = os.getenv("LLM_BASE_URL") # OpenAI-compatible endpoint for every LLM request (e.g. the offline stand-in, scripts/llm_standin.py)
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", 20)) # Pooled HTTP connections per client
+    LLM_TAILOR_CONCURRENCY: int = int(os.getenv("LLM_TAILOR_CONCURRENCY", 4)) # Concurrent section-tailoring calls per resume
+    LLM_STRUCTURED_OUTPUT: bool = os.getenv("LLM_STRUCTURED_OUTPUT", "false").lower() == "true" # JSON-schema response_format for parsing; needs API version 2024-08-01-preview+
+    RESUME_PARSE_CHUNK_CHARS: int = int(os.getenv("RESUME_PARSE_CHUNK_CHARS", 12000)) # Longer resumes are parsed in concurrent chunks
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true" # Reuse responses to identical prompts
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 50000)) # Least recently used entries are evicted beyond this
+    JD_PROMPT_MAX_TOKENS: int = int(os.getenv("JD_PROMPT_MAX_TOKENS", 1500)) # Job-description budget per prompt after compaction
+    JD_TOKENIZER_ENCODING: str = os.getenv("JD_TOKENIZER_ENCODING", "o200k_base") # tiktoken encoding used to count prompt tokens
+    JOB_ANALYSIS_MAX_KEY_TERMS: int = int(os.getenv("JOB_ANALYSIS_MAX_KEY_TERMS", 200)) # TF-IDF terms stored per job
+    PARSE_JOB_TTL_SECONDS: int = int(os.getenv("PARSE_JOB_TTL_SECONDS", 86400)) # Parse-and-tailor job ownership, matches Celery result expiry
+    PARSE_JOB_POLL_SECONDS: float = float(os.getenv("PARSE_JOB_POLL_SECONDS", 0.5)) # Result-backend poll interval for waits and SSE
+    PARSE_JOB_SYNC_TIMEOUT: float = float(os.getenv("PARSE_JOB_SYNC_TIMEOUT", 180)) # Legacy synchronous endpoint gives up after this
+    PARSE_JOB_STREAM_TIMEOUT: float = float(os.getenv("PARSE_JOB_STREAM_TIMEOUT", 300)) # SSE streams close after this
 
     # Other Model Names
     SPACY_MODEL_NAME: str = os.getenv("SPACY_MODEL_NAME", "en_core_web_sm")
@@ -60,6 +121,14 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str | None = os.getenv("AWS_SECRET_ACCESS_KEY")
     AWS_REGION_NAME: str = os.getenv("AWS_REGION_NAME", "us-east-1") # Default region if not set
     S3_BUCKET_NAME: str | None = os.getenv("S3_BUCKET_NAME")
+    RESUME_CACHE_DIR: str = os.getenv("RESUME_CACHE_DIR", os.path.join(tempfile.gettempdir(), "opencrew_resume_cache")) # Per-process subdirectories
+    RESUME_CACHE_MAX_MB: int = int(os.getenv("RESUME_CACHE_MAX_MB", 256)) # Per worker process, LRU-evicted
+    PDF_RENDER_CACHE_DIR: str = os.getenv("PDF_RENDER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "opencrew_pdf_render_cache")) # Per-process subdirectories
+    PDF_RENDER_CACHE_MAX_MB: int = int(os.getenv("PDF_RENDER_CACHE_MAX_MB", 64)) # Per worker process, LRU-evicted
+    PDF_RENDER_S3_PREFIX: str = os.getenv("PDF_RENDER_S3_PREFIX", "rendered_resumes") # Shared render cache tier
+    ARTIFACT_UPLOAD_WORKERS: int = int(os.getenv("ARTIFACT_UPLOAD_WORKERS", 2)) # Background screenshot upload threads per worker process
+    ARTIFACT_SCREENSHOT_MAX_WIDTH: int = int(os.getenv("ARTIFACT_SCREENSHOT_MAX_WIDTH", 1280)) # Screenshots are downscaled to this width
+    ARTIFACT_SCREENSHOT_QUALITY: int = int(os.getenv("ARTIFACT_SCREENSHOT_QUALITY", 70)) # JPEG quality for uploaded screenshots
 
     # Sentry for Error Monitoring
     SENTRY_DSN: str | None = os.getenv("SENTRY_DSN")
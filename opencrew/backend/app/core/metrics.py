@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict
+
+import redis
+
+from ..db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# --- Lightweight Worker Metrics ---
+# Counters and timings aggregated across Celery workers in Redis hashes, so a single
+# HGETALL shows totals for the whole fleet. Falls back to per-process dicts when Redis
+# is down; metrics must never break the code path they measure.
+#
+# Names are flat strings with optional labels folded in, e.g. "scraper.jobs_new{board=stripe}".
+
+_COUNTERS_KEY = "metrics:counters"
+_TIMINGS_KEY = "metrics:timings" # Fields: "<name>:count", "<name>:sum", "<name>:max"
+
+_lock = threading.Lock()
+_local_counters: Dict[str, float] = defaultdict(float)
+_local_timings: Dict[str, float] = defaultdict(float)
+
+
+def _metric_name(name: str, labels: Dict[str, object]) -> str:
+    if not labels:
+        return name
+    label_str = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+    return f"{name}{{{label_str}}}"
+
+
+def incr(name: str, amount: float = 1, **labels) -> None:
+    """Increments a counter."""
+    field = _metric_name(name, labels)
+    client = get_redis()
+    if client is not None:
+        try:
+            client.hincrbyfloat(_COUNTERS_KEY, field, amount)
+            return
+        except redis.RedisError as e:
+            logger.debug(f"Failed to record metric {field} in Redis: {e}")
+    with _lock:
+        _local_counters[field] += amount
+
+
+def observe(name: str, seconds: float, **labels) -> None:
+    """Records one timing observation (count, sum and max)."""
+    field = _metric_name(name, labels)
+    client = get_redis()
+    if client is not None:
+        try:
+            pipe = client.pipeline()
+            pipe.hincrby(_TIMINGS_KEY, f"{field}:count", 1)
+            pipe.hincrbyfloat(_TIMINGS_KEY, f"{field}:sum", seconds)
+            pipe.execute()
+            # Max isn't atomic across workers, but close enough for spotting slow boards
+            current_max = client.hget(_TIMINGS_KEY, f"{field}:max")
+            if current_max is None or seconds > float(current_max):
+                client.hset(_TIMINGS_KEY, f"{field}:max", seconds)
+            return
+        except redis.RedisError as e:
+            logger.debug(f"Failed to record timing {field} in Redis: {e}")
+    with _lock:
+        _local_timings[f"{field}:count"] += 1
+        _local_timings[f"{field}:sum"] += seconds
+        _local_timings[f"{field}:max"] = max(_local_timings[f"{field}:max"], seconds)
+
+
+@contextmanager
+def timed(name: str, **labels):
+    """Context manager recording the wall-clock duration of the block, even if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    """Returns current counters and timings (Redis if available, otherwise this process only)."""
+    client = get_redis()
+    if client is not None:
+        try:
+            counters = {k.decode(): float(v) for k, v in client.hgetall(_COUNTERS_KEY).items()}
+            timings = {k.decode(): float(v) for k, v in client.hgetall(_TIMINGS_KEY).items()}
+            return {"counters": counters, "timings": timings}
+        except redis.RedisError as e:
+            logger.debug(f"Failed to read metrics from Redis: {e}")
+    with _lock:
+        return {"counters": dict(_local_counters), "timings": dict(_local_timings)}
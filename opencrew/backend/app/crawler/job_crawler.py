@@ -6,7 +6,7 @@ Run with:
 Design goals
 ------------
 * **Pluggable site catalogue** – pass YAML/TOML defining seed URLs & crawl mode (sitemap, listings, api)
-* **Schema.org JobPosting first**  – parse <script type="application/ld+json"> OR microdata via `extruct`
+* **Schema.org JobPosting first**  – scan <script type="application/ld+json"> directly; microdata via `extruct` only as fallback
 * **Distributed‑ready** – leverages scrapy‑redis when REDIS_URL env var is set, enabling horizontal scale
 * **ATS‑friendly normalisation** – maps arbitrary fields to internal canonical schema (see JobItem below)
 * **H1B filter** – naïve Boolean from keyword list; replace with ML classifier later
@@ -24,6 +24,11 @@ import extruct
 from itemloaders.processors import TakeFirst, MapCompose
 from scrapy.loader import ItemLoader
 from scrapy.exceptions import DropItem
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet.task import deferLater
+from twisted.internet.threads import deferToThread
+
+from app.services.rate_limiter import scrape_limiter, THROTTLE_STATUS_CODES
 
 # ---------------------------
 # Canonical Job item
@@ -49,6 +54,101 @@ def detect_h1b(text: str) -> bool:
     tex = text.lower()
     return any(kw in tex for kw in _H1B_KWS)
 
+# ---------------------------
+# Structured data fast path
+# ---------------------------
+# Most ATS pages ship a single JSON-LD JobPosting block. Scanning the raw text for
+# <script type="application/ld+json"> is far cheaper than letting extruct build lxml
+# trees for every syntax, so we only fall back to full microdata extraction on a miss.
+_SCRIPT_TYPE_RE = re.compile(r"""\btype\s*=\s*["']?\s*application/ld\+json""", re.IGNORECASE)
+
+def iter_jsonld_blocks(html: str):
+    """Yields the raw body of every <script type="application/ld+json"> block, in document order."""
+    lowered = html.lower()
+    pos = 0
+    while True:
+        start = lowered.find("<script", pos)
+        if start == -1:
+            return
+        tag_end = lowered.find(">", start)
+        if tag_end == -1:
+            return
+        close = lowered.find("</script", tag_end)
+        if close == -1:
+            return
+        pos = close + 9 # len("</script>")
+        if _SCRIPT_TYPE_RE.search(html, start, tag_end):
+            yield html[tag_end + 1:close]
+
+def _find_job_posting(node):
+    """Depth-first search for a JobPosting object inside a decoded JSON-LD document."""
+    if isinstance(node, list):
+        for child in node:
+            found = _find_job_posting(child)
+            if found:
+                return found
+    elif isinstance(node, dict):
+        node_type = node.get("@type")
+        if node_type == "JobPosting" or (isinstance(node_type, list) and "JobPosting" in node_type):
+            return node
+        if "@graph" in node:
+            return _find_job_posting(node["@graph"])
+    return None
+
+def extract_job_posting_jsonld(html: str) -> dict | None:
+    """Returns the first JSON-LD JobPosting on the page, or None if there is none."""
+    if not _SCRIPT_TYPE_RE.search(html): # Case-insensitive, like the type attribute itself
+        return None
+    for block in iter_jsonld_blocks(html):
+        if "JobPosting" not in block: # Skip Organization/BreadcrumbList blocks without decoding them
+            continue
+        try:
+            data = json.loads(block.strip().removeprefix("<!--").removesuffix("-->"), strict=False)
+        except ValueError:
+            logging.debug("Skipping malformed JSON-LD block (%d chars)", len(block))
+            continue
+        job = _find_job_posting(data)
+        if job:
+            return job
+    return None
+
+def extract_job_posting(html: str, base_url: str | None = None) -> dict | None:
+    """JSON-LD fast path first; full extruct microdata extraction only when that misses."""
+    job = extract_job_posting_jsonld(html)
+    if job:
+        return job
+    if "itemtype" not in html: # No microdata on the page either
+        return None
+    # uniform=True maps microdata onto the same @type/field layout as JSON-LD
+    md = extruct.extract(html, base_url=base_url, syntaxes=["microdata"], uniform=True)
+    return _find_job_posting(md.get("microdata") or [])
+
+# ---------------------------
+# Politeness
+# ---------------------------
+class HostRateLimitMiddleware:
+    """Routes every request through the shared per-host limiter (same buckets as scraping.py and
+    other Celery workers) and feeds 429/503 Retry-After back into it. Delays are deferred on the
+    reactor, so other hosts keep downloading while one host waits; the limiter's Redis round trip
+    runs in the reactor's thread pool. Deferreds are awaited via maybe_deferred_to_future, which
+    works under both the asyncio reactor (Scrapy's default) and the plain Twisted one."""
+
+    async def process_request(self, request, spider):
+        delay = await maybe_deferred_to_future(deferToThread(scrape_limiter.reserve, request.url))
+        if delay > 0:
+            from twisted.internet import reactor # Imported lazily so Scrapy can install its own reactor first
+            spider.logger.debug(f"Rate limiting {request.url} for {delay:.2f}s")
+            await maybe_deferred_to_future(deferLater(reactor, delay, lambda: None))
+        return None
+
+    def process_response(self, request, response, spider):
+        if response.status in THROTTLE_STATUS_CODES:
+            retry_after = response.headers.get(b"Retry-After")
+            headers = {"Retry-After": retry_after.decode("latin-1")} if retry_after else {}
+            attempt = request.meta.get("retry_times", 0)
+            scrape_limiter.observe(request.url, response.status, headers, attempt)
+        return response # RetryMiddleware re-schedules; the next attempt waits out the host block
+
 # ---------------------------
 # Spider
 # ---------------------------
@@ -59,9 +159,12 @@ class JobSpider(scrapy.Spider):
             # Use the full Python path to the class within the project structure
             "app.crawler.job_crawler.JobPostgresPipeline": 300,
         },
-        # Auto‑throttle keeps you polite
-        "AUTOTHROTTLE_ENABLED": True,
-        "AUTOTHROTTLE_TARGET_CONCURRENCY": 4.0,
+        # Shared per-host limiter keeps you polite (replaces AutoThrottle so limits hold across workers)
+        "DOWNLOADER_MIDDLEWARES": {
+            "app.crawler.job_crawler.HostRateLimitMiddleware": 560, # After RetryMiddleware (550) so it sees 429s first
+        },
+        "AUTOTHROTTLE_ENABLED": False,
+        "RETRY_HTTP_CODES": [429, 500, 502, 503, 504],
         "DOWNLOAD_TIMEOUT": 30,
     }
 
@@ -259,14 +362,9 @@ class JobSpider(scrapy.Spider):
         loader = ItemLoader(item=JobItem(), response=response)
         loader.default_output_processor = TakeFirst()
 
-        # Extract structured data (JSON-LD, Microdata)
+        # Extract structured data (JSON-LD fast path, then Microdata)
         # No longer check response.meta['api_post_data'] here
-        ld = extruct.extract(response.text, syntaxes=["json-ld", "microdata"])
-        job = None
-        for syntax in (ld.get("json-ld") or []) + (ld.get("microdata") or []):
-            if isinstance(syntax, dict) and syntax.get("@type") == "JobPosting":
-                job = syntax
-                break
+        job = extract_job_posting(response.text, base_url=response.url)
         if job:
             loader.add_value("title", job.get("title"))
             loader.add_value("company", job.get("hiringOrganization", {}).get("name"))
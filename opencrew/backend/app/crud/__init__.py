@@ -2,6 +2,7 @@ from . import user
 from . import application
 from . import job
 from . import resume
+from . import agent_usage
 
 # Import specific functions/classes if you want to expose them directly
 # e.g., from .user import get_user_by_supabase_id
\ No newline at end of file
@@ -0,0 +1,77 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case
+from typing import List, Optional, Dict, Any
+from datetime import datetime
+
+from ..models.agent_usage import AgentRunUsage # Import AgentRunUsage model
+
+def add_agent_run_usage(
+    db: Session, *, application_id: int, domain: str, steps: int, llm_calls: int,
+    prompt_tokens: int, completion_tokens: int, duration_seconds: float,
+    success: bool, stop_reason: Optional[str] = None
+) -> AgentRunUsage:
+    """Adds a usage row to the session without committing (saved with the application's final status)."""
+    usage = AgentRunUsage(
+        application_id=application_id,
+        domain=domain,
+        steps=steps,
+        llm_calls=llm_calls,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        duration_seconds=duration_seconds,
+        success=success,
+        stop_reason=stop_reason,
+    )
+    db.add(usage)
+    return usage
+
+def get_usage_by_application(db: Session, application_id: int) -> List[AgentRunUsage]:
+    """All agent runs for one application, oldest first."""
+    return (
+        db.query(AgentRunUsage)
+        .filter(AgentRunUsage.application_id == application_id)
+        .order_by(AgentRunUsage.created_at.asc())
+        .all()
+    )
+
+def summarize_usage_by_domain(
+    db: Session, *, since: Optional[datetime] = None, limit: int = 50
+) -> List[Dict[str, Any]]:
+    """Per-domain agent usage, most total agent time first.
+
+    Returns dicts with runs, successes, budget_stops, total/avg steps, tokens and seconds.
+    """
+    total_tokens = func.sum(AgentRunUsage.prompt_tokens + AgentRunUsage.completion_tokens)
+    query = db.query(
+        AgentRunUsage.domain,
+        func.count(AgentRunUsage.id).label("runs"),
+        func.sum(case((AgentRunUsage.success.is_(True), 1), else_=0)).label("successes"),
+        func.sum(case((AgentRunUsage.stop_reason.isnot(None), 1), else_=0)).label("budget_stops"),
+        func.avg(AgentRunUsage.steps).label("avg_steps"),
+        func.sum(AgentRunUsage.llm_calls).label("llm_calls"),
+        total_tokens.label("total_tokens"),
+        func.sum(AgentRunUsage.duration_seconds).label("total_seconds"),
+        func.avg(AgentRunUsage.duration_seconds).label("avg_seconds"),
+    )
+    if since is not None:
+        query = query.filter(AgentRunUsage.created_at >= since)
+    rows = (
+        query.group_by(AgentRunUsage.domain)
+        .order_by(func.sum(AgentRunUsage.duration_seconds).desc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "domain": row.domain,
+            "runs": row.runs,
+            "successes": int(row.successes or 0),
+            "budget_stops": int(row.budget_stops or 0),
+            "avg_steps": float(row.avg_steps or 0),
+            "llm_calls": int(row.llm_calls or 0),
+            "total_tokens": int(row.total_tokens or 0),
+            "total_seconds": float(row.total_seconds or 0),
+            "avg_seconds": float(row.avg_seconds or 0),
+        }
+        for row in rows
+    ]
@@ -1,15 +1,10 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Set
 from datetime import datetime, timedelta
-from sqlalchemy import func, extract
 
-from ..models.user import User, SubscriptionTier # Import User model and tier enum
 from ..models.application import Application, ApplicationStatus # Import Application model and status enum
 from ..schemas.application import ApplicationCreate, ApplicationUpdate # Import specific schemas
 
-# Define free tier limit
-FREE_TIER_AUTO_APPLY_LIMIT = 50
-
 def get_application(db: Session, application_id: int) -> Optional[Application]:
     """Get a single application by ID."""
     return db.query(Application).filter(Application.id == application_id).first()
@@ -37,44 +32,19 @@ def get_application_by_user_and_job(
         .first()
     )
 
-def count_monthly_auto_applies(db: Session, user_id: int) -> int:
-    """Counts applications marked as 'applied' or 'applying' by the user in the current calendar month."""
-    now = datetime.utcnow()
-    # Count applications from the start of the current month
-    start_of_month = datetime(now.year, now.month, 1)
-    
-    count = db.query(func.count(Application.id)).filter(
-        Application.user_id == user_id,
-        Application.status.in_([ApplicationStatus.APPLIED, ApplicationStatus.APPLYING]),
-        # Check based on when the status was last updated or applied_at
-        # Using status_last_updated_at might be simpler if 'applying' is brief
-        Application.status_last_updated_at >= start_of_month
-        # Alternatively, check applied_at if only counting fully applied:
-        # Application.applied_at >= start_of_month
-    ).scalar()
-    
-    return count or 0 # Return 0 if count is None
-
-def check_auto_apply_quota(db: Session, user: User) -> bool:
-    """Checks if the user is allowed to perform another auto-apply based on their tier and usage.
-    
-    Returns:
-        True if the user is within their quota, False otherwise.
-    """
-    # Pro and Elite tiers have unlimited applies (for now)
-    if user.subscription_tier in [SubscriptionTier.PRO, SubscriptionTier.ELITE]:
-        return True
-        
-    # Check free tier quota
-    if user.subscription_tier == SubscriptionTier.FREE:
-        current_usage = count_monthly_auto_applies(db=db, user_id=user.id)
-        if current_usage < FREE_TIER_AUTO_APPLY_LIMIT:
-            return True
-        else:
-            return False
-            
-    # Default case (shouldn't happen if tier is set correctly)
-    return False 
+def get_existing_application_job_ids(
+    db: Session, user_id: int, job_ids: List[int]
+) -> Set[int]:
+    """Returns which of the given job IDs the user already has an application for, in one query."""
+    if not job_ids:
+        return set()
+    rows = (
+        db.query(Application.job_id)
+        .filter(Application.user_id == user_id, Application.job_id.in_(job_ids))
+        .distinct()
+        .all()
+    )
+    return {row.job_id for row in rows}
 
 def create_application(
     db: Session, *, application_in: ApplicationCreate, user_id: int
@@ -95,6 +65,61 @@ def create_application(
     db.refresh(db_application)
     return db_application
 
+def bulk_create_applications(
+    db: Session, *, applications_in: List[ApplicationCreate], user_id: int, notes: Optional[str] = None
+) -> List[int]:
+    """Inserts many applications in a single flush/commit and returns their IDs in input order.
+
+    Unlike create_application this does not check for duplicates; callers are expected to
+    have filtered with get_existing_application_job_ids first.
+    """
+    if not applications_in:
+        return []
+    db_applications = [
+        Application(**application_in.model_dump(), user_id=user_id, notes=notes)
+        for application_in in applications_in
+    ]
+    db.add_all(db_applications)
+    db.flush() # Assigns primary keys (batched INSERT ... RETURNING)
+    application_ids = [db_application.id for db_application in db_applications]
+    db.commit()
+    return application_ids
+
+def fail_unpublished_applications(
+    db: Session, application_ids: List[int], in_flight_statuses: Iterable[ApplicationStatus]
+) -> Dict[int, int]:
+    """Marks applications whose task could not be published as TRIGGER_FAILED, skipping any that
+    are no longer in flight. Returns the number marked per user, as {user_id: count}."""
+    if not application_ids:
+        return {}
+    rows = (
+        db.query(Application.id, Application.user_id)
+        .filter(Application.id.in_(application_ids), Application.status.in_(list(in_flight_statuses)))
+        .all()
+    )
+    per_user: Dict[int, int] = {}
+    for row in rows:
+        per_user[row.user_id] = per_user.get(row.user_id, 0) + 1
+    bulk_update_application_status(db, [row.id for row in rows], ApplicationStatus.TRIGGER_FAILED)
+    return per_user
+
+def bulk_update_application_status(
+    db: Session, application_ids: List[int], status: ApplicationStatus
+) -> int:
+    """Sets the status of many applications with one UPDATE. Returns the number of rows changed."""
+    if not application_ids:
+        return 0
+    updated = (
+        db.query(Application)
+        .filter(Application.id.in_(application_ids))
+        .update(
+            {Application.status: status, Application.status_last_updated_at: datetime.utcnow()},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return updated
+
 def update_application(
     db: Session, *, db_application: Application, application_in: ApplicationUpdate
 ) -> Application:
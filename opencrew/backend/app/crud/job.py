@@ -1,10 +1,12 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import or_
 from typing import List, Optional
 import logging
 
 from ..schemas.job import JobCreate, JobUpdate # Import specific schemas
 from ..models.job import Job # Import the specific Job model class
 from ..services import matching # Import the matching service
+from ..services import dedup # Near-duplicate fingerprinting
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +18,53 @@ def get_job_by_url(db: Session, url: str) -> Optional[Job]:
     """Get a single job by its unique URL."""
     return db.query(Job).filter(Job.url == url).first()
 
+def get_jobs_by_ids(db: Session, job_ids: List[int], canonical_only: bool = True) -> List[Job]:
+    """Get jobs by a list of IDs in one query. Duplicates of another posting are excluded by default."""
+    if not job_ids:
+        return []
+    query = db.query(Job).filter(Job.id.in_(job_ids))
+    if canonical_only:
+        query = query.filter(Job.canonical_job_id.is_(None))
+    return query.all()
+
+def find_canonical_duplicate(db: Session, fingerprint: int, exclude_job_id: Optional[int] = None) -> Optional[Job]:
+    """Looks up the LSH band index for a canonical job within NEAR_DUPLICATE_MAX_DISTANCE of the fingerprint."""
+    bands = dedup.lsh_bands(fingerprint)
+    band_columns = [Job.simhash_band_0, Job.simhash_band_1, Job.simhash_band_2, Job.simhash_band_3]
+    query = db.query(Job).filter(
+        Job.canonical_job_id.is_(None),
+        Job.simhash.isnot(None),
+        or_(*[column == band for column, band in zip(band_columns, bands)]),
+    )
+    if exclude_job_id is not None:
+        query = query.filter(Job.id != exclude_job_id)
+    candidates = query.limit(50).all() # Band collisions are rare; cap pathological buckets
+    best_match, best_distance = None, None
+    for candidate in candidates:
+        distance = dedup.hamming_distance(fingerprint, dedup.from_signed64(candidate.simhash))
+        if distance <= dedup.NEAR_DUPLICATE_MAX_DISTANCE and (best_distance is None or distance < best_distance):
+            best_match, best_distance = candidate, distance
+    return best_match
+
+def _fingerprint_job(db: Session, db_job: Job) -> None:
+    """Sets the job's SimHash and LSH bands and links it to its canonical duplicate, if any.
+
+    Postings with nothing to fingerprint are left unfingerprinted and canonical. A job that
+    other postings already point at stays canonical.
+    """
+    fingerprint = dedup.job_fingerprint(db_job.title, db_job.company, db_job.description)
+    if fingerprint is None:
+        db_job.simhash = None
+        db_job.simhash_band_0 = db_job.simhash_band_1 = db_job.simhash_band_2 = db_job.simhash_band_3 = None
+        db_job.canonical_job_id = None
+        return
+    db_job.simhash = dedup.to_signed64(fingerprint)
+    db_job.simhash_band_0, db_job.simhash_band_1, db_job.simhash_band_2, db_job.simhash_band_3 = dedup.lsh_bands(fingerprint)
+    if db_job.id is not None and db.query(Job.id).filter(Job.canonical_job_id == db_job.id).first():
+        return
+    canonical = find_canonical_duplicate(db, fingerprint, exclude_job_id=db_job.id)
+    db_job.canonical_job_id = canonical.id if canonical else None
+
 def get_jobs(
     db: Session, skip: int = 0, limit: int = 100, 
     # Add filters as needed, e.g., company: Optional[str] = None
@@ -40,9 +89,14 @@ def create_job(db: Session, job: JobCreate) -> Job:
         visa_sponsorship_available=job.visa_sponsorship_available,
         # Embedding will be generated below
     )
-    
-    # Generate embedding if description exists
-    if db_job.description:
+
+    # Fingerprint and cluster cross-posted duplicates under the canonical job
+    _fingerprint_job(db, db_job)
+    if db_job.canonical_job_id:
+        logger.info(f"Job '{db_job.title}' ({db_job.url}) is a near-duplicate of job ID {db_job.canonical_job_id}. Skipping embedding.")
+
+    # Generate embedding if description exists (duplicates are never matched, so don't embed them)
+    if db_job.description and not db_job.canonical_job_id:
         embedding = matching.get_embedding(db_job.description)
         if embedding:
             db_job.embedding = embedding # Store as JSON
@@ -80,6 +134,10 @@ def update_job(db: Session, db_job: Job, job_in: JobUpdate) -> Job:
         if field == 'url' and value is not None:
             value = str(value)
         setattr(db_job, field, value)
+
+    # Content changed: refresh the fingerprint so stale bands don't keep matching new postings
+    if update_data.keys() & {"title", "company", "description"}:
+        _fingerprint_job(db, db_job)
         
     # Manually update updated_at if not handled by DB trigger/default
     # db_job.updated_at = datetime.datetime.utcnow() 
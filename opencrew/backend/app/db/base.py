@@ -4,5 +4,7 @@ from ..models.user import User  # Add other models here as they are created
 from ..models.resume import Resume # Add Resume model import
 from ..models.job import Job # Add Job model import
 from ..models.application import Application # Add Application model import
+from ..models.quota import UserQuotaUsage # Add quota usage model import
+from ..models.agent_usage import AgentRunUsage # Add agent usage model import
 # from ..models.payment import Payment
 from ..models.user import Base # Import Base from one of your models 
\ No newline at end of file
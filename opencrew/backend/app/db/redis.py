@@ -0,0 +1,33 @@
+import logging
+import time
+from typing import Optional
+
+import redis
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_redis_client: Optional[redis.Redis] = None
+_last_failure_at: float = 0.0
+_RECONNECT_INTERVAL_SECONDS = 30.0 # Don't pay a connect timeout on every call while Redis is down
+
+def get_redis() -> Optional[redis.Redis]:
+    """Returns a process-wide Redis client, or None if Redis is unreachable.
+
+    Callers are expected to degrade to in-process state when this returns None.
+    """
+    global _redis_client, _last_failure_at
+    if _redis_client is not None:
+        return _redis_client
+    if time.monotonic() - _last_failure_at < _RECONNECT_INTERVAL_SECONDS:
+        return None
+    try:
+        client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=2, socket_connect_timeout=2)
+        client.ping()
+        _redis_client = client
+        logger.info("Connected to Redis for shared worker state.")
+    except redis.RedisError as e:
+        _last_failure_at = time.monotonic()
+        logger.warning(f"Redis not available at {settings.REDIS_URL}: {e}. Falling back to per-process state.")
+    return _redis_client
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Boolean
+from sqlalchemy.sql import func
+
+from .user import Base # Import Base from user model or a central base file
+
+class AgentRunUsage(Base):
+    """LLM usage of one browser-agent run for an application.
+
+    One row per agent run (an application retried after a crash gets another row).
+    `stop_reason` is set when the run was cut off by a budget ("steps", "tokens" or
+    "wall_clock"). Written by services/autosubmit.py, summarized by crud.agent_usage.
+    """
+    __tablename__ = "agent_run_usage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    application_id = Column(Integer, ForeignKey("applications.id", ondelete="CASCADE"), nullable=False, index=True)
+    domain = Column(String, nullable=False, index=True) # Job-site host, e.g. "jobs.ashbyhq.com"
+    steps = Column(Integer, nullable=False, default=0, server_default="0")
+    llm_calls = Column(Integer, nullable=False, default=0, server_default="0")
+    prompt_tokens = Column(Integer, nullable=False, default=0, server_default="0")
+    completion_tokens = Column(Integer, nullable=False, default=0, server_default="0")
+    duration_seconds = Column(Float, nullable=False, default=0.0, server_default="0")
+    success = Column(Boolean, nullable=False, default=False, server_default="false") # Agent reported the application submitted
+    stop_reason = Column(String(16), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -8,6 +8,8 @@ from .user import Base # Assuming Base is defined centrally or in user.py
 # Define potential application statuses using Python Enum
 class ApplicationStatus(str, enum.Enum):
     SAVED = "saved" # User saved the job, hasn't applied
+    PENDING_TRIGGER = "pending_trigger" # Created by matching, auto-apply task not yet picked up
+    TRIGGER_FAILED = "trigger_failed" # Auto-apply task could not be published
     APPLYING = "applying" # Auto-apply in progress
     APPLIED = "applied" # Application submitted
     ASSESSMENT = "assessment"
@@ -15,6 +17,7 @@ class ApplicationStatus(str, enum.Enum):
     OFFER = "offer"
     REJECTED = "rejected"
     WITHDRAWN = "withdrawn"
+    ERROR = "error" # Auto-apply failed
 
 class Application(Base):
     __tablename__ = "applications"
@@ -29,6 +32,8 @@ class Application(Base):
     applied_at = Column(DateTime(timezone=True), nullable=True) # Timestamp when application was actually sent
     notes = Column(Text, nullable=True)
     screenshot_url = Column(String, nullable=True) # Store URL/path to final screenshot
+    # Resume tailored for this job ahead of auto-apply (see services/pre_tailoring.py)
+    tailored_data = Column(JSON, nullable=True) # StructuredResume dump
 
     # Relationships (adjust back_populates as needed)
     user = relationship("User", back_populates="applications")
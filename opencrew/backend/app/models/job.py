@@ -1,5 +1,5 @@
 import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Boolean, DateTime, Float, JSON, ForeignKey
 # Consider using sqlalchemy_utils.types.url.URLType for url if installed
 # from sqlalchemy.dialects.postgresql import VECTOR # Example if using pgvector
 
@@ -20,6 +20,17 @@ class Job(Base):
     date_posted = Column(DateTime, nullable=True)
     visa_sponsorship_available = Column(Boolean, default=False, nullable=True)
     
+    # Near-duplicate detection (see services/dedup.py)
+    simhash = Column(BigInteger, nullable=True) # Signed 64-bit SimHash of title/company/description
+    simhash_band_0 = Column(Integer, index=True, nullable=True) # LSH band keys (16 bits each)
+    simhash_band_1 = Column(Integer, index=True, nullable=True)
+    simhash_band_2 = Column(Integer, index=True, nullable=True)
+    simhash_band_3 = Column(Integer, index=True, nullable=True)
+    canonical_job_id = Column(Integer, ForeignKey("jobs.id", ondelete="SET NULL"), index=True, nullable=True) # Set on duplicates; NULL means this job is canonical
+
+    # Shared description analysis reused by every user tailoring against this job (see services/job_analysis.py)
+    analysis = Column(JSON, nullable=True)
+
     # Placeholder for vector embedding - type depends on DB (e.g., pgvector)
     # embedding = Column(VECTOR(768)) # Example dimension 768
     
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy.sql import func
+
+from .user import Base # Import Base from user model or a central base file
+
+class UserQuotaUsage(Base):
+    """Materialized per-user auto-apply usage for one billing period (calendar month, UTC).
+
+    `reserved` counts applications that have been allocated quota but not yet submitted;
+    `used` counts submitted applications. Maintained by services/quota.py.
+    """
+    __tablename__ = "user_quota_usage"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    period = Column(String(7), primary_key=True) # "YYYY-MM"
+    reserved = Column(Integer, nullable=False, default=0, server_default="0")
+    used = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
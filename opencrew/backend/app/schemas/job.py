@@ -31,6 +31,7 @@ class JobInDBBase(JobBase):
     id: int
     created_at: datetime
     updated_at: datetime
+    canonical_job_id: Optional[int] = None # Set when this job is a near-duplicate of another posting
     # embedding: Optional[List[float]] = None # If you store embedding in DB
 
     class Config:
@@ -44,8 +44,9 @@ class ParseRequest(BaseModel):
 
 class KeywordAnalysisRequest(BaseModel):
     """Request model for the keyword gap analysis endpoint."""
-    job_description: str
+    job_description: str | None = None # Optional when job_id is given
     parsed_resume: ParsedResume # The structured resume from the /parse step
+    job_id: int | None = None # Use the job's stored description analysis
 
 
 class MissingTerm(BaseModel):
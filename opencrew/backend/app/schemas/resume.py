@@ -128,3 +128,20 @@ ResumeUpdate.model_rebuild()
 class ResumeParseResponse(BaseModel):
     structured_resume: StructuredResume
     message: Optional[str] = None
+    reused_sections: List[str] = [] # Tailored sections reused unchanged from an earlier tailoring ("objective", "experiences.<i>", ...)
+
+
+# --- Asynchronous parse-and-tailor jobs ---
+
+class ResumeParseJobSubmitted(BaseModel):
+    job_id: str
+    status_url: str
+    events_url: str
+
+class ResumeParseJobStatus(BaseModel):
+    job_id: str
+    state: str # Celery state: PENDING, STARTED, PROGRESS, SUCCESS, FAILURE
+    stage: str # queued, parsing, tailoring, saving, done, failed
+    sections: Dict[str, Any] = {} # Sections finished so far ("parsed", "objective", "skills", "experiences.<i>")
+    result: Optional[ResumeParseResponse] = None
+    error: Optional[str] = None
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# --- Agent Budgets ---
+# A browser-use agent that can't find a submit button will keep clicking until its step
+# limit (100 by default), spending minutes and hundreds of thousands of tokens. Each run
+# gets a budget of steps, wall-clock seconds and LLM tokens:
+#
+#   * steps      - passed to agent.run(max_steps=...)
+#   * tokens     - counted from the LLM responses by a LangChain callback on the agent's LLM
+#   * wall clock - a timer on the event loop
+#
+# Exceeding the token or time budget calls agent.stop(); the agent finishes its current
+# step and run() returns the history so far. The tracker's counters are what autosubmit
+# records in agent_run_usage.
+
+
+@dataclass
+class AgentBudget:
+    max_steps: int
+    max_seconds: float
+    max_tokens: int
+
+    @classmethod
+    def from_settings(cls) -> "AgentBudget":
+        return cls(
+            max_steps=settings.AGENT_MAX_STEPS,
+            max_seconds=settings.AGENT_MAX_SECONDS,
+            max_tokens=settings.AGENT_MAX_TOKENS,
+        )
+
+
+def _token_usage(response: LLMResult) -> tuple:
+    """(prompt_tokens, completion_tokens) reported for one LLM response."""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens", 0) or 0, usage.get("completion_tokens", 0) or 0
+    # Providers that only report usage on the message (langchain usage_metadata)
+    prompt = completion = 0
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            prompt += metadata.get("input_tokens", 0)
+            completion += metadata.get("output_tokens", 0)
+    return prompt, completion
+
+
+class AgentUsageTracker(BaseCallbackHandler):
+    """Counts LLM calls and tokens for one agent run and stops the agent when over budget.
+
+    Pass it as a callback to the agent's LLM, then attach() it to the Agent before run().
+    """
+    run_inline = True # Called on the event loop thread, next to the agent
+
+    def __init__(self, budget: AgentBudget):
+        self.budget = budget
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.steps = 0
+        self.stop_reason: Optional[str] = None
+        self._agent = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._started = time.monotonic()
+        self._finished: Optional[float] = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return (self._finished or time.monotonic()) - self._started
+
+    def attach(self, agent) -> None:
+        """Starts the wall-clock budget for `agent`. Call from the running event loop."""
+        self._agent = agent
+        self._started = time.monotonic()
+        self._timer = asyncio.get_running_loop().call_later(self.budget.max_seconds, self._exceeded, "wall_clock")
+
+    def detach(self, steps_taken: int = 0) -> None:
+        """Stops the clock; records a step-limit stop if the agent used all its steps without finishing."""
+        self._finished = time.monotonic()
+        self.steps = steps_taken
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        finished = self._agent is not None and self._agent.state.history.is_done()
+        if self.stop_reason is None and steps_taken >= self.budget.max_steps and not finished:
+            self.stop_reason = "steps"
+            metrics.incr("autosubmit.agent_budget_exceeded", reason="steps")
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        prompt, completion = _token_usage(response)
+        self.llm_calls += 1
+        self.prompt_tokens += prompt
+        self.completion_tokens += completion
+        if self.total_tokens > self.budget.max_tokens:
+            self._exceeded("tokens")
+
+    def _exceeded(self, reason: str) -> None:
+        if self.stop_reason is not None:
+            return
+        self.stop_reason = reason
+        metrics.incr("autosubmit.agent_budget_exceeded", reason=reason)
+        logger.warning(
+            f"Agent over its {reason} budget after {self.elapsed_seconds:.0f}s, "
+            f"{self.llm_calls} LLM calls and {self.total_tokens} tokens; stopping."
+        )
+        if self._agent is not None:
+            self._agent.stop()
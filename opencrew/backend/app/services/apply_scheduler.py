@@ -0,0 +1,235 @@
+import logging
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import redis
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.redis import get_redis
+from app.models.user import SubscriptionTier
+from .rate_limiter import HostRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# --- Auto-Apply Scheduler ---
+# Sits in front of the auto-apply Celery tasks and decides *when* an application runs:
+#
+# Fair queue - applications wait in one Redis sorted set ordered by a weighted-fair-queuing
+#   virtual finish time. Each user's applications are spaced 1/weight apart starting at
+#   max(global virtual time, that user's last finish), so one user's 200 matches can't
+#   starve another user's 3, and paying tiers (higher weight) advance faster. A beat task
+#   pops the head of the queue and publishes it with a per-tier Celery priority.
+#
+# Domain admission - right before an agent starts, the worker asks for a slot on the job's
+#   domain: at most AUTO_APPLY_DOMAIN_CONCURRENCY agents cluster-wide (leases expire after
+#   AUTO_APPLY_SLOT_TTL in case a worker dies) and at most AUTO_APPLY_DOMAIN_RATE_PER_MINUTE
+#   starts. A refused application is re-published with a countdown; workers never sleep.
+#   On hosted ATSs (boards.greenhouse.io, jobs.lever.co, ...) every employer shares the host,
+#   so the "domain" is host + board slug (boards.greenhouse.io/acme), and the host as a whole
+#   has its own, higher caps (AUTO_APPLY_ATS_CONCURRENCY / AUTO_APPLY_ATS_RATE_PER_MINUTE).
+#
+# Without Redis, enqueue() returns False (callers publish directly) and admission falls
+# back to the per-process limits in autosubmit.apply_many_async.
+
+TIER_WEIGHTS = {
+    SubscriptionTier.FREE: 1,
+    SubscriptionTier.PRO: 2,
+    SubscriptionTier.ELITE: 4,
+}
+# Celery priorities for the Redis transport: lower runs first
+TIER_PRIORITIES = {
+    SubscriptionTier.FREE: 6,
+    SubscriptionTier.PRO: 3,
+    SubscriptionTier.ELITE: 0,
+}
+
+QUEUE_KEY = "apply:queue"
+VIRTUAL_TIME_KEY = "apply:vtime"
+USER_FINISH_KEY = "apply:vfinish:{user_id}"
+DOMAIN_SLOTS_KEY = "apply:slots:{domain}"
+ATS_SLOTS_KEY = "apply:slots:ats:{ats}"
+USER_FINISH_TTL_SECONDS = 7 * 24 * 3600
+# Hosts serving many employers' boards, with the board slug as the first path segment
+MULTI_TENANT_ATS_HOSTS = {
+    "boards.greenhouse.io", "job-boards.greenhouse.io", "jobs.lever.co",
+    "jobs.ashbyhq.com", "apply.workable.com", "jobs.smartrecruiters.com",
+}
+
+# KEYS: queue, vtime, user_finish | ARGV: weight, priority, ttl, application_id...
+_ENQUEUE_LUA = """
+local vtime = tonumber(redis.call('GET', KEYS[2]) or '0')
+local finish = math.max(vtime, tonumber(redis.call('GET', KEYS[3]) or '0'))
+local step = 1 / tonumber(ARGV[1])
+for i = 4, #ARGV do
+    finish = finish + step
+    redis.call('ZADD', KEYS[1], finish, ARGV[i] .. ':' .. ARGV[2])
+end
+redis.call('SET', KEYS[3], tostring(finish), 'EX', tonumber(ARGV[3]))
+return tostring(finish)
+"""
+
+# KEYS: queue, vtime | ARGV: count
+_POP_LUA = """
+local items = redis.call('ZRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1, 'WITHSCORES')
+if #items == 0 then return {} end
+local members = {}
+for i = 1, #items, 2 do
+    table.insert(members, items[i])
+    redis.call('ZREM', KEYS[1], items[i])
+end
+redis.call('SET', KEYS[2], items[#items])
+return members
+"""
+
+# KEYS: slots | ARGV: member, limit, ttl
+# Returns 1 if the member holds a slot (re-admitting a redelivered task is idempotent).
+_ADMIT_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) and redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), ARGV[1])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+return 1
+"""
+
+# Start-rate limit per job-site domain, shared with the scraper limiter implementation
+domain_start_limiter = HostRateLimiter(
+    rate_per_second=settings.AUTO_APPLY_DOMAIN_RATE_PER_MINUTE / 60.0,
+    burst=settings.AUTO_APPLY_DOMAIN_CONCURRENCY,
+    key_prefix="apply:rate",
+)
+
+
+# Start-rate limit per hosted ATS, across all of its boards
+ats_start_limiter = HostRateLimiter(
+    rate_per_second=settings.AUTO_APPLY_ATS_RATE_PER_MINUTE / 60.0,
+    burst=settings.AUTO_APPLY_ATS_CONCURRENCY,
+    key_prefix="apply:rate:ats",
+)
+
+
+def admission_key(url: Optional[str]) -> str:
+    """The admission "domain" for a job URL: the host, or host/board-slug on hosted ATSs."""
+    if not url:
+        return "unknown"
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if host not in MULTI_TENANT_ATS_HOSTS:
+        return host or "unknown"
+    segments = [s for s in parsed.path.split("/") if s]
+    slug = segments[0] if segments else None
+    if slug == "embed": # boards.greenhouse.io/embed/job_app?for=<slug>&token=...
+        slug = (parse_qs(parsed.query).get("for") or [None])[0]
+    return f"{host}/{slug.lower()}" if slug else host
+
+
+def ats_host(domain: str) -> Optional[str]:
+    """The hosted ATS an admission key belongs to, or None for an employer's own domain."""
+    host = domain.split("/", 1)[0]
+    return host if host in MULTI_TENANT_ATS_HOSTS else None
+
+
+def tier_priority(tier: SubscriptionTier) -> int:
+    return TIER_PRIORITIES.get(tier, TIER_PRIORITIES[SubscriptionTier.FREE])
+
+
+# --- Fair Queue ---
+
+def enqueue(user_id: int, tier: SubscriptionTier, application_ids: List[int]) -> bool:
+    """Adds a user's applications to the fair queue. Returns False if Redis is unavailable."""
+    if not application_ids:
+        return True
+    client = get_redis()
+    if client is None:
+        return False
+    try:
+        client.eval(
+            _ENQUEUE_LUA, 3, QUEUE_KEY, VIRTUAL_TIME_KEY, USER_FINISH_KEY.format(user_id=user_id),
+            TIER_WEIGHTS.get(tier, 1), tier_priority(tier), USER_FINISH_TTL_SECONDS, *application_ids,
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Could not enqueue {len(application_ids)} applications for user {user_id}: {e}")
+        return False
+    metrics.incr("apply_scheduler.enqueued", amount=len(application_ids), tier=getattr(tier, "value", tier))
+    logger.info(f"Queued {len(application_ids)} applications for user {user_id} ({tier}).")
+    return True
+
+
+def pop_next(count: int) -> List[Tuple[int, int]]:
+    """Removes up to `count` applications from the head of the fair queue as (application_id, priority)."""
+    client = get_redis()
+    if client is None:
+        return []
+    try:
+        members = client.eval(_POP_LUA, 2, QUEUE_KEY, VIRTUAL_TIME_KEY, count)
+    except redis.RedisError as e:
+        logger.warning(f"Could not read the auto-apply queue: {e}")
+        return []
+    entries = []
+    for member in members:
+        application_id, priority = (member.decode() if isinstance(member, bytes) else member).split(":")
+        entries.append((int(application_id), int(priority)))
+    return entries
+
+
+def queue_length() -> int:
+    client = get_redis()
+    if client is None:
+        return 0
+    try:
+        return client.zcard(QUEUE_KEY)
+    except redis.RedisError:
+        return 0
+
+
+# --- Domain Admission ---
+
+def _claim_slot(client, slots_key: str, application_id: int, limit: int) -> bool:
+    try:
+        return bool(client.eval(_ADMIT_LUA, 1, slots_key, application_id, limit, settings.AUTO_APPLY_SLOT_TTL))
+    except redis.RedisError as e:
+        logger.warning(f"Domain admission unavailable for {slots_key}, admitting application {application_id}: {e}")
+        return True
+
+
+def try_admit(domain: str, application_id: int) -> float:
+    """Claims a domain slot (and its ATS's slot) for an application. Returns 0 if admitted, else seconds to defer by."""
+    ats = ats_host(domain)
+    client = get_redis()
+    if client is not None:
+        if not _claim_slot(client, DOMAIN_SLOTS_KEY.format(domain=domain), application_id, settings.AUTO_APPLY_DOMAIN_CONCURRENCY):
+            metrics.incr("apply_scheduler.deferred", reason="domain_busy")
+            return float(settings.AUTO_APPLY_DEFER_SECONDS)
+        if ats and not _claim_slot(client, ATS_SLOTS_KEY.format(ats=ats), application_id, settings.AUTO_APPLY_ATS_CONCURRENCY):
+            release(domain, application_id)
+            metrics.incr("apply_scheduler.deferred", reason="ats_busy")
+            return float(settings.AUTO_APPLY_DEFER_SECONDS)
+
+    # Board first: its limit is the tighter one, so a refused board doesn't burn a token of the
+    # whole ATS (at worst an ATS refusal costs that one board a token)
+    delay = domain_start_limiter.try_reserve(domain)
+    if delay <= 0 and ats:
+        delay = ats_start_limiter.try_reserve(ats)
+    if delay > 0:
+        release(domain, application_id) # Don't hold concurrency slots while deferred
+        metrics.incr("apply_scheduler.deferred", reason="domain_rate")
+        return delay
+    return 0.0
+
+
+def release(domain: str, application_id: int) -> None:
+    """Frees the application's domain (and ATS) slots (no-op if it holds none)."""
+    client = get_redis()
+    if client is None:
+        return
+    ats = ats_host(domain)
+    try:
+        client.zrem(DOMAIN_SLOTS_KEY.format(domain=domain), application_id)
+        if ats:
+            client.zrem(ATS_SLOTS_KEY.format(ats=ats), application_id)
+    except redis.RedisError as e:
+        logger.warning(f"Could not release domain slot for application {application_id} on {domain}: {e}")
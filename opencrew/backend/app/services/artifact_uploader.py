@@ -0,0 +1,137 @@
+import base64
+import binascii
+import io
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+
+from celery.signals import worker_process_shutdown
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.application import Application
+from . import s3
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# --- Background Artifact Uploads ---
+# Screenshots are uploaded after the application's final status is committed, on a small
+# per-process thread pool, so the apply loop never waits on S3. Each upload downscales the
+# image (Pillow, if installed) to ARTIFACT_SCREENSHOT_MAX_WIDTH as JPEG, puts it with the
+# shared S3 client and then sets Application.screenshot_url on its own DB session.
+# Pending uploads are flushed when the worker process shuts down.
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_pid
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=settings.ARTIFACT_UPLOAD_WORKERS, thread_name_prefix="artifact-upload")
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def last_screenshot(history) -> Optional[bytes]:
+    """The last screenshot in an AgentHistoryList as PNG bytes.
+
+    browser-use records screenshots as base64 strings; a file path is accepted as well.
+    """
+    screenshots = [shot for shot in (history.screenshots() if history else []) if shot]
+    if not screenshots:
+        return None
+    last = screenshots[-1]
+    if len(last) < 4096 and Path(last).is_file():
+        return Path(last).read_bytes()
+    try:
+        return base64.b64decode(last, validate=True)
+    except (binascii.Error, ValueError):
+        logger.warning("Agent screenshot is neither a file nor base64 data; skipping.")
+        return None
+
+
+def prepare_screenshot(png: bytes) -> Tuple[bytes, str, str]:
+    """Downscales and re-encodes a screenshot. Returns (data, file extension, content type)."""
+    if not PIL_AVAILABLE:
+        return png, "png", "image/png"
+    try:
+        with Image.open(io.BytesIO(png)) as image:
+            image = image.convert("RGB")
+            if image.width > settings.ARTIFACT_SCREENSHOT_MAX_WIDTH:
+                height = round(image.height * settings.ARTIFACT_SCREENSHOT_MAX_WIDTH / image.width)
+                image = image.resize((settings.ARTIFACT_SCREENSHOT_MAX_WIDTH, height), Image.LANCZOS)
+            out = io.BytesIO()
+            image.save(out, format="JPEG", quality=settings.ARTIFACT_SCREENSHOT_QUALITY, optimize=True)
+            return out.getvalue(), "jpg", "image/jpeg"
+    except Exception as e:
+        logger.warning(f"Could not re-encode screenshot, uploading original PNG: {e}")
+        return png, "png", "image/png"
+
+
+def _upload_and_record(application_id: int, outcome: str, screenshot: bytes) -> Optional[str]:
+    data, extension, content_type = prepare_screenshot(screenshot)
+    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    s3_key = f"application_screenshots/app_{application_id}_{outcome}_{timestamp}.{extension}"
+    try:
+        with metrics.timed("artifact_uploader.upload_seconds"):
+            s3.get_s3_client().put_object(Bucket=settings.S3_BUCKET_NAME, Key=s3_key, Body=data, ContentType=content_type)
+    except Exception as e:
+        logger.error(f"S3 upload failed for app {application_id} screenshot: {e}", exc_info=True)
+        metrics.incr("artifact_uploader.failures")
+        return None
+    s3_url = s3.object_url(s3_key)
+
+    db = SessionLocal() # The apply coroutine's session may already be closed
+    try:
+        db.query(Application).filter(Application.id == application_id).update(
+            {Application.screenshot_url: s3_url}, synchronize_session=False
+        )
+        db.commit()
+    except Exception as e:
+        logger.error(f"Uploaded screenshot for app {application_id} but failed to record it: {e}", exc_info=True)
+        db.rollback()
+        return None
+    finally:
+        db.close()
+    metrics.incr("artifact_uploader.uploaded")
+    metrics.incr("artifact_uploader.bytes_saved", amount=max(0, len(screenshot) - len(data)))
+    logger.info(f"Uploaded screenshot for app {application_id} ({len(screenshot)} -> {len(data)} bytes): {s3_url}")
+    return s3_url
+
+
+def submit_screenshot(application_id: int, outcome: str, screenshot: Optional[bytes]) -> Optional[Future]:
+    """Queues a screenshot upload for an application and returns immediately."""
+    if not screenshot:
+        return None
+    if not s3.is_configured():
+        logger.error(f"S3 credentials or bucket name not configured. Cannot upload screenshot for app {application_id}.")
+        return None
+    return _get_executor().submit(_upload_and_record, application_id, outcome, screenshot)
+
+
+def shutdown(wait: bool = True) -> None:
+    """Waits for queued uploads and stops the pool."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None and _executor_pid == os.getpid():
+        executor.shutdown(wait=wait)
+
+
+@worker_process_shutdown.connect
+def _on_worker_process_shutdown(**kwargs):
+    shutdown(wait=True)
@@ -0,0 +1,175 @@
+import json
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import Error as PlaywrightError, Page
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# --- Deterministic ATS Adapters ---
+# Greenhouse and Lever serve a small number of stable form layouts. For those, filling the
+# known fields with Playwright takes seconds and no LLM tokens, versus minutes and a few
+# dozen GPT-4o calls for the browser-use agent. An adapter only handles the happy path:
+#
+#   * form not found, a selector missing, or required questions we have no answer for
+#     -> AdapterResult(fallback=True) and the caller runs the LLM agent instead
+#   * anything after the submit click is final (success or failure, never fallback), so
+#     an application is never submitted twice.
+#
+# Selectors live in ats_selectors/<adapter>.json so they can be fixed without code changes.
+
+SELECTOR_DIR = Path(__file__).parent / "ats_selectors"
+
+# Required inputs still empty after filling (custom questions) -> let the agent handle the form.
+# Natively required fields use validity.valueMissing, which covers unchecked checkboxes, radio
+# groups with no choice and unselected selects (their .value is never empty). aria-required
+# fields carry no constraint, so they are checked by hand.
+_UNFILLED_REQUIRED_JS = """
+() => [...new Set(Array.from(document.querySelectorAll(
+    'input[required], textarea[required], select[required], input[aria-required="true"], textarea[aria-required="true"]'
+)).filter(el => el.type !== 'hidden' && el.type !== 'file' && el.offsetParent !== null && (
+    el.required ? el.validity.valueMissing
+    : el.type === 'radio' ? !document.querySelector(`input[type="radio"][name="${CSS.escape(el.name)}"]:checked`)
+    : el.type === 'checkbox' ? !el.checked
+    : !el.value
+)).map(el => el.name || el.id || el.type))]
+"""
+
+
+@dataclass
+class AdapterResult:
+    """Outcome of a deterministic apply attempt."""
+    success: bool = False
+    message: str = ""
+    fallback: bool = False # True: nothing was submitted, run the LLM agent instead
+    screenshot: Optional[bytes] = None # Final page, PNG
+
+
+@lru_cache(maxsize=None)
+def load_selectors(adapter_name: str) -> Dict[str, str]:
+    """Loads ats_selectors/<adapter_name>.json."""
+    with open(SELECTOR_DIR / f"{adapter_name}.json", "r") as f:
+        return json.load(f)["selectors"]
+
+
+class BaseAdapter:
+    name: str = ""
+    hosts: tuple = ()
+    # selector key -> function of the applicant profile producing the value to type
+    text_fields: Dict[str, Callable[[Dict[str, str]], Optional[str]]] = {}
+
+    @property
+    def selectors(self) -> Dict[str, str]:
+        return load_selectors(self.name)
+
+    def matches(self, url: str) -> bool:
+        host = (urlparse(url).hostname or "").lower()
+        return any(host == h or host.endswith(f".{h}") for h in self.hosts)
+
+    def apply_url(self, job_url: str) -> str:
+        return job_url
+
+    async def _fill_fields(self, page: Page, profile: Dict[str, str]) -> None:
+        """Fills the known text fields we have values for (required-but-empty ones are caught afterwards)."""
+        for key, value_for in self.text_fields.items():
+            value = (value_for(profile) or "").strip()
+            if key not in self.selectors or not value:
+                continue
+            locator = page.locator(self.selectors[key]).first
+            if await locator.count(): # Not every board shows every field
+                await locator.fill(value)
+
+    async def apply(self, page: Page, job_url: str, profile: Dict[str, str], resume_path: str) -> AdapterResult:
+        timeout_ms = settings.ATS_ADAPTER_TIMEOUT_SECONDS * 1000
+        # --- Before submit: any problem falls back to the agent ---
+        try:
+            await page.goto(self.apply_url(job_url), wait_until="domcontentloaded", timeout=timeout_ms)
+            await page.locator(self.selectors["email"]).first.wait_for(state="visible", timeout=timeout_ms)
+
+            await self._fill_fields(page, profile)
+            resume_input = page.locator(self.selectors["resume_upload_input"]).first
+            if not await resume_input.count():
+                return AdapterResult(fallback=True, message="Resume upload field not found.")
+            await resume_input.set_input_files(resume_path)
+
+            unfilled = await page.evaluate(_UNFILLED_REQUIRED_JS)
+            if unfilled:
+                return AdapterResult(fallback=True, message=f"Unanswered required fields: {unfilled}")
+
+            submit = page.locator(self.selectors["submit_button"]).first
+            if not await submit.count():
+                return AdapterResult(fallback=True, message="Submit button not found.")
+        except PlaywrightError as e:
+            return AdapterResult(fallback=True, message=f"Form not recognised: {e}")
+
+        # --- Submit: from here on the outcome is final ---
+        try:
+            await submit.click()
+            await page.locator(self.selectors["success_message"]).first.wait_for(state="visible", timeout=timeout_ms)
+            return AdapterResult(success=True, message=f"Application submitted via {self.name} adapter.", screenshot=await page.screenshot())
+        except PlaywrightError as e:
+            screenshot = None
+            try:
+                screenshot = await page.screenshot()
+            except PlaywrightError:
+                pass
+            return AdapterResult(success=False, message=f"No confirmation after submitting via {self.name} adapter: {e}", screenshot=screenshot)
+
+
+class GreenhouseAdapter(BaseAdapter):
+    name = "greenhouse"
+    hosts = ("boards.greenhouse.io", "job-boards.greenhouse.io")
+    text_fields = {
+        "first_name": lambda p: p.get("first_name"),
+        "last_name": lambda p: p.get("last_name"),
+        "email": lambda p: p.get("email"),
+        "phone": lambda p: p.get("phone"),
+        "linkedin_url": lambda p: p.get("linkedin_url"),
+    }
+
+
+class LeverAdapter(BaseAdapter):
+    name = "lever"
+    hosts = ("jobs.lever.co",)
+    text_fields = {
+        "full_name": lambda p: " ".join(filter(None, [p.get("first_name"), p.get("last_name")])),
+        "email": lambda p: p.get("email"),
+        "phone": lambda p: p.get("phone"),
+        "linkedin_url": lambda p: p.get("linkedin_url"),
+    }
+
+    def apply_url(self, job_url: str) -> str:
+        # Posting pages link to the form at <posting>/apply
+        job_url = job_url.split("?")[0].rstrip("/")
+        return job_url if job_url.endswith("/apply") else f"{job_url}/apply"
+
+
+ADAPTERS: List[BaseAdapter] = [GreenhouseAdapter(), LeverAdapter()]
+
+
+def detect_adapter(url: str) -> Optional[BaseAdapter]:
+    """Returns the adapter for a job URL's ATS, or None if the LLM agent must handle it."""
+    if not settings.ATS_ADAPTERS_ENABLED or not url:
+        return None
+    return next((adapter for adapter in ADAPTERS if adapter.matches(url)), None)
+
+
+async def try_adapter(browser_context, job_url: str, profile: Dict[str, str], resume_path: str) -> Optional[AdapterResult]:
+    """Runs the matching adapter on a pooled browser context. None if no adapter covers the URL."""
+    adapter = detect_adapter(job_url)
+    if adapter is None:
+        return None
+    page = await browser_context.get_current_page()
+    with metrics.timed("autosubmit.adapter_seconds", adapter=adapter.name):
+        result = await adapter.apply(page, job_url, profile, resume_path)
+    outcome = "fallback" if result.fallback else ("success" if result.success else "failure")
+    metrics.incr("autosubmit.adapter_runs", adapter=adapter.name, outcome=outcome)
+    logger.info(f"{adapter.name} adapter for {job_url}: {outcome}. {result.message}")
+    return result
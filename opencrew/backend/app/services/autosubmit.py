@@ -1,11 +1,11 @@
 import logging
 import asyncio
-import time
+import contextlib
 import json # Import json
 from pathlib import Path # Import Path
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional, Type
+from typing import Any, Dict, List, Optional, Tuple, Type
 from urllib.parse import urlparse
 
 # from playwright.async_api import async_playwright, Browser, Page, Locator, Error as PlaywrightError # Likely managed by browser-use
@@ -17,11 +17,14 @@ from urllib.parse import urlparse
 import os
 from dotenv import load_dotenv
 from browser_use import Agent # The core agent from browser-use
-from langchain_openai import ChatOpenAI # Example LLM integration
 from pydantic import ValidationError # For loading structured data
 
-# Import the new PDF generator service and schema
-from .pdf_generator import StructuredResumePdfGenerator
+# Import the PDF render cache and schema
+from . import apply_scheduler, artifact_uploader, ats_adapters, llm_gateway, pdf_render_cache, quota, s3
+from .agent_budget import AgentBudget, AgentUsageTracker
+from .browser_pool import get_browser_pool
+from .file_cache import get_resume_cache
+from .quota import IN_FLIGHT_STATUSES
 from ..schemas.resume import StructuredResume
 
 load_dotenv() # Load .env file for API keys
@@ -51,73 +54,11 @@ logger = logging.getLogger(__name__)
 # --- Artifact Handling ---
 import tempfile
 import shutil # Keep for potential temp file cleanup if needed
-import boto3 # Import AWS SDK
-from botocore.exceptions import NoCredentialsError, PartialCredentialsError, ClientError # Import specific exceptions
 from app.core.config import settings # Absolute import
 
 # ARTIFACT_DIR = Path(tempfile.gettempdir()) / "opencrew_artifacts" # No longer saving locally by default
 # ARTIFACT_DIR.mkdir(parents=True, exist_ok=True)
-
-def upload_screenshot_to_s3(history, application_id: int, outcome: str) -> Optional[str]:
-    """Uploads the last screenshot from AgentHistoryList to S3 and returns the URL."""
-    try:
-        screenshot_paths = history.screenshots() # Get list of screenshot paths
-        if not screenshot_paths:
-            logger.info(f"No screenshots found in history for app {application_id}.")
-            return None
-
-        last_screenshot_source_path_str = screenshot_paths[-1]
-        last_screenshot_source_path = Path(last_screenshot_source_path_str) # Keep as Path for existence check
-
-        if not last_screenshot_source_path.exists():
-            logger.warning(f"Source screenshot path '{last_screenshot_source_path_str}' not found for app {application_id}.")
-            return None
-
-        # --- S3 Upload Logic ---
-        if not settings.S3_BUCKET_NAME or not settings.AWS_ACCESS_KEY_ID or not settings.AWS_SECRET_ACCESS_KEY:
-            logger.error(f"S3 credentials or bucket name not configured. Cannot upload screenshot for app {application_id}.")
-            return None
-
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION_NAME
-        )
-
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        # Define a key (path within the bucket)
-        s3_key = f"application_screenshots/app_{application_id}_{outcome}_{timestamp}.png"
-
-        try:
-            logger.info(f"Uploading screenshot for app {application_id} from '{last_screenshot_source_path_str}' to s3://{settings.S3_BUCKET_NAME}/{s3_key}")
-            s3_client.upload_file(
-                Filename=last_screenshot_source_path_str,
-                Bucket=settings.S3_BUCKET_NAME,
-                Key=s3_key,
-                ExtraArgs={'ContentType': 'image/png'} # Ensure correct content type
-            )
-
-            # Construct the object URL (basic version, consider using get_object_url or presigned URLs if needed)
-            # Note: Assumes bucket has public read access or uses other auth mechanisms (e.g., CloudFront)
-            # For private buckets, you'd generate a presigned URL here instead.
-            s3_url = f"https://{settings.S3_BUCKET_NAME}.s3.{settings.AWS_REGION_NAME}.amazonaws.com/{s3_key}"
-            logger.info(f"Successfully uploaded screenshot for app {application_id} to S3: {s3_url}")
-            return s3_url
-
-        except (NoCredentialsError, PartialCredentialsError):
-            logger.error(f"AWS credentials not found or incomplete for S3 upload (app {application_id}).")
-        except ClientError as e:
-            # More specific error handling for S3 issues (e.g., bucket not found, permissions)
-            logger.error(f"S3 ClientError during upload for app {application_id}: {e}", exc_info=True)
-        except Exception as e:
-            logger.error(f"Unexpected error during S3 upload for app {application_id}: {e}", exc_info=True)
-
-        return None # Return None if upload fails
-
-    except Exception as e:
-        logger.error(f"Error processing screenshot history for app {application_id}: {e}", exc_info=True)
-        return None
+# Screenshots are uploaded in the background by artifact_uploader once the final status is committed.
 
 # --- Telemetry Placeholders ---
 # tracer = trace.get_tracer(__name__) # Example OTel tracer
@@ -160,15 +101,14 @@ def upload_screenshot_to_s3(history, application_id: int, outcome: str) -> Optio
 # async def find_element_by_semantic_label(page: Page, target_label: str, element_type: str = "input") -> Optional[Locator]: ... (Full function commented out)
 
 
-# --- Adapters (Commented out - Replaced by Agent) ---
-# class BaseAdapter: ... (Full class commented out)
-# class GreenhouseAdapter(BaseAdapter): ... (Full class commented out)
-# class LeverAdapter(BaseAdapter): ... (Full class commented out)
+# --- Adapters ---
+# Deterministic Greenhouse/Lever adapters live in services/ats_adapters.py and run before
+# the agent; Indeed/Workday still go straight to the agent.
 # class IndeedAdapter(BaseAdapter): ... (Full class commented out)
 # class WorkdayAdapter(BaseAdapter): ... (Full class commented out)
 
-# --- Site Detection (Commented out - Replaced by Agent) ---
-# def detect_site(url: str) -> Optional[Type[BaseAdapter]]: ... (Full function commented out)
+# --- Site Detection ---
+# See ats_adapters.detect_adapter().
 
 # --- AutoSubmitter Class (State Machine) (Commented out - Replaced by Agent) ---
 # class AutoSubmitter: ... (Full class commented out)
@@ -182,8 +122,12 @@ async def apply_to_job_async(db: Session, application_id: int):
     """
     logger.info(f"Starting async auto-apply process for application ID: {application_id}")
     application: Application | None = None # Use imported Application type
-    original_temp_resume_path = None # Path for the original downloaded resume
-    tailored_resume_path = None # Path for the newly generated tailored PDF
+    resume_cache = None
+    original_resume_path = None # Cached local copy of the original resume (pinned while in use)
+    tailored_resume_path = None # Cached tailored PDF (pinned while in use)
+    final_screenshot = None # PNG bytes, uploaded after the final status is committed
+    screenshot_outcome = "failure"
+    usage_tracker: AgentUsageTracker | None = None # Set only when the LLM agent runs
 
     try:
         # --- Fetch Application Details ---
@@ -191,6 +135,12 @@ async def apply_to_job_async(db: Session, application_id: int):
         if not application:
             logger.error(f"Application not found for ID: {application_id}")
             return
+        # Quota was reserved when this application was queued (matching task or API); it is
+        # committed on success or released on failure below. Anything no longer in flight was
+        # already settled by an earlier delivery (acks_late redelivery, re-published batch).
+        if application.status not in IN_FLIGHT_STATUSES:
+            logger.info(f"Application {application_id} is already settled ({application.status.value}). Skipping.")
+            return
         if not application.user or not application.job or not application.resume:
             logger.error(f"Missing user, job, or resume for application ID: {application_id}")
             # Update status to error in DB
@@ -198,6 +148,7 @@ async def apply_to_job_async(db: Session, application_id: int):
             application.notes = "Missing required data (user, job, or resume)."
             db.add(application)
             db.commit()
+            quota.release(db, application.user_id)
             return
         # Check for original_filepath (where S3 key is stored) instead of file_path
         if not application.resume.original_filepath:
@@ -206,30 +157,14 @@ async def apply_to_job_async(db: Session, application_id: int):
             application.notes = "Resume S3 key missing."
             db.add(application)
             db.commit()
+            quota.release(db, application.user_id)
             return
 
         user = application.user
         job = application.job
         resume = application.resume
 
-        # --- Check Quota ---
-        remaining_quota = check_user_quota(db=db, user=user)
-        if remaining_quota <= 0:
-            logger.warning(f"User {user.id} has no auto-apply quota remaining. Skipping application {application_id}.")
-            application.status = ApplicationStatus.ERROR # Use imported Enum (Or a specific 'QUOTA_EXCEEDED' status)
-            application.notes = "Auto-apply quota exceeded for the month."
-            db.add(application)
-            db.commit()
-            return
-
-        logger.info(f"User {user.id} has {remaining_quota} auto-apply quota remaining. Proceeding with application {application_id}.")
-
-        # --- Elite Tier Throttling (Placeholder) ---
-        if user.subscription_tier == SubscriptionTier.ELITE: # Use imported Enum
-            # TODO: Implement actual throttling logic (e.g., check last N application timestamps)
-            throttle_delay_seconds = 5.0 + (time.time() % 5) # Example: Wait 5-10 seconds
-            logger.info(f"Elite tier user {user.id}. Applying placeholder throttle delay of {throttle_delay_seconds:.1f} seconds.")
-            await asyncio.sleep(throttle_delay_seconds)
+        # Pacing per job-site domain and tier priority are handled by services/apply_scheduler.py
 
         # --- Prepare Task Data ---
         user_profile = {
@@ -248,42 +183,36 @@ async def apply_to_job_async(db: Session, application_id: int):
              application.notes = "Critical: Resume S3 key missing just before execution."
              db.add(application)
              db.commit()
+             quota.release(db, application.user_id)
              return
 
-        # --- Download Original Resume from S3 to Temporary File ---
+        # --- Fetch Original Resume via the Local File Cache ---
         # Check S3 configuration first
-        if not settings.S3_BUCKET_NAME or not settings.AWS_ACCESS_KEY_ID or not settings.AWS_SECRET_ACCESS_KEY:
+        if not s3.is_configured():
              logger.error(f"S3 credentials or bucket name not configured. Cannot download resume for app {application_id}.")
              raise ValueError("S3 storage not configured for resume download.") # Raise error to stop processing
 
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION_NAME
-        )
-        # Create a temporary file with the correct extension (e.g., .pdf)
-        file_suffix = Path(resume_s3_key).suffix or '.pdf' # Get suffix from key or default
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_suffix) as temp_file:
-            original_temp_resume_path = temp_file.name # Store the path of the original download
-            logger.info(f"Downloading original resume from s3://{settings.S3_BUCKET_NAME}/{resume_s3_key} to {original_temp_resume_path} for app {application_id}")
-            s3_client.download_file(settings.S3_BUCKET_NAME, resume_s3_key, original_temp_resume_path)
-            logger.info(f"Successfully downloaded original resume to {original_temp_resume_path}")
+        # Cached by S3 key + ETag, so repeated applications with one resume skip the download.
+        # Blocking I/O runs off the event loop so concurrent applies keep progressing.
+        resume_cache = get_resume_cache()
+        original_resume_path = await asyncio.to_thread(resume_cache.acquire, resume_s3_key)
+        logger.info(f"Using original resume {original_resume_path} (s3://{settings.S3_BUCKET_NAME}/{resume_s3_key}) for app {application_id}")
         # --- End Download ---
 
         # --- Generate Tailored PDF if Structured Data Exists ---
-        resume_to_use_path = original_temp_resume_path # Default to original S3 resume
-        if resume.structured_data:
-            logger.info(f"Structured data found for resume ID {resume.id}. Attempting to generate tailored PDF.")
+        resume_to_use_path = original_resume_path # Default to original S3 resume
+        # Prefer the resume pre-tailored for this job (services/pre_tailoring.py); its PDF is usually already rendered
+        structured_data = application.tailored_data or resume.structured_data
+        if structured_data:
+            source = "pre-tailored for this application" if application.tailored_data else f"of resume ID {resume.id}"
+            logger.info(f"Using structured data {source}. Attempting to generate tailored PDF.")
             try:
                 # Load structured data into Pydantic model
-                structured_resume = StructuredResume(**resume.structured_data)
+                structured_resume = StructuredResume(**structured_data)
 
-                # Instantiate generator and generate PDF
-                pdf_generator = StructuredResumePdfGenerator()
-                temp_pdf_dir = tempfile.gettempdir() # Use system temp dir
-                tailored_resume_path = pdf_generator.generate_resume_pdf(structured_resume, temp_pdf_dir)
-                logger.info(f"Successfully generated tailored PDF: {tailored_resume_path}")
+                # Reuse an earlier render of identical data (local or S3) instead of re-rendering
+                tailored_resume_path = await asyncio.to_thread(pdf_render_cache.acquire_tailored_pdf, structured_resume)
+                logger.info(f"Using tailored PDF: {tailored_resume_path}")
                 resume_to_use_path = tailored_resume_path # Use the tailored PDF path for the agent
 
             except ValidationError as ve:
@@ -325,40 +254,64 @@ async def apply_to_job_async(db: Session, application_id: int):
         Provide a final status message indicating success or failure, and mention any fields you couldn't fill or steps you couldn't complete.
         """
 
-        # Configure the LLM (ensure OPENAI_API_KEY is set in .env)
-        llm = ChatOpenAI(model="gpt-4o", temperature=0.2) # Using GPT-4o as example
-
-        # Instantiate and run the agent
-        logger.info(f"Instantiating browser-use Agent for application {application_id}")
-        agent = Agent(
-            task=task_prompt,
-            llm=llm,
-            # Add browser_args, viewport, etc. if needed for stealth/config
-            # browser_args=["--no-sandbox"], # Example for Linux environments
-            # viewport={"width": 1920, "height": 1080}
-        )
-
-        history = await agent.run() # agent.run() returns AgentHistoryList
-        logger.info(f"Agent execution finished for application {application_id}.")
+        history = None
+        async with get_browser_pool().lease() as browser_context:
+            # Fast path: known ATS forms are filled deterministically, no LLM involved
+            adapter_result = await ats_adapters.try_adapter(browser_context, job.url, user_profile, resume_to_use_path)
+
+            if adapter_result is None or adapter_result.fallback:
+                # Step, wall-clock and token budgets; the tracker counts the LLM's usage
+                budget = AgentBudget.from_settings()
+                usage_tracker = AgentUsageTracker(budget)
+
+                # Configure the LLM (ensure OPENAI_API_KEY is set in .env); pooled and rate-limited by the gateway
+                llm = llm_gateway.chat_model("gpt-4o", temperature=0.2, callbacks=[usage_tracker]) # Using GPT-4o as example
+
+                # Instantiate and run the agent on a warm pooled browser context
+                logger.info(f"Instantiating browser-use Agent for application {application_id}")
+                agent = Agent(
+                    task=task_prompt,
+                    llm=llm,
+                    browser=browser_context.browser,
+                    browser_context=browser_context, # Injected, so the agent won't close the pooled browser
+                    # Add browser_args, viewport, etc. to BrowserPool if needed for stealth/config
+                )
+
+                usage_tracker.attach(agent)
+                try:
+                    history = await agent.run(max_steps=budget.max_steps) # agent.run() returns AgentHistoryList
+                finally:
+                    usage_tracker.detach(steps_taken=agent.state.n_steps - 1) # n_steps counts from 1
+                logger.info(f"Agent execution finished for application {application_id}.")
         # logger.debug(f"Agent history details: {history}") # Optional: Log full history for debugging
 
         # --- Interpret Agent Result using AgentHistoryList ---
-        final_screenshot_url = None # Initialize outside try block
-
         try:
-            if history and history.is_done() and not history.has_errors():
+            if adapter_result is not None and not adapter_result.fallback:
+                # Submitted (or failed after submitting) by a deterministic adapter
+                agent_success = adapter_result.success
+                agent_message = adapter_result.message
+                screenshot_outcome = "success" if agent_success else "failure"
+                final_screenshot = adapter_result.screenshot
+
+            elif history and history.is_done() and not history.has_errors():
                 agent_success = True
                 agent_message = history.final_result() or "Application submitted successfully by agent."
                 logger.info(f"Agent task marked as done without errors for application {application_id}. Final result: {agent_message}")
-                # Upload final screenshot on success
-                final_screenshot_url = upload_screenshot_to_s3(history, application_id, "success")
+                # Keep the final screenshot on success
+                screenshot_outcome = "success"
+                final_screenshot = artifact_uploader.last_screenshot(history)
 
             elif history:
                 # Agent finished but didn't mark as done, or encountered errors
                 agent_success = False
                 errors = history.errors()
                 final_output = history.final_result()
-                if errors:
+                if usage_tracker.stop_reason:
+                    # Cut off by a budget; errors() has one entry (usually None) per step taken
+                    agent_message = f"Agent stopped: {usage_tracker.stop_reason} budget exceeded. Final output: {final_output}"
+                    logger.warning(f"Agent for application {application_id} stopped over its {usage_tracker.stop_reason} budget.")
+                elif errors:
                     agent_error_details = "; ".join(map(str, errors)) # Combine multiple errors if they exist
                     agent_message = f"Agent encountered errors: {agent_error_details}"
                     if final_output:
@@ -370,8 +323,8 @@ async def apply_to_job_async(db: Session, application_id: int):
                 else: # Should ideally not happen if has_errors() is reliable
                     agent_message = f"Agent finished with unclear status (done: {history.is_done()}, errors: {history.has_errors()}). Final output: {final_output}"
                     logger.warning(agent_message)
-                # Upload final screenshot on failure/error
-                final_screenshot_url = upload_screenshot_to_s3(history, application_id, "failure")
+                # Keep the final screenshot on failure/error
+                final_screenshot = artifact_uploader.last_screenshot(history)
 
             else:
                 # Should not happen if agent.run() always returns history, but handle defensively
@@ -396,25 +349,17 @@ async def apply_to_job_async(db: Session, application_id: int):
         agent_error_details = str(agent_exec_error)
         # Attempt to save screenshot even if agent execution failed mid-way, if history exists (unlikely here)
         # if 'history' in locals() and history:
-        #      final_screenshot_url = upload_screenshot_to_s3(history, application_id, "failure_exec")
+        #      final_screenshot = artifact_uploader.last_screenshot(history)
 
 
     finally:
         # --- Clean up temporary resume files ---
-        # Delete original downloaded resume
-        if original_temp_resume_path and Path(original_temp_resume_path).exists():
-            try:
-                Path(original_temp_resume_path).unlink()
-                logger.info(f"Successfully deleted temporary original resume file: {original_temp_resume_path}")
-            except Exception as cleanup_error:
-                logger.error(f"Failed to delete temporary original resume file {original_temp_resume_path}: {cleanup_error}")
-        # Delete tailored generated resume if it exists
-        if tailored_resume_path and Path(tailored_resume_path).exists():
-            try:
-                Path(tailored_resume_path).unlink()
-                logger.info(f"Successfully deleted temporary tailored resume file: {tailored_resume_path}")
-            except Exception as cleanup_error:
-                logger.error(f"Failed to delete temporary tailored resume file {tailored_resume_path}: {cleanup_error}")
+        # Unpin the cached original resume (kept on disk for the next application)
+        if resume_cache and original_resume_path:
+            resume_cache.release(original_resume_path)
+        # Unpin the cached tailored PDF
+        if tailored_resume_path:
+            pdf_render_cache.release_tailored_pdf(tailored_resume_path)
 
     # --- Update Application Status (Moved outside main try block to ensure it runs even if agent init fails) ---
     # Ensure application object is available
@@ -439,11 +384,23 @@ async def apply_to_job_async(db: Session, application_id: int):
         if agent_error_details:
             application.notes += f" | Details: {agent_error_details}" # Updated label
 
-    # Save the S3 URL to the database (if generated)
-    if 'final_screenshot_url' in locals() and final_screenshot_url:
-        application.screenshot_url = final_screenshot_url
-    else:
-         application.screenshot_url = None # Ensure it's null if upload failed or wasn't attempted
+    # Cleared now; set by the background upload once it finishes
+    application.screenshot_url = None
+
+    # Record the agent's LLM usage in the same transaction (adapter-only runs use no LLM)
+    if usage_tracker and usage_tracker.llm_calls:
+        crud.agent_usage.add_agent_run_usage(
+            db,
+            application_id=application_id,
+            domain=urlparse(job.url).netloc.lower() if job.url else "unknown",
+            steps=usage_tracker.steps,
+            llm_calls=usage_tracker.llm_calls,
+            prompt_tokens=usage_tracker.prompt_tokens,
+            completion_tokens=usage_tracker.completion_tokens,
+            duration_seconds=usage_tracker.elapsed_seconds,
+            success=agent_success,
+            stop_reason=usage_tracker.stop_reason,
+        )
 
     try:
         db.add(application)
@@ -453,42 +410,119 @@ async def apply_to_job_async(db: Session, application_id: int):
          logger.error(f"Failed to commit final application status update for ID {application_id}: {final_commit_e}", exc_info=True)
          sentry_sdk.capture_exception(final_commit_e) # Capture exception in Sentry
          db.rollback()
+         return # Leave the reservation in place; reconcile_quota_usage repairs it from the final status
 
+    # --- Upload the Final Screenshot (off the critical path) ---
+    artifact_uploader.submit_screenshot(application_id, screenshot_outcome, final_screenshot) # No-op without a screenshot
 
-# --- Quota Checking Logic (Unchanged) ---
-QUOTA_LIMITS = {
-    SubscriptionTier.FREE: 50, # Use imported Enum
-    SubscriptionTier.PRO: 10000,  # Effectively unlimited
-    SubscriptionTier.ELITE: 10000, # Effectively unlimited
-}
+    # --- Settle the Quota Reservation ---
+    try:
+        if agent_success:
+            quota.commit(db, application.user_id)
+        else:
+            quota.release(db, application.user_id)
+    except Exception as quota_e:
+        logger.error(f"Failed to settle quota reservation for application ID {application_id}: {quota_e}", exc_info=True)
+        db.rollback()
+
+
+# --- Concurrent Execution ---
+# One worker process drives several agents at once: most of an apply is spent waiting on
+# the LLM and the network, not on CPU. Concurrency is capped at the browser pool size (so
+# memory stays bounded by the warm contexts) and per job-site domain, so a batch doesn't
+# hit one ATS with every slot at once. Limits are per event loop, i.e. per worker process.
+
+_loop_limits: Dict[int, tuple] = {} # id(loop) -> (global semaphore, {domain: semaphore})
+
+def _apply_limits() -> tuple:
+    loop = asyncio.get_running_loop()
+    limits = _loop_limits.get(id(loop))
+    if limits is None:
+        _loop_limits.clear() # A new loop (e.g. after fork) makes the old semaphores unusable
+        limits = (asyncio.Semaphore(max(1, settings.BROWSER_POOL_SIZE)), {})
+        _loop_limits[id(loop)] = limits
+    return limits
+
+def _domain_semaphore(domain: str, limit: int) -> asyncio.Semaphore:
+    domain_semaphores = _apply_limits()[1]
+    if domain not in domain_semaphores:
+        domain_semaphores[domain] = asyncio.Semaphore(max(1, limit))
+    return domain_semaphores[domain]
+
+def _ats_semaphore(domain: str):
+    """The per-ATS cap for boards on a hosted ATS; a no-op for an employer's own domain."""
+    ats = apply_scheduler.ats_host(domain)
+    return _domain_semaphore(f"ats:{ats}", settings.AUTO_APPLY_ATS_CONCURRENCY) if ats else contextlib.nullcontext()
+
+def _job_domain(db: Session, application_id: int) -> str:
+    job_url = (
+        db.query(Job.url)
+        .join(Application, Application.job_id == Job.id)
+        .filter(Application.id == application_id)
+        .scalar()
+    )
+    return apply_scheduler.admission_key(job_url)
+
+async def _apply_with_limits(application_id: int) -> Tuple[str, float]:
+    """Applies one application under the domain and global caps, on its own DB session.
+
+    Returns (outcome, defer_seconds) where outcome is "processed", "error" or "deferred".
+    """
+    db = SessionLocal() # Sessions are not shared between concurrent coroutines
+    domain = None
+    try:
+        domain = _job_domain(db, application_id)
+        # Cluster-wide domain slot and start rate; a refusal is retried later with a countdown
+        defer_seconds = await asyncio.to_thread(apply_scheduler.try_admit, domain, application_id)
+        if defer_seconds > 0:
+            logger.info(f"Domain {domain} at capacity; deferring application {application_id} by {defer_seconds:.0f}s.")
+            domain = None # Nothing to release
+            return "deferred", defer_seconds
+        # Domain slot first, so an application waiting on a busy domain doesn't hold a global slot
+        async with _domain_semaphore(domain, settings.AUTO_APPLY_DOMAIN_CONCURRENCY), _ats_semaphore(domain), _apply_limits()[0]:
+            logger.info(f"Applying application {application_id} (domain {domain}).")
+            await apply_to_job_async(db=db, application_id=application_id)
+        return "processed", 0.0
+    except Exception as e:
+        logger.error(f"Concurrent auto-apply failed for application ID {application_id}: {e}", exc_info=True)
+        sentry_sdk.capture_exception(e)
+        db.rollback()
+        return "error", 0.0
+    finally:
+        if domain is not None:
+            await asyncio.to_thread(apply_scheduler.release, domain, application_id)
+        db.close()
+
+async def apply_many_async(application_ids: List[int]) -> Dict[str, Any]:
+    """Runs auto-apply for several applications concurrently. One failure doesn't stop the others.
+
+    Returns counts plus the applications the scheduler deferred (`deferred`) and the shortest
+    wait before retrying them (`retry_in`), for the caller to re-publish with a countdown.
+    """
+    results = await asyncio.gather(*(_apply_with_limits(app_id) for app_id in application_ids))
+    outcomes = [outcome for outcome, _ in results]
+    deferred = [app_id for app_id, (outcome, _) in zip(application_ids, results) if outcome == "deferred"]
+    summary = {
+        "processed": outcomes.count("processed"),
+        "errors": outcomes.count("error"),
+        "deferred": deferred,
+        "retry_in": min((delay for outcome, delay in results if outcome == "deferred"), default=0.0),
+    }
+    logger.info(f"Finished concurrent auto-apply batch of {len(application_ids)} applications: {summary}")
+    return summary
+
+
+# --- Quota Checking Logic ---
+# Limits and counters live in services/quota.py; kept here for existing callers.
+QUOTA_LIMITS = quota.QUOTA_LIMITS
 
 def check_user_quota(db: Session, user: User) -> int: # Use imported User type
     """
     Checks the remaining auto-apply quota for the user in the current calendar month.
-    Returns the number of applications remaining.
+    Returns the number of applications remaining (reserved-but-unsent applications count as spent).
     """
-    limit = QUOTA_LIMITS.get(user.subscription_tier, 0)
-    # Check for Pro or Elite tiers specifically for unlimited quota
-    if user.subscription_tier in [SubscriptionTier.PRO, SubscriptionTier.ELITE]: # Use imported Enum
-        logger.info(f"User {user.id} has '{user.subscription_tier}' tier. Granting unlimited auto-apply quota.")
-        return 99999 # Return a very large number to signify unlimited
-
-    # For FREE tier or any other tiers without explicit unlimited quota
-    now = datetime.utcnow()
-    start_of_month = datetime(now.year, now.month, 1)
-
     try:
-        applied_count = db.query(func.count(Application.id)) \
-            .filter(
-                Application.user_id == user.id,
-                Application.status == ApplicationStatus.APPLIED,
-                Application.applied_at >= start_of_month
-            ).scalar() or 0
-
-        remaining = limit - applied_count
-        logger.info(f"User {user.id} (Tier: {user.subscription_tier}): Monthly Limit={limit}, Used This Month={applied_count}, Remaining={max(0, remaining)}")
-        return max(0, remaining) # Ensure non-negative return
-
+        return quota.remaining(db, user)
     except Exception as e:
         logger.error(f"Error checking quota for user {user.id}: {e}")
         return 0
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional, Tuple
+
+from browser_use import Browser, BrowserConfig
+from browser_use.browser.context import BrowserContext
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# --- Warm Browser Pool for Auto-Apply Agents ---
+# Launching Chromium costs seconds; opening a fresh context on a running browser costs
+# milliseconds. Each worker process keeps one warm browser and up to `size` pre-opened
+# contexts. Agents lease a context, and on return it is closed (dropping cookies, storage
+# and pages so nothing leaks between applicants) and replaced with a fresh warm one.
+#
+# The browser is health-checked on every lease and relaunched if it died, and recycled
+# after `max_uses` leases to bound Chromium's memory growth. A retired browser stays open
+# until its last outstanding lease is returned.
+#
+# A pool's semaphore, lock and Playwright connection belong to the event loop that first
+# used them, so there is one pool per (process, loop); normally that is the single
+# long-lived loop in workers/async_runtime.py.
+
+
+class BrowserPool:
+    def __init__(self, size: int, max_uses: int, headless: bool = True):
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.headless = headless
+        self._browser: Optional[Browser] = None
+        self._uses = 0 # Leases served by the current browser
+        self._active: Dict[int, int] = {} # id(browser) -> outstanding leases
+        self._retired: Dict[int, Browser] = {}
+        self._idle: Deque[BrowserContext] = deque()
+        self._semaphore = asyncio.Semaphore(self.size)
+        self._lock = asyncio.Lock()
+
+    # --- Browser lifecycle ---
+
+    def _is_healthy(self, browser: Optional[Browser]) -> bool:
+        return bool(browser and browser.playwright_browser and browser.playwright_browser.is_connected())
+
+    async def _launch(self) -> Browser:
+        start = time.perf_counter()
+        browser = Browser(config=BrowserConfig(headless=self.headless))
+        await browser.get_playwright_browser() # Pay the Chromium launch now, not on first lease
+        metrics.observe("browser_pool.launch_seconds", time.perf_counter() - start)
+        logger.info(f"Launched pooled browser in {time.perf_counter() - start:.2f}s.")
+        return browser
+
+    async def _retire_current(self, reason: str) -> None:
+        browser, self._browser = self._browser, None
+        self._uses = 0
+        idle, self._idle = list(self._idle), deque()
+        for context in idle:
+            await self._close_context(context)
+        if browser is None:
+            return
+        logger.info(f"Retiring pooled browser ({reason}).")
+        metrics.incr("browser_pool.recycles", reason=reason)
+        if self._active.get(id(browser)):
+            self._retired[id(browser)] = browser # Closed when its last lease returns
+        else:
+            await self._close_browser(browser)
+
+    async def _close_browser(self, browser: Browser) -> None:
+        self._active.pop(id(browser), None)
+        try:
+            await browser.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled browser: {e}")
+
+    async def _ensure_browser(self) -> Browser:
+        if self._browser is not None and not self._is_healthy(self._browser):
+            await self._retire_current("unhealthy")
+        elif self._uses >= self.max_uses:
+            await self._retire_current("max_uses")
+        if self._browser is None:
+            self._browser = await self._launch()
+        return self._browser
+
+    # --- Contexts ---
+
+    async def _open_context(self, browser: Browser) -> BrowserContext:
+        context = await browser.new_context()
+        await context.__aenter__() # Opens the Playwright context and first page
+        return context
+
+    async def _close_context(self, context: BrowserContext) -> None:
+        try:
+            await context.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled browser context: {e}")
+
+    async def _refill(self) -> None:
+        """Keeps one warm context ready per free slot so the next lease doesn't wait."""
+        async with self._lock:
+            browser = self._browser
+            if not self._is_healthy(browser) or self._uses >= self.max_uses:
+                return
+            free_slots = self.size - self._active.get(id(browser), 0)
+            while len(self._idle) < free_slots:
+                try:
+                    self._idle.append(await self._open_context(browser))
+                except Exception as e:
+                    logger.warning(f"Failed to pre-open browser context: {e}")
+                    return
+
+    @asynccontextmanager
+    async def lease(self):
+        """Leases a clean browser context for one agent run."""
+        async with self._semaphore:
+            start = time.perf_counter()
+            async with self._lock:
+                browser = await self._ensure_browser()
+                context = self._idle.popleft() if self._idle else await self._open_context(browser)
+                self._uses += 1
+                self._active[id(browser)] = self._active.get(id(browser), 0) + 1
+            metrics.observe("browser_pool.lease_seconds", time.perf_counter() - start)
+            try:
+                yield context
+            finally:
+                # Reset: a used context is never handed out again
+                await self._close_context(context)
+                async with self._lock:
+                    self._active[id(browser)] -= 1
+                    retired = self._retired.get(id(browser))
+                    if retired is not None and self._active[id(browser)] == 0:
+                        del self._retired[id(browser)]
+                        await self._close_browser(retired)
+        await self._refill()
+
+    async def close(self) -> None:
+        """Closes all contexts and browsers. Called from the worker's shutdown hook."""
+        async with self._lock:
+            await self._retire_current("shutdown")
+            for browser in list(self._retired.values()):
+                await self._close_browser(browser)
+            self._retired.clear()
+
+
+_pools: Dict[Tuple[int, int], BrowserPool] = {} # (pid, id(loop)) -> pool
+
+def _pool_key() -> Tuple[int, int]:
+    return os.getpid(), id(asyncio.get_running_loop())
+
+def get_browser_pool() -> BrowserPool:
+    """Returns the browser pool for this worker process and running loop (created on first use)."""
+    key = _pool_key()
+    pool = _pools.get(key)
+    if pool is None:
+        # A pool inherited through fork, or bound to a finished loop, is unusable here
+        _pools.clear()
+        pool = BrowserPool(
+            size=settings.BROWSER_POOL_SIZE,
+            max_uses=settings.BROWSER_POOL_MAX_USES,
+            headless=settings.BROWSER_HEADLESS,
+        )
+        _pools[key] = pool
+    return pool
+
+async def close_browser_pool() -> None:
+    """Closes this process and loop's pool if one was created."""
+    pool = _pools.pop(_pool_key(), None)
+    if pool is not None:
+        await pool.close()
@@ -0,0 +1,107 @@
+import hashlib
+import logging
+import re
+from collections import Counter
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# --- Near-Duplicate Detection (SimHash + LSH banding) ---
+# The same role is routinely cross-posted on Greenhouse, Lever, Indeed, etc. with
+# different URLs. Each job gets a 64-bit SimHash of its normalized title, company and
+# description at ingest; jobs whose fingerprints differ by only a few bits are treated
+# as the same posting and clustered under the first (canonical) job.
+
+SIMHASH_BITS = 64
+LSH_BANDS = 4 # 4 bands x 16 bits; any pair within 3 bits is guaranteed to share a band
+BAND_BITS = SIMHASH_BITS // LSH_BANDS
+NEAR_DUPLICATE_MAX_DISTANCE = 3 # Max Hamming distance still considered the same posting
+SHINGLE_SIZE = 3 # Word n-gram size for description features
+HEADER_SHARE = 0.5 # Title/company carry half the total weight so different roles sharing boilerplate don't collide
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_NON_WORD_RE = re.compile(r"[^a-z0-9+#]+")
+# Board-specific suffixes that shouldn't make two postings look different
+_COMPANY_NOISE = {"inc", "llc", "ltd", "corp", "corporation", "co", "company", "greenhouse", "lever"}
+
+
+def normalize_text(text: Optional[str]) -> List[str]:
+    """Lowercases, strips markup/punctuation and returns the token list."""
+    if not text:
+        return []
+    text = _TAG_RE.sub(" ", text.lower())
+    return [tok for tok in _NON_WORD_RE.split(text) if tok]
+
+
+def _feature_hash(feature: str) -> int:
+    """Stable 64-bit hash of a feature (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(features: Counter) -> int:
+    """Computes a 64-bit SimHash from weighted features."""
+    vector = [0] * SIMHASH_BITS
+    for feature, weight in features.items():
+        h = _feature_hash(feature)
+        for bit in range(SIMHASH_BITS):
+            vector[bit] += weight if (h >> bit) & 1 else -weight
+    fingerprint = 0
+    for bit, value in enumerate(vector):
+        if value > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def job_fingerprint(title: Optional[str], company: Optional[str], description: Optional[str]) -> Optional[int]:
+    """SimHash fingerprint of a job posting built from title, company and description shingles.
+
+    Returns None when there is nothing to fingerprint: an empty feature set hashes to 0, which
+    would make every such posting a "duplicate" of every other.
+    """
+    features: Counter = Counter()
+    desc_tokens = normalize_text(description)
+    if len(desc_tokens) < SHINGLE_SIZE:
+        features.update(f"d:{tok}" for tok in desc_tokens)
+    else:
+        features.update(
+            "d:" + " ".join(desc_tokens[i:i + SHINGLE_SIZE])
+            for i in range(len(desc_tokens) - SHINGLE_SIZE + 1)
+        )
+
+    header = [f"t:{tok}" for tok in normalize_text(title)]
+    header += [f"c:{tok}" for tok in normalize_text(company) if tok not in _COMPANY_NOISE]
+    if header:
+        # Long descriptions would otherwise drown out the title entirely
+        desc_weight = sum(features.values())
+        header_weight = max(1, round(desc_weight * HEADER_SHARE / (1 - HEADER_SHARE) / len(header)))
+        for feature in header:
+            features[feature] += header_weight
+    if not features:
+        return None
+    return simhash(features)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints."""
+    return bin((a ^ b) & ((1 << SIMHASH_BITS) - 1)).count("1")
+
+
+def lsh_bands(fingerprint: int) -> List[int]:
+    """Splits a fingerprint into LSH_BANDS band keys used as indexed lookup columns."""
+    mask = (1 << BAND_BITS) - 1
+    return [(fingerprint >> (i * BAND_BITS)) & mask for i in range(LSH_BANDS)]
+
+
+def to_signed64(value: int) -> int:
+    """Maps an unsigned 64-bit fingerprint onto Postgres BIGINT range."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def from_signed64(value: int) -> int:
+    """Inverse of to_signed64."""
+    return value + (1 << 64) if value < 0 else value
+
+
+def is_near_duplicate(a: int, b: int) -> bool:
+    """True if two fingerprints are close enough to be the same posting."""
+    return hamming_distance(a, b) <= NEAR_DUPLICATE_MAX_DISTANCE
@@ -0,0 +1,142 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from celery.signals import worker_process_shutdown
+
+from app.core import metrics
+from app.core.config import settings
+from . import s3
+
+logger = logging.getLogger(__name__)
+
+# --- Local File Cache ---
+# Auto-apply needs the user's resume as a local file for the browser upload. The same
+# resume is used for many applications in a row, so downloads are cached on disk.
+# (The tailored-PDF render cache reuses the same class with its own keys, see
+# services/pdf_render_cache.py.)
+#
+# Entries are content-addressed by (S3 key, ETag): a HEAD request confirms the object is
+# unchanged, and a re-uploaded resume gets a new ETag and therefore a new entry. Total
+# size is bounded with least-recently-used eviction (file mtime is the access clock), and
+# files handed to a running agent are pinned until released. Each worker process owns
+# its own directory, removed on process shutdown.
+
+
+class LocalFileCache:
+    def __init__(self, root: Path, max_bytes: int, name: str = "resumes"):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.name = name # Metrics label
+        self._lock = threading.Lock()
+        self._pinned: Dict[Path, int] = {} # path -> outstanding acquire() calls
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, cache_key: str, suffix: str) -> Path:
+        digest = hashlib.sha256(cache_key.encode()).hexdigest()
+        return self.root / f"{digest}{suffix}"
+
+    def acquire(self, s3_key: str) -> Path:
+        """Returns a local path for the S3 object, downloading only on a miss. Pair with release()."""
+        client = s3.get_s3_client()
+        etag = client.head_object(Bucket=settings.S3_BUCKET_NAME, Key=s3_key)["ETag"].strip('"')
+
+        def download(tmp_name: str) -> None:
+            logger.info(f"Downloading s3://{settings.S3_BUCKET_NAME}/{s3_key} into local file cache.")
+            client.download_file(settings.S3_BUCKET_NAME, s3_key, tmp_name)
+
+        return self.acquire_entry(f"{s3_key}\0{etag}", Path(s3_key).suffix or ".bin", download)
+
+    def acquire_entry(self, cache_key: str, suffix: str, fill: Callable[[str], None]) -> Path:
+        """Returns the pinned local file for `cache_key`, calling fill(tmp_path) to create it on a miss."""
+        path = self._entry_path(cache_key, suffix)
+
+        with self._lock:
+            if path.exists():
+                os.utime(path) # Mark as recently used
+                self._pinned[path] = self._pinned.get(path, 0) + 1
+                metrics.incr("file_cache.hits", cache=self.name)
+                return path
+
+        metrics.incr("file_cache.misses", cache=self.name)
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix=".part")
+        os.close(fd)
+        try:
+            fill(tmp_name)
+            os.replace(tmp_name, path) # Atomic: readers never see a partial file
+        except Exception:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            self._pinned[path] = self._pinned.get(path, 0) + 1
+            self._evict()
+        return path
+
+    def release(self, path: Optional[Path]) -> None:
+        """Unpins a path returned by acquire() so it becomes evictable."""
+        if path is None:
+            return
+        with self._lock:
+            count = self._pinned.get(Path(path), 0) - 1
+            if count > 0:
+                self._pinned[Path(path)] = count
+            else:
+                self._pinned.pop(Path(path), None)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Removes least-recently-used unpinned entries until under max_bytes. Caller holds the lock."""
+        entries = []
+        for entry in self.root.iterdir():
+            if entry.suffix == ".part":
+                continue # In-flight download
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if entry in self._pinned:
+                continue
+            entry.unlink(missing_ok=True)
+            total -= size
+            metrics.incr("file_cache.evictions", cache=self.name)
+
+    def clear(self) -> None:
+        """Deletes the cache directory."""
+        with self._lock:
+            self._pinned.clear()
+            shutil.rmtree(self.root, ignore_errors=True)
+
+
+_cache: Optional[LocalFileCache] = None
+_cache_pid: Optional[int] = None
+_cache_lock = threading.Lock()
+
+def get_resume_cache() -> LocalFileCache:
+    """Returns this worker process's resume file cache (created on first use)."""
+    global _cache, _cache_pid
+    with _cache_lock:
+        if _cache is None or _cache_pid != os.getpid():
+            _cache = LocalFileCache(
+                root=Path(settings.RESUME_CACHE_DIR) / str(os.getpid()),
+                max_bytes=settings.RESUME_CACHE_MAX_MB * 1024 * 1024,
+            )
+            _cache_pid = os.getpid()
+        return _cache
+
+
+@worker_process_shutdown.connect
+def _on_worker_process_shutdown(**kwargs):
+    if _cache is not None and _cache_pid == os.getpid():
+        _cache.clear()
+        logger.info("Removed local resume file cache.")
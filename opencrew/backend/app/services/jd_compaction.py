@@ -0,0 +1,172 @@
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional
+
+from app.core import metrics
+from app.core.config import settings
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# --- Job-Description Compaction ---
+# Raw job descriptions carry a lot that doesn't help an LLM tailor a resume: EEO and privacy
+# statements, benefits and "about us" sections, and bullets repeated across sections.
+# Before a description goes into a prompt it is compacted:
+#
+#   1. sections under a boilerplate heading (benefits, EEO, about us, ...) are dropped,
+#      and so are stray boilerplate paragraphs,
+#   2. repeated lines/bullets are kept once,
+#   3. the rest is trimmed to JD_PROMPT_MAX_TOKENS, counted with tiktoken when installed
+#      (otherwise estimated at ~4 characters per token).
+#
+# Results are cached per description (a job's description is compacted once per process),
+# and callers report the tokens saved per LLM call in jd_compaction.tokens_saved{call_site}.
+
+_BOILERPLATE_HEADING_RE = re.compile(
+    r"^(about (us|the company|our company)|who we are|our (story|mission|values|culture)|why (join us|work here|you'll love working here)|"
+    r"benefits|perks|(benefits|perks) (and|&) (perks|benefits)|what we offer|compensation( and benefits)?|"
+    r"equal (employment )?opportunity.*|eeo.*|diversity.*|privacy.*|accommodations?|reasonable accommodations?|e-verify|"
+    r"additional information|how to apply|disclaimer)\s*:?$",
+    re.IGNORECASE,
+)
+# Headings that end a boilerplate section (short lines inside one, like "Health insurance", don't)
+_CONTENT_HEADING_RE = re.compile(
+    r"^(about the (role|team|job|position)|the role|role|overview|summary|job description|responsibilities|"
+    r"key responsibilities|what you('ll| will) do|your (role|impact)|requirements|qualifications|"
+    r"(minimum|basic|preferred) qualifications|what you('ll)? (need|bring)|who you are|you (have|are)|skills|"
+    r"experience|nice to have|bonus points|tech stack)\s*:?$",
+    re.IGNORECASE,
+)
+_BOILERPLATE_PARAGRAPH_RE = re.compile(
+    r"equal opportunity employer|without regard to (race|sex|gender|age)|reasonable accommodation|e-verify|"
+    r"will receive consideration for employment|applicant privacy|privacy (notice|policy)|"
+    r"does not accept unsolicited (resumes|agency)",
+    re.IGNORECASE,
+)
+_BULLET_PREFIX_RE = re.compile(r"^[\s\-\*•▪●–·>]+")
+_CACHE_MAX_ENTRIES = 512
+
+
+@dataclass(frozen=True)
+class Compaction:
+    text: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.original_tokens - self.tokens)
+
+    def record(self, call_site: str, calls: int = 1) -> None:
+        """Reports the tokens saved by `calls` prompts that used this compaction."""
+        if calls and self.tokens_saved:
+            metrics.incr("jd_compaction.tokens_saved", amount=self.tokens_saved * calls, call_site=call_site)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.get_encoding(settings.JD_TOKENIZER_ENCODING)
+    except Exception as e: # The BPE file is downloaded on first use
+        logger.warning(f"tiktoken encoding {settings.JD_TOKENIZER_ENCODING} unavailable, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    encoding = _encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:max_tokens])
+    return text[:max_tokens * 4]
+
+
+def _is_heading(line: str) -> bool:
+    """Short line that reads like a section title (no sentence punctuation)."""
+    words = line.split()
+    return 0 < len(words) <= 8 and not line.endswith((".", ",", ";")) and (line.endswith(":") or line[0].isupper())
+
+
+def strip_boilerplate(description: str) -> str:
+    """Drops boilerplate sections and paragraphs, and repeated lines."""
+    kept: List[str] = []
+    seen = set()
+    in_boilerplate = False
+    for raw_line in description.splitlines():
+        line = raw_line.strip()
+        if not line:
+            if kept and kept[-1]:
+                kept.append("")
+            continue
+        if _is_heading(line) and not _BULLET_PREFIX_RE.match(raw_line):
+            title = line.rstrip(":").strip()
+            if _BOILERPLATE_HEADING_RE.match(title):
+                in_boilerplate = True
+                continue
+            if in_boilerplate and (line.endswith(":") or _CONTENT_HEADING_RE.match(title)):
+                in_boilerplate = False
+        if in_boilerplate or _BOILERPLATE_PARAGRAPH_RE.search(line):
+            continue
+        normalized = _BULLET_PREFIX_RE.sub("", line).lower()
+        if normalized in seen:
+            continue
+        seen.add(normalized)
+        kept.append(line)
+    return "\n".join(kept).strip()
+
+
+def _compact(description: str, max_tokens: int) -> Compaction:
+    original_tokens = count_tokens(description)
+    text = strip_boilerplate(description) or description
+    tokens = count_tokens(text)
+    if tokens > max_tokens:
+        lines, used = [], 0
+        for line in text.split("\n"): # Whole lines while they fit, then cut the next one
+            line_tokens = count_tokens(line) + 1
+            if used + line_tokens > max_tokens:
+                remainder = _truncate_to_tokens(line, max_tokens - used)
+                if remainder.strip():
+                    lines.append(remainder)
+                break
+            lines.append(line)
+            used += line_tokens
+        text = "\n".join(lines).strip()
+        tokens = count_tokens(text)
+    return Compaction(text=text, original_tokens=original_tokens, tokens=tokens)
+
+
+_cache: "OrderedDict[str, Compaction]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def compact_description(description: str, max_tokens: Optional[int] = None) -> Compaction:
+    """Compacted form of a job description for prompts (cached per description and budget)."""
+    max_tokens = max_tokens or settings.JD_PROMPT_MAX_TOKENS
+    key = hashlib.sha256(f"{max_tokens}\0{description}".encode("utf-8")).hexdigest()
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    compaction = _compact(description, max_tokens)
+    with _cache_lock:
+        _cache[key] = compaction
+        while len(_cache) > _CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return compaction
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.models.job import Job
+from . import jd_compaction, resume_tailoring
+
+logger = logging.getLogger(__name__)
+
+# --- Shared Job-Description Analysis ---
+# Every user tailoring a resume against the same job used to re-analyze that job's
+# description: TF-IDF for keyword gaps, and the full description pasted into every
+# tailoring prompt. The analysis is now computed once per job on first use and stored in
+# Job.analysis:
+#
+#   {"version", "description_hash", "key_terms": [[term, score], ...],
+#    "summarized", "summary", "requirements": [...]}
+#
+# It is recomputed when the description changes (hash mismatch) or ANALYSIS_VERSION is
+# bumped. Near-duplicate postings share their canonical job's analysis. The TF-IDF key
+# terms are stored as soon as they are computed; the LLM summary is filled in later by the
+# first caller that needs it and gets an answer (summarized=False until then). Keyword-only
+# callers pass with_summary=False and never wait on the LLM.
+
+ANALYSIS_VERSION = 2
+KEY_TERM_MIN_SCORE = 0.05
+
+_ANALYSIS_SYSTEM_PROMPT = """You are a recruiting analyst. Read the job description and extract what a candidate must show to be a strong match.
+Return ONLY a JSON object of the form {"summary": "...", "requirements": ["...", "..."]}:
+- summary: 2-3 sentences on the role, seniority and domain.
+- requirements: up to 12 concrete requirements (skills, technologies, experience, responsibilities), most important first.
+Do not include markdown formatting."""
+
+
+def description_hash(description: str) -> str:
+    return hashlib.sha256((description or "").encode("utf-8")).hexdigest()
+
+
+def _clean_text(text: str) -> str:
+    """Lowercase, remove punctuation (same normalization as the keyword gap analysis)."""
+    return re.sub(r'[^\w\s]', '', text.lower())
+
+
+def extract_key_terms(description: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+    """1-3 word phrases of the description with TF-IDF score > KEY_TERM_MIN_SCORE, highest first."""
+    text = _clean_text(description or "")
+    if not text.strip():
+        return []
+    try:
+        vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 3))
+        scores = vectorizer.fit_transform([text]).toarray().flatten()
+    except ValueError as e: # Empty or stopword-only description
+        logger.warning(f"TF-IDF Vectorizer failed: {e}. Likely due to empty/stopword-only JD.")
+        return []
+    terms = sorted(zip(vectorizer.get_feature_names_out(), scores), key=lambda x: x[1], reverse=True)
+    terms = [(term, round(float(score), 4)) for term, score in terms if score > KEY_TERM_MIN_SCORE]
+    return terms[:limit or settings.JOB_ANALYSIS_MAX_KEY_TERMS]
+
+
+def _summarize(description: str) -> Optional[Dict[str, Any]]:
+    """One LLM call for the summary and requirements. None if the LLM is unavailable or answers badly."""
+    compaction = jd_compaction.compact_description(description)
+    response = resume_tailoring._call_llm(
+        _ANALYSIS_SYSTEM_PROMPT, f"Job Description:\n---\n{compaction.text}\n---\n\nJSON Output:",
+        temperature=0.2, max_tokens=600, call_site="job_analysis",
+    )
+    compaction.record("job_analysis")
+    if not response:
+        return None
+    try:
+        data = json.loads(response.strip().removeprefix("```json").removesuffix("```").strip())
+        requirements = [str(r).strip() for r in data.get("requirements") or [] if str(r).strip()]
+        return {"summary": (data.get("summary") or "").strip() or None, "requirements": requirements}
+    except (json.JSONDecodeError, AttributeError) as e:
+        logger.warning(f"Could not parse job analysis response: {e}")
+        return None
+
+
+def compute_key_terms_analysis(description: str) -> Dict[str, Any]:
+    """A new analysis with the description's key terms; the LLM summary is still pending."""
+    with metrics.timed("job_analysis.compute_seconds"):
+        key_terms = extract_key_terms(description)
+    return {
+        "version": ANALYSIS_VERSION,
+        "description_hash": description_hash(description),
+        "key_terms": [[term, score] for term, score in key_terms],
+        "summarized": False,
+        "summary": None,
+        "requirements": [],
+    }
+
+
+def is_current(analysis: Optional[Dict[str, Any]], description: str) -> bool:
+    return bool(analysis) and analysis.get("version") == ANALYSIS_VERSION \
+        and analysis.get("description_hash") == description_hash(description)
+
+
+def get_or_compute(db: Session, job: Job, with_summary: bool = True) -> Optional[Dict[str, Any]]:
+    """The job's stored analysis, computing and storing it on first use. None if the job has no description.
+
+    With with_summary=False only the key terms are guaranteed; no LLM call is made.
+    """
+    if job.canonical_job_id:
+        canonical = db.get(Job, job.canonical_job_id)
+        if canonical is not None and canonical.description:
+            job = canonical
+    if not job.description:
+        return None
+    analysis = job.analysis if is_current(job.analysis, job.description) else None
+    if analysis is not None and (analysis.get("summarized") or not with_summary):
+        metrics.incr("job_analysis.lookups", outcome="hit")
+        return analysis
+
+    metrics.incr("job_analysis.lookups", outcome="miss" if analysis is None else "summary_pending")
+    changed = analysis is None
+    if analysis is None:
+        analysis = compute_key_terms_analysis(job.description)
+    if with_summary:
+        summary = _summarize(job.description)
+        if summary:
+            analysis = {**analysis, **summary, "summarized": True}
+            changed = True
+        else:
+            logger.warning(f"Description summary for job {job.id} unavailable (LLM failed); storing key terms only.")
+    if changed:
+        job.analysis = analysis
+        try:
+            db.commit()
+            logger.info(f"Stored description analysis for job {job.id} (summarized: {analysis['summarized']}).")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Could not store description analysis for job {job.id}: {e}", exc_info=True)
+    return analysis
+
+
+def key_terms(analysis: Dict[str, Any]) -> Dict[str, float]:
+    return {term: score for term, score in analysis.get("key_terms") or []}
+
+
+def prompt_context(analysis: Dict[str, Any], max_terms: int = 25) -> Optional[str]:
+    """Compact job context for tailoring prompts, in place of the full description. None if incomplete."""
+    if not analysis or not analysis.get("summary"):
+        return None
+    lines = [f"Role Summary: {analysis['summary']}"]
+    if analysis.get("requirements"):
+        lines.append("Key Requirements:")
+        lines.extend(f"- {requirement}" for requirement in analysis["requirements"])
+    terms = [term for term, _ in (analysis.get("key_terms") or [])[:max_terms]]
+    if terms:
+        lines.append(f"Key Terms: {', '.join(terms)}")
+    return "\n".join(lines)
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import redis
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# --- LLM Response Cache ---
+# Re-uploading a resume or re-tailoring it for the same job description sends the exact
+# same prompts again. Responses are cached in Redis under a hash of everything that
+# determines them: (deployment, system prompt, user prompt, temperature, max_tokens, and
+# the response format for structured-output calls).
+#
+# Entries expire after LLM_CACHE_TTL_SECONDS. A sorted set indexes keys by last use so the
+# cache can be capped at LLM_CACHE_MAX_ENTRIES, evicting least-recently-used entries.
+# Call sites opt out with use_cache=False (see resume_tailoring._call_llm). Without Redis
+# every lookup is a miss and nothing is stored.
+
+KEY_PREFIX = "llm:resp:"
+INDEX_KEY = "llm:resp:index"
+
+# KEYS: entry, index | ARGV: value, ttl, now, max_entries
+_SET_LUA = """
+redis.call('SET', KEYS[1], ARGV[1], 'EX', tonumber(ARGV[2]))
+redis.call('ZADD', KEYS[2], tonumber(ARGV[3]), KEYS[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', tonumber(ARGV[3]) - tonumber(ARGV[2]))
+local excess = redis.call('ZCARD', KEYS[2]) - tonumber(ARGV[4])
+if excess > 0 then
+    local evicted = redis.call('ZRANGE', KEYS[2], 0, excess - 1)
+    redis.call('ZREMRANGEBYRANK', KEYS[2], 0, excess - 1)
+    redis.call('DEL', unpack(evicted))
+end
+return excess
+"""
+
+
+def cache_key(
+    deployment: Optional[str], system_prompt: str, user_prompt: str, temperature: float, max_tokens: int,
+    response_format: Optional[Dict[str, Any]] = None
+) -> str:
+    parts = [deployment, system_prompt, user_prompt, float(temperature), int(max_tokens)]
+    if response_format is not None: # Keeps keys of plain-text calls unchanged
+        parts.append(response_format)
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+    return KEY_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def lookup(key: str, call_site: str = "default") -> Optional[str]:
+    """The cached response for `key`, or None. Refreshes the entry's LRU position on a hit."""
+    client = get_redis() if settings.LLM_CACHE_ENABLED else None
+    value = None
+    if client is not None:
+        try:
+            pipe = client.pipeline()
+            pipe.get(key)
+            pipe.zadd(INDEX_KEY, {key: time.time()}, xx=True) # Only touches keys still indexed
+            value = pipe.execute()[0]
+        except redis.RedisError as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+    metrics.incr("llm_cache.lookups", outcome="hit" if value is not None else "miss", call_site=call_site)
+    if value is None:
+        return None
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def store(key: str, value: str) -> None:
+    """Stores a response (empty responses are never cached)."""
+    if not value or not settings.LLM_CACHE_ENABLED:
+        return
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        evicted = client.eval(
+            _SET_LUA, 2, key, INDEX_KEY, value, settings.LLM_CACHE_TTL_SECONDS, time.time(), settings.LLM_CACHE_MAX_ENTRIES
+        )
+    except redis.RedisError as e:
+        logger.warning(f"LLM cache store failed: {e}")
+        return
+    if evicted and int(evicted) > 0:
+        metrics.incr("llm_cache.evictions", amount=int(evicted))
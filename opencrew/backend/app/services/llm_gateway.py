@@ -0,0 +1,309 @@
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, List, Optional
+
+import httpx
+import openai
+
+from app.core import metrics
+from app.core.config import settings
+from .rate_limiter import HostRateLimiter, backoff_delay, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# --- LLM Gateway ---
+# Every chat-completion request goes through this module rather than a client of its own:
+#
+#   * Clients: one OpenAI SDK client per provider, on a pooled httpx client (keep-alive
+#     connections are reused across calls). Async clients are bound to the event loop that
+#     created their connection pool, so each loop (the API's, a worker's persistent loop)
+#     gets its own set.
+#   * Concurrency: at most LLM_MAX_CONCURRENCY requests in flight overall and
+#     LLM_MODEL_CONCURRENCY per model, per process for threads and per event loop for
+#     coroutines.
+#   * Rate limiting: a token bucket per model shared by all workers through Redis
+#     (LLM_RATE_PER_MINUTE). The provider's x-ratelimit-remaining-* headers feed back into
+#     it: when the provider reports an exhausted quota, the model is paused until the
+#     reported reset, and a 429 pauses it for Retry-After.
+#   * Retries: throttling, 5xx and connection errors are retried up to LLM_MAX_RETRIES
+#     times with full-jitter backoff. The SDK's own retries are disabled.
+#
+# With LLM_BASE_URL set, every provider is served by that OpenAI-compatible endpoint instead
+# (e.g. scripts/llm_standin.py, to run and benchmark the LLM paths without network access).
+#
+# Callers keep their own handling of the errors that remain after the retries.
+
+AZURE = "azure"
+OPENAI = "openai"
+
+STANDIN_MODEL = "gpt-4o" # Model name sent to LLM_BASE_URL when no deployment is configured
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+_DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+llm_limiter = HostRateLimiter(
+    rate_per_second=settings.LLM_RATE_PER_MINUTE / 60.0,
+    burst=settings.LLM_MODEL_CONCURRENCY,
+    key_prefix="llm:rate",
+)
+
+
+def is_configured(provider: str = AZURE) -> bool:
+    if settings.LLM_BASE_URL:
+        return True
+    if provider == AZURE:
+        return bool(settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT and settings.AZURE_OPENAI_DEPLOYMENT_NAME)
+    return bool(os.getenv("OPENAI_API_KEY"))
+
+
+def default_model(provider: str = AZURE) -> Optional[str]:
+    if provider != AZURE:
+        return None
+    return settings.AZURE_OPENAI_DEPLOYMENT_NAME or (STANDIN_MODEL if settings.LLM_BASE_URL else None)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=settings.LLM_MAX_CONNECTIONS, max_keepalive_connections=settings.LLM_MAX_CONNECTIONS)
+
+
+def _sdk_client(provider: str, http_client, async_client: bool):
+    kwargs: Dict[str, Any] = {"http_client": http_client, "max_retries": 0, "timeout": settings.LLM_TIMEOUT_SECONDS}
+    if settings.LLM_BASE_URL:
+        cls = openai.AsyncOpenAI if async_client else openai.OpenAI
+        kwargs.update(base_url=settings.LLM_BASE_URL, api_key=os.getenv("OPENAI_API_KEY") or "stand-in")
+    elif provider == AZURE:
+        cls = openai.AsyncAzureOpenAI if async_client else openai.AzureOpenAI
+        kwargs.update(
+            api_key=settings.AZURE_OPENAI_API_KEY,
+            api_version=settings.AZURE_OPENAI_API_VERSION,
+            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+        )
+    else: # OPENAI_API_KEY is read from the environment
+        cls = openai.AsyncOpenAI if async_client else openai.OpenAI
+    return cls(**kwargs)
+
+
+# --- Sync clients and slots (shared by all threads of the process) ---
+
+_lock = threading.Lock()
+_http: Optional[httpx.Client] = None
+_clients: Dict[str, Any] = {}
+_global_slots = threading.BoundedSemaphore(settings.LLM_MAX_CONCURRENCY)
+_model_slots: Dict[str, threading.BoundedSemaphore] = {}
+
+
+def http_client() -> httpx.Client:
+    """The process's pooled httpx client for LLM requests."""
+    global _http
+    with _lock:
+        if _http is None:
+            _http = httpx.Client(limits=_limits(), timeout=settings.LLM_TIMEOUT_SECONDS)
+        return _http
+
+
+def get_client(provider: str = AZURE):
+    """The process's SDK client for a provider."""
+    http = http_client()
+    with _lock:
+        client = _clients.get(provider)
+        if client is None:
+            client = _clients[provider] = _sdk_client(provider, http, async_client=False)
+        return client
+
+
+@contextmanager
+def _slot(model: str):
+    with _lock:
+        model_slots = _model_slots.setdefault(model, threading.BoundedSemaphore(settings.LLM_MODEL_CONCURRENCY))
+    with _global_slots, model_slots:
+        yield
+
+
+# --- Async clients and slots (one set per event loop) ---
+
+class _LoopState:
+    def __init__(self):
+        self.http = httpx.AsyncClient(limits=_limits(), timeout=settings.LLM_TIMEOUT_SECONDS)
+        self.clients: Dict[str, Any] = {}
+        self.global_slots = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        self.model_slots: Dict[str, asyncio.Semaphore] = {}
+
+
+_loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+
+
+def _loop_state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+    state = _loop_states.get(loop)
+    if state is None:
+        state = _loop_states[loop] = _LoopState()
+    return state
+
+
+def async_http_client() -> httpx.AsyncClient:
+    """The running event loop's pooled httpx client for LLM requests."""
+    return _loop_state().http
+
+
+def get_async_client(provider: str = AZURE):
+    """The running event loop's async SDK client for a provider."""
+    state = _loop_state()
+    client = state.clients.get(provider)
+    if client is None:
+        client = state.clients[provider] = _sdk_client(provider, state.http, async_client=True)
+    return client
+
+
+@asynccontextmanager
+async def _async_slot(model: str):
+    state = _loop_state()
+    model_slots = state.model_slots.setdefault(model, asyncio.Semaphore(settings.LLM_MODEL_CONCURRENCY))
+    async with state.global_slots, model_slots:
+        yield
+
+
+# --- Provider feedback and retries ---
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Parses an x-ratelimit-reset-* header ("20ms", "1.5s", "6m0s") into seconds."""
+    if not value:
+        return None
+    parts = _DURATION_PART_RE.findall(value)
+    if not parts:
+        return parse_retry_after(value)
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def observe_headers(model: str, headers) -> Optional[float]:
+    """Pauses the model when the provider reports an exhausted request or token quota. Returns the pause."""
+    for kind in ("requests", "tokens"):
+        remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+        try:
+            exhausted = remaining is not None and int(remaining) <= 0
+        except (TypeError, ValueError):
+            continue
+        if exhausted:
+            reset = parse_reset(headers.get(f"x-ratelimit-reset-{kind}"))
+            metrics.incr("llm_gateway.quota_exhausted", model=model, kind=kind)
+            return llm_limiter.penalize(model, retry_after=reset if reset is not None else 1.0)
+    return None
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    retry_after_ms = response.headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    return parse_retry_after(response.headers.get("retry-after"))
+
+
+def _retry_delay(model: str, error: Exception, attempt: int, call_site: str) -> Optional[float]:
+    """Seconds to wait before retrying after `error`, or None if it should be raised."""
+    if not isinstance(error, RETRYABLE_ERRORS) or attempt >= settings.LLM_MAX_RETRIES:
+        metrics.incr("llm_gateway.requests", model=model, call_site=call_site, outcome="error")
+        return None
+    metrics.incr("llm_gateway.retries", model=model, reason=type(error).__name__)
+    logger.warning(f"LLM request to {model} failed ({type(error).__name__}); retry {attempt + 1}/{settings.LLM_MAX_RETRIES}")
+    if isinstance(error, openai.RateLimitError): # The next acquire() waits out the pause
+        llm_limiter.penalize(model, retry_after=_retry_after(error), attempt=attempt)
+        return 0.0
+    return backoff_delay(attempt)
+
+
+# --- Chat completions ---
+
+def chat_completion(messages: List[Dict[str, Any]], *, provider: str = AZURE, model: Optional[str] = None,
+                    call_site: str = "default", **params):
+    """Rate-limited chat completion with retries. Returns the SDK's ChatCompletion; raises openai errors."""
+    model = model or default_model(provider)
+    client = get_client(provider)
+    attempt = 0
+    while True:
+        llm_limiter.acquire(model)
+        try:
+            with _slot(model), metrics.timed("llm_gateway.request_seconds", model=model):
+                raw = client.chat.completions.with_raw_response.create(model=model, messages=messages, **params)
+        except Exception as e:
+            delay = _retry_delay(model, e, attempt, call_site)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            attempt += 1
+            continue
+        observe_headers(model, raw.headers)
+        metrics.incr("llm_gateway.requests", model=model, call_site=call_site, outcome="ok")
+        return raw.parse()
+
+
+async def chat_completion_async(messages: List[Dict[str, Any]], *, provider: str = AZURE, model: Optional[str] = None,
+                                call_site: str = "default", **params):
+    """Async counterpart of chat_completion."""
+    model = model or default_model(provider)
+    client = get_async_client(provider)
+    attempt = 0
+    while True:
+        await llm_limiter.acquire_async(model)
+        try:
+            async with _async_slot(model):
+                with metrics.timed("llm_gateway.request_seconds", model=model):
+                    raw = await client.chat.completions.with_raw_response.create(model=model, messages=messages, **params)
+        except Exception as e:
+            delay = _retry_delay(model, e, attempt, call_site)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        await asyncio.to_thread(observe_headers, model, raw.headers)
+        metrics.incr("llm_gateway.requests", model=model, call_site=call_site, outcome="ok")
+        return raw.parse()
+
+
+# --- LangChain models (browser-use agent) ---
+
+def chat_model(model: str, *, provider: str = OPENAI, **kwargs):
+    """A LangChain chat model on the gateway's connection pools and per-model rate limit.
+
+    LangChain drives its own requests, so retries are left to the SDK (jittered, honouring
+    Retry-After) and the concurrency slots don't apply; callers bound those themselves
+    (e.g. the browser pool bounds concurrent agents).
+    """
+    from langchain_core.rate_limiters import BaseRateLimiter
+    from langchain_openai import AzureChatOpenAI, ChatOpenAI
+
+    class GatewayRateLimiter(BaseRateLimiter):
+        def acquire(self, *, blocking: bool = True) -> bool:
+            if not blocking:
+                return llm_limiter.try_reserve(model) == 0
+            llm_limiter.acquire(model)
+            return True
+
+        async def aacquire(self, *, blocking: bool = True) -> bool:
+            if not blocking:
+                return await asyncio.to_thread(llm_limiter.try_reserve, model) == 0
+            await llm_limiter.acquire_async(model)
+            return True
+
+    common = dict(
+        http_client=http_client(), http_async_client=async_http_client(), max_retries=settings.LLM_MAX_RETRIES,
+        timeout=settings.LLM_TIMEOUT_SECONDS, rate_limiter=GatewayRateLimiter(), **kwargs,
+    )
+    if settings.LLM_BASE_URL:
+        return ChatOpenAI(model=model, base_url=settings.LLM_BASE_URL, api_key=os.getenv("OPENAI_API_KEY") or "stand-in", **common)
+    if provider == AZURE:
+        return AzureChatOpenAI(
+            azure_deployment=model, api_key=settings.AZURE_OPENAI_API_KEY,
+            api_version=settings.AZURE_OPENAI_API_VERSION, azure_endpoint=settings.AZURE_OPENAI_ENDPOINT, **common,
+        )
+    return ChatOpenAI(model=model, **common)
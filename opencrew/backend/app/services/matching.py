@@ -137,7 +137,8 @@ def search_similar_jobs(db: Session, resume_embedding: List[float], user_id: int
 
         # Fetch the corresponding Job objects from the database
         # Note: This might fetch jobs the user has already applied to. Filtering happens in the calling task.
-        matched_jobs_from_db = crud.job.get_jobs_by_ids(db, job_ids=matched_job_ids)
+        # Only canonical jobs are returned, so cross-posted duplicates never surface as separate matches.
+        matched_jobs_from_db = crud.job.get_jobs_by_ids(db, job_ids=matched_job_ids, canonical_only=True)
 
         # Optional: Sort the returned jobs based on Qdrant score (requires fetching scores)
         # matched_jobs_from_db.sort(key=lambda job: scores.get(job.id, 0.0), reverse=True)
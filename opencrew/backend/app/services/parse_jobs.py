@@ -0,0 +1,116 @@
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import redis
+from celery.result import AsyncResult
+
+from app.core.config import settings
+from app.db.redis import get_redis
+from app.workers.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+# --- Parse-and-Tailor Jobs ---
+# Resume parsing and tailoring runs in the Celery task tasks.parse_and_tailor_resume, which
+# reports progress with update_state(state="PROGRESS", meta={"stage", "sections"}). This
+# module is the API side: who owns a job, its current status, and an SSE stream of it.
+#
+# Ownership is a Redis key written before the task is published, since Celery reports
+# PENDING for both "queued" and "unknown id" and has no notion of users.
+
+OWNER_KEY = "parse_job:{job_id}:owner"
+TERMINAL_STATES = {"SUCCESS", "FAILURE", "REVOKED"}
+
+
+def register(job_id: str, user_id: int) -> bool:
+    """Records the job's owner. Returns False if Redis is unavailable."""
+    client = get_redis()
+    if client is None:
+        return False
+    try:
+        client.set(OWNER_KEY.format(job_id=job_id), user_id, ex=settings.PARSE_JOB_TTL_SECONDS)
+    except redis.RedisError as e:
+        logger.warning(f"Could not register parse job {job_id}: {e}")
+        return False
+    return True
+
+
+def is_owner(job_id: str, user_id: int) -> bool:
+    client = get_redis()
+    if client is None:
+        return False
+    try:
+        owner = client.get(OWNER_KEY.format(job_id=job_id))
+    except redis.RedisError as e:
+        logger.warning(f"Could not read owner of parse job {job_id}: {e}")
+        return False
+    return owner is not None and int(owner) == user_id
+
+
+def get_status(job_id: str) -> Dict[str, Any]:
+    """Current state of a job: {"job_id", "state", "stage", "sections", "result", "error"}."""
+    result = AsyncResult(job_id, app=celery_app)
+    state = result.state
+    status = {"job_id": job_id, "state": state, "stage": "queued", "sections": {}, "result": None, "error": None}
+    info = result.info
+    if state == "PROGRESS" and isinstance(info, dict):
+        status["stage"] = info.get("stage", "parsing")
+        status["sections"] = info.get("sections", {})
+    elif state == "STARTED":
+        status["stage"] = "parsing"
+    elif state == "SUCCESS":
+        status["stage"] = "done"
+        status["result"] = info
+    elif state in TERMINAL_STATES:
+        status["stage"] = "failed"
+        status["error"] = str(info) if info else state.lower()
+    return status
+
+
+async def wait_for_result(job_id: str, timeout: float) -> Dict[str, Any]:
+    """Polls the result backend without blocking the event loop until the job finishes.
+
+    Raises TimeoutError if it hasn't finished within `timeout` seconds.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        status = await asyncio.to_thread(get_status, job_id)
+        if status["state"] in TERMINAL_STATES:
+            return status
+        if loop.time() >= deadline:
+            raise TimeoutError(f"Parse job {job_id} did not finish within {timeout:.0f}s")
+        await asyncio.sleep(settings.PARSE_JOB_POLL_SECONDS)
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_events(job_id: str) -> AsyncIterator[str]:
+    """Server-sent events for a job: `stage` on stage changes, `section` for each newly
+    finished section, then one `done` (with the result) or `error`. Ends after that or
+    after PARSE_JOB_STREAM_TIMEOUT seconds."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.PARSE_JOB_STREAM_TIMEOUT
+    last_stage = None
+    sent_sections = set()
+    while loop.time() < deadline:
+        status = await asyncio.to_thread(get_status, job_id)
+        if status["stage"] != last_stage:
+            last_stage = status["stage"]
+            yield _sse("stage", {"job_id": job_id, "stage": last_stage})
+        for name, value in status["sections"].items():
+            if name not in sent_sections:
+                sent_sections.add(name)
+                yield _sse("section", {"name": name, "value": value})
+        if status["state"] == "SUCCESS":
+            yield _sse("done", status["result"])
+            return
+        if status["state"] in TERMINAL_STATES:
+            yield _sse("error", {"detail": status["error"]})
+            return
+        await asyncio.sleep(settings.PARSE_JOB_POLL_SECONDS)
+    yield _sse("error", {"detail": "Timed out waiting for the job; poll its status instead."})
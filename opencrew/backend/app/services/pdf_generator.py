@@ -73,6 +73,9 @@ from ..schemas.resume import StructuredResume, BasicInfo, EducationItem, Experie
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever layout, styles or fonts change so cached renders (pdf_render_cache.py) are not reused
+TEMPLATE_VERSION = "1"
+
 class StructuredResumePdfGenerator:
     """
     Generates a resume PDF from a StructuredResume Pydantic object using ReportLab.
@@ -398,10 +401,26 @@ class StructuredResumePdfGenerator:
         if not resume_data or not resume_data.basic:
             raise ValueError("Basic resume information is missing.")
 
+        name = resume_data.basic.name or "Unnamed Resume"
+        pdf_filename = f"{name.replace(' ', '_')}_resume_{Path(tempfile.NamedTemporaryFile().name).stem}.pdf"
+        return self.build_resume_pdf(resume_data, os.path.join(output_dir, pdf_filename))
+
+    def build_resume_pdf(self, resume_data: StructuredResume, output_path: str) -> str:
+        """
+        Render a StructuredResume to an exact file path (used by the render cache).
+
+        Args:
+            resume_data (StructuredResume): The Pydantic object containing resume information.
+            output_path (str): Where the PDF is written.
+
+        Returns:
+            str: output_path.
+        """
+        if not resume_data or not resume_data.basic:
+            raise ValueError("Basic resume information is missing.")
+
         basic_info = resume_data.basic
         name = basic_info.name or "Unnamed Resume"
-        pdf_filename = f"{name.replace(' ', '_')}_resume_{Path(tempfile.NamedTemporaryFile().name).stem}.pdf"
-        output_path = os.path.join(output_dir, pdf_filename)
 
         doc = SimpleDocTemplate(output_path, pagesize=A4, leftMargin=inch, rightMargin=inch, topMargin=inch, bottomMargin=inch)
 
@@ -483,6 +502,15 @@ class StructuredResumePdfGenerator:
              logger.error(f"Failed to build PDF document: {e}", exc_info=True)
              raise # Re-raise the exception after logging
 
+_generator: Optional[StructuredResumePdfGenerator] = None
+
+def get_pdf_generator() -> StructuredResumePdfGenerator:
+    """Returns a shared generator so fonts are registered once per process, not per render."""
+    global _generator
+    if _generator is None:
+        _generator = StructuredResumePdfGenerator()
+    return _generator
+
 # Example Usage (for testing if run directly)
 if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO)
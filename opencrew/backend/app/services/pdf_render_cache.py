@@ -0,0 +1,110 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from botocore.exceptions import ClientError
+from celery.signals import worker_process_shutdown
+
+from app.core import metrics
+from app.core.config import settings
+from . import s3
+from .file_cache import LocalFileCache
+from .pdf_generator import TEMPLATE_VERSION, get_pdf_generator
+from ..schemas.resume import StructuredResume
+
+logger = logging.getLogger(__name__)
+
+# --- Tailored-PDF Render Cache ---
+# The same structured resume is rendered for many applications. Renders are keyed by a
+# hash of the canonical JSON of the structured data plus pdf_generator.TEMPLATE_VERSION,
+# and looked up in two tiers:
+#
+#   1. a per-process LocalFileCache (pinned while an agent uploads the file, LRU-evicted)
+#   2. S3 under PDF_RENDER_S3_PREFIX, shared by every worker
+#
+# Only a miss in both tiers renders, and the result is written back to S3. Hit rates are
+# in metrics: file_cache.hits{cache=pdf_renders}, pdf_render_cache.s3_hits and
+# pdf_render_cache.renders.
+
+
+def render_key(resume_data: StructuredResume) -> str:
+    """Stable key for a render: identical data and template always map to the same key."""
+    canonical = json.dumps(resume_data.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{TEMPLATE_VERSION}\0{canonical}".encode()).hexdigest()
+
+
+def _s3_key(key: str) -> str:
+    return f"{settings.PDF_RENDER_S3_PREFIX}/{key}.pdf"
+
+
+def _fetch_or_render(resume_data: StructuredResume, key: str, tmp_name: str) -> None:
+    """Fills tmp_name from S3 if another worker already rendered this key, otherwise renders and uploads."""
+    if s3.is_configured():
+        try:
+            s3.get_s3_client().download_file(settings.S3_BUCKET_NAME, _s3_key(key), tmp_name)
+            metrics.incr("pdf_render_cache.s3_hits")
+            return
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey"):
+                logger.warning(f"Render cache lookup failed for {key}, rendering instead: {e}")
+
+    with metrics.timed("pdf_render_cache.render_seconds"):
+        get_pdf_generator().build_resume_pdf(resume_data, tmp_name)
+    metrics.incr("pdf_render_cache.renders")
+
+    if s3.is_configured():
+        try:
+            s3.get_s3_client().upload_file(
+                Filename=tmp_name,
+                Bucket=settings.S3_BUCKET_NAME,
+                Key=_s3_key(key),
+                ExtraArgs={'ContentType': 'application/pdf'}
+            )
+        except Exception as e:
+            logger.warning(f"Failed to store render {key} in S3 (served locally only): {e}")
+
+
+def acquire_tailored_pdf(resume_data: StructuredResume) -> Path:
+    """Returns a local path to the rendered PDF for this structured resume. Pair with release_tailored_pdf()."""
+    key = render_key(resume_data)
+    return get_render_cache().acquire_entry(key, ".pdf", lambda tmp_name: _fetch_or_render(resume_data, key, tmp_name))
+
+
+def release_tailored_pdf(path: Optional[Path]) -> None:
+    get_render_cache().release(path)
+
+
+def prerender(resume_data: StructuredResume) -> str:
+    """Renders ahead of time (into the local cache and S3) and returns the render key."""
+    path = acquire_tailored_pdf(resume_data)
+    release_tailored_pdf(path)
+    return render_key(resume_data)
+
+
+_cache: Optional[LocalFileCache] = None
+_cache_pid: Optional[int] = None
+_cache_lock = threading.Lock()
+
+def get_render_cache() -> LocalFileCache:
+    """Returns this worker process's local render cache (created on first use)."""
+    global _cache, _cache_pid
+    with _cache_lock:
+        if _cache is None or _cache_pid != os.getpid():
+            _cache = LocalFileCache(
+                root=Path(settings.PDF_RENDER_CACHE_DIR) / str(os.getpid()),
+                max_bytes=settings.PDF_RENDER_CACHE_MAX_MB * 1024 * 1024,
+                name="pdf_renders",
+            )
+            _cache_pid = os.getpid()
+        return _cache
+
+
+@worker_process_shutdown.connect
+def _on_worker_process_shutdown(**kwargs):
+    if _cache is not None and _cache_pid == os.getpid():
+        _cache.clear()
+        logger.info("Removed local PDF render cache.")
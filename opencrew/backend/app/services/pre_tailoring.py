@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from typing import Dict, List
+
+from pydantic import ValidationError
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.application import Application, ApplicationStatus
+from app.schemas.resume import StructuredResume
+from . import job_analysis, pdf_render_cache, resume_tailoring
+from .rate_limiter import HostRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# --- Pre-Tailoring for Auto-Apply ---
+# Queued applications (PENDING_TRIGGER) get a resume tailored to their job *before* they are
+# handed to the auto-apply scheduler, so the LLM latency never sits on the apply path:
+#
+#   schedule_auto_apply -> pretailor_applications task (batches) -> scheduler -> apply task
+#
+# Each application's resume structured_data is tailored against the job's shared analysis
+# (job_analysis.get_or_compute, once per job) and stored in Application.tailored_data; its
+# PDF is rendered into the shared render cache, where the apply task finds it by the data's
+# render key. The apply task uses tailored_data when present and the resume's own
+# structured_data otherwise.
+#
+# Tailoring starts are paced cluster-wide at PRETAILOR_RATE_PER_MINUTE; each task tailors
+# at most PRETAILOR_CONCURRENCY applications at once. Sections shared between applications
+# (same resume, same job context) come from the tailoring memo. A failure only means the
+# application is applied with the untailored resume.
+
+LIMITER_KEY = "tailoring"
+
+tailoring_limiter = HostRateLimiter(
+    rate_per_second=settings.PRETAILOR_RATE_PER_MINUTE / 60.0,
+    burst=settings.PRETAILOR_CONCURRENCY,
+    key_prefix="pretailor:rate",
+)
+
+
+def is_available() -> bool:
+    return settings.PRETAILOR_ENABLED and resume_tailoring._llm_configured()
+
+
+async def pretailor_application_async(application_id: int) -> str:
+    """Tailors and renders one application's resume. Returns the outcome: tailored, skipped or error."""
+    db = SessionLocal()
+    try:
+        application = db.query(Application).filter(Application.id == application_id).first()
+        if application is None or application.status != ApplicationStatus.PENDING_TRIGGER:
+            return "skipped"
+        if application.tailored_data: # Redelivered task
+            return "skipped"
+        resume, job = application.resume, application.job
+        if resume is None or job is None or not resume.structured_data or not job.description:
+            logger.info(f"Application {application_id} has no structured resume or job description; not pre-tailoring.")
+            return "skipped"
+        try:
+            structured_resume = StructuredResume(**resume.structured_data)
+        except ValidationError as e:
+            logger.error(f"Invalid structured_data on resume {resume.id}; not pre-tailoring application {application_id}: {e}")
+            return "error"
+
+        # Once per job, shared with every other user applying to it
+        analysis = await asyncio.to_thread(job_analysis.get_or_compute, db, job)
+        job_context = job_analysis.prompt_context(analysis) or job.description
+
+        await tailoring_limiter.acquire_async(LIMITER_KEY)
+        with metrics.timed("pre_tailoring.tailor_seconds"):
+            tailored = await resume_tailoring.tailor_content_async(structured_resume, job_context)
+
+        try:
+            await asyncio.to_thread(pdf_render_cache.prerender, tailored)
+        except Exception as e: # The apply task renders on demand instead
+            logger.warning(f"Could not pre-render the tailored PDF for application {application_id}: {e}")
+        application.tailored_data = tailored.model_dump()
+        db.commit()
+        logger.info(f"Pre-tailored resume {resume.id} for application {application_id} (job {job.id}).")
+        return "tailored"
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Pre-tailoring failed for application {application_id}: {e}", exc_info=True)
+        return "error"
+    finally:
+        db.close()
+
+
+async def pretailor_many_async(application_ids: List[int]) -> Dict[str, int]:
+    """Pre-tailors several applications concurrently (at most PRETAILOR_CONCURRENCY at once)."""
+    semaphore = asyncio.Semaphore(settings.PRETAILOR_CONCURRENCY)
+
+    async def run(application_id: int) -> str:
+        async with semaphore:
+            return await pretailor_application_async(application_id)
+
+    outcomes = await asyncio.gather(*(run(app_id) for app_id in application_ids))
+    summary = {outcome: outcomes.count(outcome) for outcome in ("tailored", "skipped", "error")}
+    for outcome, count in summary.items():
+        if count:
+            metrics.incr("pre_tailoring.applications", amount=count, outcome=outcome)
+    logger.info(f"Pre-tailored batch of {len(application_ids)} applications: {summary}")
+    return summary
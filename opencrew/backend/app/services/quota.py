@@ -0,0 +1,181 @@
+import logging
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.application import Application, ApplicationStatus
+from app.models.quota import UserQuotaUsage
+from app.models.user import User, SubscriptionTier
+
+logger = logging.getLogger(__name__)
+
+# --- Materialized Monthly Auto-Apply Quota ---
+# Usage lives in one user_quota_usage row per (user, month) instead of being recounted
+# from the applications table on every match and every apply:
+#
+#   reserve  - lock the row, grant up to the remaining quota, bump `reserved`
+#   commit   - a reserved application was submitted: reserved -> used
+#   release  - a reserved application won't be submitted: give the slot back
+#
+# reserve() takes a row lock (SELECT ... FOR UPDATE), so concurrent workers can't both
+# hand out the last slot. commit/release are single atomic statements. reconcile()
+# rebuilds the counters from the applications table to repair drift from crashed workers.
+
+QUOTA_LIMITS = {
+    SubscriptionTier.FREE: 50,
+    SubscriptionTier.PRO: None, # Unlimited
+    SubscriptionTier.ELITE: None, # Unlimited
+}
+UNLIMITED_QUOTA = 99999 # Returned by remaining() for unlimited tiers
+IN_FLIGHT_STATUSES = (ApplicationStatus.PENDING_TRIGGER, ApplicationStatus.APPLYING)
+
+
+def current_period(now: Optional[datetime] = None) -> str:
+    """Billing period key for a timestamp (UTC calendar month), e.g. '2025-05'."""
+    now = now or datetime.utcnow()
+    return now.strftime("%Y-%m")
+
+
+def _period_bounds(period: str) -> Tuple[datetime, datetime]:
+    start = datetime.strptime(period, "%Y-%m")
+    end = datetime(start.year + 1, 1, 1) if start.month == 12 else datetime(start.year, start.month + 1, 1)
+    return start, end
+
+
+def monthly_limit(user: User) -> Optional[int]:
+    """The user's monthly auto-apply limit, or None if unlimited."""
+    return QUOTA_LIMITS.get(user.subscription_tier, 0)
+
+
+def _lock_usage_row(db: Session, user_id: int, period: str) -> UserQuotaUsage:
+    """Creates the usage row if needed and returns it locked for the rest of the transaction."""
+    db.execute(
+        pg_insert(UserQuotaUsage)
+        .values(user_id=user_id, period=period, reserved=0, used=0)
+        .on_conflict_do_nothing(index_elements=["user_id", "period"])
+    )
+    return (
+        db.query(UserQuotaUsage)
+        .filter(UserQuotaUsage.user_id == user_id, UserQuotaUsage.period == period)
+        .with_for_update()
+        .one()
+    )
+
+
+def remaining(db: Session, user: User) -> int:
+    """Remaining auto-applies this month (reserved slots count as spent). Single PK lookup."""
+    limit = monthly_limit(user)
+    if limit is None:
+        return UNLIMITED_QUOTA
+    usage = (
+        db.query(UserQuotaUsage)
+        .filter(UserQuotaUsage.user_id == user.id, UserQuotaUsage.period == current_period())
+        .first()
+    )
+    if not usage:
+        return limit
+    return max(0, limit - usage.used - usage.reserved)
+
+
+def reserve(db: Session, user: User, count: int = 1) -> int:
+    """Reserves up to `count` auto-applies for the user. Returns how many were granted (0..count).
+
+    Commits, so the row lock is held only for the duration of this call.
+    """
+    if count <= 0:
+        return 0
+    usage = _lock_usage_row(db, user.id, current_period())
+    limit = monthly_limit(user)
+    if limit is None:
+        granted = count
+    else:
+        granted = max(0, min(count, limit - usage.used - usage.reserved))
+    usage.reserved += granted
+    db.commit()
+    logger.info(f"Quota for user {user.id}: requested {count}, granted {granted} (used={usage.used}, reserved={usage.reserved}, limit={limit}).")
+    return granted
+
+
+def commit(db: Session, user_id: int, count: int = 1) -> None:
+    """Moves `count` reserved slots to used once applications are submitted."""
+    if count <= 0:
+        return
+    # Upsert: at a month boundary the reservation may belong to last month's row
+    stmt = pg_insert(UserQuotaUsage).values(user_id=user_id, period=current_period(), reserved=0, used=count)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "period"],
+        set_={
+            "used": UserQuotaUsage.used + count,
+            "reserved": func.greatest(UserQuotaUsage.reserved - count, 0),
+            "updated_at": func.now(),
+        },
+    ))
+    db.commit()
+
+
+def release(db: Session, user_id: int, count: int = 1) -> None:
+    """Returns `count` reserved slots to the pool when applications won't be submitted."""
+    if count <= 0:
+        return
+    db.query(UserQuotaUsage).filter(
+        UserQuotaUsage.user_id == user_id,
+        UserQuotaUsage.period == current_period(),
+    ).update(
+        {UserQuotaUsage.reserved: func.greatest(UserQuotaUsage.reserved - count, 0)},
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def reconcile(db: Session, period: Optional[str] = None) -> int:
+    """Rebuilds a period's counters from the applications table. Returns the number of rows written.
+
+    `used` = applications submitted (APPLIED, applied_at) within the period;
+    `reserved` = applications still in flight. Intended for a low-traffic beat schedule:
+    a reservation granted but not yet inserted as an application at that instant is
+    dropped from `reserved` until the next run.
+    """
+    period = period or current_period()
+    start, end = _period_bounds(period)
+
+    used_by_user = dict(
+        db.query(Application.user_id, func.count(Application.id))
+        .filter(
+            Application.status == ApplicationStatus.APPLIED,
+            Application.applied_at >= start,
+            Application.applied_at < end,
+        )
+        .group_by(Application.user_id)
+        .all()
+    )
+    reserved_by_user = {}
+    if period == current_period():
+        reserved_by_user = dict(
+            db.query(Application.user_id, func.count(Application.id))
+            .filter(Application.status.in_(IN_FLIGHT_STATUSES))
+            .group_by(Application.user_id)
+            .all()
+        )
+
+    # Users with a stale row but no applications any more go back to zero
+    existing_user_ids = {
+        user_id for (user_id,) in db.query(UserQuotaUsage.user_id).filter(UserQuotaUsage.period == period).all()
+    }
+    user_ids = existing_user_ids | set(used_by_user) | set(reserved_by_user)
+    for user_id in user_ids:
+        stmt = pg_insert(UserQuotaUsage).values(
+            user_id=user_id,
+            period=period,
+            used=used_by_user.get(user_id, 0),
+            reserved=reserved_by_user.get(user_id, 0),
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["user_id", "period"],
+            set_={"used": stmt.excluded.used, "reserved": stmt.excluded.reserved, "updated_at": func.now()},
+        ))
+    db.commit()
+    logger.info(f"Reconciled quota usage for {len(user_ids)} users in period {period}.")
+    return len(user_ids)
@@ -0,0 +1,316 @@
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+import redis
+import requests
+
+from ..core.config import settings
+from ..db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# --- Per-Host Adaptive Rate Limiter ---
+# One token bucket per host, shared by every scraper (requests, httpx/asyncio and Scrapy)
+# and by every Celery worker through Redis. Implemented as GCRA (the "virtual scheduling"
+# form of a token bucket): callers *reserve* a slot and are told how long to wait, which
+# lets sync code sleep, async code await and Scrapy defer without holding a lock.
+#
+# Throttling responses (429/503) do two things for a host:
+#   * honour Retry-After by blocking the host until that time, and
+#   * double the host's pacing interval (up to MAX_SLOWDOWN) for SLOWDOWN_TTL_SECONDS.
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+THROTTLE_STATUS_CODES = {429, 503}
+MAX_SLOWDOWN = 8 # Interval multiplier cap after repeated throttling
+SLOWDOWN_TTL_SECONDS = 600 # Slowdown decays back to the configured rate after this long without throttling
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_CAP_SECONDS = 60.0
+
+# KEYS: tat, blocked_until, slowdown | ARGV: interval, burst
+# Returns the number of seconds the caller must wait before using its reserved slot.
+_RESERVE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local slowdown = tonumber(redis.call('GET', KEYS[3]) or '1')
+local interval = tonumber(ARGV[1]) * slowdown
+local burst = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or '0')
+local blocked = tonumber(redis.call('GET', KEYS[2]) or '0')
+local new_tat = math.max(tat, now) + interval
+local delay = math.max(0, new_tat - burst * interval - now, blocked - now)
+if blocked > now then new_tat = math.max(new_tat, blocked + interval) end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000) + 1000)
+return tostring(delay)
+"""
+
+# Same as _RESERVE_LUA, but only takes the slot if it is available now (nothing is consumed
+# when the caller would have to wait). Returns the wait in seconds, 0 meaning "granted".
+_TRY_RESERVE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local slowdown = tonumber(redis.call('GET', KEYS[3]) or '1')
+local interval = tonumber(ARGV[1]) * slowdown
+local burst = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or '0')
+local blocked = tonumber(redis.call('GET', KEYS[2]) or '0')
+local new_tat = math.max(tat, now) + interval
+local delay = math.max(0, new_tat - burst * interval - now, blocked - now)
+if delay > 0 then return tostring(delay) end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000) + 1000)
+return '0'
+"""
+
+# KEYS: blocked_until, slowdown | ARGV: block_seconds, max_slowdown, slowdown_ttl
+_PENALIZE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local until_ts = now + tonumber(ARGV[1])
+local blocked = tonumber(redis.call('GET', KEYS[1]) or '0')
+if until_ts > blocked then
+    redis.call('SET', KEYS[1], tostring(until_ts), 'PX', math.ceil(tonumber(ARGV[1]) * 1000) + 1000)
+end
+local slowdown = math.min(tonumber(redis.call('GET', KEYS[2]) or '1') * 2, tonumber(ARGV[2]))
+redis.call('SET', KEYS[2], tostring(slowdown), 'EX', tonumber(ARGV[3]))
+return tostring(slowdown)
+"""
+
+
+def host_of(url_or_host: str) -> str:
+    """Normalizes a URL or bare host name to the lowercase host used as the bucket key."""
+    if "://" in url_or_host:
+        return (urlparse(url_or_host).hostname or url_or_host).lower()
+    return url_or_host.lower()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header (delta-seconds or HTTP-date) into seconds from now."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        logger.debug(f"Unparseable Retry-After header: {value!r}")
+        return None
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE_SECONDS, cap: float = BACKOFF_CAP_SECONDS) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class HostRateLimiter:
+    """Token-bucket rate limiter keyed by host, backed by Redis with an in-process fallback."""
+
+    def __init__(self, rate_per_second: float, burst: int, host_rates: Optional[Dict[str, float]] = None, key_prefix: str = "ratelimit"):
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self.host_rates = {host_of(h): r for h, r in (host_rates or {}).items()}
+        self.key_prefix = key_prefix
+        # In-process fallback state: host -> tat / blocked_until / (slowdown, expires_at)
+        self._lock = threading.Lock()
+        self._tat: Dict[str, float] = {}
+        self._blocked: Dict[str, float] = {}
+        self._slowdown: Dict[str, tuple] = {}
+
+    def _interval(self, host: str) -> float:
+        return 1.0 / self.host_rates.get(host, self.rate_per_second)
+
+    def _keys(self, host: str):
+        base = f"{self.key_prefix}:{host}"
+        return f"{base}:tat", f"{base}:blocked", f"{base}:slowdown"
+
+    # --- Core operations ---
+
+    def reserve(self, url_or_host: str) -> float:
+        """Reserves the next request slot for the host and returns seconds to wait before sending."""
+        host = host_of(url_or_host)
+        client = get_redis()
+        if client is not None:
+            tat_key, blocked_key, slowdown_key = self._keys(host)
+            try:
+                delay = client.eval(_RESERVE_LUA, 3, tat_key, blocked_key, slowdown_key, self._interval(host), self.burst)
+                return float(delay)
+            except redis.RedisError as e:
+                logger.warning(f"Redis rate limiter unavailable for {host}, using local bucket: {e}")
+        return self._reserve_local(host)
+
+    def try_reserve(self, url_or_host: str) -> float:
+        """Takes a slot only if one is free now. Returns 0 if granted, else seconds until one frees up.
+
+        For callers that defer work (e.g. a Celery countdown) instead of waiting on a reservation.
+        """
+        host = host_of(url_or_host)
+        client = get_redis()
+        if client is not None:
+            tat_key, blocked_key, slowdown_key = self._keys(host)
+            try:
+                delay = client.eval(_TRY_RESERVE_LUA, 3, tat_key, blocked_key, slowdown_key, self._interval(host), self.burst)
+                return float(delay)
+            except redis.RedisError as e:
+                logger.warning(f"Redis rate limiter unavailable for {host}, using local bucket: {e}")
+        return self._reserve_local(host, only_if_free=True)
+
+    def penalize(self, url_or_host: str, retry_after: Optional[float] = None, attempt: int = 0) -> float:
+        """Blocks a host after a throttling response and slows its pacing. Returns the block duration."""
+        host = host_of(url_or_host)
+        block_seconds = retry_after if retry_after is not None else backoff_delay(attempt)
+        logger.info(f"Throttled by {host}; pausing host for {block_seconds:.1f}s.")
+        client = get_redis()
+        if client is not None:
+            _, blocked_key, slowdown_key = self._keys(host)
+            try:
+                client.eval(_PENALIZE_LUA, 2, blocked_key, slowdown_key, block_seconds, MAX_SLOWDOWN, SLOWDOWN_TTL_SECONDS)
+                return block_seconds
+            except redis.RedisError as e:
+                logger.warning(f"Redis rate limiter unavailable for {host}, penalizing locally: {e}")
+        self._penalize_local(host, block_seconds)
+        return block_seconds
+
+    def acquire(self, url_or_host: str) -> None:
+        """Blocks the calling thread until a request to the host is allowed."""
+        delay = self.reserve(url_or_host)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, url_or_host: str) -> None:
+        """Awaits until a request to the host is allowed without blocking the event loop."""
+        delay = await asyncio.to_thread(self.reserve, url_or_host)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def observe(self, url: str, status_code: int, headers=None, attempt: int = 0) -> Optional[float]:
+        """Feeds a response back into the limiter. Returns the block duration if the host throttled us."""
+        if status_code not in THROTTLE_STATUS_CODES:
+            return None
+        retry_after = parse_retry_after((headers or {}).get("Retry-After"))
+        return self.penalize(url, retry_after=retry_after, attempt=attempt)
+
+    # --- In-process fallback (same algorithm as the Lua scripts) ---
+
+    def _current_slowdown(self, host: str, now: float) -> float:
+        slowdown, expires_at = self._slowdown.get(host, (1.0, 0.0))
+        return slowdown if expires_at > now else 1.0
+
+    def _reserve_local(self, host: str, only_if_free: bool = False) -> float:
+        with self._lock:
+            now = time.time()
+            interval = self._interval(host) * self._current_slowdown(host, now)
+            blocked = self._blocked.get(host, 0.0)
+            new_tat = max(self._tat.get(host, 0.0), now) + interval
+            delay = max(0.0, new_tat - self.burst * interval - now, blocked - now)
+            if only_if_free and delay > 0:
+                return delay
+            if blocked > now:
+                new_tat = max(new_tat, blocked + interval)
+            self._tat[host] = new_tat
+            return delay
+
+    def _penalize_local(self, host: str, block_seconds: float) -> None:
+        with self._lock:
+            now = time.time()
+            self._blocked[host] = max(self._blocked.get(host, 0.0), now + block_seconds)
+            slowdown = min(self._current_slowdown(host, now) * 2, MAX_SLOWDOWN)
+            self._slowdown[host] = (slowdown, now + SLOWDOWN_TTL_SECONDS)
+
+
+def _load_host_rates() -> Dict[str, float]:
+    try:
+        return {host: float(rate) for host, rate in json.loads(settings.SCRAPE_HOST_RATE_LIMITS_JSON).items()}
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.error(f"Invalid SCRAPE_HOST_RATE_LIMITS_JSON, ignoring per-host overrides: {e}")
+        return {}
+
+
+# Shared limiter for all outbound scraping
+scrape_limiter = HostRateLimiter(
+    rate_per_second=settings.SCRAPE_RATE_PER_SECOND,
+    burst=settings.SCRAPE_BURST,
+    host_rates=_load_host_rates(),
+)
+
+
+# --- Retry Helpers ---
+
+def request_with_retries(
+    method: str,
+    url: str,
+    *,
+    session: Optional[requests.Session] = None,
+    limiter: HostRateLimiter = scrape_limiter,
+    max_retries: int = settings.SCRAPE_MAX_RETRIES,
+    **kwargs,
+) -> requests.Response:
+    """Rate-limited `requests` call that retries throttling/5xx/connection errors with jittered backoff.
+
+    Returns the final response (which may still be an error status); raises the last
+    RequestException if every attempt failed at the connection level.
+    """
+    http = session or requests
+    for attempt in range(max_retries + 1):
+        limiter.acquire(url)
+        try:
+            response = http.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= max_retries:
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"{method} {url} failed ({e}); retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+            return response
+        response.close() # Return the connection to the pool (a stream=True body is never read)
+        # Throttled hosts are paused in the limiter, so the next acquire() waits out Retry-After
+        if limiter.observe(url, response.status_code, response.headers, attempt) is None:
+            time.sleep(backoff_delay(attempt))
+        logger.warning(f"{method} {url} returned {response.status_code}; retry {attempt + 1}/{max_retries}")
+    return response
+
+
+async def request_with_retries_async(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    *,
+    limiter: HostRateLimiter = scrape_limiter,
+    max_retries: int = settings.SCRAPE_MAX_RETRIES,
+    **kwargs,
+) -> httpx.Response:
+    """asyncio counterpart of request_with_retries for httpx clients."""
+    for attempt in range(max_retries + 1):
+        await limiter.acquire_async(url)
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            if attempt >= max_retries:
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"{method} {url} failed ({e}); retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            continue
+
+        if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+            return response
+        await response.aclose()
+        if limiter.observe(url, response.status_code, response.headers, attempt) is None:
+            await asyncio.sleep(backoff_delay(attempt))
+        logger.warning(f"{method} {url} returned {response.status_code}; retry {attempt + 1}/{max_retries}")
+    return response
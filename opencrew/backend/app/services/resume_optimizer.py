@@ -9,13 +9,13 @@ import os
 from docx import Document
 import spacy
 from typing import List, Optional, Dict, Any
-from sklearn.feature_extraction.text import TfidfVectorizer
 import re # For basic text cleaning
-from openai import OpenAI, OpenAIError # Added for Phase 4
+from openai import OpenAIError # Added for Phase 4
 import os # To get API key
 
 # Import settings
 from app.core.config import settings
+from app.services import job_analysis, llm_gateway
 
 # Import the schemas defined for structured output
 from app.schemas.optimize import (
@@ -183,7 +183,8 @@ def clean_text(text: str) -> str:
     return text
 
 def analyze_keyword_gaps(
-    request: KeywordAnalysisRequest
+    request: KeywordAnalysisRequest,
+    jd_terms: Optional[Dict[str, float]] = None
 ) -> KeywordAnalysisResponse:
     """
     Performs keyword gap analysis between a job description and a parsed resume
@@ -191,6 +192,8 @@ def analyze_keyword_gaps(
 
     Args:
         request: KeywordAnalysisRequest containing job description and parsed resume.
+        jd_terms: Precomputed TF-IDF terms of the job description (from the job's stored
+            analysis, see services/job_analysis.py). Computed from the text if omitted.
 
     Returns:
         KeywordAnalysisResponse containing a list of potentially missing terms.
@@ -207,35 +210,13 @@ def analyze_keyword_gaps(
     resume_text = clean_text(resume_text)
     logger.debug(f"Resume text length (cleaned): {len(resume_text)}")
 
-    # 2. Clean job description text
-    jd_text = clean_text(request.job_description)
-    logger.debug(f"Job Description text length (cleaned): {len(jd_text)}")
-
-
-    # 3. Use TF-IDF to find important terms in the Job Description
-    # We fit TF-IDF only on the JD to find terms important *to the JD*.
-    # We could also fit on both JD and resume corpus for relative importance,
-    # but this approach focuses on JD requirements first.
-    if not jd_text.strip():
-         logger.warning("Job description text is empty after cleaning.")
-         return KeywordAnalysisResponse(missing_terms=[])
-
-    try:
-        vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 3)) # Use 1-3 word phrases
-        tfidf_matrix = vectorizer.fit_transform([jd_text])
-        feature_names = vectorizer.get_feature_names_out()
-        scores = tfidf_matrix.toarray().flatten()
-
-        # Get terms sorted by TF-IDF score
-        jd_terms_scores = sorted(zip(feature_names, scores), key=lambda x: x[1], reverse=True)
-
-        # Filter terms with non-zero score
-        jd_important_terms = {term: score for term, score in jd_terms_scores if score > 0.05} # Use a threshold
-        logger.debug(f"Found {len(jd_important_terms)} important terms in JD (TF-IDF > 0.05).")
-
-    except ValueError as e:
-        # Can happen if jd_text is empty or only contains stop words
-        logger.warning(f"TF-IDF Vectorizer failed: {e}. Likely due to empty/stopword-only JD.")
+    # 2-3. Important terms of the Job Description by TF-IDF score
+    # TF-IDF is fit only on the JD to find terms important *to the JD*.
+    if jd_terms is None:
+        jd_terms = dict(job_analysis.extract_key_terms(request.job_description or ""))
+    jd_important_terms = jd_terms
+    logger.debug(f"Found {len(jd_important_terms)} important terms in JD (TF-IDF > {job_analysis.KEY_TERM_MIN_SCORE}).")
+    if not jd_important_terms:
         return KeywordAnalysisResponse(missing_terms=[])
 
 
@@ -267,16 +248,7 @@ def analyze_keyword_gaps(
 
 # --- Phase 4: Rewrite Engine ---
 
-# Initialize OpenAI client
-# Ensure OPENAI_API_KEY environment variable is set
-try:
-    openai_client = OpenAI()
-    # Test connection (optional, but good practice)
-    # openai_client.models.list()
-    logger.info("OpenAI client initialized successfully.")
-except OpenAIError as e:
-    logger.error(f"Failed to initialize OpenAI client: {e}. Ensure OPENAI_API_KEY is set.")
-    openai_client = None # Set to None to prevent usage if init fails
+# Requests go through the LLM gateway on the Azure OpenAI deployment (OPENAI_MODEL_NAME is deprecated)
 
 def generate_rewrite_suggestion(request: RewriteRequest) -> RewriteResponse:
     """
@@ -291,7 +263,7 @@ def generate_rewrite_suggestion(request: RewriteRequest) -> RewriteResponse:
     Raises:
         HTTPException: If the OpenAI client is not available or the API call fails.
     """
-    if not openai_client:
+    if not llm_gateway.is_configured(llm_gateway.AZURE):
         logger.error("OpenAI client is not available.")
         raise HTTPException(status_code=500, detail="Rewrite engine (OpenAI) is not configured.")
 
@@ -325,12 +297,12 @@ Rewritten {item_type}:
 
     try:
         # Use the chat completions endpoint (recommended)
-        completion = openai_client.chat.completions.create(
-            model=settings.OPENAI_MODEL_NAME,
-            messages=[
+        completion = llm_gateway.chat_completion(
+            [
                 {"role": "system", "content": "You are an expert resume editor."},
                 {"role": "user", "content": prompt}
             ],
+            call_site="rewrite",
             temperature=0.5, # Lower temperature for more focused output
             max_tokens=len(original_text.split()) + 50, # Estimate max tokens needed
             n=1, # Generate one suggestion
@@ -1,40 +1,54 @@
+import asyncio
+import hashlib
 import logging
 import re
-from typing import List, Dict, Any, Optional # Added Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, Awaitable, Callable # Added Optional
 
 from ..schemas.resume import PdfTextItem, StructuredResume, BasicInfo, EducationItem, ExperienceItem, ProjectItem, SkillItem
 import json # Added for LLM response parsing
 from pydantic import ValidationError # Added for parsing validation
 
 import openai # Added
+from ..core import metrics
 from ..core.config import settings # Added
+from ..workers import async_runtime
+from . import jd_compaction, llm_cache, llm_gateway
 
 
 logger = logging.getLogger(__name__)
 
-# Initialize Azure OpenAI Client
-if settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT:
-    logger.info("Initializing Azure OpenAI client...")
-    azure_llm = openai.AzureOpenAI(
-        api_key=settings.AZURE_OPENAI_API_KEY,
-        api_version=settings.AZURE_OPENAI_API_VERSION,
-        azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
-        # Note: Deployment name is usually passed during the API call (e.g., client.chat.completions.create(model=settings.AZURE_OPENAI_DEPLOYMENT_NAME, ...))
-    )
-    logger.info("Azure OpenAI client initialized.")
-else:
+# Requests go through the LLM gateway (pooled clients, concurrency limits, rate limiting, retries)
+if not llm_gateway.is_configured(llm_gateway.AZURE):
     logger.warning("Azure OpenAI credentials not found in settings. LLM features will be disabled.")
-    azure_llm = None
+
+
+def _llm_configured() -> bool:
+    return llm_gateway.is_configured(llm_gateway.AZURE)
 
 
 # --- LLM Helper ---
 
-def _call_llm(system_prompt: str, user_prompt: str, temperature: float = 0.7, max_tokens: int = 200) -> Optional[str]:
-    """Helper function to call the Azure OpenAI API."""
-    if not azure_llm or not settings.AZURE_OPENAI_DEPLOYMENT_NAME:
+def _call_llm(
+    system_prompt: str, user_prompt: str, temperature: float = 0.7, max_tokens: int = 200,
+    use_cache: bool = True, call_site: str = "default", response_format: Optional[Dict[str, Any]] = None
+) -> Optional[str]:
+    """Helper function to call the Azure OpenAI API.
+
+    Responses are served from / saved to the LLM response cache unless use_cache=False.
+    `response_format` is passed through for structured output (e.g. a JSON schema).
+    """
+    if not _llm_configured():
         logger.warning("Azure LLM client or deployment name not configured. Cannot call LLM.")
         return None
 
+    cache_key = llm_cache.cache_key(settings.AZURE_OPENAI_DEPLOYMENT_NAME, system_prompt, user_prompt, temperature, max_tokens, response_format)
+    if use_cache:
+        cached = llm_cache.lookup(cache_key, call_site=call_site)
+        if cached is not None:
+            logger.info(f"LLM response served from cache ({call_site}).")
+            return cached
+
     try:
         # Truncate prompts for logging to avoid excessive length
         log_sys_prompt = system_prompt[:200] + "..." if len(system_prompt) > 200 else system_prompt
@@ -43,20 +57,23 @@ def _call_llm(system_prompt: str, user_prompt: str, temperature: float = 0.7, ma
         logger.debug(f"LLM System Prompt (truncated): {log_sys_prompt}")
         logger.debug(f"LLM User Prompt (truncated): {log_user_prompt}")
 
-        response = azure_llm.chat.completions.create(
-            model=settings.AZURE_OPENAI_DEPLOYMENT_NAME,
-            messages=[
+        response = llm_gateway.chat_completion(
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
+            call_site=call_site,
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            **({"response_format": response_format} if response_format else {})
         )
 
         if response.choices and response.choices[0].message and response.choices[0].message.content:
             llm_response_content = response.choices[0].message.content.strip()
             logger.info("LLM call successful.")
             logger.debug(f"LLM Raw Response (content): {llm_response_content[:200]}...") # Log truncated response
+            if use_cache:
+                llm_cache.store(cache_key, llm_response_content)
             return llm_response_content
         else:
             logger.warning("LLM response was empty or invalid (no choices/message/content).")
@@ -74,17 +91,64 @@ def _call_llm(system_prompt: str, user_prompt: str, temperature: float = 0.7, ma
     return None
 
 
-# --- LLM-Based Resume Parsing ---
+async def _call_llm_async(
+    system_prompt: str, user_prompt: str, temperature: float = 0.7, max_tokens: int = 200,
+    use_cache: bool = True, call_site: str = "default", response_format: Optional[Dict[str, Any]] = None
+) -> Optional[str]:
+    """Async counterpart of _call_llm. Returns None on any failure."""
+    if not _llm_configured():
+        logger.warning("Azure LLM client or deployment name not configured. Cannot call LLM.")
+        return None
 
-def _parse_resume_with_llm(resume_text: str) -> StructuredResume:
-    """
-    Uses an LLM to parse raw resume text into the StructuredResume Pydantic model.
-    """
-    logger.info(f"Attempting to parse resume text using LLM. Text length: {len(resume_text)} chars.")
+    cache_key = llm_cache.cache_key(settings.AZURE_OPENAI_DEPLOYMENT_NAME, system_prompt, user_prompt, temperature, max_tokens, response_format)
+    if use_cache:
+        cached = await asyncio.to_thread(llm_cache.lookup, cache_key, call_site)
+        if cached is not None:
+            logger.info(f"LLM response served from cache ({call_site}).")
+            return cached
+
+    try:
+        logger.info(f"Calling LLM (async). Model: {settings.AZURE_OPENAI_DEPLOYMENT_NAME}, Temp: {temperature}, Max Tokens: {max_tokens}")
+        response = await llm_gateway.chat_completion_async(
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            call_site=call_site,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **({"response_format": response_format} if response_format else {})
+        )
 
-    # Define the expected JSON structure based on Pydantic models
-    # (Providing this in the prompt helps the LLM)
-    schema_description = """
+        if response.choices and response.choices[0].message and response.choices[0].message.content:
+            llm_response_content = response.choices[0].message.content.strip()
+            logger.debug(f"LLM Raw Response (content): {llm_response_content[:200]}...") # Log truncated response
+            if use_cache:
+                await asyncio.to_thread(llm_cache.store, cache_key, llm_response_content)
+            return llm_response_content
+        logger.warning("LLM response was empty or invalid (no choices/message/content).")
+        return None
+
+    except openai.APIError as e:
+        logger.error(f"Azure OpenAI API Error during async LLM call: {e}", exc_info=True)
+    except Exception as e:
+        logger.error(f"Unexpected error during _call_llm_async: {e}", exc_info=True)
+
+    return None
+
+
+# --- LLM-Based Resume Parsing ---
+# With LLM_STRUCTURED_OUTPUT enabled, parsing uses the model's structured-output mode:
+# response_format carries a strict JSON schema derived from StructuredResume, so the model can
+# only return JSON of that shape and the prompt no longer has to describe it. It is off by
+# default because json_schema needs Azure API version 2024-08-01-preview or later; otherwise
+# the schema is described in the prompt.
+#
+# Resumes longer than RESUME_PARSE_CHUNK_CHARS are split at section headings into chunks of
+# about that size. The chunks are extracted concurrently and merged in order, so a long CV
+# costs roughly one chunk's latency and a failed chunk doesn't cost the whole parse.
+
+_SCHEMA_DESCRIPTION = """
     The output MUST be a JSON object conforming to the following Pydantic schema structure:
 
     class BasicInfo(BaseModel):
@@ -140,12 +204,75 @@ def _parse_resume_with_llm(resume_text: str) -> StructuredResume:
     - Output ONLY the JSON object. Do not include any introductory text, explanations, or markdown formatting like ```json ... ```.
     - Ensure the JSON is valid and strictly adheres to the specified Pydantic models.
     - Pay close attention to data types (string, list, etc.).
+"""
+
+_PARSING_GUIDELINES = """
     - For dates (startDate, endDate), try to extract year, month, and day if available, otherwise use year-month or just year. Use 'Present' for ongoing roles/education. If dates are unclear, omit them (set to null/None).
     - For experience highlights, extract bullet points or descriptive sentences about responsibilities and achievements.
     - For skills, group related skills under appropriate categories (e.g., "Programming Languages", "Frameworks", "Databases", "Cloud Platforms", "Tools").
+    - Leave education and project highlights empty (null); they are filled in by tailoring.
+"""
+
+_SECTION_HEADING_RE = re.compile(
+    r"^\s*(summary|professional summary|objective|career objective|profile|about me|"
+    r"experience|work experience|professional experience|employment|employment history|work history|"
+    r"education|skills|technical skills|core competencies|projects|personal projects|"
+    r"certifications|publications|awards|honors|volunteer|volunteer experience|languages|interests)\s*:?\s*$",
+    re.IGNORECASE,
+)
+
+# Failure placeholders set in StructuredResume.objective (process_and_tailor_resume skips tailoring on these)
+PARSE_FAILURE_PREFIXES = (
+    "Failed to parse resume content via LLM",
+    "Failed to parse LLM JSON response.",
+    "LLM response failed validation.",
+    "Unexpected error processing LLM parse response.",
+)
+
+
+def _strict_json_schema(node: Any) -> Any:
+    """Pydantic JSON schema -> strict structured-output schema.
+
+    Strict mode requires every property to be listed as required (optional ones stay
+    nullable through anyOf) and additionalProperties false, and rejects `default`.
     """
-
-    system_prompt = f"""You are an expert resume parser. Your task is to analyze the provided raw resume text and extract the information into a structured JSON format. {schema_description}"""
+    if isinstance(node, list):
+        return [_strict_json_schema(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+    strict = {}
+    for key, value in node.items():
+        if key in ("default", "title"):
+            continue
+        if key in ("properties", "$defs"): # Keys of these are names, not schema keywords
+            strict[key] = {name: _strict_json_schema(schema) for name, schema in value.items()}
+        else:
+            strict[key] = _strict_json_schema(value)
+    if strict.get("type") == "object" and "properties" in strict:
+        strict["required"] = list(strict["properties"])
+        strict["additionalProperties"] = False
+    return strict
+
+
+@lru_cache(maxsize=1)
+def _parse_response_format() -> Dict[str, Any]:
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "structured_resume",
+            "schema": _strict_json_schema(StructuredResume.model_json_schema()),
+            "strict": True,
+        },
+    }
+
+
+def _parse_prompts(resume_text: str, part: Optional[Tuple[int, int]] = None) -> Tuple[str, str]:
+    schema_description = "" if settings.LLM_STRUCTURED_OUTPUT else _SCHEMA_DESCRIPTION
+    system_prompt = f"""You are an expert resume parser. Your task is to analyze the provided raw resume text and extract the information into a structured JSON format. {schema_description}
+    Guidelines:{_PARSING_GUIDELINES}"""
+    if part is not None:
+        system_prompt += f"""
+    The text is part {part[0]} of {part[1]} of a longer resume, split at section headings. Extract only what appears in this part and set everything else to null."""
     user_prompt = f"""Parse the following resume text and generate the JSON output:
 
 --- RESUME TEXT START ---
@@ -153,12 +280,11 @@ def _parse_resume_with_llm(resume_text: str) -> StructuredResume:
 --- RESUME TEXT END ---
 
 JSON Output:"""
+    return system_prompt, user_prompt
 
-    # Use a potentially larger max_tokens for complex resumes
-    max_parsing_tokens = 3000 # Adjust as needed based on typical resume complexity and model limits
-
-    llm_response_str = _call_llm(system_prompt, user_prompt, temperature=0.2, max_tokens=max_parsing_tokens)
 
+def _decode_structured_resume(llm_response_str: Optional[str]) -> StructuredResume:
+    """LLM parse response -> StructuredResume, or a failure placeholder (see PARSE_FAILURE_PREFIXES)."""
     if not llm_response_str:
         logger.error("LLM did not return a valid response string for parsing.")
         # Return an empty structure or raise an error
@@ -170,9 +296,7 @@ JSON Output:"""
         # Parse the JSON string from the LLM response
         parsed_data = json.loads(llm_response_str)
         # Validate and structure the data using the Pydantic model
-        structured_resume = StructuredResume(**parsed_data)
-        logger.info("Successfully parsed resume text using LLM.")
-        return structured_resume
+        return StructuredResume(**parsed_data)
     except json.JSONDecodeError as e:
         logger.error(f"Failed to decode JSON response from LLM during parsing: {e}", exc_info=True)
         logger.debug(f"LLM Raw Response causing JSON decode error: {llm_response_str[:500]}...") # Log more context
@@ -189,26 +313,100 @@ JSON Output:"""
         return StructuredResume(basic=BasicInfo(), objective="Unexpected error processing LLM parse response.")
 
 
-def tailor_content(structured_data: StructuredResume, job_description: str) -> StructuredResume:
+def _is_parse_failure(structured_data: StructuredResume) -> bool:
+    return bool(structured_data.objective and structured_data.objective.startswith(PARSE_FAILURE_PREFIXES))
+
+
+def _chunk_resume_text(resume_text: str, max_chars: int) -> List[str]:
+    """Splits resume text at section headings into chunks of at most ~max_chars (a single longer section stays whole)."""
+    if len(resume_text) <= max_chars:
+        return [resume_text]
+    sections: List[List[str]] = [[]]
+    for line in resume_text.split("\n"):
+        if _SECTION_HEADING_RE.match(line) and sections[-1]:
+            sections.append([])
+        sections[-1].append(line)
+
+    chunks: List[str] = []
+    current = ""
+    for section in ("\n".join(lines) for lines in sections):
+        if current and len(current) + len(section) + 1 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n{section}" if current else section
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _merge_resume_parts(parts: List[StructuredResume]) -> StructuredResume:
+    """Merges chunk extractions in document order: first non-empty contact field/objective wins, lists concatenate."""
+    merged = StructuredResume(basic=BasicInfo())
+    for part in parts:
+        for field, value in (part.basic or BasicInfo()):
+            if value and not getattr(merged.basic, field):
+                setattr(merged.basic, field, value)
+        merged.objective = merged.objective or part.objective
+        for field in ("education", "experiences", "projects", "skills"):
+            items = getattr(part, field)
+            if items:
+                setattr(merged, field, (getattr(merged, field) or []) + items)
+    return merged
+
+
+async def _parse_chunks_async(chunks: List[str], max_tokens: int, response_format: Optional[Dict[str, Any]]) -> List[StructuredResume]:
+    semaphore = asyncio.Semaphore(settings.LLM_TAILOR_CONCURRENCY)
+
+    async def parse_chunk(index: int, chunk: str) -> StructuredResume:
+        async with semaphore:
+            response = await _call_llm_async(
+                *_parse_prompts(chunk, part=(index + 1, len(chunks))), temperature=0.2, max_tokens=max_tokens,
+                call_site="parse", response_format=response_format,
+            )
+        return _decode_structured_resume(response)
+
+    return await asyncio.gather(*(parse_chunk(i, chunk) for i, chunk in enumerate(chunks)))
+
+
+def _parse_resume_with_llm(resume_text: str) -> StructuredResume:
     """
-    Uses an LLM to tailor specific parts of the resume based on the job description.
-    - Rewrites Objective/Summary
-    - Selects/Keywords relevant Skills
-    - Rewrites Experience/Project highlights
+    Uses an LLM to parse raw resume text into the StructuredResume Pydantic model.
     """
-    # TODO: Implement LLM calls for skills matching, experience/project highlight rewriting.
-    # TODO: Consider using LangChain for more complex prompt management and output parsing.
-    logger.info(f"Attempting to tailor resume content. Job description length: {len(job_description)} chars.")
+    logger.info(f"Attempting to parse resume text using LLM. Text length: {len(resume_text)} chars.")
 
-    if not azure_llm or not settings.AZURE_OPENAI_DEPLOYMENT_NAME:
-        logger.warning("Azure LLM client or deployment name not configured. Skipping tailoring.")
-        return structured_data
+    # Use a potentially larger max_tokens for complex resumes
+    max_parsing_tokens = 3000 # Adjust as needed based on typical resume complexity and model limits
+    response_format = _parse_response_format() if settings.LLM_STRUCTURED_OUTPUT else None
+
+    chunks = _chunk_resume_text(resume_text, settings.RESUME_PARSE_CHUNK_CHARS)
+    if len(chunks) == 1:
+        llm_response_str = _call_llm(
+            *_parse_prompts(resume_text), temperature=0.2, max_tokens=max_parsing_tokens,
+            call_site="parse", response_format=response_format,
+        )
+        structured_resume = _decode_structured_resume(llm_response_str)
+        if not _is_parse_failure(structured_resume):
+            logger.info("Successfully parsed resume text using LLM.")
+        return structured_resume
+
+    logger.info(f"Resume text is long; parsing {len(chunks)} chunks concurrently.")
+    with metrics.timed("resume_tailoring.chunked_parse_seconds"):
+        parts = async_runtime.run_sync(_parse_chunks_async(chunks, max_parsing_tokens, response_format))
+    parsed = [part for part in parts if not _is_parse_failure(part)]
+    if not parsed:
+        return parts[0] # Every chunk failed: surface the first failure placeholder
+    if len(parsed) < len(parts):
+        logger.error(f"{len(parts) - len(parsed)} of {len(parts)} resume chunks failed to parse; merging the rest.")
+        metrics.incr("resume_tailoring.parse_chunk_failures", amount=len(parts) - len(parsed))
+    logger.info(f"Successfully parsed resume text using LLM ({len(parsed)} chunks merged).")
+    return _merge_resume_parts(parsed)
 
-    try:
-        # --- Tailor Objective ---
-        current_objective = structured_data.objective or "No objective provided."
-        obj_system_prompt = "You are an expert resume writer. Rewrite the provided resume objective/summary to be concise, impactful, and highly relevant to the target job description. Focus on aligning the candidate's key qualifications with the job requirements."
-        obj_user_prompt = f"""Rewrite the following resume objective/summary based on the target job description.
+
+# --- Tailoring Prompts ---
+
+def _objective_prompts(current_objective: str, job_description: str) -> Tuple[str, str]:
+    system_prompt = "You are an expert resume writer. Rewrite the provided resume objective/summary to be concise, impactful, and highly relevant to the target job description. Focus on aligning the candidate's key qualifications with the job requirements."
+    user_prompt = f"""Rewrite the following resume objective/summary based on the target job description.
 
 Current Objective/Summary:
 ---
@@ -221,28 +419,12 @@ Target Job Description:
 ---
 
 Rewritten Objective/Summary (Return ONLY the rewritten text):"""
+    return system_prompt, user_prompt
 
-        logger.info("Attempting to tailor Objective/Summary...")
-        tailored_objective = _call_llm(obj_system_prompt, obj_user_prompt, max_tokens=150)
-        if tailored_objective:
-            structured_data.objective = tailored_objective
-            logger.info("Successfully generated tailored objective.")
-            logger.debug(f"Tailored objective: {tailored_objective[:200]}...")
-        else:
-            logger.warning("Failed to tailor objective (LLM response was empty/failed).")
 
-
-        # --- Tailor Skills ---
-        logger.info("Attempting to tailor Skills...")
-        if structured_data.skills:
-            # Correctly extract all skill strings from the list of SkillItem objects
-            all_skill_strings = []
-            for skill_item in structured_data.skills:
-                all_skill_strings.extend(skill_item.skills)
-            current_skills_str = ", ".join(set(all_skill_strings)) # Use set to avoid duplicates
-
-            skills_system_prompt = "You are a resume analysis assistant. Analyze the provided skill list and the target job description. Identify and return ONLY a comma-separated list of the most relevant skills from the original list that align strongly with the job requirements. Prioritize skills explicitly mentioned or strongly implied in the job description."
-            skills_user_prompt = f"""Analyze the following list of skills based on the target job description and return a comma-separated list of the most relevant skills.
+def _skills_prompts(current_skills_str: str, job_description: str) -> Tuple[str, str]:
+    system_prompt = "You are a resume analysis assistant. Analyze the provided skill list and the target job description. Identify and return ONLY a comma-separated list of the most relevant skills from the original list that align strongly with the job requirements. Prioritize skills explicitly mentioned or strongly implied in the job description."
+    user_prompt = f"""Analyze the following list of skills based on the target job description and return a comma-separated list of the most relevant skills.
 
 Current Skills:
 ---
@@ -255,44 +437,12 @@ Target Job Description:
 ---
 
 Most Relevant Skills (Return ONLY a comma-separated list):"""
-
-            tailored_skills_str = _call_llm(skills_system_prompt, skills_user_prompt, max_tokens=200)
-            if tailored_skills_str:
-                # Parse the response and update the skills list
-                relevant_skill_names = [s.strip() for s in tailored_skills_str.split(',') if s.strip()]
-                # Replace original skills with a single SkillItem containing the relevant skills
-                if relevant_skill_names:
-                    structured_data.skills = [SkillItem(category="Relevant Skills (Tailored)", skills=relevant_skill_names)]
-                    logger.info(f"Successfully tailored skills. Identified {len(relevant_skill_names)} relevant skills.")
-                    logger.debug(f"Tailored skills list: {relevant_skill_names}")
-                else:
-                    structured_data.skills = [] # Clear skills if LLM returns empty relevant list
-                    logger.info("No relevant skills identified by LLM after tailoring (LLM returned empty list).")
-            else:
-                logger.warning("Failed to tailor skills (LLM response was empty/failed). Keeping original skills.")
-                # Optionally clear skills or keep original: structured_data.skills = []
-        else:
-            logger.info("No original skills found in structured data to tailor.")
+    return system_prompt, user_prompt
 
 
-        # --- Tailor Experiences ---
-        logger.info("Attempting to tailor Experience descriptions...")
-        if structured_data.experiences:
-            logger.info(f"Found {len(structured_data.experiences)} experience items to potentially tailor.")
-            updated_experiences = []
-            for i, exp in enumerate(structured_data.experiences):
-                # Ensure the attribute is 'position' for logging
-                logger.info(f"Tailoring experience item {i+1}/{len(structured_data.experiences)}: {exp.position} at {exp.company}")
-                # Use highlights for tailoring, join list into a newline-separated string
-                current_highlights = exp.highlights or []
-                current_desc = "\n".join(current_highlights) if current_highlights else "No description provided."
-                if not current_highlights:
-                     logger.warning(f"Skipping experience item {i+1} due to missing highlights for tailoring.")
-                     updated_experiences.append(exp) # Keep original if no highlights
-                     continue
-
-                exp_system_prompt = "You are an expert resume writer specializing in tailoring experience bullet points. Rewrite the provided bullet points to highlight achievements and responsibilities most relevant to the target job description, using action verbs and quantifying results where possible. Maintain the original number of bullet points if feasible."
-                exp_user_prompt = f"""Rewrite the following experience bullet points to strongly align with the target job description. Focus on keywords, required skills, and desired outcomes mentioned in the job description.
+def _experience_prompts(current_desc: str, job_description: str) -> Tuple[str, str]:
+    system_prompt = "You are an expert resume writer specializing in tailoring experience bullet points. Rewrite the provided bullet points to highlight achievements and responsibilities most relevant to the target job description, using action verbs and quantifying results where possible. Maintain the original number of bullet points if feasible."
+    user_prompt = f"""Rewrite the following experience bullet points to strongly align with the target job description. Focus on keywords, required skills, and desired outcomes mentioned in the job description.
 
 Original Bullet Points (separated by newline):
 ---
@@ -305,25 +455,160 @@ Target Job Description:
 ---
 
 Rewritten Bullet Points (Return ONLY the rewritten bullet points, separated by newline):"""
+    return system_prompt, user_prompt
+
 
-                # Use slightly higher temperature for more creative rewriting, adjust tokens based on expected length
-                tailored_desc = _call_llm(exp_system_prompt, exp_user_prompt, temperature=0.75, max_tokens=len(current_desc.split())*10 + 100) # Estimate token need
+# --- Content Tailoring ---
+# The objective, the skills and each experience item are tailored by independent LLM calls.
+# They are issued concurrently (at most LLM_TAILOR_CONCURRENCY in flight). Each call only
+# writes its own section, so the result doesn't depend on which call finishes first, and
+# tailoring takes about as long as the slowest single call instead of the sum of all.
+# `on_section(name, value)` is called as each section is applied ("objective", "skills",
+# "experiences.<i>"), which lets the parse-and-tailor job stream partial results.
+#
+# Tailored sections are memoized (in the LLM cache store) under a hash of the section's
+# original content, the job context and TAILOR_PROMPT_VERSION, so re-tailoring after
+# editing one experience, or against the same job again, only sends the changed sections
+# to the LLM. Names of reused sections are appended to `reused_sections`.
 
-                if tailored_desc:
-                    # Split the LLM response back into a list and assign to highlights
-                    tailored_highlights_list = [line.strip() for line in tailored_desc.split('\n') if line.strip()]
-                    exp.highlights = tailored_highlights_list
-                    logger.info(f"Successfully generated tailored highlights for experience item {i+1}.")
-                    logger.debug(f"Tailored highlights for exp {i+1}: {tailored_highlights_list}")
-                else:
-                    logger.warning(f"Failed to tailor highlights for experience item {i+1} (LLM response was empty/failed). Keeping original highlights.")
-                updated_experiences.append(exp) # Add the (potentially updated) experience back
+SectionCallback = Callable[[str, Any], None]
 
-            structured_data.experiences = updated_experiences # Replace with the list containing updated items
+TAILOR_PROMPT_VERSION = 1 # Bump when the tailoring prompts change, so memoized sections are regenerated
+SECTION_MEMO_PREFIX = "llm:section:"
+
+
+def _section_memo_key(section: str, content: str, job_description: str) -> str:
+    """Memo key for a tailored section: (section kind, content hash, job context hash, prompt version)."""
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    job_hash = hashlib.sha256(job_description.encode("utf-8")).hexdigest()
+    return f"{SECTION_MEMO_PREFIX}v{TAILOR_PROMPT_VERSION}:{section}:{content_hash}:{job_hash}"
+
+
+def _apply_objective(structured_data: StructuredResume, tailored_objective: Optional[str]) -> Optional[str]:
+    if not tailored_objective:
+        logger.warning("Failed to tailor objective (LLM response was empty/failed).")
+        return None
+    structured_data.objective = tailored_objective
+    logger.info("Successfully generated tailored objective.")
+    logger.debug(f"Tailored objective: {tailored_objective[:200]}...")
+    return structured_data.objective
+
+
+def _apply_skills(structured_data: StructuredResume, tailored_skills_str: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+    if not tailored_skills_str:
+        logger.warning("Failed to tailor skills (LLM response was empty/failed). Keeping original skills.")
+        return None
+    # Parse the response and update the skills list
+    relevant_skill_names = [s.strip() for s in tailored_skills_str.split(',') if s.strip()]
+    # Replace original skills with a single SkillItem containing the relevant skills
+    if relevant_skill_names:
+        structured_data.skills = [SkillItem(category="Relevant Skills (Tailored)", skills=relevant_skill_names)]
+        logger.info(f"Successfully tailored skills. Identified {len(relevant_skill_names)} relevant skills.")
+        logger.debug(f"Tailored skills list: {relevant_skill_names}")
+    else:
+        structured_data.skills = [] # Clear skills if LLM returns empty relevant list
+        logger.info("No relevant skills identified by LLM after tailoring (LLM returned empty list).")
+    return [skill.model_dump() for skill in structured_data.skills]
+
+
+def _apply_experience(structured_data: StructuredResume, index: int, tailored_desc: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not tailored_desc:
+        logger.warning(f"Failed to tailor highlights for experience item {index+1} (LLM response was empty/failed). Keeping original highlights.")
+        return None
+    exp = structured_data.experiences[index]
+    # Split the LLM response back into a list and assign to highlights
+    exp.highlights = [line.strip() for line in tailored_desc.split('\n') if line.strip()]
+    logger.info(f"Successfully generated tailored highlights for experience item {index+1}.")
+    logger.debug(f"Tailored highlights for exp {index+1}: {exp.highlights}")
+    return exp.model_dump()
+
+
+async def tailor_content_async(
+    structured_data: StructuredResume, job_description: str, on_section: Optional[SectionCallback] = None,
+    reused_sections: Optional[List[str]] = None
+) -> StructuredResume:
+    """
+    Uses an LLM to tailor specific parts of the resume based on the job description.
+    - Rewrites Objective/Summary
+    - Selects/Keywords relevant Skills
+    - Rewrites Experience highlights
+    """
+    logger.info(f"Attempting to tailor resume content. Job description length: {len(job_description)} chars.")
+
+    if not _llm_configured():
+        logger.warning("Azure LLM client or deployment name not configured. Skipping tailoring.")
+        return structured_data
+
+    # Every section prompt repeats the description: strip boilerplate and cap it once
+    compaction = jd_compaction.compact_description(job_description)
+    job_description = compaction.text
+
+    try:
+        semaphore = asyncio.Semaphore(settings.LLM_TAILOR_CONCURRENCY)
+        prompted: List[str] = [] # Sections sent to the LLM (not reused from the memo)
+
+        async def tailor_section(name: str, content: str, prompts: Tuple[str, str], apply: Callable[[Optional[str]], Any], **kwargs) -> None:
+            section = name.split(".")[0]
+            memo_key = _section_memo_key(section, content, job_description)
+            response = await asyncio.to_thread(llm_cache.lookup, memo_key, "section_memo")
+            if response is not None:
+                logger.info(f"Section {name} unchanged since it was last tailored for this job; reusing it.")
+                if reused_sections is not None:
+                    reused_sections.append(name)
+            else:
+                prompted.append(name)
+                try:
+                    async with semaphore: # The memo replaces the prompt-level cache for these calls
+                        response = await _call_llm_async(*prompts, use_cache=False, call_site=section, **kwargs)
+                except Exception as e:
+                    logger.error(f"Tailoring call for section {name} failed: {e}", exc_info=True)
+                    response = None
+                if response:
+                    await asyncio.to_thread(llm_cache.store, memo_key, response)
+            value = apply(response)
+            if on_section is not None and value is not None:
+                on_section(name, value)
+
+        # --- Build Section Calls ---
+        section_calls: List[Awaitable[None]] = []
+
+        current_objective = structured_data.objective or "No objective provided."
+        section_calls.append(tailor_section(
+            "objective", current_objective, _objective_prompts(current_objective, job_description),
+            lambda response: _apply_objective(structured_data, response), max_tokens=150,
+        ))
+
+        if structured_data.skills:
+            # Correctly extract all skill strings from the list of SkillItem objects
+            all_skill_strings = []
+            for skill_item in structured_data.skills:
+                all_skill_strings.extend(skill_item.skills)
+            current_skills_str = ", ".join(dict.fromkeys(all_skill_strings)) # De-duplicate, keep order (stable prompts)
+            section_calls.append(tailor_section(
+                "skills", current_skills_str, _skills_prompts(current_skills_str, job_description),
+                lambda response: _apply_skills(structured_data, response), max_tokens=200,
+            ))
         else:
-              logger.info("No experience entries found in structured data to tailor.")
+            logger.info("No original skills found in structured data to tailor.")
 
-    # Catch exceptions specifically from the tailoring process (excluding LLM call errors handled in _call_llm)
+        for i, exp in enumerate(structured_data.experiences or []):
+            if not exp.highlights:
+                logger.warning(f"Skipping experience item {i+1} due to missing highlights for tailoring.")
+                continue
+            current_desc = "\n".join(exp.highlights)
+            # Use slightly higher temperature for more creative rewriting, adjust tokens based on expected length
+            section_calls.append(tailor_section(
+                f"experiences.{i}", current_desc, _experience_prompts(current_desc, job_description),
+                lambda response, i=i: _apply_experience(structured_data, i, response),
+                temperature=0.75, max_tokens=len(current_desc.split())*10 + 100, # Estimate token need
+            ))
+
+        logger.info(f"Tailoring {len(section_calls)} resume sections concurrently (limit {settings.LLM_TAILOR_CONCURRENCY}). "
+                    f"Job description compacted from {compaction.original_tokens} to {compaction.tokens} tokens.")
+        await asyncio.gather(*section_calls)
+        compaction.record("tailoring", calls=len(prompted))
+
+    # Catch exceptions specifically from the tailoring process (excluding LLM call errors handled in _call_llm_async)
     except Exception as e:
         logger.error(f"An unexpected error occurred during the 'tailor_content' function execution: {e}", exc_info=True)
 
@@ -331,6 +616,20 @@ Rewritten Bullet Points (Return ONLY the rewritten bullet points, separated by n
     logger.info("Content tailoring attempt finished.")
     return structured_data
 
+
+def tailor_content(
+    structured_data: StructuredResume, job_description: str, on_section: Optional[SectionCallback] = None,
+    reused_sections: Optional[List[str]] = None
+) -> StructuredResume:
+    """Synchronous wrapper around tailor_content_async for sync callers (API handlers, Celery tasks).
+
+    Runs on the process's persistent event loop, so it also works when called from a thread
+    that is already running a loop. `on_section` is called from that loop's thread.
+    """
+    return async_runtime.run_sync(tailor_content_async(
+        structured_data, job_description, on_section=on_section, reused_sections=reused_sections
+    ))
+
 # --- Preprocessing Helper ---
 
 def _preprocess_text_items(text_items: List[PdfTextItem]) -> List[PdfTextItem]:
@@ -350,10 +649,16 @@ def _preprocess_text_items(text_items: List[PdfTextItem]) -> List[PdfTextItem]:
 
 def process_and_tailor_resume(
     text_items: List[PdfTextItem],
-    job_description: str | None = None
+    job_description: str | None = None,
+    on_section: Optional[SectionCallback] = None,
+    reused_sections: Optional[List[str]] = None
 ) -> StructuredResume:
     """
     Orchestrates the resume processing and tailoring workflow.
+
+    `on_section(name, value)` reports progress: "parsed" with the full parsed resume, then
+    each tailored section as it finishes (see tailor_content_async). Names of sections
+    reused from an earlier tailoring are appended to `reused_sections`.
     """
     logger.info("Starting resume processing and tailoring...")
 
@@ -371,6 +676,8 @@ def process_and_tailor_resume(
     # 3. Parse raw text into structured data using LLM
     logger.info("Calling LLM for initial parsing...")
     structured_data = _parse_resume_with_llm(raw_resume_text)
+    if on_section is not None:
+        on_section("parsed", structured_data.model_dump())
 
     # 4. Tailor content using LLM (if job description is provided and parsing was successful)
     # Check if parsing actually succeeded by ensuring objective doesn't start with failure messages
@@ -380,21 +687,14 @@ def process_and_tailor_resume(
         parsing_succeeded = False
         logger.warning("Skipping tailoring because parsing result or objective is missing.")
     else:
-        # Check against known failure prefixes set in _parse_resume_with_llm
-        failure_prefixes = (
-            "Failed to parse resume content via LLM.",
-            "Failed to parse LLM JSON response.",
-            "LLM response failed validation.",
-            "Unexpected error processing LLM response."
-            # Add any other potential failure messages here
-        )
-        if structured_data.objective.startswith(failure_prefixes):
+        # Check against known failure placeholders set in _parse_resume_with_llm
+        if _is_parse_failure(structured_data):
             parsing_succeeded = False
             logger.warning(f"Skipping tailoring because initial parsing failed with message: {structured_data.objective}")
 
     if job_description and parsing_succeeded:
         logger.info("Job description provided and parsing succeeded. Proceeding with content tailoring...")
-        structured_data = tailor_content(structured_data, job_description)
+        structured_data = tailor_content(structured_data, job_description, on_section=on_section, reused_sections=reused_sections)
     elif not job_description:
         logger.info("No job description provided. Skipping content tailoring.")
     else: # Parsing failed
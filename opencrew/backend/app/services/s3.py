@@ -0,0 +1,44 @@
+import logging
+import os
+import threading
+from typing import Optional
+
+import boto3
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# --- Shared S3 Client ---
+# boto3 clients are thread-safe but expensive to build (credential resolution, endpoint
+# discovery, a fresh connection pool). One client per process is reused by every caller.
+
+_client = None
+_client_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def is_configured() -> bool:
+    """True if a bucket and credentials are configured."""
+    return bool(settings.S3_BUCKET_NAME and settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY)
+
+
+def get_s3_client():
+    """Returns this process's S3 client (re-created after fork; connection pools don't survive it)."""
+    global _client, _client_pid
+    with _lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = boto3.client(
+                's3',
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                region_name=settings.AWS_REGION_NAME
+            )
+            _client_pid = os.getpid()
+            logger.info(f"Created shared S3 client for process {_client_pid}.")
+        return _client
+
+
+def object_url(s3_key: str) -> str:
+    """Public object URL for a key (assumes public-read or fronted by CloudFront)."""
+    return f"https://{settings.S3_BUCKET_NAME}.s3.{settings.AWS_REGION_NAME}.amazonaws.com/{s3_key}"
@@ -5,11 +5,20 @@ from urllib.parse import urljoin, urlencode
 from datetime import datetime, timedelta
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 import time # For potential delays
-from typing import List, Optional
+import html
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Iterator, List, Optional
 import yaml # Add yaml import
 import os # Add os import
 
+import ijson
+import lxml.etree
+import lxml.html
+
+from ..core.config import settings
 from ..schemas.job import JobCreate # Import JobCreate directly
+from .rate_limiter import scrape_limiter, request_with_retries # Shared per-host politeness
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,6 +26,10 @@ logger = logging.getLogger(__name__)
 # --- Constants ---
 INDEED_BASE_URL = "https://www.indeed.com"
 
+class ScrapeError(Exception):
+    """Raised by scrape_site when a board could not be fetched (as opposed to having no jobs)."""
+    pass
+
 # --- Helper Functions ---
 def parse_relative_date(date_str: str) -> datetime | None:
     """Rudimentary parser for relative dates like 'today', 'X days ago'."""
@@ -62,6 +75,7 @@ def scrape_indeed(query: str, location: str, pages: int = 1) -> List[JobCreate]:
             logger.info(f"Navigating to URL: {search_url}")
 
             try:
+                scrape_limiter.acquire(search_url) # Pace page loads per host across all workers
                 page.goto(search_url, timeout=30000) # Increased timeout
                 # Wait for the main job results container to be present
                 page.wait_for_selector(results_container_selector, timeout=20000)
@@ -172,15 +186,65 @@ def scrape_indeed(query: str, location: str, pages: int = 1) -> List[JobCreate]:
     return jobs
 
 
-def scrape_greenhouse(company_board_token: str) -> List[JobCreate]: # Use direct import
-    """Scrapes jobs from a Greenhouse board using its API endpoint.
+def html_to_text(description_html: Optional[str]) -> str:
+    """Converts a job description's HTML to newline-separated text.
+
+    Greenhouse returns `content` HTML-entity-escaped (`&lt;p&gt;...`), so it is
+    unescaped first. Uses lxml, which is several times faster than BeautifulSoup's
+    pure-Python html.parser and releases the GIL while parsing.
+    """
+    if not description_html:
+        return ""
+    markup = html.unescape(description_html)
+    try:
+        root = lxml.html.fromstring(markup)
+    except (lxml.etree.ParserError, ValueError):
+        return markup.strip() # Plain text or an empty document
+    return "\n".join(text.strip() for text in root.itertext() if text.strip())
+
+
+def _greenhouse_job_from_item(job_item: dict, company_board_token: str, description_text: str) -> Optional[JobCreate]:
+    """Builds a JobCreate from one Greenhouse API job object (None if it lacks title/URL)."""
+    # Extract relevant fields - check Greenhouse API docs/response for exact fields
+    title = job_item.get('title')
+    url = job_item.get('absolute_url')
+    location_name = job_item.get('location', {}).get('name', 'N/A') if job_item.get('location') else 'N/A'
+    date_posted_str = job_item.get('updated_at') # Often 'updated_at' is more reliable than 'posted_at'
+    date_posted = None
+    if date_posted_str:
+        try:
+            # Format is often like '2023-10-27T10:30:00-07:00' or '2023-10-27T17:30:00Z'
+            date_posted = datetime.fromisoformat(date_posted_str.replace('Z', '+00:00'))
+        except ValueError:
+             logger.warning(f"Could not parse Greenhouse date format: {date_posted_str}")
+
+    if not (title and url):
+        logger.warning(f"Skipping job from {company_board_token} due to missing title or URL: ID {job_item.get('id')}")
+        return None
+    return JobCreate( # Use direct import
+        title=title,
+        company=company_board_token, # Use token as placeholder company name
+        location=location_name,
+        url=url,
+        description=description_text,
+        source="Greenhouse",
+        date_posted=date_posted
+    )
+
+
+def iter_greenhouse_jobs(company_board_token: str, raise_on_error: bool = False) -> Iterator[JobCreate]:
+    """Streams jobs from a Greenhouse board API response.
+
+    Job objects are parsed incrementally off the socket with ijson, and descriptions are
+    converted to text in batches of SCRAPER_HTML_BATCH_SIZE on a thread pool, so peak
+    memory is bounded by one batch rather than the full (often multi-MB) payload.
 
     Args:
         company_board_token: The unique token for the company's board 
                              (e.g., 'airbnb' from boards.greenhouse.io/airbnb).
+        raise_on_error: Raise ScrapeError on request/decode failures instead of stopping quietly.
     """
     logger.info(f"Starting Greenhouse scrape for board token: {company_board_token}")
-    jobs: List[JobCreate] = [] # Use direct import
     # Greenhouse often provides a JSON API endpoint
     api_url = f"https://boards-api.greenhouse.io/v1/boards/{company_board_token}/jobs?content=true"
     headers = {
@@ -188,67 +252,63 @@ def scrape_greenhouse(company_board_token: str) -> List[JobCreate]: # Use direct
     }
 
     try:
-        response = requests.get(api_url, headers=headers, timeout=15)
+        response = request_with_retries("GET", api_url, headers=headers, timeout=15, stream=True)
         response.raise_for_status()
-        data = response.json()
     except requests.exceptions.RequestException as e:
         logger.error(f"Request failed for Greenhouse board {company_board_token}: {e}")
-        return []
-    except requests.exceptions.JSONDecodeError as e:
-         logger.error(f"Failed to decode JSON from Greenhouse board {company_board_token}: {e}")
-         return []
-
-    if not data or 'jobs' not in data:
-        logger.warning(f"No 'jobs' key found in Greenhouse API response for {company_board_token}")
-        return []
-
-    logger.info(f"Found {len(data['jobs'])} jobs on Greenhouse board: {company_board_token}")
-
-    for job_item in data['jobs']:
+        if raise_on_error:
+            raise ScrapeError(f"Greenhouse board {company_board_token}: {e}") from e
+        return
+
+    found = 0
+    yielded = 0
+    with response, ThreadPoolExecutor(max_workers=settings.SCRAPER_HTML_WORKERS) as pool:
+        response.raw.decode_content = True # Let urllib3 undo gzip before ijson sees the bytes
+        items = ijson.items(response.raw, 'jobs.item')
         try:
-            # Extract relevant fields - check Greenhouse API docs/response for exact fields
-            title = job_item.get('title')
-            url = job_item.get('absolute_url')
-            location_name = job_item.get('location', {}).get('name', 'N/A') if job_item.get('location') else 'N/A'
-            description_html = job_item.get('content', '') # Contains HTML
-            # Basic HTML to text conversion (consider a library like html2text for better results)
-            soup = BeautifulSoup(description_html, 'html.parser')
-            description_text = soup.get_text(separator='\n', strip=True)
-            date_posted_str = job_item.get('updated_at') # Often 'updated_at' is more reliable than 'posted_at'
-            date_posted = None
-            if date_posted_str:
-                try:
-                    # Format is often like '2023-10-27T10:30:00-07:00' or '2023-10-27T17:30:00Z'
-                    date_posted = datetime.fromisoformat(date_posted_str.replace('Z', '+00:00'))
-                except ValueError:
-                     logger.warning(f"Could not parse Greenhouse date format: {date_posted_str}")
-
-            if title and url:
-                 job_data = JobCreate( # Use direct import
-                     title=title,
-                     company=company_board_token, # Use token as placeholder company name
-                     location=location_name,
-                     url=url,
-                     description=description_text,
-                     source="Greenhouse",
-                     date_posted=date_posted
-                 )
-                 jobs.append(job_data)
-            else:
-                logger.warning(f"Skipping job from {company_board_token} due to missing title or URL: ID {job_item.get('id')}")
-
-        except Exception as e:
-            logger.warning(f"Failed to process job item from Greenhouse board {company_board_token}: {e} - Item: {job_item.get('id')}")
+            while True:
+                batch = list(islice(items, settings.SCRAPER_HTML_BATCH_SIZE))
+                if not batch:
+                    break
+                found += len(batch)
+                descriptions = pool.map(html_to_text, (item.get('content', '') for item in batch))
+                for job_item, description_text in zip(batch, descriptions):
+                    try:
+                        job_data = _greenhouse_job_from_item(job_item, company_board_token, description_text)
+                    except Exception as e:
+                        logger.warning(f"Failed to process job item from Greenhouse board {company_board_token}: {e} - Item: {job_item.get('id')}")
+                        continue
+                    if job_data:
+                        yielded += 1
+                        yield job_data
+        except (ijson.JSONError, requests.exceptions.RequestException) as e:
+            logger.error(f"Failed to stream JSON from Greenhouse board {company_board_token} after {found} jobs: {e}")
+            if raise_on_error:
+                raise ScrapeError(f"Greenhouse board {company_board_token}: {e}") from e
+            return
+
+    if found == 0:
+        logger.warning(f"No jobs found in Greenhouse API response for {company_board_token}")
+    logger.info(f"Finished Greenhouse scrape for {company_board_token}. Found {found} jobs, {yielded} valid.")
+
+
+def scrape_greenhouse(company_board_token: str, raise_on_error: bool = False) -> List[JobCreate]: # Use direct import
+    """Scrapes jobs from a Greenhouse board using its API endpoint.
 
-    logger.info(f"Finished Greenhouse scrape for {company_board_token}. Found {len(jobs)} valid jobs.")
-    return jobs
+    Args:
+        company_board_token: The unique token for the company's board 
+                             (e.g., 'airbnb' from boards.greenhouse.io/airbnb).
+        raise_on_error: Raise ScrapeError on request/decode failures instead of returning [].
+    """
+    return list(iter_greenhouse_jobs(company_board_token, raise_on_error=raise_on_error))
 
-def scrape_lever(company_site_tag: str) -> List[JobCreate]: # Use direct import
+def scrape_lever(company_site_tag: str, raise_on_error: bool = False) -> List[JobCreate]: # Use direct import
     """Scrapes jobs from a Lever board using its API endpoint.
 
     Args:
         company_site_tag: The unique tag for the company's site 
                          (e.g., 'lever' from jobs.lever.co/lever).
+        raise_on_error: Raise ScrapeError on request/decode failures instead of returning [].
     """
     logger.info(f"Starting Lever scrape for site tag: {company_site_tag}")
     jobs: List[JobCreate] = [] # Use direct import
@@ -260,15 +320,19 @@ def scrape_lever(company_site_tag: str) -> List[JobCreate]: # Use direct import
     }
 
     try:
-        response = requests.get(api_url, headers=headers, timeout=15)
+        response = request_with_retries("GET", api_url, headers=headers, timeout=15)
         response.raise_for_status()
         # Lever API returns a list directly
         data = response.json()
     except requests.exceptions.RequestException as e:
         logger.error(f"Request failed for Lever board {company_site_tag}: {e}")
+        if raise_on_error:
+            raise ScrapeError(f"Lever board {company_site_tag}: {e}") from e
         return []
     except requests.exceptions.JSONDecodeError as e:
         logger.error(f"Failed to decode JSON from Lever board {company_site_tag}: {e}")
+        if raise_on_error:
+            raise ScrapeError(f"Lever board {company_site_tag}: {e}") from e
         return []
 
     if not isinstance(data, list):
@@ -319,11 +383,8 @@ def scrape_lever(company_site_tag: str) -> List[JobCreate]: # Use direct import
     return jobs
 
 # --- Main Scraper Function ---
-def run_scrapers() -> List[JobCreate]: # Use direct import
-    """Run scrapers based on the configuration in ../crawler/sites.yml."""
-    all_jobs: List[JobCreate] = [] # Use direct import
-    sites_config = []
-
+def load_sites_config() -> List[dict]:
+    """Loads the board list from ../crawler/sites.yml. Returns [] if it is missing or invalid."""
     # Construct the path to sites.yml relative to this script's directory
     current_dir = os.path.dirname(os.path.abspath(__file__))
     sites_yaml_path = os.path.join(current_dir, '..', 'crawler', 'sites.yml')
@@ -335,7 +396,7 @@ def run_scrapers() -> List[JobCreate]: # Use direct import
             sites_config = yaml.safe_load(f)
         if not isinstance(sites_config, list):
             logger.error(f"Invalid format in {sites_yaml_path}. Expected a list of sites.")
-            sites_config = [] # Prevent further errors
+            return []
     except FileNotFoundError:
         logger.error(f"Configuration file not found: {sites_yaml_path}")
         return [] # Cannot proceed without config
@@ -347,43 +408,64 @@ def run_scrapers() -> List[JobCreate]: # Use direct import
         return []
 
     logger.info(f"Found {len(sites_config)} site configurations.")
+    return sites_config
 
-    for site in sites_config:
-        name = site.get('name', 'Unknown Site')
-        source = site.get('source', '').lower()
-        mode = site.get('mode', '').lower()
-        seeds = site.get('seeds', [])
 
-        if not seeds:
-            logger.warning(f"Skipping site '{name}': No seeds provided.")
-            continue
+def iter_site_jobs(site: dict) -> Iterator[JobCreate]:
+    """Yields jobs for a single sites.yml entry as they are parsed.
 
-        seed = seeds[0] # Assuming one seed per entry for API modes
+    Raises ScrapeError if the board's API could not be fetched, so callers can retry
+    just this board. Unsupported or seedless entries are skipped and yield nothing.
+    """
+    name = site.get('name', 'Unknown Site')
+    source = site.get('source', '').lower()
+    mode = site.get('mode', '').lower()
+    seeds = site.get('seeds', [])
 
-        logger.info(f"Processing site: '{name}' (Source: {source}, Mode: {mode}, Seed: {seed})")
+    if not seeds:
+        logger.warning(f"Skipping site '{name}': No seeds provided.")
+        return
 
-        try:
-            site_jobs = []
-            if source == 'greenhouse' and mode == 'api':
-                site_jobs = scrape_greenhouse(company_board_token=seed)
-            elif source == 'lever' and mode == 'api':
-                 site_jobs = scrape_lever(company_site_tag=seed)
-            # Add elif for 'indeed' or other sources/modes if needed later
-            # elif source == 'indeed' and mode == 'listing':
-            #     # Need to decide how to handle query/location for Indeed from config
-            #     # For now, skipping Indeed in this dynamic run
-            #     logger.info(f"Skipping Indeed site '{name}' in dynamic run for now.")
-            #     continue
-            else:
-                logger.warning(f"Skipping site '{name}': Unsupported source/mode combination ({source}/{mode}).")
-                continue
+    seed = seeds[0] # Assuming one seed per entry for API modes
+
+    logger.info(f"Processing site: '{name}' (Source: {source}, Mode: {mode}, Seed: {seed})")
+
+    if source == 'greenhouse' and mode == 'api':
+        yield from iter_greenhouse_jobs(company_board_token=seed, raise_on_error=True)
+    elif source == 'lever' and mode == 'api':
+        yield from scrape_lever(company_site_tag=seed, raise_on_error=True)
+    # Add elif for 'indeed' or other sources/modes if needed later
+    # elif source == 'indeed' and mode == 'listing':
+    #     # Need to decide how to handle query/location for Indeed from config
+    #     # For now, skipping Indeed in this dynamic run
+    #     logger.info(f"Skipping Indeed site '{name}' in dynamic run for now.")
+    #     return
+    else:
+        logger.warning(f"Skipping site '{name}': Unsupported source/mode combination ({source}/{mode}).")
 
-            logger.info(f"Found {len(site_jobs)} jobs from '{name}'.")
-            all_jobs.extend(site_jobs)
 
+def scrape_site(site: dict) -> List[JobCreate]:
+    """Scrapes a single sites.yml entry into a list. See iter_site_jobs."""
+    site_jobs = list(iter_site_jobs(site))
+    logger.info(f"Found {len(site_jobs)} jobs from '{site.get('name', 'Unknown Site')}'.")
+    return site_jobs
+
+
+def run_scrapers() -> List[JobCreate]: # Use direct import
+    """Run scrapers based on the configuration in ../crawler/sites.yml.
+
+    Scrapes every board sequentially in this process. The Celery beat task fans out
+    per-shard subtasks via load_sites_config/scrape_site instead; this is kept for
+    one-off local runs.
+    """
+    all_jobs: List[JobCreate] = [] # Use direct import
+
+    for site in load_sites_config():
+        try:
+            all_jobs.extend(scrape_site(site))
         except Exception as e:
             # Use logger.exception to include traceback for debugging
-            logger.exception(f"Error scraping site '{name}' (Seed: {seed}): {e}")
+            logger.exception(f"Error scraping site '{site.get('name', 'Unknown Site')}': {e}")
 
     logger.info(f"Finished running configured scrapers. Found {len(all_jobs)} jobs in total.")
     return all_jobs
@@ -407,6 +407,32 @@ async def test_delete_resume_forbidden(authenticated_client: TestClient, db: Ses
 
 # --- Tests for /parse-and-tailor ---
 
+@pytest.fixture(scope="function")
+def inline_parse_jobs(mocker, db: Session) -> Dict[str, Any]:
+    """Runs parse-and-tailor jobs inline: the Celery task executes when published and
+    parse_jobs.wait_for_result returns its outcome."""
+    from app.workers.tasks import parse_and_tailor_resume_task
+    results: Dict[str, Any] = {}
+    mocker.patch("app.workers.tasks.SessionLocal", return_value=db) # Task saves through the test session
+    mocker.patch.object(parse_and_tailor_resume_task, "update_state")
+    mocker.patch("app.api.resumes.parse_jobs.register", return_value=True)
+
+    def run_inline(kwargs, task_id):
+        parse_and_tailor_resume_task.push_request(id=task_id)
+        try:
+            results[task_id] = {"state": "SUCCESS", "result": parse_and_tailor_resume_task(**kwargs), "error": None}
+        except Exception as e:
+            results[task_id] = {"state": "FAILURE", "result": None, "error": str(e)}
+        finally:
+            parse_and_tailor_resume_task.pop_request()
+
+    async def wait_for_result(job_id, timeout):
+        return results[job_id]
+
+    mocker.patch.object(parse_and_tailor_resume_task, "apply_async", side_effect=run_inline)
+    mocker.patch("app.api.resumes.parse_jobs.wait_for_result", side_effect=wait_for_result)
+    return results
+
 # Define a sample structured resume for mocking the service output
 SAMPLE_STRUCTURED_RESUME = StructuredResume( # Use direct schema import
     basic=BasicInfo(name="Test User", email="test@example.com", phone="123-456-7890", location="Test City"), # Use direct schema import; field name was basic, not basic_info? Check schema def
@@ -419,10 +445,10 @@ SAMPLE_STRUCTURED_RESUME = StructuredResume( # Use direct schema import
 )
 
 @pytest.mark.asyncio
-async def test_parse_and_tailor_success_no_resume_id(authenticated_client: TestClient, db: Session, test_user: User, mocker): # Use direct model import
+async def test_parse_and_tailor_success_no_resume_id(authenticated_client: TestClient, db: Session, test_user: User, mocker, inline_parse_jobs): # Use direct model import
     """Tests successful parse/tailor request without saving to a specific resume."""
     # Mock the tailoring service
-    mock_tailor = mocker.patch("app.api.resumes.resume_tailoring.process_and_tailor_resume")
+    mock_tailor = mocker.patch("app.workers.tasks.resume_tailoring.process_and_tailor_resume")
     mock_tailor.return_value = SAMPLE_STRUCTURED_RESUME
 
     # Create dummy PdfTextItem data matching the schema
@@ -459,7 +485,7 @@ async def test_parse_and_tailor_success_no_resume_id(authenticated_client: TestC
 
 
 @pytest.mark.asyncio
-async def test_parse_and_tailor_success_with_resume_id(authenticated_client: TestClient, db: Session, test_user: User, mocker): # Use direct model import
+async def test_parse_and_tailor_success_with_resume_id(authenticated_client: TestClient, db: Session, test_user: User, mocker, inline_parse_jobs): # Use direct model import
     """Tests successful parse/tailor request saving to an existing resume."""
      # Create a resume first
     resume = crud_resume.create_resume( # Use imported alias
@@ -470,7 +496,7 @@ async def test_parse_and_tailor_success_with_resume_id(authenticated_client: Tes
     )
 
     # Mock the tailoring service
-    mock_tailor = mocker.patch("app.api.resumes.resume_tailoring.process_and_tailor_resume")
+    mock_tailor = mocker.patch("app.workers.tasks.resume_tailoring.process_and_tailor_resume")
     mock_tailor.return_value = SAMPLE_STRUCTURED_RESUME
 
     # Create dummy PdfTextItem data matching the schema
@@ -507,10 +533,10 @@ async def test_parse_and_tailor_success_with_resume_id(authenticated_client: Tes
 
 
 @pytest.mark.asyncio
-async def test_parse_and_tailor_resume_not_found(authenticated_client: TestClient, db: Session, test_user: User, mocker): # Use direct model import
+async def test_parse_and_tailor_resume_not_found(authenticated_client: TestClient, db: Session, test_user: User, mocker, inline_parse_jobs): # Use direct model import
     """Tests parse/tailor request when resume_id does not exist."""
     # Mock the tailoring service (it should still be called)
-    mock_tailor = mocker.patch("app.api.resumes.resume_tailoring.process_and_tailor_resume")
+    mock_tailor = mocker.patch("app.workers.tasks.resume_tailoring.process_and_tailor_resume")
     mock_tailor.return_value = SAMPLE_STRUCTURED_RESUME
 
     # Create dummy PdfTextItem data matching the schema
@@ -539,10 +565,10 @@ async def test_parse_and_tailor_resume_not_found(authenticated_client: TestClien
     # Verify no DB update occurred (implicitly tested by checking logs or if an error was raised)
 
 @pytest.mark.asyncio
-async def test_parse_and_tailor_service_error(authenticated_client: TestClient, db: Session, test_user: User, mocker): # Use direct model import
+async def test_parse_and_tailor_service_error(authenticated_client: TestClient, db: Session, test_user: User, mocker, inline_parse_jobs): # Use direct model import
     """Tests parse/tailor when the tailoring service raises an error."""
     # Mock the tailoring service to raise an exception
-    mock_tailor = mocker.patch("app.api.resumes.resume_tailoring.process_and_tailor_resume")
+    mock_tailor = mocker.patch("app.workers.tasks.resume_tailoring.process_and_tailor_resume")
     mock_tailor.side_effect = Exception("Tailoring service failed!")
 
     # Create dummy PdfTextItem data matching the schema
@@ -565,4 +591,43 @@ async def test_parse_and_tailor_service_error(authenticated_client: TestClient,
     assert "Failed to process and tailor resume" in response.json()["detail"]
     assert "Tailoring service failed!" in response.json()["detail"]
     # Verify service was called
-    mock_tailor.assert_called_once()
\ No newline at end of file
+    mock_tailor.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_parse_and_tailor_job_submit_and_ownership(authenticated_client: TestClient, test_user: User, mocker):
+    """The job API returns a job ID immediately; other users can't read the job."""
+    mock_apply = mocker.patch("app.api.resumes.parse_and_tailor_resume_task.apply_async")
+    mocker.patch("app.api.resumes.parse_jobs.register", return_value=True)
+    request_data = ResumeParseRequest(
+        text_items=[PdfTextItem(text="Item.", fontName="Arial", width=80.0, height=9.0, x=5.0, y=50.0, hasEOL=True)],
+        job_description="Job.",
+    )
+
+    response = authenticated_client.post("/resumes/parse-and-tailor/jobs", json=request_data.model_dump())
+
+    assert response.status_code == 202
+    data = response.json()
+    assert data["status_url"].endswith(f"/resumes/parse-and-tailor/jobs/{data['job_id']}")
+    assert data["events_url"].endswith(f"/resumes/parse-and-tailor/jobs/{data['job_id']}/events")
+    assert mock_apply.call_args.kwargs["task_id"] == data["job_id"]
+    assert mock_apply.call_args.kwargs["kwargs"]["user_id"] == test_user.id
+
+    mocker.patch("app.api.resumes.parse_jobs.is_owner", return_value=False)
+    assert authenticated_client.get(data["status_url"]).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_parse_and_tailor_job_not_queued_without_tracking(authenticated_client: TestClient, mocker):
+    """If the job's owner can't be recorded, the job is refused and never published."""
+    mock_apply = mocker.patch("app.api.resumes.parse_and_tailor_resume_task.apply_async")
+    mocker.patch("app.api.resumes.parse_jobs.register", return_value=False)
+    request_data = ResumeParseRequest(
+        text_items=[PdfTextItem(text="Item.", fontName="Arial", width=80.0, height=9.0, x=5.0, y=50.0, hasEOL=True)],
+        job_description="Job.",
+    )
+
+    response = authenticated_client.post("/resumes/parse-and-tailor/jobs", json=request_data.model_dump())
+
+    assert response.status_code == 503
+    mock_apply.assert_not_called()
@@ -0,0 +1,130 @@
+import pytest
+from unittest.mock import patch
+
+from app.crawler import job_crawler
+
+# --- Mock Pages ---
+
+JSONLD_PAGE = """
+<html><head>
+<script type="application/ld+json">{"@context": "https://schema.org", "@type": "Organization", "name": "Acme"}</script>
+<script type='application/ld+json'>
+{"@context": "https://schema.org", "@type": "JobPosting", "title": "Backend Engineer",
+ "hiringOrganization": {"@type": "Organization", "name": "Acme"}, "datePosted": "2025-04-01"}
+</script>
+</head><body><h1>Backend Engineer</h1></body></html>
+"""
+
+GRAPH_PAGE = """
+<html><head><SCRIPT TYPE="application/ld+json">
+{"@context": "https://schema.org", "@graph": [{"@type": "WebPage"}, {"@type": ["JobPosting"], "title": "Data Engineer"}]}
+</SCRIPT></head></html>
+"""
+
+MICRODATA_PAGE = """
+<html><body><div itemscope itemtype="https://schema.org/JobPosting">
+<h1 itemprop="title">Frontend Engineer</h1>
+</div></body></html>
+"""
+
+PLAIN_PAGE = "<html><body><h1>Careers</h1><script>var a = '</div>';</script></body></html>"
+
+# --- Tests ---
+
+def test_iter_jsonld_blocks_skips_other_scripts():
+    """Only ld+json script bodies are yielded."""
+    blocks = list(job_crawler.iter_jsonld_blocks(JSONLD_PAGE + PLAIN_PAGE))
+    assert len(blocks) == 2
+    assert "Organization" in blocks[0]
+    assert "JobPosting" in blocks[1]
+
+def test_extract_job_posting_jsonld_page():
+    """JSON-LD JobPosting is found without invoking extruct."""
+    with patch('app.crawler.job_crawler.extruct.extract') as mock_extract:
+        job = job_crawler.extract_job_posting(JSONLD_PAGE)
+
+    assert job["title"] == "Backend Engineer"
+    assert job["hiringOrganization"]["name"] == "Acme"
+    mock_extract.assert_not_called()
+
+def test_extract_job_posting_graph_and_type_list():
+    """JobPosting nested in @graph with a list-valued @type is found."""
+    job = job_crawler.extract_job_posting_jsonld(GRAPH_PAGE)
+    assert job["title"] == "Data Engineer"
+
+def test_extract_job_posting_jsonld_type_is_case_insensitive():
+    """MIME types are case-insensitive, so an upper-case type attribute still matches."""
+    page = '<SCRIPT TYPE="Application/LD+JSON">{"@type": "JobPosting", "title": "SRE"}</SCRIPT>'
+    assert job_crawler.extract_job_posting_jsonld(page)["title"] == "SRE"
+
+def test_extract_job_posting_malformed_jsonld():
+    """Malformed JSON-LD is skipped instead of raising."""
+    page = '<script type="application/ld+json">{"@type": "JobPosting", </script>'
+    assert job_crawler.extract_job_posting_jsonld(page) is None
+
+def test_extract_job_posting_falls_back_to_microdata():
+    """Microdata extraction only runs when the JSON-LD scan misses."""
+    job = job_crawler.extract_job_posting(MICRODATA_PAGE, base_url="https://example.com/jobs/1")
+    assert job is not None
+    assert job["title"] == "Frontend Engineer"
+
+def test_extract_job_posting_plain_page():
+    """Pages without any structured data skip extruct entirely."""
+    with patch('app.crawler.job_crawler.extruct.extract') as mock_extract:
+        assert job_crawler.extract_job_posting(PLAIN_PAGE) is None
+    mock_extract.assert_not_called()
+
+# --- Rate Limit Middleware ---
+
+# Runs in a child process: a Twisted reactor can only be started once per process.
+CRAWL_SCRIPT = """
+import http.server, json, threading
+import scrapy
+from scrapy.crawler import CrawlerProcess
+from app.crawler import job_crawler
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"ok")
+    def log_message(self, *args):
+        pass
+
+server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+reserve_threads = []
+def reserve(url):
+    reserve_threads.append(threading.current_thread() is threading.main_thread())
+    return 0.2 # Every request is rate limited
+
+job_crawler.scrape_limiter.reserve = reserve
+statuses = []
+
+class OneRequestSpider(scrapy.Spider):
+    name = "one_request"
+    start_urls = [f"http://127.0.0.1:{server.server_port}/job"]
+    custom_settings = {"DOWNLOADER_MIDDLEWARES": {"app.crawler.job_crawler.HostRateLimitMiddleware": 560}}
+
+    def parse(self, response):
+        statuses.append(response.status)
+
+process = CrawlerProcess({"LOG_LEVEL": "ERROR", "TELNETCONSOLE_ENABLED": False})
+process.crawl(OneRequestSpider)
+process.start()
+print(json.dumps({"statuses": statuses, "reserve_on_main_thread": reserve_threads}))
+"""
+
+def test_rate_limit_middleware_delays_requests_in_a_real_crawl():
+    """A rate-limited request still downloads under Scrapy's default (asyncio) reactor,
+    and the limiter's Redis I/O runs off the reactor thread."""
+    import json, os, subprocess, sys
+    backend_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    result = subprocess.run(
+        [sys.executable, "-c", CRAWL_SCRIPT], cwd=backend_root, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report["statuses"] == [200]
+    assert report["reserve_on_main_thread"] == [False]
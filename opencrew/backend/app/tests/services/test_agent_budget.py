@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from app.services.agent_budget import AgentBudget, AgentUsageTracker
+
+# --- Helpers ---
+
+def llm_result(prompt_tokens: int, completion_tokens: int) -> LLMResult:
+    return LLMResult(generations=[[]], llm_output={"token_usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}})
+
+# --- Tests ---
+
+def test_tracker_counts_tokens_from_llm_output_and_usage_metadata():
+    tracker = AgentUsageTracker(AgentBudget(max_steps=10, max_seconds=60, max_tokens=10_000))
+    tracker.on_llm_end(llm_result(1000, 50))
+    message = AIMessage(content="", usage_metadata={"input_tokens": 200, "output_tokens": 20, "total_tokens": 220})
+    tracker.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]))
+
+    assert tracker.llm_calls == 2
+    assert (tracker.prompt_tokens, tracker.completion_tokens) == (1200, 70)
+    assert tracker.stop_reason is None
+
+def test_token_budget_stops_agent_once():
+    tracker = AgentUsageTracker(AgentBudget(max_steps=10, max_seconds=60, max_tokens=1500))
+    agent = MagicMock()
+    tracker._agent = agent
+
+    tracker.on_llm_end(llm_result(1000, 100))
+    agent.stop.assert_not_called()
+    tracker.on_llm_end(llm_result(1000, 100))
+    tracker.on_llm_end(llm_result(1000, 100)) # The agent may finish its step first
+
+    assert tracker.stop_reason == "tokens"
+    agent.stop.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_wall_clock_budget_stops_agent():
+    tracker = AgentUsageTracker(AgentBudget(max_steps=10, max_seconds=0.01, max_tokens=10_000))
+    agent = MagicMock()
+    tracker.attach(agent)
+    await asyncio.sleep(0.05)
+    tracker.detach(steps_taken=3)
+
+    assert tracker.stop_reason == "wall_clock"
+    agent.stop.assert_called_once()
+    assert tracker.steps == 3
+    duration = tracker.elapsed_seconds
+    await asyncio.sleep(0.01)
+    assert tracker.elapsed_seconds == duration # Frozen at detach
+
+@pytest.mark.asyncio
+async def test_detach_records_step_limit_and_cancels_timer():
+    tracker = AgentUsageTracker(AgentBudget(max_steps=5, max_seconds=60, max_tokens=10_000))
+    agent = MagicMock()
+    agent.state.history.is_done.return_value = False
+    tracker.attach(agent)
+    tracker.detach(steps_taken=5)
+
+    assert tracker.stop_reason == "steps"
+    assert tracker._timer is None
+    agent.stop.assert_not_called() # run(max_steps=...) already ended the loop
+
+@pytest.mark.asyncio
+async def test_detach_ignores_step_limit_when_agent_finished_on_last_step():
+    tracker = AgentUsageTracker(AgentBudget(max_steps=5, max_seconds=60, max_tokens=10_000))
+    agent = MagicMock()
+    agent.state.history.is_done.return_value = True
+    tracker.attach(agent)
+    tracker.detach(steps_taken=5)
+
+    assert tracker.stop_reason is None
+    assert tracker.steps == 5
+
+def test_summarize_usage_by_domain_orders_by_agent_time():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app import crud
+    from app.models.agent_usage import AgentRunUsage
+
+    engine = create_engine("sqlite:///:memory:")
+    AgentRunUsage.__table__.create(engine) # No FK enforcement in SQLite
+    db = sessionmaker(bind=engine)()
+    runs = [
+        ("jobs.ashbyhq.com", 30, 300.0, False, "wall_clock"),
+        ("jobs.ashbyhq.com", 12, 120.0, True, None),
+        ("boards.greenhouse.io", 8, 60.0, True, None),
+    ]
+    for i, (domain, steps, seconds, success, stop_reason) in enumerate(runs):
+        crud.agent_usage.add_agent_run_usage(
+            db, application_id=i + 1, domain=domain, steps=steps, llm_calls=steps,
+            prompt_tokens=steps * 1000, completion_tokens=steps * 10, duration_seconds=seconds,
+            success=success, stop_reason=stop_reason,
+        )
+    db.commit()
+
+    summary = crud.agent_usage.summarize_usage_by_domain(db)
+
+    assert [row["domain"] for row in summary] == ["jobs.ashbyhq.com", "boards.greenhouse.io"]
+    ashby = summary[0]
+    assert (ashby["runs"], ashby["successes"], ashby["budget_stops"]) == (2, 1, 1)
+    assert ashby["avg_steps"] == 21
+    assert ashby["total_tokens"] == 42 * 1010
+    assert ashby["total_seconds"] == 420.0
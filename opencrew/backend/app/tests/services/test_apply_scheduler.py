@@ -0,0 +1,74 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.services import apply_scheduler
+from app.services.rate_limiter import HostRateLimiter
+from app.models.user import SubscriptionTier
+
+# --- Tests ---
+
+@patch('app.services.apply_scheduler.get_redis', return_value=None)
+def test_enqueue_without_redis_declines(mock_get_redis):
+    assert apply_scheduler.enqueue(1, SubscriptionTier.FREE, [10, 11]) is False
+    assert apply_scheduler.pop_next(5) == []
+
+def test_paying_tiers_get_more_weight_and_higher_priority():
+    assert apply_scheduler.TIER_WEIGHTS[SubscriptionTier.ELITE] > apply_scheduler.TIER_WEIGHTS[SubscriptionTier.PRO] > apply_scheduler.TIER_WEIGHTS[SubscriptionTier.FREE]
+    assert apply_scheduler.tier_priority(SubscriptionTier.ELITE) < apply_scheduler.tier_priority(SubscriptionTier.FREE) # Lower runs first
+
+@patch('app.services.rate_limiter.get_redis', return_value=None)
+@patch('app.services.apply_scheduler.get_redis', return_value=None)
+def test_try_admit_defers_instead_of_waiting(mock_get_redis, mock_limiter_redis):
+    limiter = HostRateLimiter(rate_per_second=1 / 60.0, burst=1, key_prefix="test:apply")
+    with patch.object(apply_scheduler, 'domain_start_limiter', limiter):
+        assert apply_scheduler.try_admit("boards.greenhouse.io", 1) == 0.0
+        delay = apply_scheduler.try_admit("boards.greenhouse.io", 2)
+        assert 0 < delay <= 60 # Next start on this domain in about a minute
+        assert apply_scheduler.try_admit("jobs.lever.co", 3) == 0.0 # Other domains unaffected
+
+    # A refused try_reserve consumes nothing: the next slot is still a minute out, not two
+    assert limiter.try_reserve("boards.greenhouse.io") <= 60
+
+def test_admission_key_splits_hosted_ats_by_board():
+    assert apply_scheduler.admission_key("https://boards.greenhouse.io/Acme/jobs/123") == "boards.greenhouse.io/acme"
+    assert apply_scheduler.admission_key("https://boards.greenhouse.io/embed/job_app?for=globex&token=1") == "boards.greenhouse.io/globex"
+    assert apply_scheduler.admission_key("https://jobs.lever.co/initech/4f1c") == "jobs.lever.co/initech"
+    assert apply_scheduler.admission_key("https://careers.example.com/jobs/1") == "careers.example.com"
+    assert apply_scheduler.admission_key(None) == "unknown"
+    assert apply_scheduler.ats_host("jobs.lever.co/initech") == "jobs.lever.co"
+    assert apply_scheduler.ats_host("careers.example.com") is None
+
+@patch('app.services.rate_limiter.get_redis', return_value=None)
+@patch('app.services.apply_scheduler.get_redis', return_value=None)
+def test_boards_on_one_ats_are_admitted_independently(mock_get_redis, mock_limiter_redis):
+    board_limiter = HostRateLimiter(rate_per_second=1 / 60.0, burst=1, key_prefix="test:board")
+    ats_limiter = HostRateLimiter(rate_per_second=2 / 60.0, burst=2, key_prefix="test:ats")
+    with patch.object(apply_scheduler, 'domain_start_limiter', board_limiter), \
+         patch.object(apply_scheduler, 'ats_start_limiter', ats_limiter):
+        assert apply_scheduler.try_admit("boards.greenhouse.io/acme", 1) == 0.0
+        assert apply_scheduler.try_admit("boards.greenhouse.io/globex", 2) == 0.0 # Another employer's board
+        assert apply_scheduler.try_admit("boards.greenhouse.io/initech", 3) > 0 # The ATS-wide cap still applies
+
+@patch('app.services.rate_limiter.get_redis', return_value=None)
+@patch('app.services.apply_scheduler.get_redis', return_value=None)
+def test_board_rate_refusal_does_not_spend_ats_tokens(mock_get_redis, mock_limiter_redis):
+    board_limiter = HostRateLimiter(rate_per_second=1 / 60.0, burst=1, key_prefix="test:board")
+    ats_limiter = HostRateLimiter(rate_per_second=2 / 60.0, burst=2, key_prefix="test:ats")
+    with patch.object(apply_scheduler, 'domain_start_limiter', board_limiter), \
+         patch.object(apply_scheduler, 'ats_start_limiter', ats_limiter):
+        assert apply_scheduler.try_admit("boards.greenhouse.io/acme", 1) == 0.0
+        for application_id in range(2, 6): # Refused by acme's board limit
+            assert apply_scheduler.try_admit("boards.greenhouse.io/acme", application_id) > 0
+        assert apply_scheduler.try_admit("boards.greenhouse.io/globex", 6) == 0.0 # ATS budget still has room
+
+@patch('app.services.apply_scheduler.get_redis')
+def test_ats_slot_refusal_releases_board_slot(mock_get_redis):
+    client = mock_get_redis.return_value
+    client.eval.side_effect = [1, 0] # Board slot granted, ATS slot refused
+    assert apply_scheduler.try_admit("jobs.lever.co/initech", 7) == apply_scheduler.settings.AUTO_APPLY_DEFER_SECONDS
+    client.zrem.assert_any_call("apply:slots:jobs.lever.co/initech", 7)
+
+@patch('app.services.apply_scheduler.get_redis')
+def test_pop_next_decodes_members(mock_get_redis):
+    mock_get_redis.return_value.eval.return_value = [b"42:0", b"7:6"]
+    assert apply_scheduler.pop_next(2) == [(42, 0), (7, 6)]
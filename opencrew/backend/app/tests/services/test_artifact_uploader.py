@@ -0,0 +1,78 @@
+import base64
+import io
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from PIL import Image
+
+from app.services import artifact_uploader
+
+# --- Helpers ---
+
+def make_png(width: int, height: int) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(out, format="PNG")
+    return out.getvalue()
+
+# --- Tests ---
+
+def test_last_screenshot_decodes_base64_history():
+    png = make_png(10, 10)
+    history = MagicMock()
+    history.screenshots.return_value = [None, base64.b64encode(b"older").decode(), base64.b64encode(png).decode()]
+    assert artifact_uploader.last_screenshot(history) == png
+
+def test_last_screenshot_reads_file_paths(tmp_path):
+    path = tmp_path / "shot.png"
+    path.write_bytes(b"png-bytes")
+    history = MagicMock()
+    history.screenshots.return_value = [str(path)]
+    assert artifact_uploader.last_screenshot(history) == b"png-bytes"
+    history.screenshots.return_value = []
+    assert artifact_uploader.last_screenshot(history) is None
+
+def test_prepare_screenshot_downscales_to_jpeg():
+    with patch.object(artifact_uploader.settings, 'ARTIFACT_SCREENSHOT_MAX_WIDTH', 640):
+        data, extension, content_type = artifact_uploader.prepare_screenshot(make_png(1920, 1080))
+    assert (extension, content_type) == ("jpg", "image/jpeg")
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.size == (640, 360)
+
+def test_prepare_screenshot_keeps_undecodable_data():
+    assert artifact_uploader.prepare_screenshot(b"not an image") == (b"not an image", "png", "image/png")
+
+@patch('app.services.artifact_uploader.SessionLocal')
+@patch('app.services.artifact_uploader.s3')
+def test_upload_records_url_on_a_fresh_session(mock_s3, mock_session_local):
+    mock_s3.object_url.side_effect = lambda key: f"https://bucket/{key}"
+    db = mock_session_local.return_value
+
+    url = artifact_uploader._upload_and_record(7, "success", make_png(100, 50))
+
+    assert url.startswith("https://bucket/application_screenshots/app_7_success_") and url.endswith(".jpg")
+    put_kwargs = mock_s3.get_s3_client.return_value.put_object.call_args.kwargs
+    assert put_kwargs["ContentType"] == "image/jpeg"
+    db.query.return_value.filter.return_value.update.assert_called_once()
+    db.commit.assert_called_once()
+    db.close.assert_called_once()
+
+@patch('app.services.artifact_uploader.SessionLocal')
+@patch('app.services.artifact_uploader.s3')
+def test_failed_upload_leaves_application_untouched(mock_s3, mock_session_local):
+    mock_s3.get_s3_client.return_value.put_object.side_effect = Exception("S3 down")
+    assert artifact_uploader._upload_and_record(7, "failure", make_png(10, 10)) is None
+    mock_session_local.assert_not_called()
+
+@patch('app.services.artifact_uploader._upload_and_record', return_value="https://bucket/key.jpg")
+@patch('app.services.artifact_uploader.s3')
+def test_submit_screenshot_runs_in_background(mock_s3, mock_upload):
+    mock_s3.is_configured.return_value = True
+    future = artifact_uploader.submit_screenshot(7, "success", b"png")
+    assert future.result(timeout=5) == "https://bucket/key.jpg"
+    mock_upload.assert_called_once_with(7, "success", b"png")
+
+    assert artifact_uploader.submit_screenshot(7, "success", None) is None # Nothing to upload
+    mock_s3.is_configured.return_value = False
+    assert artifact_uploader.submit_screenshot(7, "success", b"png") is None
+    artifact_uploader.shutdown()
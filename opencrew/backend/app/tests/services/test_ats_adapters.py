@@ -0,0 +1,117 @@
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from playwright.async_api import Error as PlaywrightError
+
+from app.services import ats_adapters
+
+# --- Mock Data ---
+
+MOCK_PROFILE = {
+    "first_name": "Jane",
+    "last_name": "Doe",
+    "email": "jane@example.com",
+    "phone": "555-0100",
+    "linkedin_url": "",
+}
+
+def create_mock_page(present=None, unfilled_required=None, confirmation=True) -> MagicMock:
+    """Playwright page whose locators exist for the selectors in `present` (all by default)."""
+    page = MagicMock()
+    page.goto = AsyncMock()
+    page.evaluate = AsyncMock(return_value=unfilled_required or [])
+    page.screenshot = AsyncMock(return_value=b"png")
+    locators = {}
+
+    def locator(selector):
+        if selector not in locators:
+            first = MagicMock()
+            first.count = AsyncMock(return_value=1 if present is None or selector in present else 0)
+            first.fill = AsyncMock()
+            first.set_input_files = AsyncMock()
+            first.click = AsyncMock()
+            is_confirmation = selector == ats_adapters.load_selectors("greenhouse")["success_message"]
+            first.wait_for = AsyncMock(side_effect=None if confirmation or not is_confirmation else PlaywrightError("Timeout"))
+            locators[selector] = MagicMock(first=first)
+        return locators[selector]
+
+    page.locator.side_effect = locator
+    page.locators = locators
+    return page
+
+# --- Tests ---
+
+def test_detect_adapter_by_host():
+    assert isinstance(ats_adapters.detect_adapter("https://boards.greenhouse.io/stripe/jobs/1"), ats_adapters.GreenhouseAdapter)
+    assert isinstance(ats_adapters.detect_adapter("https://jobs.lever.co/netflix/abc"), ats_adapters.LeverAdapter)
+    assert ats_adapters.detect_adapter("https://example.wd5.myworkdayjobs.com/job/1") is None # Agent only
+    with patch.object(ats_adapters.settings, 'ATS_ADAPTERS_ENABLED', False):
+        assert ats_adapters.detect_adapter("https://jobs.lever.co/netflix/abc") is None
+
+def test_lever_apply_url():
+    adapter = ats_adapters.LeverAdapter()
+    assert adapter.apply_url("https://jobs.lever.co/netflix/abc?lever-source=x") == "https://jobs.lever.co/netflix/abc/apply"
+    assert adapter.apply_url("https://jobs.lever.co/netflix/abc/apply") == "https://jobs.lever.co/netflix/abc/apply"
+
+@pytest.mark.asyncio
+async def test_greenhouse_adapter_submits_known_form():
+    adapter = ats_adapters.GreenhouseAdapter()
+    page = create_mock_page()
+
+    result = await adapter.apply(page, "https://boards.greenhouse.io/stripe/jobs/1", MOCK_PROFILE, "/tmp/resume.pdf")
+
+    assert result.success and not result.fallback
+    assert result.screenshot == b"png"
+    selectors = adapter.selectors
+    page.locators[selectors["first_name"]].first.fill.assert_awaited_once_with("Jane")
+    page.locators[selectors["resume_upload_input"]].first.set_input_files.assert_awaited_once_with("/tmp/resume.pdf")
+    page.locators[selectors["submit_button"]].first.click.assert_awaited_once()
+    assert selectors["linkedin_url"] not in page.locators # Empty optional value skipped
+
+@pytest.mark.asyncio
+async def test_custom_required_questions_fall_back_without_submitting():
+    adapter = ats_adapters.GreenhouseAdapter()
+    page = create_mock_page(unfilled_required=["question_123"])
+
+    result = await adapter.apply(page, "https://boards.greenhouse.io/stripe/jobs/1", MOCK_PROFILE, "/tmp/resume.pdf")
+
+    assert result.fallback and not result.success
+    assert "question_123" in result.message
+    submit = page.locator(adapter.selectors["submit_button"]).first
+    submit.click.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_missing_confirmation_is_final_failure():
+    """After the submit click the agent must not retry, or the application could be sent twice."""
+    adapter = ats_adapters.GreenhouseAdapter()
+    page = create_mock_page(confirmation=False)
+
+    result = await adapter.apply(page, "https://boards.greenhouse.io/stripe/jobs/1", MOCK_PROFILE, "/tmp/resume.pdf")
+
+    assert not result.success and not result.fallback
+
+REQUIRED_CHOICES_FORM = """<form>
+<input name="first_name" required value="Jane">
+<input type="checkbox" name="consent" required>
+<input type="checkbox" name="privacy" required checked>
+<input type="radio" name="sponsorship" value="yes" required><input type="radio" name="sponsorship" value="no" required>
+<input type="radio" name="authorized" value="yes" required checked><input type="radio" name="authorized" value="no" required>
+<input type="radio" name="relocate" value="yes" aria-required="true"><input type="radio" name="relocate" value="no" aria-required="true">
+</form>"""
+
+@pytest.mark.asyncio
+async def test_unfilled_required_detects_unchecked_boxes_and_radio_groups():
+    """A checkbox's or radio's value is "on" even when unchecked, so emptiness alone misses them."""
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as playwright:
+        try:
+            browser = await playwright.chromium.launch()
+        except PlaywrightError as e:
+            pytest.skip(f"Chromium not available: {e.message.splitlines()[0]}")
+        try:
+            page = await browser.new_page()
+            await page.set_content(REQUIRED_CHOICES_FORM)
+            assert await page.evaluate(ats_adapters._UNFILLED_REQUIRED_JS) == ["consent", "sponsorship", "relocate"]
+        finally:
+            await browser.close()
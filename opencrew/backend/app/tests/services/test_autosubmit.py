@@ -9,7 +9,7 @@ from app.models.user import User, SubscriptionTier
 from app.models.application import Application, ApplicationStatus
 from app.models.job import Job
 from app.models.resume import Resume
-from app.db.session import SessionLocal # For mocking
+from sqlalchemy.orm import Session # For mocking
 
 # --- Mock Data ---
 
@@ -18,9 +18,7 @@ def create_mock_user(id=1, tier=SubscriptionTier.FREE, **kwargs) -> User:
     defaults = {
         "id": id,
         "email": f"user{id}@test.com",
-        "hashed_password": "hashed_password",
         "is_active": True,
-        "is_superuser": False,
         "subscription_tier": tier,
         "stripe_customer_id": f"cus_{id}",
         "first_name": "Test",
@@ -40,8 +38,7 @@ def create_mock_application(id=1, user_id=1, job_id=1, resume_id=1, status=Appli
         "job_id": job_id,
         "resume_id": resume_id,
         "status": status,
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow(),
+        "status_last_updated_at": datetime.utcnow(),
         # Add related objects if needed for tests, but often mocked separately
         "user": create_mock_user(id=user_id),
         "job": Job(id=job_id, url="http://test.com/job", title="Mock Job"),
@@ -55,37 +52,37 @@ def create_mock_application(id=1, user_id=1, job_id=1, resume_id=1, status=Appli
     return Application(**defaults)
 
 # Mock DB Session
-mock_db_session = MagicMock(spec=SessionLocal)
+mock_db_session = MagicMock(spec=Session)
 
 # --- Tests for check_user_quota ---
 
 def test_check_user_quota_free_tier_no_apps():
-    """Test free tier quota with no applications this month."""
+    """Test free tier quota with no usage row this month."""
     mock_user = create_mock_user(tier=SubscriptionTier.FREE)
-    mock_db_session.query.return_value.filter.return_value.scalar.return_value = 0 # No apps found
+    mock_db_session.query.return_value.filter.return_value.first.return_value = None # No usage yet
 
     quota = autosubmit.check_user_quota(db=mock_db_session, user=mock_user)
 
     assert quota == 50
-    mock_db_session.query.assert_called_once() # Check that query was made
+    mock_db_session.query.assert_called_once() # Single usage-row lookup, no COUNT scan
 
 def test_check_user_quota_free_tier_some_apps():
-    """Test free tier quota with some applications this month."""
+    """Test free tier quota with some applications this month (reserved ones count as spent)."""
     mock_user = create_mock_user(tier=SubscriptionTier.FREE)
-    mock_db_session.query.return_value.filter.return_value.scalar.return_value = 15 # 15 apps found
+    mock_db_session.query.return_value.filter.return_value.first.return_value = MagicMock(used=10, reserved=5)
 
     quota = autosubmit.check_user_quota(db=mock_db_session, user=mock_user)
 
-    assert quota == 35 # 50 - 15
+    assert quota == 35 # 50 - 10 - 5
 
 def test_check_user_quota_free_tier_limit_reached():
     """Test free tier quota when the limit is reached/exceeded."""
     mock_user = create_mock_user(tier=SubscriptionTier.FREE)
-    mock_db_session.query.return_value.filter.return_value.scalar.return_value = 50 # 50 apps found
+    mock_db_session.query.return_value.filter.return_value.first.return_value = MagicMock(used=50, reserved=0)
     quota = autosubmit.check_user_quota(db=mock_db_session, user=mock_user)
     assert quota == 0
 
-    mock_db_session.query.return_value.filter.return_value.scalar.return_value = 60 # 60 apps found
+    mock_db_session.query.return_value.filter.return_value.first.return_value = MagicMock(used=55, reserved=5)
     quota = autosubmit.check_user_quota(db=mock_db_session, user=mock_user)
     assert quota == 0 # Should not go below 0
 
@@ -113,55 +110,110 @@ def test_check_user_quota_elite_tier():
 # --- Tests for apply_to_job_async ---
 
 @pytest.mark.asyncio
-@patch('app.services.autosubmit.check_user_quota')
-@patch('app.services.autosubmit.boto3.client')
-@patch('app.services.autosubmit.tempfile.NamedTemporaryFile')
-@patch('app.services.autosubmit.StructuredResumePdfGenerator')
+@patch('app.services.autosubmit.quota')
+@patch('app.services.autosubmit.get_resume_cache')
 @patch('app.services.autosubmit.Agent')
-@patch('app.services.autosubmit.ChatOpenAI')
-async def test_apply_to_job_quota_exceeded(
-    mock_chat_openai, mock_agent_class, mock_pdf_gen_class, mock_tempfile, mock_s3_client, mock_check_quota):
-    """Test apply_to_job_async when user quota is exceeded."""
-    mock_db = MagicMock(spec=SessionLocal)
-    mock_application = create_mock_application(id=99, status=ApplicationStatus.PENDING_TRIGGER)
+async def test_apply_to_job_settled_application_is_skipped(mock_agent_class, mock_get_resume_cache, mock_quota):
+    """A redelivered task for an already-settled application must not apply or settle quota again."""
+    for settled_status in (ApplicationStatus.APPLIED, ApplicationStatus.ERROR, ApplicationStatus.TRIGGER_FAILED):
+        mock_db = MagicMock(spec=Session)
+        mock_application = create_mock_application(id=99, status=settled_status)
+        mock_db.query.return_value.filter.return_value.first.return_value = mock_application
+
+        await autosubmit.apply_to_job_async(db=mock_db, application_id=99)
+
+        assert mock_application.status == settled_status
+        mock_db.commit.assert_not_called()
+    mock_get_resume_cache.assert_not_called()
+    mock_agent_class.assert_not_called()
+    mock_quota.commit.assert_not_called()
+    mock_quota.release.assert_not_called()
+
+@pytest.mark.asyncio
+@patch('app.services.autosubmit.quota')
+async def test_apply_to_job_missing_s3_key_releases_quota(mock_quota):
+    """Failing before the agent runs hands the reserved quota slot back."""
+    mock_db = MagicMock(spec=Session)
+    mock_application = create_mock_application(id=100)
+    mock_application.resume.original_filepath = None
     mock_db.query.return_value.filter.return_value.first.return_value = mock_application
-    
-    # Simulate quota check returning 0
-    mock_check_quota.return_value = 0
 
-    await autosubmit.apply_to_job_async(db=mock_db, application_id=99)
+    await autosubmit.apply_to_job_async(db=mock_db, application_id=100)
 
-    # Assertions
-    mock_check_quota.assert_called_once_with(db=mock_db, user=mock_application.user)
-    # Ensure application status is updated to ERROR
     assert mock_application.status == ApplicationStatus.ERROR
-    assert "quota exceeded" in mock_application.notes.lower()
-    # Ensure no S3/Agent operations were attempted
-    mock_s3_client.assert_not_called()
-    mock_agent_class.assert_not_called()
-    mock_db.commit.assert_called_once() # Should commit the status update
+    mock_quota.release.assert_called_once_with(mock_db, mock_application.user_id)
+    mock_quota.commit.assert_not_called()
 
 @pytest.mark.asyncio
 async def test_apply_to_job_application_not_found():
     """Test apply_to_job_async when application ID does not exist."""
-    mock_db = MagicMock(spec=SessionLocal)
+    mock_db = MagicMock(spec=Session)
     mock_db.query.return_value.filter.return_value.first.return_value = None # Simulate not found
 
     # Use patch context managers if mocks are only needed here
-    with patch('app.services.autosubmit.check_user_quota') as mock_check_quota, \
+    with patch('app.services.autosubmit.quota') as mock_quota, \
          patch('app.services.autosubmit.Agent') as mock_agent_class:
         
         await autosubmit.apply_to_job_async(db=mock_db, application_id=101)
 
         # Assertions
         mock_db.query.assert_called_once()
-        mock_check_quota.assert_not_called() # Should exit before quota check
+        mock_quota.release.assert_not_called() # No application, nothing reserved to settle
         mock_agent_class.assert_not_called()
         mock_db.commit.assert_not_called() # Should not commit if app not found
 
+# --- Tests for apply_many_async ---
+
+@pytest.mark.asyncio
+@patch('app.services.autosubmit.SessionLocal')
+@patch('app.services.autosubmit._job_domain')
+async def test_apply_many_async_caps_concurrency_per_domain(mock_job_domain, mock_session_local):
+    """Applications run concurrently, but never more than the cap against one domain."""
+    domains = {1: "boards.greenhouse.io", 2: "boards.greenhouse.io", 3: "jobs.lever.co", 4: "jobs.lever.co"}
+    mock_job_domain.side_effect = lambda db, application_id: domains[application_id]
+    running = {"total": 0, "max_total": 0, "boards.greenhouse.io": 0, "jobs.lever.co": 0, "max_per_domain": 0}
+
+    async def fake_apply(db, application_id):
+        domain = domains[application_id]
+        running["total"] += 1
+        running[domain] += 1
+        running["max_total"] = max(running["max_total"], running["total"])
+        running["max_per_domain"] = max(running["max_per_domain"], running[domain])
+        await asyncio.sleep(0.01)
+        running["total"] -= 1
+        running[domain] -= 1
+        if application_id == 4:
+            raise RuntimeError("Agent crashed")
+
+    with patch('app.services.autosubmit.apply_to_job_async', side_effect=fake_apply), \
+         patch('app.services.autosubmit.apply_scheduler.try_admit', return_value=0.0), \
+         patch('app.services.autosubmit.apply_scheduler.release'), \
+         patch.object(autosubmit.settings, 'BROWSER_POOL_SIZE', 4), \
+         patch.object(autosubmit.settings, 'AUTO_APPLY_DOMAIN_CONCURRENCY', 1):
+        summary = await autosubmit.apply_many_async([1, 2, 3, 4])
+
+    assert summary == {"processed": 3, "errors": 1, "deferred": [], "retry_in": 0.0} # One failure doesn't cancel the rest
+    assert running["max_total"] == 2 # Both domains in parallel...
+    assert running["max_per_domain"] == 1 # ...but one agent per domain
+    assert mock_session_local.return_value.close.call_count == 4 # One session per coroutine
+
+@pytest.mark.asyncio
+@patch('app.services.autosubmit.SessionLocal')
+@patch('app.services.autosubmit._job_domain', return_value="boards.greenhouse.io")
+@patch('app.services.autosubmit.apply_scheduler')
+async def test_apply_many_async_defers_refused_applications(mock_scheduler, mock_job_domain, mock_session_local):
+    """Applications the scheduler refuses are returned for re-queueing instead of waiting in the worker."""
+    mock_scheduler.try_admit.side_effect = lambda domain, application_id: 0.0 if application_id == 1 else 30.0
+
+    with patch('app.services.autosubmit.apply_to_job_async') as mock_apply:
+        summary = await autosubmit.apply_many_async([1, 2])
+
+    assert summary == {"processed": 1, "errors": 0, "deferred": [2], "retry_in": 30.0}
+    mock_apply.assert_called_once_with(db=mock_session_local.return_value, application_id=1)
+    mock_scheduler.release.assert_called_once_with("boards.greenhouse.io", 1) # Only the admitted one held a slot
+
 # TODO: Add more tests for apply_to_job_async:
 # - Success case (mocking agent success, S3 upload, PDF generation etc.)
-# - Missing resume S3 key scenario.
 # - PDF generation failure scenario (should fall back to original).
 # - Agent execution failure scenario.
 # - Agent history parsing failure scenario.
@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from app.services import browser_pool
+from app.services.browser_pool import BrowserPool
+
+# --- Helpers ---
+
+def make_mock_browser():
+    """A browser_use Browser stand-in whose contexts can be opened and closed."""
+    browser = MagicMock()
+    browser.playwright_browser.is_connected.return_value = True
+    browser.get_playwright_browser = AsyncMock()
+    browser.close = AsyncMock()
+
+    async def new_context(*args, **kwargs):
+        context = MagicMock()
+        context.browser = browser
+        context.__aenter__ = AsyncMock(return_value=context)
+        context.close = AsyncMock()
+        return context
+
+    browser.new_context = AsyncMock(side_effect=new_context)
+    return browser
+
+# --- Tests ---
+
+@pytest.mark.asyncio
+@patch('app.services.browser_pool.metrics')
+@patch('app.services.browser_pool.Browser')
+async def test_lease_reuses_warm_browser_and_resets_context(mock_browser_class, mock_metrics):
+    browser = make_mock_browser()
+    mock_browser_class.return_value = browser
+    pool = BrowserPool(size=1, max_uses=10)
+
+    async with pool.lease() as first:
+        pass
+    async with pool.lease() as second:
+        pass
+
+    mock_browser_class.assert_called_once() # One Chromium launch for both leases
+    assert first is not second
+    first.close.assert_awaited_once() # Used contexts are never handed out again
+
+@pytest.mark.asyncio
+@patch('app.services.browser_pool.metrics')
+@patch('app.services.browser_pool.Browser')
+async def test_browser_recycled_after_max_uses(mock_browser_class, mock_metrics):
+    old_browser, new_browser = make_mock_browser(), make_mock_browser()
+    mock_browser_class.side_effect = [old_browser, new_browser]
+    pool = BrowserPool(size=1, max_uses=2)
+
+    for _ in range(3):
+        async with pool.lease():
+            pass
+
+    assert mock_browser_class.call_count == 2
+    old_browser.close.assert_awaited_once()
+
+@pytest.mark.asyncio
+@patch('app.services.browser_pool.metrics')
+@patch('app.services.browser_pool.Browser')
+async def test_dead_browser_is_relaunched(mock_browser_class, mock_metrics):
+    dead_browser, new_browser = make_mock_browser(), make_mock_browser()
+    mock_browser_class.side_effect = [dead_browser, new_browser]
+    pool = BrowserPool(size=1, max_uses=10)
+
+    async with pool.lease():
+        pass
+    dead_browser.playwright_browser.is_connected.return_value = False # Chromium crashed between tasks
+
+    async with pool.lease() as context:
+        assert context.browser is new_browser
+
+def test_pool_is_per_event_loop_and_process():
+    async def current_pool():
+        return browser_pool.get_browser_pool()
+
+    first_loop, second_loop = asyncio.new_event_loop(), asyncio.new_event_loop() # Both alive, so ids differ
+    try:
+        first = first_loop.run_until_complete(current_pool())
+        assert first_loop.run_until_complete(current_pool()) is first
+
+        second = second_loop.run_until_complete(current_pool()) # Can't reuse the first loop's locks
+        assert second is not first
+
+        with patch('app.services.browser_pool.os.getpid', return_value=-1): # As in a forked child
+            assert second_loop.run_until_complete(current_pool()) is not second
+    finally:
+        first_loop.close()
+        second_loop.close()
+        browser_pool._pools.clear()
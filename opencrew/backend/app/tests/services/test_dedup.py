@@ -0,0 +1,49 @@
+import pytest
+
+from app.services import dedup
+
+# --- Mock Data ---
+
+MOCK_DESCRIPTION = " ".join(
+    f"You will design payment APIs, own service {i} end to end and mentor engineers across teams."
+    for i in range(20)
+)
+
+# --- Tests ---
+
+def test_cross_posted_job_is_near_duplicate():
+    """Same role posted on two boards with markup and company suffix differences."""
+    greenhouse = dedup.job_fingerprint("Senior Backend Engineer", "Stripe", MOCK_DESCRIPTION)
+    lever = dedup.job_fingerprint("Senior Backend Engineer", "Stripe, Inc.", f"<div><p>{MOCK_DESCRIPTION}</p></div>")
+
+    assert dedup.is_near_duplicate(greenhouse, lever)
+
+def test_different_role_with_shared_boilerplate_is_not_duplicate():
+    """Different titles at the same company must not collapse even with identical descriptions."""
+    backend = dedup.job_fingerprint("Senior Backend Engineer", "Stripe", MOCK_DESCRIPTION)
+    designer = dedup.job_fingerprint("Product Designer", "Stripe", MOCK_DESCRIPTION)
+
+    assert not dedup.is_near_duplicate(backend, designer)
+
+def test_near_duplicates_share_an_lsh_band():
+    """Pigeonhole: fingerprints within NEAR_DUPLICATE_MAX_DISTANCE always share at least one band."""
+    fingerprint = dedup.job_fingerprint("Data Engineer", "Acme", MOCK_DESCRIPTION)
+    flipped = fingerprint
+    for bit in (1, 17, 33): # One flip in each of three different bands
+        flipped ^= 1 << bit
+
+    assert dedup.hamming_distance(fingerprint, flipped) == 3
+    shared = [a == b for a, b in zip(dedup.lsh_bands(fingerprint), dedup.lsh_bands(flipped))]
+    assert any(shared)
+
+def test_signed64_round_trip():
+    """Fingerprints survive the BIGINT storage mapping."""
+    for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+        stored = dedup.to_signed64(value)
+        assert -(1 << 63) <= stored < (1 << 63)
+        assert dedup.from_signed64(stored) == value
+
+def test_empty_job_fingerprint():
+    """Missing fields don't raise, and a posting with no features gets no fingerprint to match on."""
+    assert dedup.job_fingerprint(None, None, None) is None
+    assert dedup.job_fingerprint("!!!", "Inc.", "") is None
@@ -0,0 +1,73 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.services.file_cache import LocalFileCache
+
+# --- Mock Data ---
+
+def create_mock_s3_client(objects: dict) -> MagicMock:
+    """S3 client serving `objects` ({key: (etag, bytes)}) for head_object/download_file."""
+    client = MagicMock()
+    client.head_object.side_effect = lambda Bucket, Key: {"ETag": f'"{objects[Key][0]}"'}
+    def download_file(bucket, key, filename):
+        with open(filename, "wb") as f:
+            f.write(objects[key][1])
+    client.download_file.side_effect = download_file
+    return client
+
+@pytest.fixture
+def s3_objects():
+    return {"resumes/1/cv.pdf": ("etag-1", b"a" * 100), "resumes/2/cv.pdf": ("etag-2", b"b" * 100)}
+
+@pytest.fixture
+def mock_s3_client(s3_objects):
+    client = create_mock_s3_client(s3_objects)
+    with patch('app.services.file_cache.s3.get_s3_client', return_value=client):
+        yield client
+
+# --- Tests ---
+
+def test_repeated_acquire_downloads_once(tmp_path, mock_s3_client):
+    cache = LocalFileCache(tmp_path, max_bytes=10_000)
+
+    first = cache.acquire("resumes/1/cv.pdf")
+    cache.release(first)
+    second = cache.acquire("resumes/1/cv.pdf")
+
+    assert first == second
+    assert second.read_bytes() == b"a" * 100
+    assert second.suffix == ".pdf"
+    mock_s3_client.download_file.assert_called_once() # Second use is a cache hit
+
+def test_new_etag_is_a_new_entry(tmp_path, mock_s3_client, s3_objects):
+    cache = LocalFileCache(tmp_path, max_bytes=10_000)
+    first = cache.acquire("resumes/1/cv.pdf")
+
+    s3_objects["resumes/1/cv.pdf"] = ("etag-1b", b"c" * 100) # Resume re-uploaded
+    second = cache.acquire("resumes/1/cv.pdf")
+
+    assert first != second
+    assert second.read_bytes() == b"c" * 100
+    assert mock_s3_client.download_file.call_count == 2
+
+def test_lru_eviction_skips_pinned_files(tmp_path, mock_s3_client):
+    cache = LocalFileCache(tmp_path, max_bytes=150) # Room for one 100-byte entry
+
+    pinned = cache.acquire("resumes/1/cv.pdf")
+    other = cache.acquire("resumes/2/cv.pdf") # Over budget, but the first entry is still in use
+
+    assert pinned.exists() and other.exists()
+
+    cache.release(pinned)
+    cache.release(other)
+
+    assert not pinned.exists() # Least recently used goes first
+    assert other.exists()
+
+def test_clear_removes_directory(tmp_path, mock_s3_client):
+    cache = LocalFileCache(tmp_path / "cache", max_bytes=10_000)
+    cache.acquire("resumes/1/cv.pdf")
+
+    cache.clear()
+
+    assert not (tmp_path / "cache").exists()
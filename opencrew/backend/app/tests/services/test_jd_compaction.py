@@ -0,0 +1,69 @@
+import pytest
+from unittest.mock import patch
+
+from app.services import jd_compaction
+
+# --- Mock Data ---
+
+MOCK_DESCRIPTION = """About the Role
+We are hiring a backend engineer to build our payments platform.
+
+Responsibilities:
+- Build Python APIs with FastAPI
+- Own PostgreSQL schemas and migrations
+
+Requirements:
+- 5+ years of Python
+- Build Python APIs with FastAPI
+
+Benefits
+Health insurance
+Unlimited PTO
+
+Qualifications:
+- Kubernetes experience is a plus
+
+Acme is an equal opportunity employer and all qualified applicants will receive consideration for employment without regard to race, sex or age.
+"""
+
+@pytest.fixture(autouse=True)
+def estimated_tokens():
+    """Character-based token estimates (no tiktoken download) and an empty compaction cache."""
+    jd_compaction._cache.clear()
+    with patch.object(jd_compaction, '_encoding', return_value=None):
+        yield
+    jd_compaction._cache.clear()
+
+# --- Tests ---
+
+def test_strip_boilerplate_drops_benefits_eeo_and_repeated_bullets():
+    text = jd_compaction.strip_boilerplate(MOCK_DESCRIPTION)
+
+    assert "Health insurance" not in text and "Unlimited PTO" not in text
+    assert "equal opportunity" not in text
+    assert text.count("Build Python APIs with FastAPI") == 1
+    assert "- Kubernetes experience is a plus" in text # Content heading ends the benefits section
+    assert text.startswith("About the Role")
+
+def test_compaction_trims_to_budget_and_counts_savings():
+    compaction = jd_compaction.compact_description(MOCK_DESCRIPTION, max_tokens=30)
+
+    assert compaction.tokens <= 30
+    assert compaction.text.startswith("About the Role")
+    assert compaction.original_tokens == jd_compaction.count_tokens(MOCK_DESCRIPTION)
+    assert compaction.tokens_saved == compaction.original_tokens - compaction.tokens
+
+def test_short_descriptions_pass_through_and_are_cached():
+    description = "Senior Python engineer. Build Python APIs with FastAPI."
+    compaction = jd_compaction.compact_description(description)
+
+    assert compaction.text == description
+    assert compaction.tokens_saved == 0
+    assert jd_compaction.compact_description(description) is compaction # Cached per description
+
+def test_record_reports_tokens_saved_per_call():
+    compaction = jd_compaction.Compaction(text="short", original_tokens=100, tokens=40)
+    with patch.object(jd_compaction.metrics, 'incr') as mock_incr:
+        compaction.record("tailoring", calls=3)
+        jd_compaction.Compaction(text="same", original_tokens=10, tokens=10).record("tailoring") # Nothing saved
+    mock_incr.assert_called_once_with("jd_compaction.tokens_saved", amount=180, call_site="tailoring")
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.services import job_analysis
+
+# --- Mock Data ---
+
+MOCK_DESCRIPTION = "Senior Python engineer. Build Python APIs with FastAPI and PostgreSQL. Kubernetes experience preferred."
+MOCK_LLM_RESPONSE = json.dumps({
+    "summary": "Senior backend role building Python APIs.",
+    "requirements": ["Python", "FastAPI", "PostgreSQL"],
+})
+
+def create_mock_job(description=MOCK_DESCRIPTION, analysis=None, canonical_job_id=None) -> MagicMock:
+    job = MagicMock()
+    job.id = 1
+    job.description = description
+    job.analysis = analysis
+    job.canonical_job_id = canonical_job_id
+    return job
+
+# --- Tests ---
+
+def test_extract_key_terms_ranks_repeated_terms_first():
+    terms = job_analysis.extract_key_terms(MOCK_DESCRIPTION)
+    assert terms[0][0] == "python"
+    assert all(score > job_analysis.KEY_TERM_MIN_SCORE for _, score in terms)
+    assert job_analysis.extract_key_terms("the and of") == [] # Stopwords only
+
+@patch('app.services.job_analysis.resume_tailoring._call_llm', return_value=MOCK_LLM_RESPONSE)
+def test_get_or_compute_analyzes_once_per_job(mock_call_llm):
+    db = MagicMock()
+    job = create_mock_job()
+
+    first = job_analysis.get_or_compute(db, job)
+    assert first["requirements"] == ["Python", "FastAPI", "PostgreSQL"]
+    assert job.analysis == first
+    db.commit.assert_called_once()
+
+    assert job_analysis.get_or_compute(db, job) is first # Stored analysis reused
+    assert mock_call_llm.call_count == 1
+
+    job.description = MOCK_DESCRIPTION + " Go is a plus."
+    job_analysis.get_or_compute(db, job) # Description changed -> recomputed
+    assert mock_call_llm.call_count == 2
+
+@patch('app.services.job_analysis.resume_tailoring._call_llm', return_value=None)
+def test_key_terms_are_stored_when_the_summary_fails(mock_call_llm):
+    db = MagicMock()
+    job = create_mock_job()
+
+    analysis = job_analysis.get_or_compute(db, job)
+
+    assert analysis["key_terms"] and analysis["summary"] is None and not analysis["summarized"]
+    assert job.analysis == analysis
+    assert job_analysis.prompt_context(analysis) is None # Callers fall back to the raw description
+
+    with patch('app.services.job_analysis.extract_key_terms') as mock_extract:
+        assert job_analysis.get_or_compute(db, job, with_summary=False) is analysis # Keywords: no LLM retry
+        assert mock_call_llm.call_count == 1
+
+        mock_call_llm.return_value = MOCK_LLM_RESPONSE
+        completed = job_analysis.get_or_compute(db, job) # Tailoring: summary filled in later
+        mock_extract.assert_not_called() # Stored key terms are reused
+    assert completed["summarized"] and completed["summary"] == "Senior backend role building Python APIs."
+    assert completed["key_terms"] == analysis["key_terms"]
+    assert job.analysis == completed
+
+@patch('app.services.job_analysis.resume_tailoring._call_llm')
+def test_keyword_only_lookup_makes_no_llm_call(mock_call_llm):
+    db = MagicMock()
+    job = create_mock_job()
+
+    analysis = job_analysis.get_or_compute(db, job, with_summary=False)
+
+    assert analysis["key_terms"][0][0] == "python"
+    mock_call_llm.assert_not_called()
+    db.commit.assert_called_once()
+
+@patch('app.services.job_analysis.resume_tailoring._call_llm', return_value=MOCK_LLM_RESPONSE)
+def test_duplicates_share_canonical_analysis(mock_call_llm):
+    canonical = create_mock_job()
+    db = MagicMock()
+    db.get.return_value = canonical
+
+    job_analysis.get_or_compute(db, create_mock_job(canonical_job_id=7))
+
+    db.get.assert_called_once_with(job_analysis.Job, 7)
+    assert canonical.analysis["summary"] == "Senior backend role building Python APIs."
+
+def test_prompt_context_lists_summary_requirements_and_terms():
+    analysis = {"summary": "Backend role.", "requirements": ["Python"], "key_terms": [["python", 0.5], ["fastapi", 0.3]]}
+    context = job_analysis.prompt_context(analysis)
+    assert context.splitlines() == ["Role Summary: Backend role.", "Key Requirements:", "- Python", "Key Terms: python, fastapi"]
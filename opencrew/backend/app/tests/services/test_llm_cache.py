@@ -0,0 +1,51 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.services import llm_cache, resume_tailoring
+
+# --- Tests ---
+
+def test_cache_key_covers_every_input():
+    base = ("gpt-4o", "system", "user", 0.7, 200)
+    key = llm_cache.cache_key(*base)
+    assert key == llm_cache.cache_key(*base) # Stable
+    assert key.startswith(llm_cache.KEY_PREFIX)
+    for i, changed in enumerate(["gpt-4o-mini", "system!", "user!", 0.2, 300]):
+        args = list(base)
+        args[i] = changed
+        assert llm_cache.cache_key(*args) != key
+    assert llm_cache.cache_key(*base, response_format={"type": "json_object"}) != key
+
+@patch('app.services.llm_cache.get_redis', return_value=None)
+def test_without_redis_every_lookup_misses(mock_get_redis):
+    llm_cache.store("llm:resp:k", "value") # No-op
+    assert llm_cache.lookup("llm:resp:k") is None
+
+@patch('app.services.llm_cache.get_redis')
+def test_lookup_and_store(mock_get_redis):
+    client = mock_get_redis.return_value
+    client.pipeline.return_value.execute.return_value = [b"cached", 1]
+    assert llm_cache.lookup("llm:resp:k", call_site="parse") == "cached"
+
+    client.eval.return_value = 2
+    with patch.object(llm_cache.metrics, 'incr') as mock_incr:
+        llm_cache.store("llm:resp:k", "value")
+    mock_incr.assert_called_once_with("llm_cache.evictions", amount=2)
+
+    client.eval.reset_mock()
+    llm_cache.store("llm:resp:k", "") # Empty responses are never cached
+    client.eval.assert_not_called()
+
+def test_call_llm_uses_cache_unless_opted_out():
+    with patch.object(resume_tailoring, '_llm_configured', return_value=True), \
+         patch.object(resume_tailoring.llm_gateway, 'chat_completion') as mock_chat_completion, \
+         patch.object(resume_tailoring.llm_cache, 'lookup', return_value="cached") as mock_lookup, \
+         patch.object(resume_tailoring.llm_cache, 'store') as mock_store:
+        mock_chat_completion.return_value.choices = [MagicMock(message=MagicMock(content="fresh"))]
+
+        assert resume_tailoring._call_llm("system", "user") == "cached"
+        mock_chat_completion.assert_not_called()
+
+        assert resume_tailoring._call_llm("system", "user", use_cache=False) == "fresh"
+        assert mock_lookup.call_count == 1
+        mock_store.assert_not_called()
@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.services import llm_gateway
+
+# --- Helpers ---
+
+def rate_limit_error(headers=None) -> openai.RateLimitError:
+    request = httpx.Request("POST", "https://example.openai.azure.com/chat/completions")
+    return openai.RateLimitError("Too many requests", response=httpx.Response(429, headers=headers, request=request), body=None)
+
+def raw_response(headers=None) -> MagicMock:
+    raw = MagicMock()
+    raw.headers = httpx.Headers(headers or {})
+    raw.parse.return_value = "completion"
+    return raw
+
+@pytest.fixture
+def local_limiter():
+    """Gateway rate limiter on the in-process fallback (no Redis), with no pacing delays."""
+    with patch("app.services.rate_limiter.get_redis", return_value=None), \
+         patch.object(llm_gateway.llm_limiter, 'reserve', return_value=0.0), \
+         patch.object(llm_gateway.llm_limiter, 'penalize', return_value=0.0) as mock_penalize:
+        yield mock_penalize
+
+# --- Tests ---
+
+def test_parse_reset_durations():
+    assert llm_gateway.parse_reset("20ms") == pytest.approx(0.02)
+    assert llm_gateway.parse_reset("1.5s") == 1.5
+    assert llm_gateway.parse_reset("6m0s") == 360
+    assert llm_gateway.parse_reset("12") == 12.0 # Plain seconds
+    assert llm_gateway.parse_reset(None) is None
+
+def test_exhausted_quota_pauses_model(local_limiter):
+    assert llm_gateway.observe_headers("gpt-4o", httpx.Headers({"x-ratelimit-remaining-requests": "5"})) is None
+    local_limiter.assert_not_called()
+
+    llm_gateway.observe_headers("gpt-4o", httpx.Headers({
+        "x-ratelimit-remaining-requests": "3",
+        "x-ratelimit-remaining-tokens": "0",
+        "x-ratelimit-reset-tokens": "2s",
+    }))
+    local_limiter.assert_called_once_with("gpt-4o", retry_after=2.0)
+
+@patch('app.services.llm_gateway.time.sleep')
+def test_chat_completion_retries_throttling(mock_sleep, local_limiter):
+    client = MagicMock()
+    create = client.chat.completions.with_raw_response.create
+    create.side_effect = [rate_limit_error({"retry-after": "3"}), raw_response()]
+
+    with patch.object(llm_gateway, 'get_client', return_value=client):
+        result = llm_gateway.chat_completion([{"role": "user", "content": "hi"}], model="gpt-4o", temperature=0.2)
+
+    assert result == "completion"
+    assert create.call_count == 2
+    create.assert_called_with(model="gpt-4o", messages=[{"role": "user", "content": "hi"}], temperature=0.2)
+    local_limiter.assert_called_once_with("gpt-4o", retry_after=3.0, attempt=0) # Next acquire waits it out
+
+@patch('app.services.llm_gateway.time.sleep')
+def test_chat_completion_gives_up_after_max_retries(mock_sleep, local_limiter):
+    client = MagicMock()
+    request = httpx.Request("POST", "https://example.openai.azure.com/chat/completions")
+    client.chat.completions.with_raw_response.create.side_effect = openai.APIConnectionError(request=request)
+
+    with patch.object(llm_gateway, 'get_client', return_value=client), \
+         patch.object(llm_gateway.settings, 'LLM_MAX_RETRIES', 2):
+        with pytest.raises(openai.APIConnectionError):
+            llm_gateway.chat_completion([], model="gpt-4o")
+
+    assert client.chat.completions.with_raw_response.create.call_count == 3
+    assert mock_sleep.call_count == 2 # Jittered backoff between attempts
+
+def test_non_retryable_errors_are_raised_immediately(local_limiter):
+    client = MagicMock()
+    request = httpx.Request("POST", "https://example.openai.azure.com/chat/completions")
+    client.chat.completions.with_raw_response.create.side_effect = openai.BadRequestError(
+        "bad", response=httpx.Response(400, request=request), body=None)
+
+    with patch.object(llm_gateway, 'get_client', return_value=client):
+        with pytest.raises(openai.BadRequestError):
+            llm_gateway.chat_completion([], model="gpt-4o")
+    assert client.chat.completions.with_raw_response.create.call_count == 1
+
+def test_async_requests_respect_model_concurrency(local_limiter):
+    in_flight, peak = 0, 0
+
+    async def create(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return raw_response()
+
+    client = MagicMock()
+    client.chat.completions.with_raw_response.create = create
+
+    async def run():
+        return await asyncio.gather(*(llm_gateway.chat_completion_async([], model="gpt-4o") for _ in range(6)))
+
+    with patch.object(llm_gateway, 'get_async_client', return_value=client), \
+         patch.object(llm_gateway.settings, 'LLM_MODEL_CONCURRENCY', 2):
+        results = asyncio.run(run())
+
+    assert results == ["completion"] * 6
+    assert peak == 2
+
+def test_base_url_override_serves_every_provider():
+    with patch.object(llm_gateway.settings, 'LLM_BASE_URL', "http://127.0.0.1:8085/v1"), \
+         patch.object(llm_gateway.settings, 'AZURE_OPENAI_DEPLOYMENT_NAME', None):
+        assert llm_gateway.is_configured(llm_gateway.AZURE) and llm_gateway.is_configured(llm_gateway.OPENAI)
+        assert llm_gateway.default_model() == llm_gateway.STANDIN_MODEL
+        client = llm_gateway._sdk_client(llm_gateway.AZURE, httpx.Client(), async_client=False)
+
+    assert type(client) is openai.OpenAI
+    assert str(client.base_url) == "http://127.0.0.1:8085/v1/"
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.services import parse_jobs
+
+# --- Helpers ---
+
+def fake_result(state, info=None) -> MagicMock:
+    result = MagicMock()
+    result.state = state
+    result.info = info
+    return result
+
+def parse_events(chunks):
+    events = []
+    for chunk in chunks:
+        event_line, data_line = chunk.strip().split("\n")
+        events.append((event_line.removeprefix("event: "), json.loads(data_line.removeprefix("data: "))))
+    return events
+
+# --- Tests ---
+
+@patch('app.services.parse_jobs.AsyncResult')
+def test_get_status_maps_celery_states(mock_async_result):
+    mock_async_result.return_value = fake_result("PENDING")
+    assert parse_jobs.get_status("j")["stage"] == "queued"
+
+    mock_async_result.return_value = fake_result("PROGRESS", {"stage": "tailoring", "sections": {"objective": "Obj"}})
+    status = parse_jobs.get_status("j")
+    assert (status["stage"], status["sections"]) == ("tailoring", {"objective": "Obj"})
+
+    mock_async_result.return_value = fake_result("SUCCESS", {"structured_resume": {}, "message": "ok"})
+    assert parse_jobs.get_status("j")["result"] == {"structured_resume": {}, "message": "ok"}
+
+    mock_async_result.return_value = fake_result("FAILURE", ValueError("LLM down"))
+    status = parse_jobs.get_status("j")
+    assert (status["stage"], status["error"]) == ("failed", "LLM down")
+
+@pytest.mark.asyncio
+async def test_stream_events_sends_each_section_once_then_done():
+    statuses = iter([
+        {"state": "PENDING", "stage": "queued", "sections": {}, "result": None, "error": None},
+        {"state": "PROGRESS", "stage": "tailoring", "sections": {"parsed": {}}, "result": None, "error": None},
+        {"state": "PROGRESS", "stage": "tailoring", "sections": {"parsed": {}, "skills": ["Go"]}, "result": None, "error": None},
+        {"state": "SUCCESS", "stage": "done", "sections": {}, "result": {"message": "ok"}, "error": None},
+    ])
+    with patch.object(parse_jobs, 'get_status', side_effect=lambda job_id: next(statuses)), \
+         patch.object(parse_jobs.settings, 'PARSE_JOB_POLL_SECONDS', 0):
+        events = parse_events([chunk async for chunk in parse_jobs.stream_events("j")])
+
+    assert events == [
+        ("stage", {"job_id": "j", "stage": "queued"}),
+        ("stage", {"job_id": "j", "stage": "tailoring"}),
+        ("section", {"name": "parsed", "value": {}}),
+        ("section", {"name": "skills", "value": ["Go"]}),
+        ("stage", {"job_id": "j", "stage": "done"}),
+        ("done", {"message": "ok"}),
+    ]
+
+@pytest.mark.asyncio
+async def test_wait_for_result_times_out():
+    pending = {"state": "STARTED", "stage": "parsing", "sections": {}, "result": None, "error": None}
+    with patch.object(parse_jobs, 'get_status', return_value=pending), \
+         patch.object(parse_jobs.settings, 'PARSE_JOB_POLL_SECONDS', 0.01):
+        with pytest.raises(TimeoutError):
+            await parse_jobs.wait_for_result("j", timeout=0.05)
+
+@patch('app.services.parse_jobs.get_redis')
+def test_ownership_requires_matching_user(mock_get_redis):
+    mock_get_redis.return_value.get.return_value = b"7"
+    assert parse_jobs.is_owner("j", 7)
+    assert not parse_jobs.is_owner("j", 8)
+    mock_get_redis.return_value = None
+    assert not parse_jobs.is_owner("j", 7)
+    assert parse_jobs.register("j", 7) is False
@@ -0,0 +1,71 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.services import pdf_render_cache
+from app.services.file_cache import LocalFileCache
+from app.schemas.resume import StructuredResume, BasicInfo, SkillItem
+
+# --- Mock Data ---
+
+def create_structured_resume(**kwargs) -> StructuredResume:
+    defaults = {
+        "basic": BasicInfo(name="Jane Doe", email="jane@example.com"),
+        "objective": "Backend engineer.",
+        "skills": [SkillItem(category="Languages", skills=["Python", "Go"])],
+    }
+    defaults.update(kwargs)
+    return StructuredResume(**defaults)
+
+def fake_build(resume_data, output_path):
+    with open(output_path, "wb") as f:
+        f.write(b"%PDF-1.4 " + resume_data.basic.name.encode())
+    return output_path
+
+@pytest.fixture
+def render_cache(tmp_path):
+    cache = LocalFileCache(tmp_path, max_bytes=10_000, name="pdf_renders")
+    with patch('app.services.pdf_render_cache.get_render_cache', return_value=cache):
+        yield cache
+
+# --- Tests ---
+
+def test_render_key_is_canonical():
+    resume = create_structured_resume()
+    same_data = StructuredResume(**resume.model_dump()) # Rebuilt object, same content
+
+    assert pdf_render_cache.render_key(resume) == pdf_render_cache.render_key(same_data)
+    assert pdf_render_cache.render_key(resume) != pdf_render_cache.render_key(create_structured_resume(objective="Data engineer."))
+
+    key_v1 = pdf_render_cache.render_key(resume)
+    with patch('app.services.pdf_render_cache.TEMPLATE_VERSION', "2"): # Template change invalidates renders
+        assert pdf_render_cache.render_key(resume) != key_v1
+
+@patch('app.services.pdf_render_cache.s3.is_configured', return_value=False)
+@patch('app.services.pdf_render_cache.get_pdf_generator')
+def test_identical_resume_renders_once(mock_get_generator, mock_s3_configured, render_cache):
+    mock_get_generator.return_value.build_resume_pdf.side_effect = fake_build
+
+    first = pdf_render_cache.acquire_tailored_pdf(create_structured_resume())
+    pdf_render_cache.release_tailored_pdf(first)
+    second = pdf_render_cache.acquire_tailored_pdf(create_structured_resume())
+
+    assert first == second
+    assert second.read_bytes() == b"%PDF-1.4 Jane Doe"
+    mock_get_generator.return_value.build_resume_pdf.assert_called_once()
+
+@patch('app.services.pdf_render_cache.s3.is_configured', return_value=True)
+@patch('app.services.pdf_render_cache.s3.get_s3_client')
+@patch('app.services.pdf_render_cache.get_pdf_generator')
+def test_render_from_another_worker_is_fetched_from_s3(mock_get_generator, mock_get_s3_client, mock_s3_configured, render_cache):
+    def download_file(bucket, key, filename):
+        with open(filename, "wb") as f:
+            f.write(b"%PDF-1.4 from s3")
+    mock_get_s3_client.return_value.download_file.side_effect = download_file
+
+    path = pdf_render_cache.acquire_tailored_pdf(create_structured_resume())
+
+    assert path.read_bytes() == b"%PDF-1.4 from s3"
+    key = pdf_render_cache.render_key(create_structured_resume())
+    assert mock_get_s3_client.return_value.download_file.call_args.args[1] == f"rendered_resumes/{key}.pdf"
+    mock_get_generator.return_value.build_resume_pdf.assert_not_called()
+    mock_get_s3_client.return_value.upload_file.assert_not_called()
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from app.models.application import ApplicationStatus
+from app.schemas.resume import StructuredResume
+from app.services import pre_tailoring
+
+# --- Helpers ---
+
+def create_mock_application(status=ApplicationStatus.PENDING_TRIGGER, tailored_data=None) -> MagicMock:
+    application = MagicMock()
+    application.id = 1
+    application.status = status
+    application.tailored_data = tailored_data
+    application.resume.structured_data = {"objective": "Original"}
+    application.job.description = "Python role"
+    return application
+
+@pytest.fixture
+def mock_db():
+    with patch('app.services.pre_tailoring.SessionLocal') as mock_session_local:
+        yield mock_session_local.return_value
+
+@pytest.fixture(autouse=True)
+def no_rate_limit():
+    with patch.object(pre_tailoring.tailoring_limiter, 'acquire_async', new_callable=AsyncMock) as mock_acquire:
+        yield mock_acquire
+
+# --- Tests ---
+
+@pytest.mark.asyncio
+@patch('app.services.pre_tailoring.pdf_render_cache.prerender', return_value="render-key")
+@patch('app.services.pre_tailoring.resume_tailoring.tailor_content_async', new_callable=AsyncMock)
+@patch('app.services.pre_tailoring.job_analysis.get_or_compute', return_value={"summary": "Backend role.", "key_terms": []})
+async def test_pretailor_stores_tailored_resume_and_render(mock_analysis, mock_tailor, mock_prerender, mock_db):
+    application = create_mock_application()
+    mock_db.query.return_value.filter.return_value.first.return_value = application
+    mock_tailor.return_value = StructuredResume(objective="Tailored")
+
+    assert await pre_tailoring.pretailor_application_async(1) == "tailored"
+
+    structured_resume, job_context = mock_tailor.call_args.args
+    assert structured_resume.objective == "Original"
+    assert job_context == "Role Summary: Backend role." # Shared job analysis, not the raw description
+    assert application.tailored_data["objective"] == "Tailored"
+    mock_prerender.assert_called_once_with(mock_tailor.return_value)
+    mock_db.commit.assert_called_once()
+    mock_db.close.assert_called_once()
+
+@pytest.mark.asyncio
+@patch('app.services.pre_tailoring.resume_tailoring.tailor_content_async', new_callable=AsyncMock)
+async def test_pretailor_skips_applications_not_waiting_or_done(mock_tailor, mock_db):
+    for application in [create_mock_application(status=ApplicationStatus.APPLIED), create_mock_application(tailored_data={"objective": "Done"})]:
+        mock_db.query.return_value.filter.return_value.first.return_value = application
+        assert await pre_tailoring.pretailor_application_async(1) == "skipped"
+    mock_tailor.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_pretailor_many_limits_concurrency():
+    in_flight = max_in_flight = 0
+
+    async def fake_pretailor(application_id):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return "error" if application_id == 3 else "tailored"
+
+    with patch.object(pre_tailoring, 'pretailor_application_async', side_effect=fake_pretailor), \
+         patch.object(pre_tailoring.settings, 'PRETAILOR_CONCURRENCY', 2):
+        summary = await pre_tailoring.pretailor_many_async([1, 2, 3, 4, 5])
+
+    assert max_in_flight == 2
+    assert summary == {"tailored": 4, "skipped": 0, "error": 1}
@@ -0,0 +1,49 @@
+import pytest
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+
+from app.services import quota
+from app.models.user import User, SubscriptionTier
+from sqlalchemy.orm import Session # For mocking
+
+# --- Mock Data ---
+
+def create_mock_user(tier=SubscriptionTier.FREE) -> User:
+    return User(id=1, email="user1@test.com", subscription_tier=tier)
+
+# --- Tests ---
+
+def test_current_period_and_bounds():
+    assert quota.current_period(datetime(2025, 12, 31, 23, 59)) == "2025-12"
+    assert quota._period_bounds("2025-12") == (datetime(2025, 12, 1), datetime(2026, 1, 1))
+
+@patch('app.services.quota._lock_usage_row')
+def test_reserve_grants_only_what_is_left(mock_lock_row):
+    """Concurrent callers are serialized by the row lock; each sees the previous reservation."""
+    mock_db = MagicMock(spec=Session)
+    usage = MagicMock(used=45, reserved=3)
+    mock_lock_row.return_value = usage
+
+    granted = quota.reserve(mock_db, create_mock_user(), count=5)
+
+    assert granted == 2 # 50 - 45 - 3
+    assert usage.reserved == 5
+    mock_db.commit.assert_called_once() # Releases the row lock
+
+    assert quota.reserve(mock_db, create_mock_user(), count=5) == 0 # Nothing left
+
+@patch('app.services.quota._lock_usage_row')
+def test_reserve_unlimited_tier_grants_everything(mock_lock_row):
+    mock_db = MagicMock(spec=Session)
+    usage = MagicMock(used=5000, reserved=0)
+    mock_lock_row.return_value = usage
+
+    assert quota.reserve(mock_db, create_mock_user(SubscriptionTier.ELITE), count=30) == 30
+    assert usage.reserved == 30 # Still tracked for reporting
+
+def test_commit_and_release_ignore_non_positive_counts():
+    mock_db = MagicMock(spec=Session)
+    quota.commit(mock_db, user_id=1, count=0)
+    quota.release(mock_db, user_id=1, count=0)
+    mock_db.execute.assert_not_called()
+    mock_db.query.assert_not_called()
@@ -0,0 +1,56 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.services import rate_limiter
+from app.services.rate_limiter import HostRateLimiter
+
+# --- Fixtures ---
+
+@pytest.fixture
+def local_limiter():
+    """Limiter forced onto the in-process fallback (no Redis)."""
+    with patch("app.services.rate_limiter.get_redis", return_value=None):
+        yield HostRateLimiter(rate_per_second=2.0, burst=2, host_rates={"slow.example.com": 0.5})
+
+# --- Tests ---
+
+def test_parse_retry_after_seconds_and_date():
+    assert rate_limiter.parse_retry_after("12") == 12.0
+    assert rate_limiter.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0 # In the past
+    assert rate_limiter.parse_retry_after("soon") is None
+    assert rate_limiter.parse_retry_after(None) is None
+
+def test_backoff_delay_is_bounded():
+    for attempt in range(10):
+        assert 0 <= rate_limiter.backoff_delay(attempt, base=1.0, cap=5.0) <= 5.0
+
+def test_burst_then_paced(local_limiter):
+    """The first `burst` requests go immediately, the next one waits about one interval."""
+    assert local_limiter.reserve("https://boards.greenhouse.io/a") == 0
+    assert local_limiter.reserve("https://boards.greenhouse.io/b") == 0
+    assert local_limiter.reserve("https://boards.greenhouse.io/c") == pytest.approx(0.5, abs=0.05)
+
+def test_hosts_have_independent_buckets(local_limiter):
+    local_limiter.reserve("https://boards.greenhouse.io/")
+    local_limiter.reserve("https://boards.greenhouse.io/")
+    assert local_limiter.reserve("https://api.lever.co/") == 0
+
+def test_throttle_blocks_host_for_retry_after(local_limiter):
+    blocked = local_limiter.observe("https://api.lever.co/v0/postings/x", 429, {"Retry-After": "5"})
+
+    assert blocked == 5.0
+    assert local_limiter.reserve("https://api.lever.co/v0/postings/y") == pytest.approx(5.0, abs=0.1)
+    assert local_limiter.observe("https://api.lever.co/", 200, {}) is None
+
+@patch("app.services.rate_limiter.time.sleep")
+def test_retried_responses_are_closed(mock_sleep, local_limiter):
+    throttled, ok = MagicMock(status_code=503, headers={}), MagicMock(status_code=200, headers={})
+    session = MagicMock()
+    session.request.side_effect = [throttled, ok]
+
+    with patch.object(local_limiter, 'acquire'):
+        response = rate_limiter.request_with_retries("GET", "https://boards.greenhouse.io/x", session=session, limiter=local_limiter, stream=True)
+
+    assert response is ok
+    throttled.close.assert_called_once() # Its pooled connection is released before the retry
+    ok.close.assert_not_called()
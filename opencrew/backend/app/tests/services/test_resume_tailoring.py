@@ -1,6 +1,6 @@
 import pytest
 import json
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from app.schemas.resume import BasicInfo, SkillItem, StructuredResume, PdfTextItem, ExperienceItem
 from app.services.resume_tailoring import process_and_tailor_resume
 
@@ -54,6 +54,19 @@ mock_llm_tailor_experience_response = "- Led development of feature X relevant t
 # Mock job description
 mock_job_description = "Seeking a Python developer with Docker experience at TargetCorp."
 
+def tailoring_responses(objective, skills, experience):
+    """Side effect for _call_llm_async that answers each section by its prompt, not by call order.
+
+    Section calls run concurrently, so the order they reach the mock is not guaranteed.
+    """
+    async def respond(system_prompt, user_prompt, **kwargs):
+        if "objective/summary" in system_prompt:
+            return objective
+        if "skill list" in system_prompt:
+            return skills
+        return experience
+    return respond
+
 
 # --- Test Cases ---
 
@@ -75,33 +88,37 @@ def test_process_and_tailor_success_parsing_only(mock_call_llm: MagicMock):
     assert result.experiences[0].highlights == ["Developed feature X"] # Original highlights
     assert len(result.skills) == 3
 
+@patch('app.services.resume_tailoring._llm_configured', return_value=True)
+@patch('app.services.resume_tailoring._call_llm_async', new_callable=AsyncMock)
 @patch('app.services.resume_tailoring._call_llm')
-def test_process_and_tailor_success_with_tailoring(mock_call_llm: MagicMock):
+def test_process_and_tailor_success_with_tailoring(mock_call_llm: MagicMock, mock_call_llm_async: AsyncMock, mock_configured: MagicMock):
     """Test successful parsing and tailoring when job description is provided."""
     # Mock LLM responses: First for parsing, then for each tailoring step
-    mock_call_llm.side_effect = [
-        mock_llm_parse_success_json,          # 1. Parsing result
-        mock_llm_tailor_objective_response,   # 2. Tailor objective
-        mock_llm_tailor_skills_response,      # 3. Tailor skills
-        mock_llm_tailor_experience_response   # 4. Tailor experience 1
-    ]
+    mock_call_llm.return_value = mock_llm_parse_success_json # 1. Parsing result
+    mock_call_llm_async.side_effect = tailoring_responses( # Tailoring calls, keyed on section prompt
+        objective=mock_llm_tailor_objective_response,
+        skills=mock_llm_tailor_skills_response,
+        experience=mock_llm_tailor_experience_response,
+    )
 
     result = process_and_tailor_resume(text_items=mock_text_items, job_description=mock_job_description)
 
     # Assertions
     assert isinstance(result, StructuredResume)
-    assert mock_call_llm.call_count == 4 # Parsing + objective + skills + 1 experience
+    assert mock_call_llm.call_count == 1 # Parsing
+    assert mock_call_llm_async.call_count == 3 # Objective + skills + 1 experience
     assert result.basic.name == "John Doe"
     # Check tailored content
     assert result.objective == mock_llm_tailor_objective_response
     assert len(result.skills) == 1 # Only one category returned
-    assert result.skills[0].category == "Relevant Skills"
+    assert result.skills[0].category == "Relevant Skills (Tailored)"
     assert set(result.skills[0].skills) == {"Python", "Docker"}
     assert len(result.experiences) == 1
     assert result.experiences[0].highlights == [mock_llm_tailor_experience_response] # Should be list of strings
 
+@patch('app.services.resume_tailoring._call_llm_async', new_callable=AsyncMock, return_value=None)
 @patch('app.services.resume_tailoring._call_llm')
-def test_process_and_tailor_llm_parsing_error(mock_call_llm: MagicMock):
+def test_process_and_tailor_llm_parsing_error(mock_call_llm: MagicMock, mock_call_llm_async: AsyncMock):
     """Test handling when the LLM parsing call fails (returns None)."""
     mock_call_llm.return_value = None # Simulate LLM failure during parsing
 
@@ -109,7 +126,8 @@ def test_process_and_tailor_llm_parsing_error(mock_call_llm: MagicMock):
 
     assert isinstance(result, StructuredResume)
     assert mock_call_llm.call_count == 1 # Only parsing call attempted
-    assert result.objective == "Failed to parse resume content via LLM."
+    assert result.objective == "Failed to parse resume content via LLM (empty response)."
+    mock_call_llm_async.assert_not_called() # Tailoring is skipped after a failed parse
     assert result.basic is not None # Basic should exist but be empty
     assert result.experiences is None # Other fields should be None or empty
 
@@ -179,66 +197,187 @@ def test_preprocess_text_items_sorting(mock_call_llm: MagicMock):
     assert expected_joined_text in user_prompt
 
 
+@patch('app.services.resume_tailoring._llm_configured', return_value=True)
+@patch('app.services.resume_tailoring._call_llm_async', new_callable=AsyncMock)
 @patch('app.services.resume_tailoring._call_llm')
-def test_process_and_tailor_objective_tailoring_fails(mock_call_llm: MagicMock):
+def test_process_and_tailor_objective_tailoring_fails(mock_call_llm: MagicMock, mock_call_llm_async: AsyncMock, mock_configured: MagicMock):
     """Test behavior when objective tailoring fails but others succeed."""
     original_objective = "Original Software Engineer Objective"
     parsed_json_with_orig_obj = json.dumps({
         "basic": {"name": "Test User"}, "objective": original_objective, "skills": [{"category": "A", "skills": ["Python"]}], "experiences": [{"company":"Comp", "position": "Dev", "highlights": ["Did X"]}]
     })
-    mock_call_llm.side_effect = [
-        parsed_json_with_orig_obj,    # 1. Parsing success
-        None,                         # 2. Tailor objective FAILS
-        "Python",                     # 3. Tailor skills success
-        "Did X tailored"              # 4. Tailor experience success
-    ]
+    mock_call_llm.return_value = parsed_json_with_orig_obj # 1. Parsing success
+    mock_call_llm_async.side_effect = tailoring_responses(objective=None, skills="Python", experience="Did X tailored") # Objective FAILS
 
     result = process_and_tailor_resume(text_items=mock_text_items, job_description=mock_job_description)
 
-    assert mock_call_llm.call_count == 4
+    assert mock_call_llm.call_count == 1
+    assert mock_call_llm_async.call_count == 3
     assert result.objective == original_objective # Objective should remain original
     assert result.skills[0].skills == ["Python"] # Skills should be tailored
     assert result.experiences[0].highlights == ["Did X tailored"] # Experience should be tailored
 
+@patch('app.services.resume_tailoring._llm_configured', return_value=True)
+@patch('app.services.resume_tailoring._call_llm_async', new_callable=AsyncMock)
 @patch('app.services.resume_tailoring._call_llm')
-def test_process_and_tailor_skills_tailoring_fails(mock_call_llm: MagicMock):
+def test_process_and_tailor_skills_tailoring_fails(mock_call_llm: MagicMock, mock_call_llm_async: AsyncMock, mock_configured: MagicMock):
     """Test behavior when skills tailoring fails but others succeed."""
     original_skills = [{"category": "Original Category", "skills": ["SkillA", "SkillB"]}]
     parsed_json_with_orig_skills = json.dumps({
         "basic": {"name": "Test User"}, "objective": "Obj", "skills": original_skills, "experiences": [{"company":"Comp", "position": "Dev", "highlights": ["Did X"]}]
     })
-    mock_call_llm.side_effect = [
-        parsed_json_with_orig_skills,    # 1. Parsing success
-        "Tailored Obj",                # 2. Tailor objective success
-        None,                          # 3. Tailor skills FAILS
-        "Did X tailored"               # 4. Tailor experience success
-    ]
+    mock_call_llm.return_value = parsed_json_with_orig_skills # 1. Parsing success
+    mock_call_llm_async.side_effect = tailoring_responses(objective="Tailored Obj", skills=None, experience="Did X tailored") # Skills FAIL
 
     result = process_and_tailor_resume(text_items=mock_text_items, job_description=mock_job_description)
 
-    assert mock_call_llm.call_count == 4
+    assert mock_call_llm.call_count == 1
+    assert mock_call_llm_async.call_count == 3
     assert result.objective == "Tailored Obj" # Objective should be tailored
-    assert result.skills == original_skills # Skills should remain original
+    assert [skill.model_dump() for skill in result.skills] == original_skills # Skills should remain original
     assert result.experiences[0].highlights == ["Did X tailored"] # Experience should be tailored
 
 
+@patch('app.services.resume_tailoring._llm_configured', return_value=True)
+@patch('app.services.resume_tailoring._call_llm_async', new_callable=AsyncMock)
 @patch('app.services.resume_tailoring._call_llm')
-def test_process_and_tailor_experience_tailoring_fails(mock_call_llm: MagicMock):
+def test_process_and_tailor_experience_tailoring_fails(mock_call_llm: MagicMock, mock_call_llm_async: AsyncMock, mock_configured: MagicMock):
     """Test behavior when experience tailoring fails but others succeed."""
     original_highlights = ["Original Highlight 1"]
     parsed_json_with_orig_exp = json.dumps({
         "basic": {"name": "Test User"}, "objective": "Obj", "skills": [{"category": "A", "skills": ["Python"]}], "experiences": [{"company":"Comp", "position": "Dev", "highlights": original_highlights}]
     })
-    mock_call_llm.side_effect = [
-        parsed_json_with_orig_exp,    # 1. Parsing success
-        "Tailored Obj",               # 2. Tailor objective success
-        "Python",                     # 3. Tailor skills success
-        None                          # 4. Tailor experience FAILS
-    ]
+    mock_call_llm.return_value = parsed_json_with_orig_exp # 1. Parsing success
+    mock_call_llm_async.side_effect = tailoring_responses(objective="Tailored Obj", skills="Python", experience=None) # Experience FAILS
 
     result = process_and_tailor_resume(text_items=mock_text_items, job_description=mock_job_description)
 
-    assert mock_call_llm.call_count == 4
+    assert mock_call_llm.call_count == 1
+    assert mock_call_llm_async.call_count == 3
     assert result.objective == "Tailored Obj" # Objective should be tailored
     assert result.skills[0].skills == ["Python"] # Skills should be tailored
-    assert result.experiences[0].highlights == original_highlights # Experience should remain original
\ No newline at end of file
+    assert result.experiences[0].highlights == original_highlights # Experience should remain original
+
+@patch('app.services.resume_tailoring._llm_configured', return_value=True)
+def test_tailoring_calls_run_concurrently_under_the_limit(mock_configured: MagicMock):
+    """Section calls overlap (up to LLM_TAILOR_CONCURRENCY) and results land in their own sections."""
+    import asyncio
+    from app.services import resume_tailoring
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_call(system_prompt, user_prompt, temperature=0.7, max_tokens=200, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if "objective/summary" in system_prompt:
+            return "Tailored objective"
+        if "skill list" in system_prompt:
+            return "Python"
+        return user_prompt.split("---\n")[1].split("\n")[0] + " (tailored)" # Echo the first original bullet
+
+    resume = StructuredResume(
+        objective="Obj",
+        skills=[SkillItem(category="A", skills=["Python", "Go"])],
+        experiences=[ExperienceItem(company=f"C{i}", position="Dev", highlights=[f"Did {i}"]) for i in range(5)],
+    )
+    with patch.object(resume_tailoring, '_call_llm_async', side_effect=fake_call), \
+         patch.object(resume_tailoring.settings, 'LLM_TAILOR_CONCURRENCY', 3):
+        result = resume_tailoring.tailor_content(resume, mock_job_description)
+
+    assert max_in_flight == 3
+    assert result.objective == "Tailored objective"
+    assert result.skills[0].skills == ["Python"]
+    assert [exp.highlights for exp in result.experiences] == [[f"Did {i} (tailored)"] for i in range(5)]
+
+
+def test_parse_response_format_is_a_strict_schema():
+    """Structured output needs every property required and no extra properties, at every level."""
+    from app.services import resume_tailoring
+
+    response_format = resume_tailoring._parse_response_format()
+    schema = response_format["json_schema"]["schema"]
+    assert response_format["json_schema"]["strict"] is True
+    for node in [schema, *schema["$defs"].values()]:
+        assert node["additionalProperties"] is False
+        assert node["required"] == list(node["properties"])
+    assert "default" not in json.dumps(schema)
+
+
+@patch('app.services.resume_tailoring._call_llm')
+def test_parse_uses_structured_output(mock_call_llm: MagicMock):
+    from app.services import resume_tailoring
+
+    mock_call_llm.return_value = mock_llm_parse_success_json
+    with patch.object(resume_tailoring.settings, 'LLM_STRUCTURED_OUTPUT', True):
+        process_and_tailor_resume(text_items=mock_text_items, job_description=None)
+    assert mock_call_llm.call_args.kwargs["response_format"]["type"] == "json_schema"
+    assert "class StructuredResume" not in mock_call_llm.call_args.args[0]
+
+    with patch.object(resume_tailoring.settings, 'LLM_STRUCTURED_OUTPUT', False):
+        process_and_tailor_resume(text_items=mock_text_items, job_description=None)
+    assert mock_call_llm.call_args.kwargs["response_format"] is None
+    assert "class StructuredResume" in mock_call_llm.call_args.args[0] # Schema described in the prompt instead
+
+
+@patch('app.services.resume_tailoring._call_llm_async', new_callable=AsyncMock)
+@patch('app.services.resume_tailoring._call_llm')
+def test_long_resume_is_parsed_in_chunks_and_merged(mock_call_llm: MagicMock, mock_call_llm_async: AsyncMock):
+    from app.services import resume_tailoring
+
+    resume_text = "\n".join([
+        "Jane Doe", "jane@example.com", "Summary", "Engineer. " * 10,
+        "Experience", "Acme - Developer\n" + "- Shipped things\n" * 10,
+        "Education", "State University\n" * 5,
+    ])
+    mock_call_llm_async.side_effect = [
+        json.dumps({"basic": {"name": "Jane Doe", "email": "jane@example.com"}, "objective": "Engineer."}),
+        json.dumps({"basic": None, "objective": None, "experiences": [{"company": "Acme", "position": "Developer"}]}),
+        json.dumps({"basic": {"name": None, "location": "Berlin"}, "education": [{"institution": "State University"}]}),
+    ]
+
+    with patch.object(resume_tailoring.settings, 'RESUME_PARSE_CHUNK_CHARS', 200):
+        result = resume_tailoring._parse_resume_with_llm(resume_text)
+
+    mock_call_llm.assert_not_called()
+    assert mock_call_llm_async.call_count == 3
+    assert "part 1 of 3" in mock_call_llm_async.call_args_list[0].args[0]
+    assert (result.basic.name, result.basic.email, result.basic.location) == ("Jane Doe", "jane@example.com", "Berlin")
+    assert result.objective == "Engineer."
+    assert [exp.company for exp in result.experiences] == ["Acme"]
+    assert [edu.institution for edu in result.education] == ["State University"]
+
+
+@patch('app.services.resume_tailoring._llm_configured', return_value=True)
+@patch('app.services.resume_tailoring._call_llm_async', new_callable=AsyncMock)
+def test_retailoring_only_regenerates_changed_sections(mock_call_llm_async: AsyncMock, mock_configured: MagicMock):
+    """Sections whose content, job context and prompt version are unchanged come from the memo."""
+    from app.services import resume_tailoring
+
+    memo = {}
+    mock_call_llm_async.side_effect = lambda system_prompt, user_prompt, **kwargs: f"tailored {len(memo)}"
+
+    def make_resume(first_highlight):
+        return StructuredResume(
+            objective="Obj",
+            experiences=[ExperienceItem(company="A", position="Dev", highlights=[first_highlight]),
+                         ExperienceItem(company="B", position="Dev", highlights=["Did B"])],
+        )
+
+    with patch.object(resume_tailoring.llm_cache, 'lookup', side_effect=lambda key, call_site: memo.get(key)), \
+         patch.object(resume_tailoring.llm_cache, 'store', side_effect=memo.__setitem__):
+        reused = []
+        resume_tailoring.tailor_content(make_resume("Did A"), mock_job_description, reused_sections=reused)
+        assert reused == [] and mock_call_llm_async.call_count == 3
+
+        reused = []
+        result = resume_tailoring.tailor_content(make_resume("Did A, edited"), mock_job_description, reused_sections=reused)
+        assert sorted(reused) == ["experiences.1", "objective"]
+        assert mock_call_llm_async.call_count == 4 # Only the edited experience was sent again
+        assert result.experiences[1].highlights == [memo[resume_tailoring._section_memo_key("experiences", "Did B", mock_job_description)]]
+
+        resume_tailoring.tailor_content(make_resume("Did A"), "A different job")
+        assert mock_call_llm_async.call_count == 7 # New job context: nothing reused
@@ -0,0 +1,64 @@
+import io
+import json
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.services import scraping
+
+# --- Mock Data ---
+
+MOCK_GREENHOUSE_PAYLOAD = {
+    "jobs": [
+        {
+            "id": 1,
+            "title": "Backend Engineer",
+            "absolute_url": "https://boards.greenhouse.io/stripe/jobs/1",
+            "location": {"name": "Remote"},
+            "updated_at": "2024-05-01T10:00:00Z",
+            "content": "&lt;h2&gt;About&lt;/h2&gt;&lt;p&gt;Build &amp;amp; run payments.&lt;/p&gt;",
+        },
+        {"id": 2, "title": None, "absolute_url": None, "content": ""}, # Skipped: no title/URL
+        {
+            "id": 3,
+            "title": "Data Engineer",
+            "absolute_url": "https://boards.greenhouse.io/stripe/jobs/3",
+            "location": None,
+            "content": "&lt;ul&gt;&lt;li&gt;SQL&lt;/li&gt;&lt;li&gt;Spark&lt;/li&gt;&lt;/ul&gt;",
+        },
+    ],
+    "meta": {"total": 3},
+}
+
+def _streaming_response(payload: bytes) -> MagicMock:
+    response = MagicMock()
+    response.raw = io.BytesIO(payload)
+    response.__enter__.return_value = response
+    return response
+
+# --- Tests ---
+
+def test_html_to_text_unescapes_greenhouse_content():
+    text = scraping.html_to_text(MOCK_GREENHOUSE_PAYLOAD["jobs"][0]["content"])
+    assert text == "About\nBuild & run payments."
+    assert scraping.html_to_text(None) == ""
+
+@patch('app.services.scraping.request_with_retries')
+def test_iter_greenhouse_jobs_streams_payload(mock_request):
+    mock_request.return_value = _streaming_response(json.dumps(MOCK_GREENHOUSE_PAYLOAD).encode())
+
+    with patch.object(scraping.settings, 'SCRAPER_HTML_BATCH_SIZE', 2): # Force more than one batch
+        jobs = list(scraping.iter_greenhouse_jobs("stripe"))
+
+    assert [job.title for job in jobs] == ["Backend Engineer", "Data Engineer"]
+    assert jobs[1].description == "SQL\nSpark"
+    assert jobs[1].location == "N/A"
+    assert mock_request.call_args.kwargs["stream"] is True
+
+@patch('app.services.scraping.request_with_retries')
+def test_iter_greenhouse_jobs_truncated_payload_raises(mock_request):
+    payload = json.dumps(MOCK_GREENHOUSE_PAYLOAD).encode()
+    mock_request.return_value = _streaming_response(payload[: len(payload) // 2])
+
+    with pytest.raises(scraping.ScrapeError):
+        list(scraping.iter_greenhouse_jobs("stripe", raise_on_error=True))
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.workers import async_runtime
+
+# --- Tests ---
+
+def test_run_sync_reuses_one_loop_across_calls():
+    async def current_loop():
+        return asyncio.get_running_loop(), threading.current_thread().name
+
+    first_loop, thread_name = async_runtime.run_sync(current_loop())
+    second_loop, _ = async_runtime.run_sync(current_loop())
+
+    assert first_loop is second_loop # State bound to the loop survives between tasks
+    assert thread_name == "worker-event-loop"
+    async_runtime.shutdown()
+
+def test_run_sync_propagates_exceptions():
+    async def boom():
+        raise ValueError("agent failed")
+
+    with pytest.raises(ValueError):
+        async_runtime.run_sync(boom())
+    async_runtime.shutdown()
+
+def test_shutdown_runs_hooks_on_the_loop():
+    calls = []
+
+    async def hook():
+        calls.append(asyncio.get_running_loop())
+
+    loop = async_runtime.get_loop()
+    async_runtime.register_shutdown_hook(hook)
+    try:
+        async_runtime.shutdown()
+    finally:
+        async_runtime._shutdown_hooks.remove(hook)
+
+    assert calls == [loop]
+    assert loop.is_closed()
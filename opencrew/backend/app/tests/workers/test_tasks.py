@@ -1,13 +1,15 @@
 import pytest
 from unittest.mock import patch, MagicMock
+from celery.exceptions import SoftTimeLimitExceeded
 
 # Assume tasks and dependencies are importable
 from app.workers import tasks
 from app.models.job import Job
 from app.models.resume import Resume
 from app.models.user import User, SubscriptionTier
+from app.models.application import ApplicationStatus
 from app.schemas.application import ApplicationCreate # Import the schema used
-from app.db.session import SessionLocal # For mocking Session type
+from sqlalchemy.orm import Session # For mocking
 
 # --- Mock Data ---
 
@@ -24,33 +26,47 @@ mock_resume_with_embedding = Resume(
     original_filepath="path/to/resume.pdf"
 )
 
-mock_job_1 = Job(id=MOCK_JOB_ID_1, title="Job 1", company_name="Comp A")
-mock_job_2 = Job(id=MOCK_JOB_ID_2, title="Job 2", company_name="Comp B")
+mock_job_1 = Job(id=MOCK_JOB_ID_1, title="Job 1", company="Comp A")
+mock_job_2 = Job(id=MOCK_JOB_ID_2, title="Job 2", company="Comp B")
 
 mock_matched_jobs = [mock_job_1, mock_job_2]
 
 # --- Test Cases ---
 
+@pytest.fixture(autouse=True)
+def pretailoring_unavailable():
+    """Matched applications go straight to the scheduler unless a test enables pre-tailoring."""
+    with patch('app.workers.tasks.pre_tailoring.is_available', return_value=False) as mock_available:
+        yield mock_available
+
+@pytest.fixture(autouse=True)
+def scheduler_unavailable():
+    """Without Redis the scheduler declines, and applications are published directly as batches."""
+    with patch('app.workers.tasks.apply_scheduler.enqueue', return_value=False) as mock_enqueue:
+        yield mock_enqueue
+
 @patch('app.workers.tasks.SessionLocal')
 @patch('app.workers.tasks.crud.resume.get_resume')
 @patch('app.workers.tasks.matching.search_similar_jobs')
-@patch('app.workers.tasks.crud.application.get_application_by_details')
-@patch('app.workers.tasks.autosubmit.check_user_quota')
-@patch('app.workers.tasks.crud.application.create_application')
-@patch('app.workers.tasks.trigger_auto_apply.delay')
+@patch('app.workers.tasks.crud.application.get_existing_application_job_ids')
+@patch('app.workers.tasks.crud.user.get_user')
+@patch('app.workers.tasks.quota.reserve')
+@patch('app.workers.tasks.crud.application.bulk_create_applications')
+@patch('app.workers.tasks.group')
 def test_process_user_job_matches_quota_exceeded(
-    mock_trigger_delay, mock_create_app, mock_check_quota, mock_get_app_details,
+    mock_group, mock_bulk_create, mock_reserve_quota, mock_get_user, mock_get_existing,
     mock_search_jobs, mock_get_resume, mock_session_local):
     """
     Test process_user_job_matches when user quota is exceeded for all matched jobs.
     """
     # Setup Mocks
-    mock_db_instance = MagicMock(spec=SessionLocal)
+    mock_db_instance = MagicMock(spec=Session)
     mock_session_local.return_value = mock_db_instance
     mock_get_resume.return_value = mock_resume_with_embedding
     mock_search_jobs.return_value = mock_matched_jobs
-    mock_get_app_details.return_value = None # Assume no existing applications
-    mock_check_quota.return_value = (False, "Quota Exceeded") # Simulate quota check failing
+    mock_get_existing.return_value = set() # Assume no existing applications
+    mock_get_user.return_value = MagicMock(id=MOCK_USER_ID)
+    mock_reserve_quota.return_value = 0 # No applications left this month
 
     # Execute Task
     tasks.process_user_job_matches(user_id=MOCK_USER_ID, resume_id=MOCK_RESUME_ID)
@@ -58,61 +74,52 @@ def test_process_user_job_matches_quota_exceeded(
     # Assertions
     mock_get_resume.assert_called_once_with(mock_db_instance, resume_id=MOCK_RESUME_ID, owner_id=MOCK_USER_ID)
     mock_search_jobs.assert_called_once_with(db=mock_db_instance, resume_embedding=mock_resume_with_embedding.embedding, user_id=MOCK_USER_ID)
-    assert mock_get_app_details.call_count == len(mock_matched_jobs) # Check existing app for each match
-    assert mock_check_quota.call_count == len(mock_matched_jobs) # Check quota for each match
-    mock_create_app.assert_not_called() # No applications should be created
-    mock_trigger_delay.assert_not_called() # No triggers should be sent
-    mock_db_instance.commit.assert_not_called() # No successful commit expected
+    mock_get_existing.assert_called_once_with(mock_db_instance, user_id=MOCK_USER_ID, job_ids=[MOCK_JOB_ID_1, MOCK_JOB_ID_2])
+    mock_reserve_quota.assert_called_once_with(mock_db_instance, mock_get_user.return_value, count=2) # One reservation for the whole match set
+    mock_bulk_create.assert_not_called() # No applications should be created
+    mock_group.assert_not_called() # No triggers should be sent
     mock_db_instance.close.assert_called_once() # Session should always be closed
 
 
 @patch('app.workers.tasks.SessionLocal')
 @patch('app.workers.tasks.crud.resume.get_resume')
 @patch('app.workers.tasks.matching.search_similar_jobs')
-@patch('app.workers.tasks.crud.application.get_application_by_details')
-@patch('app.workers.tasks.autosubmit.check_user_quota')
-@patch('app.workers.tasks.crud.application.create_application')
-@patch('app.workers.tasks.trigger_auto_apply.delay')
+@patch('app.workers.tasks.crud.application.get_existing_application_job_ids')
+@patch('app.workers.tasks.crud.user.get_user')
+@patch('app.workers.tasks.quota.reserve')
+@patch('app.workers.tasks.crud.application.bulk_create_applications')
+@patch('app.workers.tasks.group')
 def test_process_user_job_matches_happy_path(
-    mock_trigger_delay, mock_create_app, mock_check_quota, mock_get_app_details,
+    mock_group, mock_bulk_create, mock_reserve_quota, mock_get_user, mock_get_existing,
     mock_search_jobs, mock_get_resume, mock_session_local):
     """
     Test process_user_job_matches happy path where quota is available and apps are created/triggered.
     """
     # Setup Mocks
-    mock_db_instance = MagicMock(spec=SessionLocal)
+    mock_db_instance = MagicMock(spec=Session)
     mock_session_local.return_value = mock_db_instance
     mock_get_resume.return_value = mock_resume_with_embedding
     mock_search_jobs.return_value = mock_matched_jobs
-    mock_get_app_details.return_value = None # Assume no existing applications
-    mock_check_quota.return_value = (True, "Quota Available") # Simulate quota check passing
-
-    # Mock the return value of create_application
-    mock_new_app_1 = MagicMock(id=1001)
-    mock_new_app_2 = MagicMock(id=1002)
-    mock_create_app.side_effect = [mock_new_app_1, mock_new_app_2]
+    mock_get_existing.return_value = set()
+    mock_get_user.return_value = MagicMock(id=MOCK_USER_ID)
+    mock_reserve_quota.return_value = 2
+    mock_bulk_create.return_value = [1001, 1002]
 
     # Execute Task
     tasks.process_user_job_matches(user_id=MOCK_USER_ID, resume_id=MOCK_RESUME_ID)
 
     # Assertions
-    mock_get_resume.assert_called_once()
-    mock_search_jobs.assert_called_once()
-    assert mock_get_app_details.call_count == len(mock_matched_jobs)
-    assert mock_check_quota.call_count == len(mock_matched_jobs)
-    assert mock_create_app.call_count == len(mock_matched_jobs) # App created for each match
-    # Check arguments passed to create_application for the first call
-    create_call_args_list = mock_create_app.call_args_list
-    assert create_call_args_list[0][1]['user_id'] == MOCK_USER_ID
-    assert isinstance(create_call_args_list[0][1]['application'], ApplicationCreate)
-    assert create_call_args_list[0][1]['application'].resume_id == MOCK_RESUME_ID
-    assert create_call_args_list[0][1]['application'].job_id == MOCK_JOB_ID_1
-
-    assert mock_trigger_delay.call_count == len(mock_matched_jobs) # Trigger sent for each new app
-    # Check arguments passed to trigger_auto_apply.delay for the first call
-    trigger_call_args_list = mock_trigger_delay.call_args_list
-    assert trigger_call_args_list[0][1]['application_id'] == mock_new_app_1.id
-    assert trigger_call_args_list[1][1]['application_id'] == mock_new_app_2.id
+    mock_bulk_create.assert_called_once() # One insert for all matches
+    bulk_kwargs = mock_bulk_create.call_args.kwargs
+    assert bulk_kwargs['user_id'] == MOCK_USER_ID
+    assert all(isinstance(app_in, ApplicationCreate) for app_in in bulk_kwargs['applications_in'])
+    assert [app_in.job_id for app_in in bulk_kwargs['applications_in']] == [MOCK_JOB_ID_1, MOCK_JOB_ID_2]
+    assert bulk_kwargs['applications_in'][0].resume_id == MOCK_RESUME_ID
+
+    # One group publish of batch signatures covering every new application
+    signatures = list(mock_group.call_args.args[0])
+    assert [sig.kwargs['application_ids'] for sig in signatures] == [[1001, 1002]]
+    mock_group.return_value.apply_async.assert_called_once()
 
     mock_db_instance.close.assert_called_once()
 
@@ -120,49 +127,304 @@ def test_process_user_job_matches_happy_path(
 @patch('app.workers.tasks.SessionLocal')
 @patch('app.workers.tasks.crud.resume.get_resume')
 @patch('app.workers.tasks.matching.search_similar_jobs')
-@patch('app.workers.tasks.crud.application.get_application_by_details')
-@patch('app.workers.tasks.autosubmit.check_user_quota')
-@patch('app.workers.tasks.crud.application.create_application')
-@patch('app.workers.tasks.trigger_auto_apply.delay')
+@patch('app.workers.tasks.crud.application.get_existing_application_job_ids')
+@patch('app.workers.tasks.crud.user.get_user')
+@patch('app.workers.tasks.quota.reserve')
+@patch('app.workers.tasks.crud.application.bulk_create_applications')
+@patch('app.workers.tasks.group')
 def test_process_user_job_matches_some_existing_apps(
-    mock_trigger_delay, mock_create_app, mock_check_quota, mock_get_app_details,
+    mock_group, mock_bulk_create, mock_reserve_quota, mock_get_user, mock_get_existing,
     mock_search_jobs, mock_get_resume, mock_session_local):
     """
     Test process_user_job_matches when some applications already exist.
     """
      # Setup Mocks
-    mock_db_instance = MagicMock(spec=SessionLocal)
+    mock_db_instance = MagicMock(spec=Session)
     mock_session_local.return_value = mock_db_instance
     mock_get_resume.return_value = mock_resume_with_embedding
     mock_search_jobs.return_value = mock_matched_jobs
     # Simulate first app exists, second doesn't
-    mock_get_app_details.side_effect = [MagicMock(), None]
-    mock_check_quota.return_value = (True, "Quota Available") # Quota available for the second app
-
-    mock_new_app_2 = MagicMock(id=1002)
-    mock_create_app.return_value = mock_new_app_2 # Only called once for the second job
+    mock_get_existing.return_value = {MOCK_JOB_ID_1}
+    mock_get_user.return_value = MagicMock(id=MOCK_USER_ID)
+    mock_reserve_quota.return_value = 1
+    mock_bulk_create.return_value = [1002]
 
     # Execute Task
     tasks.process_user_job_matches(user_id=MOCK_USER_ID, resume_id=MOCK_RESUME_ID)
 
     # Assertions
-    assert mock_get_app_details.call_count == len(mock_matched_jobs)
-    assert mock_check_quota.call_count == 1 # Only called for the second job
-    assert mock_create_app.call_count == 1 # Only called for the second job
-    # Check args for the single call
-    create_call_args_list = mock_create_app.call_args_list
-    assert create_call_args_list[0][1]['application'].job_id == MOCK_JOB_ID_2
+    applications_in = mock_bulk_create.call_args.kwargs['applications_in']
+    assert [app_in.job_id for app_in in applications_in] == [MOCK_JOB_ID_2] # Only the second job
+    signatures = list(mock_group.call_args.args[0])
+    assert [sig.kwargs['application_ids'] for sig in signatures] == [[1002]]
+
+    mock_db_instance.close.assert_called_once()
+
+
+@patch('app.workers.tasks.SessionLocal')
+@patch('app.workers.tasks.crud.resume.get_resume')
+@patch('app.workers.tasks.matching.search_similar_jobs')
+@patch('app.workers.tasks.crud.application.get_existing_application_job_ids')
+@patch('app.workers.tasks.crud.user.get_user')
+@patch('app.workers.tasks.quota.reserve')
+@patch('app.workers.tasks.crud.application.bulk_create_applications')
+@patch('app.workers.tasks.crud.application.bulk_update_application_status')
+@patch('app.workers.tasks.quota.release')
+@patch('app.workers.tasks.group')
+def test_process_user_job_matches_partial_quota_and_trigger_failure(
+    mock_group, mock_release_quota, mock_bulk_update, mock_bulk_create, mock_reserve_quota, mock_get_user, mock_get_existing,
+    mock_search_jobs, mock_get_resume, mock_session_local):
+    """
+    Granted quota goes to the best matches first; a failed publish marks the batch TRIGGER_FAILED and releases it.
+    """
+    mock_db_instance = MagicMock(spec=Session)
+    mock_session_local.return_value = mock_db_instance
+    mock_get_resume.return_value = mock_resume_with_embedding
+    mock_search_jobs.return_value = mock_matched_jobs
+    mock_get_existing.return_value = set()
+    mock_get_user.return_value = MagicMock(id=MOCK_USER_ID)
+    mock_reserve_quota.return_value = 1 # Room for only one more application
+    mock_bulk_create.return_value = [1001]
+    mock_group.return_value.apply_async.side_effect = Exception("Broker unavailable")
 
-    assert mock_trigger_delay.call_count == 1 # Only called for the second job
-    trigger_call_args_list = mock_trigger_delay.call_args_list
-    assert trigger_call_args_list[0][1]['application_id'] == mock_new_app_2.id
+    tasks.process_user_job_matches(user_id=MOCK_USER_ID, resume_id=MOCK_RESUME_ID)
 
+    applications_in = mock_bulk_create.call_args.kwargs['applications_in']
+    assert [app_in.job_id for app_in in applications_in] == [MOCK_JOB_ID_1]
+    mock_bulk_update.assert_called_once_with(mock_db_instance, [1001], ApplicationStatus.TRIGGER_FAILED)
+    mock_release_quota.assert_called_once_with(mock_db_instance, MOCK_USER_ID, count=1) # Reservation handed back
     mock_db_instance.close.assert_called_once()
 
 
+@patch('app.workers.tasks.group')
+def test_schedule_auto_apply_prefers_fair_queue(mock_group, scheduler_unavailable):
+    scheduler_unavailable.return_value = True
+    user = MagicMock(id=MOCK_USER_ID, subscription_tier=SubscriptionTier.PRO)
+
+    tasks.schedule_auto_apply(user, [1001, 1002])
+
+    scheduler_unavailable.assert_called_once_with(MOCK_USER_ID, SubscriptionTier.PRO, [1001, 1002])
+    mock_group.assert_not_called() # Released later by the dispatcher
+
+@patch('app.workers.tasks.group')
+def test_schedule_auto_apply_fallback_publishes_with_tier_priority(mock_group):
+    user = MagicMock(id=MOCK_USER_ID, subscription_tier=SubscriptionTier.ELITE)
+
+    with patch.object(tasks.settings, 'AUTO_APPLY_BATCH_SIZE', 2):
+        tasks.schedule_auto_apply(user, [1, 2, 3])
+
+    signatures = list(mock_group.call_args.args[0])
+    assert [sig.kwargs['application_ids'] for sig in signatures] == [[1, 2], [3]]
+    assert all(sig.options['priority'] == 0 for sig in signatures)
+
+@patch('app.workers.tasks.metrics')
+@patch('app.workers.tasks.group')
+@patch('app.workers.tasks.apply_scheduler.queue_length', return_value=0)
+@patch('app.workers.tasks.apply_scheduler.pop_next')
+def test_dispatch_auto_apply_queue_groups_by_priority(mock_pop_next, mock_queue_length, mock_group, mock_metrics):
+    mock_pop_next.return_value = [(1, 6), (2, 0), (3, 6)] # Fair-queue order, mixed tiers
+
+    assert tasks.dispatch_auto_apply_queue_task() == 3
+
+    published = [list(call.args[0]) for call in mock_group.call_args_list]
+    assert [[(sig.kwargs['application_ids'], sig.options['priority']) for sig in sigs] for sigs in published] == [
+        [([2], 0)], # Elite first
+        [([1, 3], 6)],
+    ]
+
+@patch('app.workers.tasks.metrics')
+@patch('app.workers.tasks.quota')
+@patch('app.workers.tasks.crud.application.fail_unpublished_applications', return_value={5: 2})
+@patch('app.workers.tasks.SessionLocal')
+@patch('app.workers.tasks.group')
+@patch('app.workers.tasks.apply_scheduler.queue_length', return_value=0)
+@patch('app.workers.tasks.apply_scheduler.pop_next')
+def test_dispatch_auto_apply_queue_settles_unpublished(mock_pop_next, mock_queue_length, mock_group, mock_session_local, mock_fail, mock_quota, mock_metrics):
+    """Popped applications whose publish fails are marked TRIGGER_FAILED and their quota released."""
+    mock_pop_next.return_value = [(1, 6), (2, 0), (3, 6)]
+    mock_group.return_value.apply_async.side_effect = [None, ConnectionError("broker down")] # Priority 0 ok, 6 fails
+
+    assert tasks.dispatch_auto_apply_queue_task() == 1
+
+    db = mock_session_local.return_value
+    mock_fail.assert_called_once_with(db, [1, 3], mock_quota.IN_FLIGHT_STATUSES)
+    mock_quota.release.assert_called_once_with(db, 5, count=2)
+    db.close.assert_called_once()
+
+@patch('app.workers.tasks.async_runtime.run_sync')
+def test_trigger_auto_apply_batch_requeues_deferred(mock_run_sync):
+    mock_run_sync.return_value = {"processed": 1, "errors": 0, "deferred": [7, 8], "retry_in": 12.3}
+
+    with patch.object(tasks.trigger_auto_apply_batch, 'apply_async') as mock_apply_async:
+        summary = tasks.trigger_auto_apply_batch([6, 7, 8])
+
+    assert summary == {"processed": 1, "errors": 0, "deferred": 2}
+    assert mock_apply_async.call_args.kwargs["kwargs"] == {"application_ids": [7, 8]}
+    assert mock_apply_async.call_args.kwargs["countdown"] == 13 # Countdown, not a sleep in the worker
+    mock_run_sync.call_args.args[0].close() # Discard the un-awaited coroutine
+
+
 # TODO: Add tests for:
 # - Resume not found
 # - Resume has no embedding
 # - matching.search_similar_jobs returns empty list
-# - crud.application.create_application raises an exception
-# - trigger_auto_apply.delay raises an exception (and status update)
\ No newline at end of file
+# - crud.application.bulk_create_applications raises an exception
+
+# --- Scraper Fan-Out ---
+
+MOCK_SITES = [
+    {"name": "Stripe", "source": "greenhouse", "mode": "api", "seeds": ["stripe"]},
+    {"name": "Netflix", "source": "lever", "mode": "api", "seeds": ["netflix"]},
+]
+
+def test_shard_sites_splits_config():
+    shards = tasks._shard_sites(MOCK_SITES * 3, shard_size=4)
+    assert [len(shard) for shard in shards] == [4, 2]
+
+
+@patch('app.workers.tasks.metrics')
+@patch('app.workers.tasks.SessionLocal')
+@patch('app.workers.tasks._ingest_jobs')
+@patch('app.workers.tasks.scraping.iter_site_jobs')
+def test_scrape_sites_shard_ingests_each_board(mock_scrape_site, mock_ingest, mock_session_local, mock_metrics):
+    """Each board is ingested as soon as it is scraped, with its own session."""
+    mock_scrape_site.side_effect = [iter([MagicMock()] * 3), iter([MagicMock()] * 2)]
+    mock_ingest.side_effect = [(2, 2), (1, 0)]
+
+    summary = tasks.scrape_sites_shard_task(MOCK_SITES)
+
+    assert summary == {"sites": 2, "scraped": 5, "new": 3, "indexed": 2, "failed": []}
+    assert mock_ingest.call_count == 2
+    assert mock_session_local.return_value.close.call_count == 2
+
+
+@patch('app.workers.tasks.metrics')
+@patch('app.workers.tasks.SessionLocal')
+@patch('app.workers.tasks._ingest_jobs', return_value=(1, 1))
+@patch('app.workers.tasks.scraping.iter_site_jobs')
+def test_scrape_sites_shard_retries_only_failed_boards(mock_scrape_site, mock_ingest, mock_session_local, mock_metrics):
+    mock_scrape_site.side_effect = [iter([MagicMock()]), Exception("503 from Lever")]
+
+    with patch.object(tasks.scrape_sites_shard_task, 'retry', side_effect=RuntimeError("retry")) as mock_retry:
+        with pytest.raises(RuntimeError):
+            tasks.scrape_sites_shard_task(MOCK_SITES)
+
+    retry_kwargs = mock_retry.call_args.kwargs
+    assert retry_kwargs["args"] == [[MOCK_SITES[1]]] # Only the failed board is retried
+    assert retry_kwargs["kwargs"]["carried"]["new"] == 1 # Progress from this attempt is kept
+
+
+@patch('app.workers.tasks.metrics')
+@patch('app.workers.tasks.SessionLocal')
+@patch('app.workers.tasks._ingest_jobs', return_value=(1, 1))
+@patch('app.workers.tasks.scraping.iter_site_jobs')
+def test_scrape_sites_shard_returns_partial_summary_on_time_limit(mock_scrape_site, mock_ingest, mock_session_local, mock_metrics):
+    sites = MOCK_SITES + [{"name": "Figma", "source": "greenhouse", "mode": "api", "seeds": ["figma"]}]
+    mock_scrape_site.side_effect = [iter([MagicMock()]), SoftTimeLimitExceeded()]
+
+    with patch.object(tasks.scrape_sites_shard_task, 'retry') as mock_retry:
+        summary = tasks.scrape_sites_shard_task(sites)
+
+    mock_retry.assert_not_called()
+    assert summary == {"sites": 1, "scraped": 1, "new": 1, "indexed": 1, "failed": ["Netflix", "Figma"]}
+    assert mock_scrape_site.call_count == 2 # The board after the timeout isn't started
+
+
+def test_summarize_scrape_run_totals_shards():
+    with patch('app.workers.tasks.metrics'):
+        result = tasks.summarize_scrape_run_task([
+            {"sites": 2, "scraped": 5, "new": 3, "indexed": 2, "failed": []},
+            {"sites": 1, "scraped": 4, "new": 4, "indexed": 4, "failed": ["Netflix"]},
+        ])
+
+    assert result == {"sites": 3, "scraped": 9, "new": 7, "indexed": 6, "failed": ["Netflix"]}
+
+
+@patch('app.workers.tasks.SessionLocal')
+@patch('app.workers.tasks.crud.resume')
+@patch('app.workers.tasks.resume_tailoring.process_and_tailor_resume')
+def test_parse_and_tailor_resume_task_reports_sections_and_saves(mock_process, mock_crud_resume, mock_session_local):
+    """Each finished section is published as PROGRESS before the result is saved to the resume."""
+    from app.schemas.resume import StructuredResume
+
+    def fake_process(text_items, job_description, on_section, **kwargs):
+        on_section("parsed", {"objective": "Parsed"})
+        on_section("objective", "Tailored")
+        return StructuredResume(objective="Tailored")
+
+    mock_process.side_effect = fake_process
+    parse_request = {
+        "text_items": [{"text": "Jane", "fontName": "Arial", "width": 10, "height": 10, "x": 0, "y": 0, "hasEOL": True}],
+        "job_description": "Python role",
+        "resume_id": MOCK_RESUME_ID,
+    }
+
+    task = tasks.parse_and_tailor_resume_task
+    task.push_request(id="job-1")
+    try:
+        with patch.object(task, 'update_state') as mock_update_state:
+            result = task(user_id=MOCK_USER_ID, parse_request=parse_request)
+    finally:
+        task.pop_request()
+
+    progress = [c.kwargs["meta"] for c in mock_update_state.call_args_list]
+    assert [p["stage"] for p in progress] == ["parsing", "tailoring", "tailoring", "saving"]
+    assert progress[1]["sections"] == {"parsed": {"objective": "Parsed"}}
+    assert progress[2]["sections"]["objective"] == "Tailored"
+    assert all(c.kwargs["task_id"] == "job-1" for c in mock_update_state.call_args_list)
+
+    assert result["structured_resume"]["objective"] == "Tailored"
+    mock_crud_resume.get_resume.assert_called_once_with(mock_session_local.return_value, resume_id=MOCK_RESUME_ID, owner_id=MOCK_USER_ID)
+    saved = mock_crud_resume.update_resume.call_args.kwargs["resume_in"]
+    assert saved.structured_data.objective == "Tailored"
+    mock_session_local.return_value.close.assert_called_once()
+
+@patch('app.workers.tasks.SessionLocal')
+@patch('app.workers.tasks.crud.resume')
+@patch('app.workers.tasks.crud.job')
+@patch('app.workers.tasks.job_analysis.get_or_compute')
+@patch('app.workers.tasks.resume_tailoring.process_and_tailor_resume')
+def test_parse_and_tailor_resume_task_tailors_against_job_analysis(mock_process, mock_get_or_compute, mock_crud_job, mock_crud_resume, mock_session_local):
+    """With a job_id the prompts get the job's shared analysis instead of the full description."""
+    from app.schemas.resume import StructuredResume
+
+    mock_process.return_value = StructuredResume(objective="Tailored")
+    mock_get_or_compute.return_value = {"summary": "Backend role.", "requirements": ["Python"], "key_terms": [["python", 0.5]]}
+    parse_request = {"text_items": [], "job_id": MOCK_JOB_ID_1, "resume_id": MOCK_RESUME_ID}
+
+    task = tasks.parse_and_tailor_resume_task
+    task.push_request(id="job-2")
+    try:
+        with patch.object(task, 'update_state'):
+            task(user_id=MOCK_USER_ID, parse_request=parse_request)
+    finally:
+        task.pop_request()
+
+    mock_get_or_compute.assert_called_once_with(mock_session_local.return_value, mock_crud_job.get_job.return_value)
+    assert mock_process.call_args.kwargs["job_description"].startswith("Role Summary: Backend role.")
+
+@patch('app.workers.tasks.group')
+def test_schedule_auto_apply_pretailors_matched_applications_first(mock_group, pretailoring_unavailable):
+    pretailoring_unavailable.return_value = True
+    user = MagicMock(id=MOCK_USER_ID, subscription_tier=SubscriptionTier.ELITE)
+
+    with patch.object(tasks.settings, 'PRETAILOR_BATCH_SIZE', 2):
+        tasks.schedule_auto_apply(user, [1, 2, 3], pretailor=True)
+
+    signatures = list(mock_group.call_args.args[0])
+    assert [sig.task for sig in signatures] == ["tasks.pretailor_applications"] * 2
+    assert [sig.kwargs['application_ids'] for sig in signatures] == [[1, 2], [3]]
+    assert all(sig.options['priority'] == 0 for sig in signatures)
+
+@patch('app.workers.tasks.SessionLocal')
+@patch('app.workers.tasks.crud.user.get_user')
+@patch('app.workers.tasks.schedule_auto_apply')
+@patch('app.workers.tasks.async_runtime.run_sync')
+def test_pretailor_applications_schedules_even_if_tailoring_fails(mock_run_sync, mock_schedule, mock_get_user, mock_session_local):
+    mock_run_sync.side_effect = RuntimeError("LLM down")
+
+    summary = tasks.pretailor_applications_task(user_id=MOCK_USER_ID, application_ids=[1, 2])
+
+    assert summary["error"] == 2
+    mock_schedule.assert_called_once_with(mock_get_user.return_value, [1, 2]) # Applied with the untailored resume
+    mock_session_local.return_value.close.assert_called_once()
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import Awaitable, Callable, List, Optional
+
+from celery.signals import worker_process_shutdown
+
+logger = logging.getLogger(__name__)
+
+# --- Persistent Per-Worker Event Loop ---
+# Celery tasks are synchronous, and each one used to wrap its coroutine in asyncio.run(),
+# which creates and tears down an event loop per task. Anything bound to a loop (a warm
+# Playwright browser, async HTTP clients) then had to be rebuilt for every task.
+# Instead, each worker process runs one long-lived loop in a daemon thread; tasks submit
+# coroutines to it with run_sync() and block on the result.
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_owner_pid: Optional[int] = None
+_lock = threading.Lock()
+_shutdown_hooks: List[Callable[[], Awaitable[None]]] = []
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Returns this process's background event loop, starting it on first use.
+
+    Started lazily (and re-created after fork) so prefork children never inherit a
+    loop thread from the parent.
+    """
+    global _loop, _thread, _owner_pid
+    with _lock:
+        if _loop is None or _owner_pid != os.getpid() or not _loop.is_running():
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=_run, name="worker-event-loop", daemon=True)
+            thread.start()
+            ready.wait()
+            _loop, _thread, _owner_pid = loop, thread, os.getpid()
+            logger.info(f"Started persistent event loop for worker process {_owner_pid}.")
+        return _loop
+
+
+def run_sync(coro: Awaitable, timeout: Optional[float] = None):
+    """Runs a coroutine on the worker's persistent loop and returns its result (re-raising errors)."""
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    return future.result(timeout)
+
+
+def register_shutdown_hook(hook: Callable[[], Awaitable[None]]) -> None:
+    """Registers an async cleanup callable to run on the loop before it stops (e.g. closing a browser pool)."""
+    _shutdown_hooks.append(hook)
+
+
+def shutdown(timeout: float = 30.0) -> None:
+    """Runs shutdown hooks on the loop, then stops it. Safe to call if the loop never started."""
+    global _loop, _thread, _owner_pid
+    with _lock:
+        loop, thread = _loop, _thread
+        if loop is None or _owner_pid != os.getpid():
+            return
+        _loop, _thread, _owner_pid = None, None, None
+
+    for hook in _shutdown_hooks:
+        try:
+            asyncio.run_coroutine_threadsafe(hook(), loop).result(timeout)
+        except Exception as e:
+            logger.error(f"Error in event loop shutdown hook {hook}: {e}", exc_info=True)
+    loop.call_soon_threadsafe(loop.stop)
+    if thread is not None:
+        thread.join(timeout)
+    loop.close()
+    logger.info("Stopped persistent worker event loop.")
+
+
+@worker_process_shutdown.connect
+def _on_worker_process_shutdown(**kwargs):
+    shutdown()
@@ -59,6 +59,7 @@ celery_app.conf.update(
     # Add other configurations like rate limits later if needed
     task_acks_late = True, # Example: Ensure tasks only ack after completion/failure
     worker_prefetch_multiplier = 1, # Example: Ensure worker only takes 1 task at a time if tasks are long-running
+    broker_transport_options = {"queue_order_strategy": "priority"}, # Honour per-tier task priorities (apply_scheduler.TIER_PRIORITIES)
     # task_routes = {
     #     'app.workers.tasks.process_payment': {'queue': 'payments'},
     # }
@@ -69,6 +70,14 @@ celery_app.conf.update(
             # Alternatively, use seconds: 'schedule': 6 * 60 * 60.0, # Run every 6 hours (in seconds)
             # 'args': (), # Add arguments if the task requires any
         },
+        'dispatch-auto-apply-queue': {
+            'task': 'tasks.dispatch_auto_apply_queue',
+            'schedule': settings.AUTO_APPLY_DISPATCH_INTERVAL, # Seconds; releases the fair queue in small slices
+        },
+        'reconcile-quota-usage-daily': {
+            'task': 'tasks.reconcile_quota_usage',
+            'schedule': crontab(minute=30, hour=4), # Low-traffic hour; repairs counters left by crashed workers
+        },
     }
 )
 
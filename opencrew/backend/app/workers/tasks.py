@@ -1,22 +1,39 @@
 import logging
-import asyncio # Import asyncio
-from typing import List
+import math
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from celery import chord, group
+from celery.exceptions import SoftTimeLimitExceeded
 
 from .celery_app import celery_app # Import the configured Celery app
-from ..services import autosubmit, scraping, matching # Import scraping and matching services
+from . import async_runtime
+from ..core import metrics
+from ..core.config import settings
+from ..services import apply_scheduler, autosubmit, browser_pool, scraping, matching, quota, resume_tailoring, job_analysis, pre_tailoring # Import scraping and matching services
 from ..db.session import SessionLocal # Needed for DB operations within tasks
-from .. import crud, schemas # Needed for DB operations
+from .. import crud # Needed for DB operations
+from ..schemas.application import ApplicationCreate
+from ..schemas.job import JobCreate
+from ..schemas.resume import ResumeParseRequest, ResumeUpdate
+from ..models.application import ApplicationStatus
 
 logger = logging.getLogger(__name__)
 
+# Close pooled browsers before the worker's event loop stops
+async_runtime.register_shutdown_hook(browser_pool.close_browser_pool)
+
 @celery_app.task(acks_late=True, name="tasks.trigger_auto_apply") # Use explicit name
 def trigger_auto_apply(application_id: int):
-    """Celery task to trigger the auto-application process for a given application ID."""
+    """Celery task to trigger the auto-application process for a given application ID.
+
+    Runs immediately, bypassing the scheduler; new work goes through schedule_auto_apply().
+    """
     logger.info(f"Received task trigger_auto_apply for application_id: {application_id}")
     db = SessionLocal()
     try:
-        # Call the new async auto-submit function using asyncio.run()
-        asyncio.run(autosubmit.apply_to_job_async(db=db, application_id=application_id))
+        # Run on the worker's persistent loop so the pooled browser stays warm between tasks
+        async_runtime.run_sync(autosubmit.apply_to_job_async(db=db, application_id=application_id))
         # Logging and status updates are now handled within apply_to_job_async
         logger.info(f"Finished processing task trigger_auto_apply for application_id: {application_id}")
     except Exception as e:
@@ -34,6 +51,126 @@ def trigger_auto_apply(application_id: int):
     finally:
         db.close() # Ensure the session is always closed
 
+@celery_app.task(bind=True, acks_late=True, name="tasks.trigger_auto_apply_batch")
+def trigger_auto_apply_batch(self, application_ids: List[int]):
+    """Celery task that runs auto-apply for a batch of applications concurrently on this worker."""
+    logger.info(f"Received task trigger_auto_apply_batch for {len(application_ids)} applications: {application_ids}")
+    # Each coroutine opens its own session; concurrency is capped by the browser pool and per domain
+    summary = async_runtime.run_sync(autosubmit.apply_many_async(application_ids))
+
+    # Applications the scheduler refused (domain busy/rate-limited) come back later, same priority
+    deferred, retry_in = summary.pop("deferred"), summary.pop("retry_in")
+    if deferred:
+        priority = (self.request.delivery_info or {}).get("priority")
+        trigger_auto_apply_batch.apply_async(
+            kwargs={"application_ids": deferred}, countdown=max(1, math.ceil(retry_in)), priority=priority
+        )
+        logger.info(f"Re-queued {len(deferred)} deferred applications in {retry_in:.0f}s: {deferred}")
+    summary["deferred"] = len(deferred)
+    return summary
+
+
+def _publish_auto_apply_batches(application_ids: List[int], priority: int) -> None:
+    """Publishes trigger_auto_apply_batch tasks of AUTO_APPLY_BATCH_SIZE as one group."""
+    batches = [
+        application_ids[i:i + settings.AUTO_APPLY_BATCH_SIZE]
+        for i in range(0, len(application_ids), settings.AUTO_APPLY_BATCH_SIZE)
+    ]
+    group(trigger_auto_apply_batch.s(application_ids=batch).set(priority=priority) for batch in batches).apply_async()
+
+
+def schedule_auto_apply(user, application_ids: List[int], pretailor: bool = False) -> None:
+    """Hands applications to the fair scheduler, or publishes them directly if Redis is unavailable.
+
+    With pretailor=True (applications queued by matching) the resumes are first tailored per
+    job by pretailor_applications tasks, which schedule the applications when done.
+    Raises if publishing fails, so callers can mark the applications and release quota.
+    """
+    if not application_ids:
+        return
+    if pretailor and pre_tailoring.is_available():
+        batches = [
+            application_ids[i:i + settings.PRETAILOR_BATCH_SIZE]
+            for i in range(0, len(application_ids), settings.PRETAILOR_BATCH_SIZE)
+        ]
+        priority = apply_scheduler.tier_priority(user.subscription_tier)
+        group(pretailor_applications_task.s(user_id=user.id, application_ids=batch).set(priority=priority) for batch in batches).apply_async()
+        logger.info(f"Pre-tailoring {len(application_ids)} applications for user {user.id} in {len(batches)} batches before auto-apply.")
+        return
+    if apply_scheduler.enqueue(user.id, user.subscription_tier, application_ids):
+        return # dispatch_auto_apply_queue_task releases them in fair order
+    logger.warning(f"Scheduler unavailable; publishing {len(application_ids)} applications for user {user.id} directly.")
+    _publish_auto_apply_batches(application_ids, apply_scheduler.tier_priority(user.subscription_tier))
+
+
+@celery_app.task(acks_late=True, name="tasks.pretailor_applications")
+def pretailor_applications_task(user_id: int, application_ids: List[int]):
+    """Tailors each application's resume to its job, then hands the batch to the auto-apply scheduler.
+
+    Applications are scheduled even if tailoring fails; they are then applied with the
+    resume's own structured data.
+    """
+    logger.info(f"Received task pretailor_applications for user {user_id}: {application_ids}")
+    try:
+        summary = async_runtime.run_sync(pre_tailoring.pretailor_many_async(application_ids))
+    except Exception as e:
+        logger.error(f"Pre-tailoring batch for user {user_id} failed; scheduling untailored: {e}", exc_info=True)
+        summary = {"tailored": 0, "skipped": 0, "error": len(application_ids)}
+
+    db = SessionLocal()
+    try:
+        user = crud.user.get_user(db, user_id=user_id)
+        if not user:
+            logger.error(f"User {user_id} not found. Cannot schedule {len(application_ids)} pre-tailored applications.")
+            return summary
+        try:
+            schedule_auto_apply(user, application_ids)
+        except Exception as trigger_exc:
+            logger.error(f"Failed to publish auto-apply tasks for user {user_id}: {trigger_exc}", exc_info=True)
+            crud.application.bulk_update_application_status(db, application_ids, ApplicationStatus.TRIGGER_FAILED)
+            quota.release(db, user_id, count=len(application_ids))
+    finally:
+        db.close()
+    return summary
+
+
+@celery_app.task(acks_late=True, name="tasks.dispatch_auto_apply_queue")
+def dispatch_auto_apply_queue_task():
+    """Beat task: releases the head of the fair queue as prioritized auto-apply batches."""
+    entries = apply_scheduler.pop_next(settings.AUTO_APPLY_DISPATCH_BATCH)
+    if not entries:
+        return 0
+    by_priority: Dict[int, List[int]] = {}
+    for application_id, priority in entries:
+        by_priority.setdefault(priority, []).append(application_id)
+    dispatched = 0
+    for priority, application_ids in sorted(by_priority.items()):
+        try:
+            _publish_auto_apply_batches(application_ids, priority)
+            dispatched += len(application_ids)
+        except Exception as e:
+            # Already popped from the queue: settle them here or their reservations leak
+            logger.error(f"Failed to publish {len(application_ids)} queued applications: {e}", exc_info=True)
+            _fail_unpublished(application_ids)
+    metrics.incr("apply_scheduler.dispatched", amount=dispatched)
+    logger.info(f"Dispatched {dispatched} queued applications ({apply_scheduler.queue_length()} still waiting).")
+    return dispatched
+
+
+def _fail_unpublished(application_ids: List[int]) -> None:
+    """Marks applications that could not be published as TRIGGER_FAILED and releases their quota."""
+    db = SessionLocal()
+    try:
+        per_user = crud.application.fail_unpublished_applications(db, application_ids, quota.IN_FLIGHT_STATUSES)
+        for user_id, count in per_user.items():
+            quota.release(db, user_id, count=count)
+        metrics.incr("apply_scheduler.publish_failures", amount=len(application_ids))
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Could not settle unpublished applications {application_ids}; reconcile will repair quota: {e}", exc_info=True)
+    finally:
+        db.close()
+
 # Add other tasks here later, e.g.:
 # @celery_app.task(name="tasks.send_email")
 # def send_email_task(recipient: str, subject: str, body: str):
@@ -41,60 +178,155 @@ def trigger_auto_apply(application_id: int):
 #     emailer.send_email(to=recipient, subject=subject, body=body)
 
 
+def _ingest_jobs(db, jobs: List[JobCreate]) -> Tuple[int, int]:
+    """Inserts unseen jobs and indexes their embeddings in Qdrant. Returns (new_jobs, indexed_jobs)."""
+    new_jobs_count = 0
+    indexed_jobs_count = 0
+    for job_data in jobs:
+        # Ensure URL is a string for DB lookup
+        job_url_str = str(job_data.url)
+        existing_job = crud.job.get_job_by_url(db, url=job_url_str)
+        if existing_job:
+            continue
+        try:
+            # create_job handles embedding generation internally if description exists
+            created_job = crud.job.create_job(db, job=job_data)
+            new_jobs_count += 1
+            logger.info(f"Created new job in DB: ID {created_job.id}, Title: {created_job.title}")
+
+            # Index in Qdrant if embedding was generated
+            if created_job.embedding:
+                # index_job expects the embedding list directly
+                if matching.index_job(job=created_job, job_embedding=created_job.embedding):
+                    indexed_jobs_count += 1
+                else:
+                    logger.warning(f"Failed to index job ID {created_job.id} in Qdrant.")
+            else:
+                logger.info(f"Skipping Qdrant indexing for job ID {created_job.id} (no embedding).")
+
+        except Exception as create_exc:
+            logger.error(f"Failed to create or index job with URL {job_url_str}: {create_exc}", exc_info=True)
+            db.rollback() # Rollback the specific failed job creation
+    return new_jobs_count, indexed_jobs_count
+
+
+def _shard_sites(sites: List[dict], shard_size: int) -> List[List[dict]]:
+    """Splits sites.yml entries into shards of at most shard_size entries."""
+    shard_size = max(1, shard_size)
+    return [sites[i:i + shard_size] for i in range(0, len(sites), shard_size)]
+
+
 @celery_app.task(acks_late=True, name="tasks.run_all_scrapers")
 def run_all_scrapers_task():
-    """Celery task to run all configured job scrapers."""
+    """Fans out one scrape subtask per shard of sites.yml and summarizes the run once all finish.
+
+    Each shard scrapes and ingests its boards independently, so one slow or failing
+    board no longer loses the whole run, and jobs are ingested in small batches as
+    they are parsed rather than held in memory.
+    """
     logger.info("Starting task: run_all_scrapers_task")
-    try:
-        scraped_jobs: List[schemas.JobCreate] = scraping.run_scrapers()
-        logger.info(f"Scraping completed. Found {len(scraped_jobs)} jobs.")
+    sites = scraping.load_sites_config()
+    if not sites:
+        logger.warning("No scraper sites configured. Nothing to do.")
+        return 0
+
+    shards = _shard_sites(sites, settings.SCRAPER_SHARD_SIZE)
+    chord(
+        group(scrape_sites_shard_task.s(shard) for shard in shards),
+        summarize_scrape_run_task.s(),
+    ).apply_async()
+    logger.info(f"Dispatched {len(shards)} scraper shards covering {len(sites)} sites.")
+    return len(shards)
 
-        # --- Integrate Job Processing/Indexing ---
+
+@celery_app.task(
+    bind=True,
+    acks_late=True,
+    name="tasks.scrape_sites_shard",
+    max_retries=settings.SCRAPE_MAX_RETRIES,
+    soft_time_limit=settings.SCRAPER_SHARD_TIME_LIMIT,
+    time_limit=settings.SCRAPER_SHARD_TIME_LIMIT + 60,
+)
+def scrape_sites_shard_task(self, sites: List[dict], carried: Optional[Dict] = None):
+    """Scrapes and ingests a shard of sites.yml entries, board by board.
+
+    Boards that fail to fetch are retried (only those boards) with exponential backoff.
+    Counts from earlier attempts are carried across retries so the chord summary sees
+    the whole shard. Always returns a summary rather than raising, so one bad shard
+    doesn't fail the chord callback. A shard that hits its soft time limit reports the
+    board in progress and the ones it didn't reach as failed.
+    """
+    summary = carried or {"sites": 0, "scraped": 0, "new": 0, "indexed": 0, "failed": []}
+    failed_sites = []
+    timed_out = False
+
+    for index, site in enumerate(sites):
+        name = site.get('name', 'Unknown Site')
+        scraped_count, new_count, indexed_count = 0, 0, 0
+        # Stream this board straight into ingestion in small batches instead of
+        # accumulating it (or the whole run) in memory
         db = SessionLocal()
-        new_jobs_count = 0
-        indexed_jobs_count = 0
         try:
-            for job_data in scraped_jobs:
-                # Ensure URL is a string for DB lookup
-                job_url_str = str(job_data.url)
-                existing_job = crud.job.get_job_by_url(db, url=job_url_str)
-                if not existing_job:
-                    try:
-                        # create_job handles embedding generation internally if description exists
-                        created_job = crud.job.create_job(db, job=job_data)
-                        new_jobs_count += 1
-                        logger.info(f"Created new job in DB: ID {created_job.id}, Title: {created_job.title}")
-
-                        # Index in Qdrant if embedding was generated
-                        if created_job.embedding:
-                            # index_job expects the embedding list directly
-                            if matching.index_job(job=created_job, job_embedding=created_job.embedding):
-                                indexed_jobs_count += 1
-                            else:
-                                logger.warning(f"Failed to index job ID {created_job.id} in Qdrant.")
-                        else:
-                            logger.info(f"Skipping Qdrant indexing for job ID {created_job.id} (no embedding).")
-
-                    except Exception as create_exc:
-                        logger.error(f"Failed to create or index job with URL {job_url_str}: {create_exc}", exc_info=True)
-                        db.rollback() # Rollback the specific failed job creation
-                # else: # Optional: Log if job already exists
-                #     logger.debug(f"Job with URL {job_url_str} already exists. Skipping.")
-
-            logger.info(f"Processed scraped jobs. Added {new_jobs_count} new jobs to DB. Indexed {indexed_jobs_count} new jobs in Qdrant.")
-
-        except Exception as outer_exc:
-             logger.error(f"Error during job processing loop: {outer_exc}", exc_info=True)
-             db.rollback() # Rollback any potential partial commits from the loop
+            with metrics.timed("scraper.board_seconds", board=name):
+                site_jobs = scraping.iter_site_jobs(site)
+                while True:
+                    batch = list(islice(site_jobs, settings.SCRAPER_HTML_BATCH_SIZE))
+                    if not batch:
+                        break
+                    batch_new, batch_indexed = _ingest_jobs(db, batch)
+                    scraped_count += len(batch)
+                    new_count += batch_new
+                    indexed_count += batch_indexed
+        except SoftTimeLimitExceeded:
+            logger.warning(f"Shard hit its time limit during site '{name}'; {len(sites) - index} sites not finished.")
+            db.rollback()
+            failed_sites.extend(sites[index:])
+            timed_out = True
+        except Exception as e:
+            # Jobs ingested before the failure are kept; the retry skips them by URL
+            metrics.incr("scraper.board_failures", board=name)
+            logger.warning(f"Scrape failed for site '{name}' (attempt {self.request.retries + 1}): {e}")
+            db.rollback()
+            failed_sites.append(site)
         finally:
             db.close()
-        # --- End Job Processing ---
 
+        metrics.incr("scraper.jobs_scraped", scraped_count, board=name)
+        metrics.incr("scraper.jobs_new", new_count, board=name)
+        summary["scraped"] += scraped_count
+        summary["new"] += new_count
+        summary["indexed"] += indexed_count
+        if site not in failed_sites:
+            summary["sites"] += 1
+            logger.info(f"Site '{name}': scraped {scraped_count}, added {new_count}, indexed {indexed_count}.")
+        if timed_out:
+            break
 
-    except Exception as e:
-        logger.error(f"Error during run_all_scrapers_task: {e}", exc_info=True)
-        # Depending on retry policy, this might raise the exception to trigger a retry
-        raise
+    if failed_sites and not timed_out and self.request.retries < self.max_retries:
+        countdown = 30 * (2 ** self.request.retries)
+        logger.info(f"Retrying {len(failed_sites)} failed sites in {countdown}s.")
+        raise self.retry(args=[failed_sites], kwargs={"carried": summary}, countdown=countdown)
+
+    summary["failed"] = summary["failed"] + [site.get('name', 'Unknown Site') for site in failed_sites]
+    if failed_sites:
+        logger.error(f"Giving up on sites after {self.request.retries} retries: {summary['failed']}")
+    return summary
+
+
+@celery_app.task(acks_late=True, name="tasks.summarize_scrape_run")
+def summarize_scrape_run_task(shard_summaries: List[Dict]):
+    """Chord callback: logs totals for a full scraper run."""
+    totals = {"sites": 0, "scraped": 0, "new": 0, "indexed": 0}
+    failed: List[str] = []
+    for shard_summary in shard_summaries:
+        for key in totals:
+            totals[key] += shard_summary.get(key, 0)
+        failed.extend(shard_summary.get("failed", []))
+
+    metrics.incr("scraper.runs")
+    logger.info(f"Scraper run complete. Sites: {totals['sites']}, Jobs scraped: {totals['scraped']}, "
+                f"Added: {totals['new']}, Indexed: {totals['indexed']}, Failed sites: {failed or 'none'}")
+    return {**totals, "failed": failed}
 
 
 @celery_app.task(acks_late=True, name="tasks.process_user_job_matches")
@@ -102,6 +334,10 @@ def process_user_job_matches(user_id: int, resume_id: int):
     """ 
     Fetches relevant jobs for a user/resume, checks quotas, 
     creates Application records, and triggers auto-apply tasks.
+
+    Works on the whole match set at once: one query for existing applications, one
+    quota reservation, one bulk insert and one scheduler hand-off, instead of several
+    round-trips per matched job.
     """
     logger.info(f"Starting task process_user_job_matches for user_id: {user_id}, resume_id: {resume_id}")
     db = SessionLocal()
@@ -125,64 +361,63 @@ def process_user_job_matches(user_id: int, resume_id: int):
             return
         logger.info(f"Found {len(matched_jobs)} potential job matches.")
 
-        # --- 3. Process Matches (Quota Check, Create Application, Trigger Task) ---
-        created_count = 0
-        quota_exceeded_count = 0
-        already_applied_count = 0
-        trigger_failed_count = 0
+        # --- 3. Drop Jobs Already Applied To (one query for all matches) ---
+        existing_job_ids = crud.application.get_existing_application_job_ids(
+            db, user_id=user_id, job_ids=[job.id for job in matched_jobs]
+        )
+        candidates = [job for job in matched_jobs if job.id not in existing_job_ids]
+        already_applied_count = len(matched_jobs) - len(candidates)
+        if not candidates:
+            logger.info(f"All {len(matched_jobs)} matches already have applications for user {user_id}. Nothing to do.")
+            return
+
+        # --- 4. Reserve Quota Once for the Whole Batch ---
+        user = crud.user.get_user(db, user_id=user_id)
+        if not user:
+            logger.error(f"User {user_id} not found. Aborting task.")
+            return
+        # Matches arrive best-first, so the granted quota goes to the strongest candidates
+        granted = quota.reserve(db, user, count=len(candidates))
+        selected_jobs = candidates[:granted]
+        quota_exceeded_count = len(candidates) - granted
+        if not selected_jobs:
+            logger.info(f"Quota exhausted for user {user_id}. Skipping {quota_exceeded_count} matches.")
+            return
 
-        for job in matched_jobs:
-            # --- 3a. Check if application already exists ---
-            existing_application = crud.application.get_application_by_details(
-                db, user_id=user_id, resume_id=resume_id, job_id=job.id
+        # --- 5. Bulk-Create Application Records ---
+        applications_in = [
+            ApplicationCreate(
+                resume_id=resume_id,
+                job_id=job.id,
+                status=ApplicationStatus.PENDING_TRIGGER, # Initial status before task pickup
             )
-            if existing_application:
-                logger.debug(f"Application already exists for user {user_id}, resume {resume_id}, job {job.id}. Skipping.")
-                already_applied_count += 1
-                continue
-
-            # --- 3b. Check user quota ---
-            has_quota, quota_message = autosubmit.check_user_quota(db, user_id=user_id)
-            if not has_quota:
-                logger.info(f"Quota exceeded for user {user_id}. Skipping job {job.id}. Reason: {quota_message}")
-                quota_exceeded_count += 1
-                # Optimization: If quota is exceeded, we can stop processing further matches for this user in this run.
-                # However, keep processing all matches for now for simpler logic and logging consistency.
-                continue
-                # break # Uncomment this line to stop processing if quota is exceeded
-
-            # --- 3c. Create Application Record ---
-            logger.info(f"Quota available for user {user_id}. Creating application for job {job.id} ({job.title}).")
-            try:
-                app_create = schemas.ApplicationCreate(
-                    resume_id=resume_id,
-                    job_id=job.id,
-                    status="PENDING_TRIGGER", # Initial status before task pickup
-                    notes="Application created via automated matching task."
-                )
-                new_application = crud.application.create_application(db=db, application=app_create, user_id=user_id)
-                logger.info(f"Created Application record ID: {new_application.id}")
-
-                # --- 3d. Trigger Auto-Apply Task ---
-                try:
-                    trigger_auto_apply.delay(application_id=new_application.id)
-                    logger.info(f"Successfully triggered auto-apply task for application ID: {new_application.id}")
-                    created_count += 1
-                    # Update status after successful trigger? Optional.
-                    # crud.application.update_application_status(db, app_id=new_application.id, status="PENDING_EXECUTION")
-                except Exception as trigger_exc:
-                    logger.error(f"Failed to trigger auto-apply task for application ID {new_application.id}: {trigger_exc}", exc_info=True)
-                    # Optionally update status to reflect trigger failure
-                    crud.application.update_application_status(db, app_id=new_application.id, status="TRIGGER_FAILED")
-                    trigger_failed_count += 1
-                    # Should we rollback the application creation if the trigger fails? Depends on desired behavior.
-                    # For now, keep the record with TRIGGER_FAILED status.
-
-            except Exception as app_create_exc:
-                logger.error(f"Failed to create Application record for user {user_id}, job {job.id}: {app_create_exc}", exc_info=True)
-                db.rollback() # Rollback this specific application creation attempt
-
-        
+            for job in selected_jobs
+        ]
+        try:
+            application_ids = crud.application.bulk_create_applications(
+                db,
+                applications_in=applications_in,
+                user_id=user_id,
+                notes="Application created via automated matching task.",
+            )
+        except Exception:
+            db.rollback()
+            quota.release(db, user_id, count=granted)
+            raise
+        logger.info(f"Created {len(application_ids)} Application records for user {user_id}.")
+
+        # --- 6. Hand the Applications to the Auto-Apply Scheduler ---
+        trigger_failed_count = 0
+        try:
+            schedule_auto_apply(user, application_ids, pretailor=True)
+        except Exception as trigger_exc:
+            logger.error(f"Failed to publish auto-apply tasks for user {user_id}: {trigger_exc}", exc_info=True)
+            # Keep the records so they can be re-triggered, but mark them as not in flight
+            crud.application.bulk_update_application_status(db, application_ids, ApplicationStatus.TRIGGER_FAILED)
+            quota.release(db, user_id, count=len(application_ids))
+            trigger_failed_count = len(application_ids)
+        created_count = len(application_ids) - trigger_failed_count
+
         logger.info(f"Finished processing matches for user {user_id}, resume {resume_id}. "
                     f"Created/Triggered: {created_count}, Quota Exceeded: {quota_exceeded_count}, Already Existed: {already_applied_count}, Trigger Failed: {trigger_failed_count}")
 
@@ -194,3 +429,100 @@ def process_user_job_matches(user_id: int, resume_id: int):
     finally:
         db.close()
 
+
+@celery_app.task(acks_late=True, name="tasks.reconcile_quota_usage")
+def reconcile_quota_usage_task():
+    """Rebuilds this month's user_quota_usage counters from the applications table."""
+    logger.info("Starting task: reconcile_quota_usage_task")
+    db = SessionLocal()
+    try:
+        return quota.reconcile(db)
+    except Exception as e:
+        logger.error(f"Error during reconcile_quota_usage_task: {e}", exc_info=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _job_tailoring_context(job_id: int) -> Optional[str]:
+    """Tailoring context from the job's shared description analysis (computed on first use).
+
+    Falls back to the raw description while the analysis is incomplete; None if the job is unknown.
+    """
+    db = SessionLocal()
+    try:
+        job = crud.job.get_job(db, job_id=job_id)
+        if job is None:
+            logger.warning(f"Job {job_id} not found; tailoring against the request's job description.")
+            return None
+        analysis = job_analysis.get_or_compute(db, job)
+        return job_analysis.prompt_context(analysis) or job.description
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, acks_late=True, name="tasks.parse_and_tailor_resume")
+def parse_and_tailor_resume_task(self, user_id: int, parse_request: Dict):
+    """Parses PDF text items into a structured resume, tailors it and saves it to the resume.
+
+    Reports progress as PROGRESS states with {"stage", "sections"}; sections are added as
+    they finish so clients can render them early (see services/parse_jobs.py).
+    Returns a ResumeParseResponse dict.
+    """
+    request = ResumeParseRequest(**parse_request)
+    task_id = self.request.id # Captured here: tailoring callbacks run on the event loop thread
+    logger.info(f"Starting task parse_and_tailor_resume {task_id} for user {user_id}, resume {request.resume_id}.")
+    sections: Dict = {}
+    stage = {"name": "parsing"}
+
+    def report(stage_name: Optional[str] = None) -> None:
+        if stage_name:
+            stage["name"] = stage_name
+        try:
+            self.update_state(task_id=task_id, state="PROGRESS", meta={"stage": stage["name"], "sections": dict(sections)})
+        except Exception as e: # Progress is best-effort; the final result still gets stored
+            logger.warning(f"Could not report progress for parse job {task_id}: {e}")
+
+    report("parsing")
+    job_context = request.job_description
+    if request.job_id is not None:
+        job_context = _job_tailoring_context(request.job_id) or job_context
+
+    def on_section(name: str, value) -> None:
+        sections[name] = value
+        report("tailoring" if name == "parsed" and job_context else None)
+
+    reused_sections: List[str] = []
+    structured_resume = resume_tailoring.process_and_tailor_resume(
+        text_items=request.text_items,
+        job_description=job_context,
+        on_section=on_section,
+        reused_sections=reused_sections,
+    )
+    if reused_sections:
+        logger.info(f"Parse job {task_id} reused {len(reused_sections)} previously tailored sections: {reused_sections}")
+
+    # --- Save/Update Structured Data ---
+    report("saving")
+    message = "Resume processed and tailored successfully."
+    if request.resume_id is not None:
+        db = SessionLocal()
+        try:
+            db_resume = crud.resume.get_resume(db, resume_id=request.resume_id, owner_id=user_id)
+            if db_resume:
+                logger.info(f"Updating structured data for resume ID: {request.resume_id}")
+                crud.resume.update_resume(db=db, db_resume=db_resume, resume_in=ResumeUpdate(structured_data=structured_resume))
+            else:
+                logger.warning(f"Resume ID {request.resume_id} not found for user {user_id}. Structured data not saved.")
+                message += " Resume not found; structured data not saved."
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    else:
+        logger.warning("No resume_id provided in the request. Structured data not saved.")
+
+    logger.info(f"Finished task parse_and_tailor_resume {task_id} for user {user_id}.")
+    return {"structured_resume": structured_resume.model_dump(), "message": message, "reused_sections": reused_sections}
@@ -0,0 +1,191 @@
+"""
+Throughput benchmark for the LLM stages of the resume pipeline (parse an uploaded resume,
+then tailor it to a job), run against the offline LLM stand-in (scripts/llm_standin.py).
+
+Each pipeline parses a resume text with the LLM and tailors the result against a job
+description, exactly as the parse-and-tailor task does. Pipelines run at each requested
+concurrency level; the report shows throughput, latency percentiles and the stand-in's
+request counts. Response caching and the section memo are disabled so every pipeline pays
+for its LLM calls, and the gateway's rate limit is raised (--rate-per-minute) so the numbers
+measure the pipeline rather than the limiter.
+
+A synthesized stand-in answer to the parse call is a schema-minimal resume with no
+experiences or skills, which would leave almost nothing to tailor. Unless the parse is
+answered from a recording with real content, tailoring runs on SAMPLE_STRUCTURED_RESUME
+(the built-in sample resume, parsed), so each pipeline makes the objective, skills and
+per-experience calls.
+
+Usage:
+    # Starts an in-process stand-in (replaying llm_recordings.jsonl, synthesizing misses)
+    python opencrew/scripts/bench_llm_pipeline.py --pipelines 40 --concurrency 1,4,16 --latency-ms 800
+
+    # Or against a stand-in that is already running
+    python opencrew/scripts/bench_llm_pipeline.py --base-url http://127.0.0.1:8085/v1
+
+The apply stage drives a real browser and is not part of this benchmark; with LLM_BASE_URL
+set, its agent also talks to the stand-in when run via trigger_mvp_pipeline.py.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the backend project root to the Python path so `app.*` imports work
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', 'backend'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import httpx
+import uvicorn
+
+import llm_standin
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SAMPLE_RESUME = """Jane Doe
+jane.doe@example.com | +1 555 0100 | Berlin, Germany
+
+Summary
+Backend engineer with 6 years of experience building Python services.
+
+Experience
+Senior Software Engineer, Acme Payments, 2021 - Present
+- Built FastAPI services handling 2k requests per second
+- Migrated batch jobs to Celery with Redis
+- Led the PostgreSQL schema redesign for the ledger
+
+Software Engineer, Example GmbH, 2018 - 2021
+- Developed internal tooling in Python and Django
+- Set up CI pipelines and container builds
+
+Education
+B.Sc. Computer Science, TU Berlin, 2014 - 2018
+
+Skills
+Python, FastAPI, Django, PostgreSQL, Redis, Celery, Docker, Kubernetes
+"""
+
+SAMPLE_STRUCTURED_RESUME = {
+    "basic": {"name": "Jane Doe", "email": "jane.doe@example.com", "phone": "+1 555 0100", "location": "Berlin, Germany"},
+    "objective": "Backend engineer with 6 years of experience building Python services.",
+    "education": [{"institution": "TU Berlin", "area": "Computer Science", "studyType": "B.Sc.", "startDate": "2014", "endDate": "2018"}],
+    "experiences": [
+        {"company": "Acme Payments", "position": "Senior Software Engineer", "startDate": "2021", "endDate": "Present",
+         "highlights": ["Built FastAPI services handling 2k requests per second", "Migrated batch jobs to Celery with Redis",
+                        "Led the PostgreSQL schema redesign for the ledger"]},
+        {"company": "Example GmbH", "position": "Software Engineer", "startDate": "2018", "endDate": "2021",
+         "highlights": ["Developed internal tooling in Python and Django", "Set up CI pipelines and container builds"]},
+    ],
+    "skills": [
+        {"category": "Languages & Frameworks", "skills": ["Python", "FastAPI", "Django"]},
+        {"category": "Infrastructure", "skills": ["PostgreSQL", "Redis", "Celery", "Docker", "Kubernetes"]},
+    ],
+}
+
+SAMPLE_JOB_DESCRIPTION = """About the Role
+We are looking for a senior backend engineer to scale our payments platform.
+
+Responsibilities:
+- Design and build Python APIs with FastAPI
+- Own PostgreSQL data models and migrations
+- Run services on Kubernetes
+
+Requirements:
+- 5+ years of backend development in Python
+- Experience with asynchronous task queues (Celery, Redis)
+
+Benefits
+Health insurance
+Unlimited PTO
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_standin(args: argparse.Namespace) -> str:
+    """Runs the stand-in in a background thread and returns its base URL."""
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(llm_standin.app_from_args(args), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="llm-standin", daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/v1"
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_level(resume_tailoring, resume_text: str, job_description: str, pipelines: int, concurrency: int, seed) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def pipeline(i: int) -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            # Distinct text per pipeline, so nothing is shared between them
+            structured = await asyncio.to_thread(resume_tailoring._parse_resume_with_llm, f"{resume_text}\nRef {i}")
+            if not (structured.experiences or structured.skills):
+                structured = seed.model_copy(deep=True) # Synthesized parse answer: tailor a realistic resume instead
+            await resume_tailoring.tailor_content_async(structured, job_description)
+            return time.perf_counter() - start
+
+    return await asyncio.gather(*(pipeline(i) for i in range(pipelines)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parse and tailor LLM stages against the LLM stand-in.")
+    parser.add_argument("--base-url", help="Running stand-in (default: start one in-process)")
+    parser.add_argument("--pipelines", type=int, default=20, help="Pipelines per concurrency level")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--resume-file", help="Resume text to parse (default: built-in sample)")
+    parser.add_argument("--jd-file", help="Job description to tailor against (default: built-in sample)")
+    parser.add_argument("--rate-per-minute", type=float, default=1_000_000,
+                        help="Gateway LLM_RATE_PER_MINUTE for the run (default: high enough not to throttle)")
+    llm_standin.add_arguments(parser)
+    args = parser.parse_args()
+
+    base_url = args.base_url or start_standin(args)
+    # Settings are read at import time, so these must be set before importing app.*
+    os.environ["LLM_BASE_URL"] = base_url
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["LLM_RATE_PER_MINUTE"] = str(args.rate_per_minute)
+    os.environ["LLM_STRUCTURED_OUTPUT"] = "true" # The stand-in synthesizes parse answers from the schema
+    from app.schemas.resume import StructuredResume
+    from app.services import resume_tailoring
+
+    seed = StructuredResume(**SAMPLE_STRUCTURED_RESUME)
+
+    resume_text = Path(args.resume_file).read_text(encoding="utf-8") if args.resume_file else SAMPLE_RESUME
+    job_description = Path(args.jd_file).read_text(encoding="utf-8") if args.jd_file else SAMPLE_JOB_DESCRIPTION
+    stats_url = base_url.rsplit("/v1", 1)[0] + "/stats"
+    logger.info(f"Benchmarking against {base_url}")
+
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        before = httpx.get(stats_url).json()
+        start = time.perf_counter()
+        latencies = asyncio.run(run_level(resume_tailoring, resume_text, job_description, args.pipelines, concurrency, seed))
+        elapsed = time.perf_counter() - start
+        after = httpx.get(stats_url).json()
+        delta = {k: after.get(k, 0) - before.get(k, 0) for k in after if after.get(k, 0) != before.get(k, 0)}
+        logger.info(
+            f"concurrency {concurrency:>3} | {args.pipelines / elapsed:6.2f} pipelines/s | "
+            f"p50 {statistics.median(latencies):6.2f}s p95 {percentile(latencies, 95):6.2f}s | "
+            f"LLM requests {delta.get('requests', 0)} {delta}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Offline OpenAI-compatible stand-in for the LLM provider.
+
+Serves /v1/chat/completions (and the Azure-style /openai/deployments/<name>/chat/completions)
+so the LLM-heavy paths (parsing, tailoring, rewrite suggestions, the browser-use agent) can
+be run and load-tested without Azure/OpenAI. Point the backend at it with
+
+    LLM_BASE_URL=http://127.0.0.1:8085/v1
+
+Modes:
+  replay  Answers from a recordings file (JSONL). Requests are matched on their prompt and
+          parameters (not the model name); a miss falls back to another recording with the
+          same system prompt, then to a synthesized answer (a minimal JSON object for
+          structured-output requests, placeholder text otherwise).
+  record  Forwards requests to the real provider configured in backend/.env (through the
+          LLM gateway) and appends each request/response pair, with its latency, to the file.
+
+Latency is simulated as base + per-token time, with the base drawn from a fixed, normal or
+lognormal distribution, or taken from the recording. Optional faults: a per-minute request
+quota (with x-ratelimit-* headers and 429s beyond it) and a random 429 rate.
+
+Usage:
+    python opencrew/scripts/llm_standin.py --mode record --recordings llm_recordings.jsonl
+    python opencrew/scripts/llm_standin.py --mode replay --recordings llm_recordings.jsonl \\
+        --latency lognormal --latency-ms 900 --ms-per-token 15 --requests-per-minute 600
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add the backend project root to the Python path so `app.*` imports work
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..', 'backend'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Request fields that determine the answer; the model name is left out so recordings made
+# against one deployment replay under any other
+MATCH_FIELDS = ("messages", "temperature", "max_tokens", "response_format", "tools", "tool_choice", "n", "stop")
+LATENCY_DISTRIBUTIONS = ("none", "fixed", "normal", "lognormal", "recorded")
+
+
+def request_key(body: Dict[str, Any]) -> str:
+    payload = {field: body.get(field) for field in MATCH_FIELDS}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def system_key(body: Dict[str, Any]) -> Optional[str]:
+    messages = body.get("messages") or []
+    if messages and messages[0].get("role") == "system":
+        return hashlib.sha256(json.dumps(messages[0].get("content"), default=str).encode("utf-8")).hexdigest()
+    return None
+
+
+def estimate_tokens(value: Any) -> int:
+    return max(1, len(json.dumps(value, default=str)) // 4)
+
+
+def minimal_instance(schema: Dict[str, Any], defs: Optional[Dict[str, Any]] = None) -> Any:
+    """Smallest value that satisfies a (strict structured-output) JSON schema."""
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return minimal_instance(defs[schema["$ref"].split("/")[-1]], defs)
+    for combinator in ("anyOf", "oneOf"):
+        if combinator in schema:
+            options = schema[combinator]
+            nullable = next((o for o in options if o.get("type") == "null"), None)
+            return None if nullable is not None else minimal_instance(options[0], defs)
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        schema_type = "null" if "null" in schema_type else schema_type[0]
+    if "enum" in schema:
+        return schema["enum"][0]
+    if schema_type == "object":
+        properties = schema.get("properties", {})
+        return {name: minimal_instance(properties[name], defs) for name in schema.get("required", properties)}
+    return {"array": [], "string": "", "integer": 0, "number": 0, "boolean": False, "null": None}.get(schema_type)
+
+
+def synthesize_content(body: Dict[str, Any]) -> str:
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        return json.dumps(minimal_instance(response_format["json_schema"]["schema"]))
+    if response_format.get("type") == "json_object":
+        return "{}"
+    return "Stand-in response."
+
+
+class Recordings:
+    """Recorded request/response pairs, indexed by request key and by system prompt."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.by_key: Dict[str, Dict[str, Any]] = {}
+        self.by_system: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._next: Dict[str, int] = defaultdict(int)
+        self._write_lock = asyncio.Lock()
+        if path.exists():
+            with path.open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+        logger.info(f"Loaded {len(self.by_key)} recordings from {path}")
+
+    def _index(self, entry: Dict[str, Any]) -> None:
+        self.by_key[entry["key"]] = entry
+        if entry.get("system_key"):
+            self.by_system[entry["system_key"]].append(entry)
+
+    def find(self, body: Dict[str, Any]):
+        """Returns (entry, match) with match 'exact', 'system' or 'miss'."""
+        entry = self.by_key.get(request_key(body))
+        if entry is not None:
+            return entry, "exact"
+        candidates = self.by_system.get(system_key(body) or "")
+        if candidates:
+            index = self._next[system_key(body)] % len(candidates) # Round-robin over similar calls
+            self._next[system_key(body)] += 1
+            return candidates[index], "system"
+        return None, "miss"
+
+    async def append(self, body: Dict[str, Any], response: Dict[str, Any], latency_ms: float) -> None:
+        entry = {
+            "key": request_key(body), "system_key": system_key(body), "model": body.get("model"),
+            "request": {field: body.get(field) for field in MATCH_FIELDS if body.get(field) is not None},
+            "response": response, "latency_ms": round(latency_ms, 1),
+        }
+        async with self._write_lock:
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+            self._index(entry)
+
+
+class Latency:
+    def __init__(self, distribution: str, base_ms: float, jitter: float, ms_per_token: float):
+        self.distribution = distribution
+        self.base_ms = base_ms
+        self.jitter = jitter
+        self.ms_per_token = ms_per_token
+
+    def seconds(self, completion_tokens: int, recorded_ms: Optional[float] = None) -> float:
+        if self.distribution == "recorded" and recorded_ms is not None:
+            return recorded_ms / 1000
+        if self.distribution == "none":
+            return 0.0
+        base = self.base_ms
+        if self.distribution == "normal":
+            base = max(0.0, random.gauss(self.base_ms, self.base_ms * self.jitter))
+        elif self.distribution in ("lognormal", "recorded"): # Median base_ms, long right tail
+            base = random.lognormvariate(0, self.jitter) * self.base_ms
+        return (base + completion_tokens * self.ms_per_token) / 1000
+
+
+class Quota:
+    """Requests-per-minute quota over a sliding window, reported the way OpenAI does."""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self.sent: deque = deque()
+
+    def take(self) -> Dict[str, str]:
+        """Headers for this request; x-ratelimit-remaining-requests is -1 when over quota."""
+        if not self.per_minute:
+            return {}
+        now = time.monotonic()
+        while self.sent and now - self.sent[0] >= 60:
+            self.sent.popleft()
+        reset = 60 - (now - self.sent[0]) if self.sent else 0.0
+        if len(self.sent) >= self.per_minute:
+            return {"x-ratelimit-remaining-requests": "-1", "x-ratelimit-reset-requests": f"{reset:.3f}s", "retry-after": str(max(1, round(reset)))}
+        self.sent.append(now)
+        return {
+            "x-ratelimit-limit-requests": str(self.per_minute),
+            "x-ratelimit-remaining-requests": str(self.per_minute - len(self.sent)),
+            "x-ratelimit-reset-requests": f"{reset:.3f}s",
+        }
+
+
+def create_app(mode: str, recordings_path: Path, latency: Latency, requests_per_minute: int = 0,
+               error_rate: float = 0.0, retry_after: float = 1.0) -> FastAPI:
+    app = FastAPI(title="LLM stand-in")
+    recordings = Recordings(recordings_path)
+    quota = Quota(requests_per_minute)
+    stats: Dict[str, int] = defaultdict(int)
+    counter = {"id": 0}
+
+    def throttled(message: str, headers: Dict[str, str]) -> JSONResponse:
+        stats["throttled"] += 1
+        return JSONResponse({"error": {"message": message, "type": "rate_limit_error", "code": "429"}}, status_code=429, headers=headers)
+
+    async def forward(body: Dict[str, Any]) -> JSONResponse:
+        from app.services import llm_gateway # Real provider from backend/.env
+
+        params = {k: v for k, v in body.items() if k not in ("model", "messages", "stream")}
+        start = time.perf_counter()
+        completion = await llm_gateway.chat_completion_async(body["messages"], call_site="standin_record", **params)
+        latency_ms = (time.perf_counter() - start) * 1000
+        response = completion.model_dump(exclude_none=True)
+        await recordings.append(body, response, latency_ms)
+        stats["recorded"] += 1
+        return JSONResponse(response)
+
+    async def replay(body: Dict[str, Any]) -> JSONResponse:
+        headers = quota.take()
+        if headers.get("x-ratelimit-remaining-requests") == "-1":
+            return throttled("Requests per minute quota exceeded.", headers)
+        if error_rate and random.random() < error_rate:
+            return throttled("Injected rate limit.", {"retry-after": str(retry_after)})
+
+        entry, match = recordings.find(body)
+        stats[match] += 1
+        counter["id"] += 1
+        if entry is not None:
+            response = json.loads(json.dumps(entry["response"]))
+            recorded_ms = entry.get("latency_ms")
+        else:
+            content = synthesize_content(body)
+            response = {
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": estimate_tokens(body.get("messages")), "completion_tokens": estimate_tokens(content)},
+            }
+            response["usage"]["total_tokens"] = response["usage"]["prompt_tokens"] + response["usage"]["completion_tokens"]
+            recorded_ms = None
+        response.update(id=f"chatcmpl-standin-{counter['id']}", created=int(time.time()), model=body.get("model") or "stand-in")
+
+        completion_tokens = (response.get("usage") or {}).get("completion_tokens", 0)
+        await asyncio.sleep(latency.seconds(completion_tokens, recorded_ms))
+        return JSONResponse(response, headers=headers)
+
+    async def chat_completions(request: Request) -> JSONResponse:
+        body = await request.json()
+        stats["requests"] += 1
+        if body.get("stream"):
+            return JSONResponse({"error": {"message": "Streaming is not supported by the stand-in."}}, status_code=400)
+        return await (forward(body) if mode == "record" else replay(body))
+
+    async def deployment_chat_completions(deployment: str, request: Request) -> JSONResponse:
+        return await chat_completions(request)
+
+    app.add_api_route("/v1/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/openai/deployments/{deployment}/chat/completions", deployment_chat_completions, methods=["POST"])
+    app.add_api_route("/stats", lambda: dict(stats), methods=["GET"])
+    return app
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--recordings", default="llm_recordings.jsonl", help="JSONL file to replay from / record into")
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal", help="Simulated latency distribution (replay)")
+    parser.add_argument("--latency-ms", type=float, default=800, help="Mean (normal) or median (lognormal) base latency")
+    parser.add_argument("--latency-jitter", type=float, default=0.4, help="Relative stddev (normal) or sigma (lognormal)")
+    parser.add_argument("--ms-per-token", type=float, default=10, help="Added latency per completion token")
+    parser.add_argument("--requests-per-minute", type=int, default=0, help="Simulated provider quota (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After sent with injected 429s")
+
+
+def app_from_args(args: argparse.Namespace, mode: str = "replay") -> FastAPI:
+    latency = Latency(args.latency, args.latency_ms, args.latency_jitter, args.ms_per_token)
+    return create_app(mode, Path(args.recordings), latency, args.requests_per_minute, args.error_rate, args.retry_after)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible LLM stand-in with record/replay.")
+    parser.add_argument("--mode", choices=("replay", "record"), default="replay")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8085)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        from app.core.config import settings
+        if settings.LLM_BASE_URL:
+            logger.error("LLM_BASE_URL is set; unset it so record mode forwards to the real provider.")
+            sys.exit(1)
+    logger.info(f"LLM stand-in ({args.mode}) on http://{args.host}:{args.port}/v1")
+    uvicorn.run(app_from_args(args, args.mode), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()